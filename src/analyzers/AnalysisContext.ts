@@ -0,0 +1,204 @@
+import Parser from 'tree-sitter';
+import { FunctionInfo, NodeBudget, ParseOptions } from '../types';
+
+/**
+ * Line-offset index over a file's source, built once per file
+ *
+ * Lines are 1-based and absolute (tree-sitter row + 1), so a line number
+ * taken from any node of the file's tree maps to the right text even
+ * when only one function of the file is being analyzed.
+ */
+export class LineIndex {
+  readonly code: string;
+  private lineStarts: number[];
+  // effectiveBefore[i]: effective lines among the first i lines, built on first use
+  private effectiveBefore: Uint32Array | null = null;
+
+  constructor(code: string) {
+    this.code = code;
+    this.lineStarts = [0];
+
+    let newline = code.indexOf('\n');
+    while (newline !== -1) {
+      this.lineStarts.push(newline + 1);
+      newline = code.indexOf('\n', newline + 1);
+    }
+  }
+
+  get lineCount(): number {
+    return this.lineStarts.length;
+  }
+
+  /**
+   * Text of a line without its line terminator, or '' if out of range
+   */
+  getLine(line: number): string {
+    if (line < 1 || line > this.lineStarts.length) {
+      return '';
+    }
+
+    const start = this.lineStarts[line - 1];
+    let end = line < this.lineStarts.length ? this.lineStarts[line] - 1 : this.code.length;
+    if (end > start && this.code.charCodeAt(end - 1) === 13) {
+      end--; // \r of a CRLF terminator
+    }
+
+    return this.code.slice(start, end);
+  }
+
+  /**
+   * Total and effective (non-blank, non-comment) lines from startLine to
+   * endLine inclusive. Every line is classified once per file, so counting
+   * nested ranges does not rescan their text.
+   */
+  countLines(startLine: number, endLine: number): { total: number; effective: number } {
+    const effectiveBefore = this.effectiveBefore ??= this.classifyLines();
+    const first = Math.max(1, startLine);
+    const last = Math.min(this.lineStarts.length, endLine);
+    if (first > last) {
+      return { total: 0, effective: 0 };
+    }
+
+    return {
+      total: last - first + 1,
+      effective: effectiveBefore[last] - effectiveBefore[first - 1],
+    };
+  }
+
+  private classifyLines(): Uint32Array {
+    const effectiveBefore = new Uint32Array(this.lineStarts.length + 1);
+
+    for (let line = 1; line <= this.lineStarts.length; line++) {
+      const trimmed = this.getLineContent(line);
+      const effective = trimmed.length > 0 &&
+        !trimmed.startsWith('//') &&
+        !trimmed.startsWith('/*') &&
+        !trimmed.startsWith('*') &&
+        !trimmed.startsWith('#');
+      effectiveBefore[line] = effectiveBefore[line - 1] + (effective ? 1 : 0);
+    }
+
+    return effectiveBefore;
+  }
+
+  /**
+   * Trimmed text of a line, as used for issue snippets
+   */
+  getLineContent(line: number): string {
+    return this.getLine(line).trim();
+  }
+
+  /**
+   * Text spanning whole lines from startLine to endLine inclusive
+   */
+  getText(startLine: number, endLine: number): string {
+    const first = Math.max(1, startLine);
+    const last = Math.min(this.lineStarts.length, endLine);
+    if (first > last) {
+      return '';
+    }
+
+    const end = last < this.lineStarts.length ? this.lineStarts[last] - 1 : this.code.length;
+    return this.code.slice(this.lineStarts[first - 1], end);
+  }
+}
+
+/**
+ * Analysis of a function together with the functions nested in it
+ */
+export interface FunctionTree {
+  info: FunctionInfo;
+  // Byte range of the function's node
+  startIndex: number;
+  endIndex: number;
+  children: FunctionTree[];
+  // What an enclosing function adds to its cognitive complexity: the
+  // flow-break increments of this subtree, each one more per level of
+  // nesting around it, and this function's own calls by callee, which
+  // count when they recurse into an enclosing function. `recursion` is
+  // the part of the inclusive complexity from calls to this function.
+  cognitive: { increments: number; calls: Map<string, number>; recursion: number };
+}
+
+/**
+ * Per-function results kept across analyses of the same file, so a parser
+ * can skip functions an edit did not touch
+ */
+export interface FunctionCache {
+  get(node: Parser.SyntaxNode): FunctionTree | undefined;
+  set(node: Parser.SyntaxNode, tree: FunctionTree): void;
+}
+
+/**
+ * Source shared by every check analyzing one region of a file
+ *
+ * All regions of a file share the same LineIndex; the region only
+ * bounds line-based scans such as TODO detection.
+ */
+export class AnalysisContext {
+  readonly lines: LineIndex;
+  readonly startLine: number;
+  readonly endLine: number;
+  readonly functionCache?: FunctionCache;
+  // Shared by every walk of the file; aborts analysis past its limits
+  readonly budget?: NodeBudget;
+  readonly metricsOnly: boolean;
+  readonly minFingerprintTokens?: number;
+  readonly collectImports: boolean;
+
+  constructor(
+    lines: LineIndex,
+    startLine: number = 1,
+    endLine: number = lines.lineCount,
+    functionCache?: FunctionCache,
+    options: ParseOptions = {}
+  ) {
+    this.lines = lines;
+    this.startLine = startLine;
+    this.endLine = endLine;
+    this.functionCache = functionCache;
+    this.budget = options.budget;
+    this.metricsOnly = options.metricsOnly ?? false;
+    this.minFingerprintTokens = options.minFingerprintTokens;
+    this.collectImports = options.collectImports ?? false;
+  }
+
+  /**
+   * Context covering the whole of a piece of source
+   */
+  static fromCode(code: string, functionCache?: FunctionCache, options?: ParseOptions): AnalysisContext {
+    const lines = new LineIndex(code);
+    return new AnalysisContext(lines, 1, lines.lineCount, functionCache, options);
+  }
+
+  /**
+   * Accepts either raw source or an existing context, so checks can still
+   * be constructed standalone from a string
+   */
+  static from(source: string | AnalysisContext): AnalysisContext {
+    return typeof source === 'string' ? AnalysisContext.fromCode(source) : source;
+  }
+
+  /**
+   * Context for a sub-region of the same file, sharing its line index
+   */
+  forRange(startLine: number, endLine: number): AnalysisContext {
+    return new AnalysisContext(this.lines, startLine, endLine, this.functionCache, {
+      budget: this.budget,
+      metricsOnly: this.metricsOnly,
+      minFingerprintTokens: this.minFingerprintTokens,
+      collectImports: this.collectImports,
+    });
+  }
+
+  /**
+   * Source text of this region
+   */
+  getText(): string {
+    return this.lines.getText(this.startLine, this.endLine);
+  }
+
+  getLineContent(line: number): string {
+    return this.lines.getLineContent(line);
+  }
+}
@@ -0,0 +1,77 @@
+import { AnalysisLimitReason, NodeBudget } from '../types';
+
+/**
+ * Thrown when a file exceeds one of the configured analysis limits
+ */
+export class AnalysisLimitError extends Error {
+  readonly reason: AnalysisLimitReason;
+
+  constructor(reason: AnalysisLimitReason, message: string) {
+    super(message);
+    this.name = 'AnalysisLimitError';
+    this.reason = reason;
+  }
+}
+
+/**
+ * Per-file budget of syntax nodes walked and wall-clock time, checked by
+ * the traversal engine as it visits nodes
+ */
+export class AnalysisBudget implements NodeBudget {
+  // Reading the clock on every node would cost more than the walk itself
+  private static CLOCK_INTERVAL = 1024;
+
+  private nodes = 0;
+  private readonly deadline: number;
+
+  constructor(private readonly maxNodes: number, private readonly timeoutMs: number) {
+    this.deadline = performance.now() + timeoutMs;
+  }
+
+  visit(): void {
+    if (++this.nodes > this.maxNodes) {
+      throw new AnalysisLimitError('TOO_MANY_NODES', `Walked more than ${this.maxNodes} syntax nodes`);
+    }
+    // The deadline is set before parsing, so parse time counts too
+    if (this.nodes % AnalysisBudget.CLOCK_INTERVAL === 0 && performance.now() > this.deadline) {
+      throw new AnalysisLimitError('TIMEOUT', `Analysis took longer than ${this.timeoutMs} ms`);
+    }
+  }
+}
+
+// Markers conventionally placed at the top of generated files
+const GENERATED_MARKER = /@generated\b|\bDO NOT EDIT\b/;
+const MINIFIED_AVERAGE_LINE = 250;
+const MINIFIED_LONGEST_LINE = 10_000;
+
+/**
+ * Recognize minified or generated source from a marker in its header or
+ * from its line lengths. Returns why the file should only be measured, or
+ * null for ordinary source.
+ */
+export function detectGeneratedCode(code: string): { reason: AnalysisLimitReason; message: string } | null {
+  if (GENERATED_MARKER.test(code.slice(0, 1024))) {
+    return { reason: 'GENERATED', message: 'Generated file (marker in header)' };
+  }
+
+  let lines = 0;
+  let longest = 0;
+  let start = 0;
+  while (start <= code.length) {
+    const newline = code.indexOf('\n', start);
+    const end = newline === -1 ? code.length : newline;
+    longest = Math.max(longest, end - start);
+    lines++;
+    start = end + 1;
+  }
+
+  const average = code.length / lines;
+  if (average > MINIFIED_AVERAGE_LINE || longest > MINIFIED_LONGEST_LINE) {
+    return {
+      reason: 'MINIFIED',
+      message: `Minified file (average line ${Math.round(average)} chars, longest ${longest})`,
+    };
+  }
+
+  return null;
+}
@@ -0,0 +1,593 @@
+import {
+  AnalysisError,
+  AnalysisList,
+  ClassInfo,
+  CodeFix,
+  CodeIssue,
+  ComplexityMetrics,
+  FileAnalysis,
+  FunctionFingerprint,
+  FunctionInfo,
+  FunctionRef,
+  IssueCategory,
+  IssueType,
+  ModuleImport,
+} from '../types';
+
+type TypedArray = Uint8Array | Uint32Array | Float64Array;
+
+const u8 = (capacity: number) => new Uint8Array(capacity);
+const u32 = (capacity: number) => new Uint32Array(capacity);
+const f64 = (capacity: number) => new Float64Array(capacity);
+
+// Marks an absent optional string or row in a Uint32 column
+const NONE = 0xffffffff;
+
+const METRIC_KEYS: Array<keyof ComplexityMetrics> = [
+  'cyclomaticComplexity',
+  'cognitiveComplexity',
+  'linesOfCode',
+  'effectiveLinesOfCode',
+  'nestingDepth',
+  'functionLength',
+  'parameterCount',
+];
+
+const SEVERITIES: Array<CodeIssue['severity']> = ['low', 'medium', 'high', 'critical'];
+
+// Quoted names and numbers are what varies between issues of one rule
+const PARAMETER = /'[^'\n]*'|\b\d+(?:\.\d+)?\b/g;
+const PLACEHOLDER = '\u0000';
+
+/**
+ * Split an issue message into a template shared by every issue of its rule
+ * and the parameters filled into it, e.g. `Function 'a' has 12 parameters`
+ * into `Function \0 has \0 parameters` and `'a'`, `12`.
+ */
+export function splitMessage(message: string): { template: string; params: string[] } {
+  const params: string[] = [];
+  if (message.includes(PLACEHOLDER)) {
+    return { template: message, params };
+  }
+
+  const template = message.replace(PARAMETER, param => {
+    params.push(param);
+    return PLACEHOLDER;
+  });
+  return { template, params };
+}
+
+/**
+ * Inverse of splitMessage
+ */
+export function joinMessage(template: string, params: string[]): string {
+  if (params.length === 0) {
+    return template;
+  }
+  return template.split(PLACEHOLDER).reduce((message, part, i) => message + params[i - 1] + part);
+}
+
+/**
+ * Stores each distinct string once and refers to it by index
+ */
+export class StringPool {
+  private readonly ids = new Map<string, number>();
+  private readonly values: string[] = [];
+
+  intern(value: string): number {
+    let id = this.ids.get(value);
+    if (id === undefined) {
+      id = this.values.length;
+      this.values.push(value);
+      this.ids.set(value, id);
+    }
+    return id;
+  }
+
+  get(id: number): string {
+    return this.values[id];
+  }
+
+  get size(): number {
+    return this.values.length;
+  }
+}
+
+/**
+ * Append-only typed array that doubles its capacity as it fills
+ */
+class Column {
+  private data: TypedArray;
+  length = 0;
+
+  constructor(private readonly allocate: (capacity: number) => TypedArray) {
+    this.data = allocate(64);
+  }
+
+  push(value: number): number {
+    if (this.length === this.data.length) {
+      const grown = this.allocate(this.data.length * 2);
+      grown.set(this.data);
+      this.data = grown;
+    }
+    this.data[this.length] = value;
+    return this.length++;
+  }
+
+  get(index: number): number {
+    return this.data[index];
+  }
+
+  set(index: number, value: number): void {
+    this.data[index] = value;
+  }
+
+  get byteLength(): number {
+    return this.data.byteLength;
+  }
+}
+
+/**
+ * Rows of numbers stored column by column, one typed array per column
+ */
+class Table<K extends string> {
+  private readonly columns = {} as Record<K, Column>;
+  length = 0;
+
+  constructor(layout: Record<K, (capacity: number) => TypedArray>) {
+    for (const key of Object.keys(layout) as K[]) {
+      this.columns[key] = new Column(layout[key]);
+    }
+  }
+
+  push(row: Record<K, number>): number {
+    for (const key in this.columns) {
+      this.columns[key].push(row[key]);
+    }
+    return this.length++;
+  }
+
+  get(index: number, column: K): number {
+    return this.columns[column].get(index);
+  }
+
+  get byteLength(): number {
+    return (Object.values(this.columns) as Column[]).reduce((sum, column) => sum + column.byteLength, 0);
+  }
+}
+
+/**
+ * Compact in-memory store of file analyses for whole-run reports
+ *
+ * Analyses are kept as struct-of-arrays typed-array columns rather than as
+ * object graphs: metrics are rows of a Float64Array, issues store their
+ * line, severity and rule as numbers, and every string (paths, names, issue
+ * types, snippets, import specifiers) is interned once. Issue messages are
+ * interned as a template per rule plus their varying parameters, and
+ * fingerprint signatures are kept as runs of a Uint32Array. A FileAnalysis
+ * is only materialized when it is read, so reporters that iterate hold one
+ * file's objects at a time.
+ */
+export class AnalysisStore implements AnalysisList {
+  private readonly strings = new StringPool();
+  // METRIC_KEYS.length values per row
+  private readonly metrics = new Column(f64);
+  private readonly files = new Table({
+    path: u32,
+    language: u32,
+    metrics: u32,
+    functionStart: u32,
+    functionCount: u32,
+    classStart: u32,
+    classCount: u32,
+    totalIssues: u32,
+    analysisDate: f64,
+    degradedPath: u32,
+    degradedError: u32,
+    degradedType: u32,
+    importStart: u32,
+    importCount: u32,
+  });
+  private readonly functions = new Table({
+    name: u32,
+    startLine: u32,
+    endLine: u32,
+    metrics: u32,
+    exclusiveMetrics: u32,
+    previousMetrics: u32,
+    parent: u32,
+    childStart: u32,
+    childCount: u32,
+    issueStart: u32,
+    issueCount: u32,
+    fingerprintTokens: u32,
+    minHashStart: u32,
+    minHashCount: u32,
+  });
+  private readonly classes = new Table({
+    name: u32,
+    startLine: u32,
+    endLine: u32,
+    metrics: u32,
+    methodStart: u32,
+    methodCount: u32,
+  });
+  private readonly issues = new Table({
+    type: u32,
+    category: u32,
+    severity: u8,
+    line: u32,
+    template: u32,
+    paramStart: u32,
+    paramCount: u32,
+    suggestion: u32,
+    codeSnippet: u32,
+  });
+  // Parents and children of nested functions
+  private readonly refs = new Table({ name: u32, startLine: u32 });
+  private readonly imports = new Table({ source: u32, line: u32, nameStart: u32, nameCount: u32 });
+  // Function rows of each file's function list and each class's method list
+  private readonly functionLists = new Column(u32);
+  private readonly params = new Column(u32);
+  // Strings of the `names` of Python `from` imports
+  private readonly importNames = new Column(u32);
+  private readonly minHashes = new Column(u32);
+  // Fixes are rare and only attached just before reporting
+  private readonly fixes = new Map<number, CodeFix>();
+  // File rows in reading order
+  private readonly order = new Column(u32);
+
+  get length(): number {
+    return this.files.length;
+  }
+
+  /**
+   * Size of the typed arrays, not counting interned strings
+   */
+  get byteLength(): number {
+    const columns: Array<{ byteLength: number }> = [
+      this.files, this.functions, this.classes, this.issues, this.refs, this.imports,
+      this.metrics, this.functionLists, this.params, this.importNames, this.minHashes, this.order,
+    ];
+    return columns.reduce((sum, column) => sum + column.byteLength, 0);
+  }
+
+  /**
+   * Append an analysis. Only attached fixes are kept by reference; the
+   * analysis itself can be dropped once added.
+   */
+  add(analysis: FileAnalysis): void {
+    // Methods usually also appear in the file's function list; store them once
+    const functionRows = new Map<FunctionInfo, number>();
+    const addFunction = (fn: FunctionInfo) => {
+      let row = functionRows.get(fn);
+      if (row === undefined) {
+        row = this.addFunction(fn);
+        functionRows.set(fn, row);
+      }
+      return row;
+    };
+
+    const functions = analysis.functions.map(addFunction);
+    const functionStart = this.functionLists.length;
+    functions.forEach(row => this.functionLists.push(row));
+
+    const classStart = this.classes.length;
+    for (const cls of analysis.classes) {
+      const methods = cls.methods.map(addFunction);
+      const methodStart = this.functionLists.length;
+      methods.forEach(row => this.functionLists.push(row));
+
+      this.classes.push({
+        name: this.strings.intern(cls.name),
+        startLine: cls.startLine,
+        endLine: cls.endLine,
+        metrics: this.addMetrics(cls.metrics),
+        methodStart,
+        methodCount: methods.length,
+      });
+    }
+
+    const { degraded } = analysis;
+    const importStart = this.imports.length;
+    analysis.imports?.forEach(moduleImport => this.addImport(moduleImport));
+
+    const row = this.files.push({
+      path: this.strings.intern(analysis.filePath),
+      language: this.strings.intern(analysis.language),
+      metrics: this.addMetrics(analysis.overallMetrics),
+      functionStart,
+      functionCount: functions.length,
+      classStart,
+      classCount: analysis.classes.length,
+      totalIssues: analysis.totalIssues,
+      // Analyses read back from JSON carry their date as a string
+      analysisDate: new Date(analysis.analysisDate).getTime(),
+      degradedPath: degraded ? this.strings.intern(degraded.filePath) : NONE,
+      degradedError: degraded ? this.strings.intern(degraded.error) : NONE,
+      degradedType: degraded ? this.strings.intern(degraded.errorType) : NONE,
+      // Tells an empty import list from none
+      importStart: analysis.imports ? importStart : NONE,
+      importCount: analysis.imports?.length ?? 0,
+    });
+    this.order.push(row);
+  }
+
+  /**
+   * Materialize the analysis at `index`
+   */
+  get(index: number): FileAnalysis {
+    if (index < 0 || index >= this.length) {
+      throw new RangeError(`No analysis at index ${index}`);
+    }
+
+    const row = this.order.get(index);
+    const files = this.files;
+    const functions = new Map<number, FunctionInfo>();
+    const getFunction = (fnRow: number) => {
+      let fn = functions.get(fnRow);
+      if (!fn) {
+        fn = this.getFunction(fnRow);
+        functions.set(fnRow, fn);
+      }
+      return fn;
+    };
+
+    const classes: ClassInfo[] = [];
+    const classStart = files.get(row, 'classStart');
+    for (let cls = classStart; cls < classStart + files.get(row, 'classCount'); cls++) {
+      classes.push({
+        name: this.strings.get(this.classes.get(cls, 'name')),
+        startLine: this.classes.get(cls, 'startLine'),
+        endLine: this.classes.get(cls, 'endLine'),
+        methods: this.getFunctionList(this.classes.get(cls, 'methodStart'), this.classes.get(cls, 'methodCount'))
+          .map(getFunction),
+        metrics: this.getMetrics(this.classes.get(cls, 'metrics')),
+      });
+    }
+
+    const analysis: FileAnalysis = {
+      filePath: this.strings.get(files.get(row, 'path')),
+      language: this.strings.get(files.get(row, 'language')),
+      overallMetrics: this.getMetrics(files.get(row, 'metrics')),
+      functions: this.getFunctionList(files.get(row, 'functionStart'), files.get(row, 'functionCount'))
+        .map(getFunction),
+      classes,
+      totalIssues: files.get(row, 'totalIssues'),
+      analysisDate: new Date(files.get(row, 'analysisDate')),
+    };
+
+    if (files.get(row, 'degradedType') !== NONE) {
+      analysis.degraded = {
+        filePath: this.strings.get(files.get(row, 'degradedPath')),
+        error: this.strings.get(files.get(row, 'degradedError')),
+        errorType: this.strings.get(files.get(row, 'degradedType')) as AnalysisError['errorType'],
+      };
+    }
+
+    const importStart = files.get(row, 'importStart');
+    if (importStart !== NONE) {
+      analysis.imports = [];
+      for (let i = importStart; i < importStart + files.get(row, 'importCount'); i++) {
+        analysis.imports.push(this.getImport(i));
+      }
+    }
+
+    return analysis;
+  }
+
+  slice(start = 0, end = this.length): FileAnalysis[] {
+    const from = clampIndex(start, this.length);
+    const to = clampIndex(end, this.length);
+    const analyses: FileAnalysis[] = [];
+    for (let i = from; i < to; i++) {
+      analyses.push(this.get(i));
+    }
+    return analyses;
+  }
+
+  *[Symbol.iterator](): Iterator<FileAnalysis> {
+    for (let i = 0; i < this.length; i++) {
+      yield this.get(i);
+    }
+  }
+
+  /**
+   * Order the analyses by file path, as files are discovered, rather than
+   * by when they finished
+   */
+  sortByPath(): void {
+    const rows = Array.from({ length: this.length }, (_, i) => this.order.get(i));
+    const paths = rows.map(row => this.strings.get(this.files.get(row, 'path')));
+    const sorted = rows.map((_, i) => i).sort((a, b) => (paths[a] < paths[b] ? -1 : paths[a] > paths[b] ? 1 : a - b));
+    sorted.forEach((i, position) => this.order.set(position, rows[i]));
+  }
+
+  private addFunction(fn: FunctionInfo): number {
+    const issueStart = this.issues.length;
+    fn.issues.forEach(issue => this.addIssue(issue));
+
+    const childStart = this.refs.length;
+    fn.children?.forEach(child => this.addRef(child));
+
+    const minHashStart = this.minHashes.length;
+    fn.fingerprint?.minHash.forEach(hash => this.minHashes.push(hash));
+
+    return this.functions.push({
+      name: this.strings.intern(fn.name),
+      startLine: fn.startLine,
+      endLine: fn.endLine,
+      metrics: this.addMetrics(fn.metrics),
+      exclusiveMetrics: fn.exclusiveMetrics ? this.addMetrics(fn.exclusiveMetrics) : NONE,
+      previousMetrics: fn.previousMetrics ? this.addMetrics(fn.previousMetrics) : NONE,
+      parent: fn.parent ? this.addRef(fn.parent) : NONE,
+      // Tells an empty children list from none
+      childStart: fn.children ? childStart : NONE,
+      childCount: fn.children?.length ?? 0,
+      issueStart,
+      issueCount: fn.issues.length,
+      fingerprintTokens: fn.fingerprint ? fn.fingerprint.tokens : NONE,
+      minHashStart,
+      minHashCount: fn.fingerprint?.minHash.length ?? 0,
+    });
+  }
+
+  private getFunction(row: number): FunctionInfo {
+    const fns = this.functions;
+    const exclusiveMetrics = fns.get(row, 'exclusiveMetrics');
+    const previousMetrics = fns.get(row, 'previousMetrics');
+    const parent = fns.get(row, 'parent');
+    const childStart = fns.get(row, 'childStart');
+
+    const children: FunctionRef[] = [];
+    for (let child = childStart; childStart !== NONE && child < childStart + fns.get(row, 'childCount'); child++) {
+      children.push(this.getRef(child));
+    }
+
+    const issues: CodeIssue[] = [];
+    const issueStart = fns.get(row, 'issueStart');
+    for (let issue = issueStart; issue < issueStart + fns.get(row, 'issueCount'); issue++) {
+      issues.push(this.getIssue(issue));
+    }
+
+    const fingerprintTokens = fns.get(row, 'fingerprintTokens');
+    let fingerprint: FunctionFingerprint | undefined;
+    if (fingerprintTokens !== NONE) {
+      const minHashStart = fns.get(row, 'minHashStart');
+      const minHash: number[] = [];
+      for (let i = minHashStart; i < minHashStart + fns.get(row, 'minHashCount'); i++) {
+        minHash.push(this.minHashes.get(i));
+      }
+      fingerprint = { tokens: fingerprintTokens, minHash };
+    }
+
+    // Fields in declaration order, absent optional ones left out
+    return {
+      name: this.strings.get(fns.get(row, 'name')),
+      startLine: fns.get(row, 'startLine'),
+      endLine: fns.get(row, 'endLine'),
+      metrics: this.getMetrics(fns.get(row, 'metrics')),
+      ...(exclusiveMetrics === NONE ? {} : { exclusiveMetrics: this.getMetrics(exclusiveMetrics) }),
+      ...(previousMetrics === NONE ? {} : { previousMetrics: this.getMetrics(previousMetrics) }),
+      ...(parent === NONE ? {} : { parent: this.getRef(parent) }),
+      ...(childStart === NONE ? {} : { children }),
+      issues,
+      ...(fingerprint ? { fingerprint } : {}),
+    };
+  }
+
+  private getFunctionList(start: number, count: number): number[] {
+    const rows: number[] = [];
+    for (let i = start; i < start + count; i++) {
+      rows.push(this.functionLists.get(i));
+    }
+    return rows;
+  }
+
+  private addIssue(issue: CodeIssue): void {
+    const { template, params } = splitMessage(issue.message);
+    const paramStart = this.params.length;
+    params.forEach(param => this.params.push(this.strings.intern(param)));
+
+    const row = this.issues.push({
+      type: this.strings.intern(issue.type),
+      category: this.strings.intern(issue.category),
+      severity: SEVERITIES.indexOf(issue.severity),
+      line: issue.line,
+      template: this.strings.intern(template),
+      paramStart,
+      paramCount: params.length,
+      suggestion: issue.suggestion === undefined ? NONE : this.strings.intern(issue.suggestion),
+      codeSnippet: issue.codeSnippet === undefined ? NONE : this.strings.intern(issue.codeSnippet),
+    });
+
+    if (issue.fix) {
+      this.fixes.set(row, issue.fix);
+    }
+  }
+
+  private getIssue(row: number): CodeIssue {
+    const issues = this.issues;
+    const params: string[] = [];
+    const paramStart = issues.get(row, 'paramStart');
+    for (let i = paramStart; i < paramStart + issues.get(row, 'paramCount'); i++) {
+      params.push(this.strings.get(this.params.get(i)));
+    }
+
+    const issue: CodeIssue = {
+      type: this.strings.get(issues.get(row, 'type')) as IssueType,
+      category: this.strings.get(issues.get(row, 'category')) as IssueCategory,
+      severity: SEVERITIES[issues.get(row, 'severity')],
+      line: issues.get(row, 'line'),
+      message: joinMessage(this.strings.get(issues.get(row, 'template')), params),
+    };
+
+    if (issues.get(row, 'suggestion') !== NONE) {
+      issue.suggestion = this.strings.get(issues.get(row, 'suggestion'));
+    }
+    if (issues.get(row, 'codeSnippet') !== NONE) {
+      issue.codeSnippet = this.strings.get(issues.get(row, 'codeSnippet'));
+    }
+    const fix = this.fixes.get(row);
+    if (fix) {
+      issue.fix = fix;
+    }
+
+    return issue;
+  }
+
+  private addRef(ref: FunctionRef): number {
+    return this.refs.push({ name: this.strings.intern(ref.name), startLine: ref.startLine });
+  }
+
+  private getRef(row: number): FunctionRef {
+    return { name: this.strings.get(this.refs.get(row, 'name')), startLine: this.refs.get(row, 'startLine') };
+  }
+
+  private addImport(moduleImport: ModuleImport): number {
+    const nameStart = this.importNames.length;
+    moduleImport.names?.forEach(name => this.importNames.push(this.strings.intern(name)));
+
+    return this.imports.push({
+      source: this.strings.intern(moduleImport.source),
+      line: moduleImport.line,
+      // Tells an empty names list from none
+      nameStart: moduleImport.names ? nameStart : NONE,
+      nameCount: moduleImport.names?.length ?? 0,
+    });
+  }
+
+  private getImport(row: number): ModuleImport {
+    const imports = this.imports;
+    const source = this.strings.get(imports.get(row, 'source'));
+    const nameStart = imports.get(row, 'nameStart');
+    if (nameStart === NONE) {
+      return { source, line: imports.get(row, 'line') };
+    }
+
+    const names: string[] = [];
+    for (let i = nameStart; i < nameStart + imports.get(row, 'nameCount'); i++) {
+      names.push(this.strings.get(this.importNames.get(i)));
+    }
+    return { source, names, line: imports.get(row, 'line') };
+  }
+
+  private addMetrics(metrics: ComplexityMetrics): number {
+    const row = this.metrics.length / METRIC_KEYS.length;
+    METRIC_KEYS.forEach(key => this.metrics.push(metrics[key]));
+    return row;
+  }
+
+  private getMetrics(row: number): ComplexityMetrics {
+    const metrics = {} as ComplexityMetrics;
+    METRIC_KEYS.forEach((key, i) => {
+      metrics[key] = this.metrics.get(row * METRIC_KEYS.length + i);
+    });
+    return metrics;
+  }
+}
+
+// Array.prototype.slice semantics for negative and out-of-range indices
+function clampIndex(index: number, length: number): number {
+  return index < 0 ? Math.max(0, length + index) : Math.min(index, length);
+}
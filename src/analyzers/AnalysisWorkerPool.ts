@@ -0,0 +1,147 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { Worker } from 'worker_threads';
+import { AnalysisResult, AnalyzerConfig, DEFAULT_CONFIG } from '../types';
+
+interface PendingTask {
+  id: number;
+  filePath: string;
+  code?: string;
+  resolve: (result: AnalysisResult) => void;
+}
+
+interface WorkerResponse {
+  id: number;
+  result: AnalysisResult;
+}
+
+/**
+ * Fixed-size pool of worker threads that analyze files in parallel
+ *
+ * Each worker owns its own FileAnalyzer (and therefore its own
+ * JavaScriptParser/PythonParser instances), since tree-sitter parsers
+ * cannot be shared across threads. Tasks are dispatched in submission
+ * order to whichever worker is idle.
+ */
+export class AnalysisWorkerPool {
+  private static WORKER_SCRIPT = path.join(__dirname, 'analysisWorker.js');
+
+  private workers: Worker[] = [];
+  private idle: Worker[] = [];
+  private queue: PendingTask[] = [];
+  private running: Map<Worker, PendingTask> = new Map();
+  private nextTaskId = 0;
+  private closed = false;
+
+  constructor(size: number, private readonly config: AnalyzerConfig = DEFAULT_CONFIG) {
+    for (let i = 0; i < size; i++) {
+      this.spawnWorker();
+    }
+  }
+
+  /**
+   * Worker threads need the compiled worker script; when running from
+   * TypeScript sources (ts-node, ts-jest) callers should analyze in-process
+   */
+  static isAvailable(): boolean {
+    return fs.existsSync(this.WORKER_SCRIPT);
+  }
+
+  /**
+   * Queue a file for analysis. Never rejects: failures are returned
+   * as AnalysisError records in the result. Pass `code` when the file
+   * was already read, so the worker does not read it again.
+   */
+  analyzeFile(filePath: string, code?: string): Promise<AnalysisResult> {
+    if (this.closed) {
+      return Promise.resolve(this.failure(filePath, 'Worker pool has been closed'));
+    }
+
+    return new Promise(resolve => {
+      this.queue.push({ id: this.nextTaskId++, filePath, code, resolve });
+      this.dispatch();
+    });
+  }
+
+  /**
+   * Terminate all workers. Queued tasks resolve as failures.
+   */
+  async close(): Promise<void> {
+    this.closed = true;
+
+    for (const task of this.queue.splice(0)) {
+      task.resolve(this.failure(task.filePath, 'Worker pool has been closed'));
+    }
+
+    await Promise.all(this.workers.map(worker => worker.terminate()));
+    this.workers = [];
+    this.idle = [];
+  }
+
+  private spawnWorker(): void {
+    const worker = new Worker(AnalysisWorkerPool.WORKER_SCRIPT, { workerData: { config: this.config } });
+
+    worker.on('message', (response: WorkerResponse) => {
+      const task = this.running.get(worker);
+      this.running.delete(worker);
+      if (task && task.id === response.id) {
+        task.resolve(response.result);
+      }
+      this.idle.push(worker);
+      this.dispatch();
+    });
+
+    worker.on('error', error => {
+      this.replaceWorker(worker, error.message);
+    });
+
+    worker.on('exit', code => {
+      if (!this.closed) {
+        this.replaceWorker(worker, `Worker exited with code ${code}`);
+      }
+    });
+
+    this.workers.push(worker);
+    this.idle.push(worker);
+  }
+
+  /**
+   * A crashed worker fails its current task and is replaced, so one bad
+   * file cannot stall the rest of the run
+   */
+  private replaceWorker(worker: Worker, reason: string): void {
+    if (!this.workers.includes(worker)) {
+      return;
+    }
+
+    this.workers = this.workers.filter(w => w !== worker);
+    this.idle = this.idle.filter(w => w !== worker);
+
+    const task = this.running.get(worker);
+    this.running.delete(worker);
+    if (task) {
+      task.resolve(this.failure(task.filePath, reason));
+    }
+
+    if (!this.closed) {
+      this.spawnWorker();
+      this.dispatch();
+    }
+  }
+
+  private dispatch(): void {
+    while (this.idle.length > 0 && this.queue.length > 0) {
+      const worker = this.idle.shift()!;
+      const task = this.queue.shift()!;
+      this.running.set(worker, task);
+      worker.postMessage({ id: task.id, filePath: task.filePath, code: task.code });
+    }
+  }
+
+  private failure(filePath: string, error: string): AnalysisResult {
+    return {
+      successful: [],
+      failed: [{ filePath, error, errorType: 'PARSE_ERROR' }],
+    };
+  }
+}
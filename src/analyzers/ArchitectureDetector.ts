@@ -1,46 +1,66 @@
 import Parser from 'tree-sitter';
 import { CodeIssue, IssueType, IssueCategory } from '../types';
+import { TraversalEngine } from './TraversalEngine';
+import { AnalysisContext } from './AnalysisContext';
 
 /**
  * Detects architectural and design issues
  */
 export class ArchitectureDetector {
-  private code: string;
+  private context: AnalysisContext;
 
-  constructor(code: string) {
-    this.code = code;
+  constructor(source: string | AnalysisContext) {
+    this.context = AnalysisContext.from(source);
   }
 
   /**
    * Detect all architectural issues
    */
   detectArchitectureIssues(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-
-    issues.push(...this.detectGodClass(node));
-    issues.push(...this.detectFeatureEnvy(node));
-    issues.push(...this.detectTightCoupling(node));
-    issues.push(...this.detectMissingAbstraction(node));
+    const engine = new TraversalEngine(this.context.budget);
+    const collect = this.register(engine);
+    engine.walk(node);
+    return collect();
+  }
 
-    return issues;
+  /**
+   * Register all architecture checks on a shared traversal engine.
+   * Returns a callback that collects the issues once the walk is done.
+   */
+  register(engine: TraversalEngine): () => CodeIssue[] {
+    const checks = [
+      engine.section('ArchitectureDetector.detectGodClass', () => this.detectGodClass(engine)),
+      engine.section('ArchitectureDetector.detectFeatureEnvy', () => this.detectFeatureEnvy(engine)),
+      engine.section('ArchitectureDetector.detectTightCoupling', () => this.detectTightCoupling(engine)),
+      engine.section('ArchitectureDetector.detectMissingAbstraction', () => this.detectMissingAbstraction(engine)),
+    ];
+
+    return () => checks.flatMap(collect => collect());
   }
 
   /**
    * Detect God Class - class with too many methods/responsibilities
    */
-  private detectGodClass(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'class_declaration' || n.type === 'class') {
+  private detectGodClass(engine: TraversalEngine): () => CodeIssue[] {
+    // One slot per class, reserved on entry so issues keep source order
+    const slots: CodeIssue[][] = [];
+    const openClasses: Array<{ slot: number; methods: string[] }> = [];
+
+    engine.on(
+      ['class_declaration', 'class'],
+      () => {
+        openClasses.push({ slot: slots.length, methods: [] });
+        slots.push([]);
+      },
+      n => {
+        const { slot, methods } = openClasses.pop()!;
         const className = this.getClassName(n);
-        const methods = this.getClassMethods(n);
         const methodCount = methods.length;
 
         // God class threshold: >10 methods
         if (methodCount > 10) {
           const line = n.startPosition.row + 1;
-          issues.push({
+          slots[slot].push({
             type: IssueType.GOD_CLASS,
             category: IssueCategory.ARCHITECTURE,
             severity: methodCount > 20 ? 'critical' : 'high',
@@ -55,7 +75,7 @@ export class ArchitectureDetector {
         const domains = this.identifyMethodDomains(methods);
         if (domains.size > 3 && methodCount > 5) {
           const line = n.startPosition.row + 1;
-          issues.push({
+          slots[slot].push({
             type: IssueType.GOD_CLASS,
             category: IssueCategory.ARCHITECTURE,
             severity: 'high',
@@ -66,25 +86,42 @@ export class ArchitectureDetector {
           });
         }
       }
+    );
 
-      for (const child of n.children) {
-        traverse(child);
+    // Methods count towards every enclosing class, including nested ones
+    engine.on(['method_definition'], n => {
+      if (openClasses.length === 0) {
+        return;
       }
-    };
 
-    traverse(node);
-    return issues;
+      const nameNode = n.childForFieldName('name');
+      if (nameNode) {
+        const name = nameNode.text;
+        for (const cls of openClasses) {
+          cls.methods.push(name);
+        }
+      }
+    });
+
+    return () => slots.flat();
   }
 
   /**
    * Detect Feature Envy - method using another object's data excessively
    */
-  private detectFeatureEnvy(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'method_definition' || n.type === 'function_declaration') {
-        const externalAccess = this.countExternalPropertyAccess(n);
+  private detectFeatureEnvy(engine: TraversalEngine): () => CodeIssue[] {
+    // One slot per method, reserved on entry so issues keep source order
+    const slots: CodeIssue[][] = [];
+    const openMethods: Array<{ slot: number; externalAccess: Record<string, number> }> = [];
+
+    engine.on(
+      ['method_definition', 'function_declaration'],
+      () => {
+        openMethods.push({ slot: slots.length, externalAccess: {} });
+        slots.push([]);
+      },
+      n => {
+        const { slot, externalAccess } = openMethods.pop()!;
 
         // If accessing another object's properties >3 times
         Object.entries(externalAccess).forEach(([objectName, count]) => {
@@ -92,7 +129,7 @@ export class ArchitectureDetector {
             const line = n.startPosition.row + 1;
             const methodName = this.getMethodName(n);
 
-            issues.push({
+            slots[slot].push({
               type: IssueType.FEATURE_ENVY,
               category: IssueCategory.ARCHITECTURE,
               severity: 'medium',
@@ -104,76 +141,86 @@ export class ArchitectureDetector {
           }
         });
       }
+    );
 
-      for (const child of n.children) {
-        traverse(child);
+    // Property accesses count towards every enclosing method
+    engine.on(['member_expression'], n => {
+      if (openMethods.length === 0) {
+        return;
       }
-    };
 
-    traverse(node);
-    return issues;
+      const objectNode = n.childForFieldName('object');
+      if (objectNode && objectNode.type === 'identifier') {
+        const objName = objectNode.text;
+        for (const method of openMethods) {
+          method.externalAccess[objName] = (method.externalAccess[objName] || 0) + 1;
+        }
+      }
+    });
+
+    return () => slots.flat();
   }
 
   /**
    * Detect tight coupling - too many dependencies
    */
-  private detectTightCoupling(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-    const imports = this.countImports(node);
-
-    if (imports.count > 10) {
-      issues.push({
-        type: IssueType.TIGHT_COUPLING,
-        category: IssueCategory.ARCHITECTURE,
-        severity: imports.count > 15 ? 'high' : 'medium',
-        line: 1,
-        message: `File has ${imports.count} imports - indicates tight coupling`,
-        suggestion: 'Consider grouping related imports into facade modules or using dependency injection',
-        codeSnippet: `${imports.count} import statements`,
-      });
-    }
-
-    return issues;
+  private detectTightCoupling(engine: TraversalEngine): () => CodeIssue[] {
+    let importCount = 0;
+
+    engine.on(['import_statement', 'import_declaration'], () => {
+      importCount++;
+    });
+
+    return () => {
+      const issues: CodeIssue[] = [];
+
+      if (importCount > 10) {
+        issues.push({
+          type: IssueType.TIGHT_COUPLING,
+          category: IssueCategory.ARCHITECTURE,
+          severity: importCount > 15 ? 'high' : 'medium',
+          line: 1,
+          message: `File has ${importCount} imports - indicates tight coupling`,
+          suggestion: 'Consider grouping related imports into facade modules or using dependency injection',
+          codeSnippet: `${importCount} import statements`,
+        });
+      }
+
+      return issues;
+    };
   }
 
   /**
    * Detect missing abstraction - complex parameter destructuring
    */
-  private detectMissingAbstraction(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectMissingAbstraction(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'method_definition' || n.type === 'function_declaration') {
-        const params = n.childForFieldName('parameters');
+    engine.on(['method_definition', 'function_declaration'], n => {
+      const params = n.childForFieldName('parameters');
 
-        if (params) {
-          // Check for object destructuring with many properties
-          const destructuredProps = this.countDestructuredProperties(params);
+      if (params) {
+        // Check for object destructuring with many properties
+        const destructuredProps = this.countDestructuredProperties(params);
 
-          if (destructuredProps > 5) {
-            const line = n.startPosition.row + 1;
-            const methodName = this.getMethodName(n);
+        if (destructuredProps > 5) {
+          const line = n.startPosition.row + 1;
+          const methodName = this.getMethodName(n);
 
-            issues.push({
-              type: IssueType.MISSING_ABSTRACTION,
-              category: IssueCategory.ARCHITECTURE,
-              severity: 'medium',
-              line,
-              message: `Function '${methodName}' destructures ${destructuredProps} properties - missing domain object`,
-              suggestion: `Create a domain class/type to encapsulate these ${destructuredProps} properties`,
-              codeSnippet: this.getLineContent(line),
-            });
-          }
+          issues.push({
+            type: IssueType.MISSING_ABSTRACTION,
+            category: IssueCategory.ARCHITECTURE,
+            severity: 'medium',
+            line,
+            message: `Function '${methodName}' destructures ${destructuredProps} properties - missing domain object`,
+            suggestion: `Create a domain class/type to encapsulate these ${destructuredProps} properties`,
+            codeSnippet: this.getLineContent(line),
+          });
         }
       }
+    });
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   // Helper methods
@@ -188,26 +235,6 @@ export class ArchitectureDetector {
     return nameNode ? nameNode.text : '<anonymous>';
   }
 
-  private getClassMethods(classNode: Parser.SyntaxNode): string[] {
-    const methods: string[] = [];
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'method_definition') {
-        const nameNode = n.childForFieldName('name');
-        if (nameNode) {
-          methods.push(nameNode.text);
-        }
-      }
-
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(classNode);
-    return methods;
-  }
-
   private identifyMethodDomains(methods: string[]): Set<string> {
     const domains = new Set<string>();
 
@@ -258,44 +285,6 @@ export class ArchitectureDetector {
     return domains;
   }
 
-  private countExternalPropertyAccess(node: Parser.SyntaxNode): Record<string, number> {
-    const access: Record<string, number> = {};
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'member_expression') {
-        const objectNode = n.childForFieldName('object');
-        if (objectNode && objectNode.type === 'identifier') {
-          const objName = objectNode.text;
-          access[objName] = (access[objName] || 0) + 1;
-        }
-      }
-
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return access;
-  }
-
-  private countImports(node: Parser.SyntaxNode): { count: number } {
-    let count = 0;
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'import_statement' || n.type === 'import_declaration') {
-        count++;
-      }
-
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return { count };
-  }
-
   private countDestructuredProperties(paramsNode: Parser.SyntaxNode): number {
     let count = 0;
 
@@ -321,7 +310,6 @@ export class ArchitectureDetector {
   }
 
   private getLineContent(line: number): string {
-    const lines = this.code.split('\n');
-    return lines[line - 1]?.trim() || '';
+    return this.context.getLineContent(line);
   }
 }
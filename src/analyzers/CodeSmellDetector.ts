@@ -1,37 +1,50 @@
 import Parser from 'tree-sitter';
 import { CodeIssue, IssueType, IssueCategory } from '../types';
+import { TraversalEngine } from './TraversalEngine';
+import { AnalysisContext } from './AnalysisContext';
 
 /**
  * Detects code smells in the AST
  */
 export class CodeSmellDetector {
-  private code: string;
+  private context: AnalysisContext;
 
-  constructor(code: string) {
-    this.code = code;
+  constructor(source: string | AnalysisContext) {
+    this.context = AnalysisContext.from(source);
   }
 
   /**
    * Detect all code smells in a node
    */
   detectSmells(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-
-    issues.push(...this.detectMagicNumbers(node));
-    issues.push(...this.detectPoorNaming(node));
-    issues.push(...this.detectConsoleLog(node));
-    issues.push(...this.detectEmptyCatch(node));
-    issues.push(...this.detectTodoComments(node));
-    issues.push(...this.detectTypeCoercion(node));
-    issues.push(...this.detectUnusedVariables(node));
+    const engine = new TraversalEngine();
+    const collect = this.register(engine);
+    engine.walk(node);
+    return collect();
+  }
 
-    return issues;
+  /**
+   * Register all code smell checks on a shared traversal engine.
+   * Returns a callback that collects the issues once the walk is done.
+   */
+  register(engine: TraversalEngine): () => CodeIssue[] {
+    const checks = [
+      engine.section('CodeSmellDetector.detectMagicNumbers', () => this.detectMagicNumbers(engine)),
+      engine.section('CodeSmellDetector.detectPoorNaming', () => this.detectPoorNaming(engine)),
+      engine.section('CodeSmellDetector.detectConsoleLog', () => this.detectConsoleLog(engine)),
+      engine.section('CodeSmellDetector.detectEmptyCatch', () => this.detectEmptyCatch(engine)),
+      engine.section('CodeSmellDetector.detectTodoComments', () => () => this.detectTodoComments(engine)),
+      engine.section('CodeSmellDetector.detectTypeCoercion', () => this.detectTypeCoercion(engine)),
+      engine.section('CodeSmellDetector.detectUnusedVariables', () => this.detectUnusedVariables(engine)),
+    ];
+
+    return () => checks.flatMap(collect => collect());
   }
 
   /**
    * Detect magic numbers (hardcoded numbers without meaning)
    */
-  private detectMagicNumbers(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectMagicNumbers(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
     // Common acceptable numbers that don't need constants
@@ -60,68 +73,61 @@ export class CodeSmellDetector {
              (n.text === '100' && parentText.includes('/'));
     };
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'number') {
-        const value = parseFloat(n.text);
-        const line = n.startPosition.row + 1;
-
-        // Skip acceptable numbers, array indices, time-related, HTTP codes, and percentages
-        if (!acceptableNumbers.has(value) &&
-            !this.isArrayIndex(n) &&
-            !isTimeRelated(n) &&
-            !(isHTTPStatus(value) && (n.parent?.parent?.text || '').includes('status')) &&
-            !isPercentage(n)) {
-          // Get code snippet from parent context - walk up to find meaningful context
-          let codeSnippet = n.text;
-          if (n.parent) {
-            let parentNode: Parser.SyntaxNode | null = n.parent;
-            // Walk up the tree to find the most meaningful parent context
-            while (parentNode) {
-              if (parentNode.type === 'call_expression' ||
-                  parentNode.type === 'expression_statement' ||
-                  parentNode.type === 'variable_declarator' ||
-                  parentNode.type === 'assignment_expression' ||
-                  parentNode.type === 'new_expression') {
-                codeSnippet = parentNode.text.trim();
-                // Limit snippet length for readability
-                if (codeSnippet.length > 80) {
-                  codeSnippet = codeSnippet.substring(0, 77) + '...';
-                }
-                break;
+    engine.on(['number'], n => {
+      const value = parseFloat(n.text);
+      const line = n.startPosition.row + 1;
+
+      // Skip acceptable numbers, array indices, time-related, HTTP codes, and percentages
+      if (!acceptableNumbers.has(value) &&
+          !this.isArrayIndex(n) &&
+          !isTimeRelated(n) &&
+          !(isHTTPStatus(value) && (n.parent?.parent?.text || '').includes('status')) &&
+          !isPercentage(n)) {
+        // Get code snippet from parent context - walk up to find meaningful context
+        let codeSnippet = n.text;
+        if (n.parent) {
+          let parentNode: Parser.SyntaxNode | null = n.parent;
+          // Walk up the tree to find the most meaningful parent context
+          while (parentNode) {
+            if (parentNode.type === 'call_expression' ||
+                parentNode.type === 'expression_statement' ||
+                parentNode.type === 'variable_declarator' ||
+                parentNode.type === 'assignment_expression' ||
+                parentNode.type === 'new_expression') {
+              codeSnippet = parentNode.text.trim();
+              // Limit snippet length for readability
+              if (codeSnippet.length > 80) {
+                codeSnippet = codeSnippet.substring(0, 77) + '...';
               }
-              // Don't go too far up
-              if (!parentNode.parent || parentNode.type === 'program' || parentNode.type === 'function') {
-                break;
-              }
-              parentNode = parentNode.parent;
+              break;
+            }
+            // Don't go too far up
+            if (!parentNode.parent || parentNode.type === 'program' || parentNode.type === 'function') {
+              break;
             }
+            parentNode = parentNode.parent;
           }
-
-          issues.push({
-            type: IssueType.MAGIC_NUMBER,
-            category: IssueCategory.CODE_SMELL,
-            severity: 'low',
-            line,
-            message: `Magic number '${n.text}' should be replaced with a named constant`,
-            suggestion: `const DESCRIPTIVE_NAME = ${n.text}; // Explain what this number means`,
-            codeSnippet,
-          });
         }
-      }
 
-      for (const child of n.children) {
-        traverse(child);
+        issues.push({
+          type: IssueType.MAGIC_NUMBER,
+          category: IssueCategory.CODE_SMELL,
+          severity: 'low',
+          line,
+          message: `Magic number '${n.text}' should be replaced with a named constant`,
+          suggestion: `const DESCRIPTIVE_NAME = ${n.text}; // Explain what this number means`,
+          codeSnippet,
+        });
       }
-    };
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
    * Detect poor variable naming
    */
-  private detectPoorNaming(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectPoorNaming(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
     const badNames = new Set(['data', 'temp', 'tmp', 'foo', 'bar', 'baz']);
     const loopVariables = new Set(['i', 'j', 'k', 'l', 'm', 'n']);
@@ -142,45 +148,11 @@ export class CodeSmellDetector {
       'cfg', 'env', 'opts', 'args', 'params'
     ]);
 
-    const isInLoopContext = (n: Parser.SyntaxNode): boolean => {
-      let parent = n.parent;
-      while (parent) {
-        if (parent.type === 'for_statement' ||
-            parent.type === 'for_in_statement' ||
-            parent.type === 'while_statement') {
-          return true;
-        }
-        parent = parent.parent;
-      }
-      return false;
-    };
+    const { context } = engine;
 
-    const isCallbackParam = (n: Parser.SyntaxNode): boolean => {
-      // Check if this identifier is a parameter in an arrow function or callback
-      let parent = n.parent;
-      while (parent) {
-        if (parent.type === 'arrow_function' || parent.type === 'function_expression') {
-          // Check if it's a common callback pattern like (a, b) => a - b
-          const params = parent.childForFieldName('parameters');
-          if (params && params.namedChildCount <= 2) {
-            return true;
-          }
-        }
-        parent = parent.parent;
-      }
-      return false;
-    };
-
-    const isCatchParam = (n: Parser.SyntaxNode): boolean => {
-      let parent = n.parent;
-      while (parent && parent.type !== 'program') {
-        if (parent.type === 'catch_clause') {
-          return true;
-        }
-        parent = parent.parent;
-      }
-      return false;
-    };
+    // Short parameter lists mark common callback patterns like (a, b) => a - b
+    const isInCallback = (): boolean =>
+      context.callbacks.some(callback => callback.parameterCount !== null && callback.parameterCount <= 2);
 
     const checkIdentifier = (n: Parser.SyntaxNode) => {
       if (n.type === 'identifier') {
@@ -188,7 +160,7 @@ export class CodeSmellDetector {
         const line = n.startPosition.row + 1;
 
         // Skip common loop variables if they're in a loop context
-        if (loopVariables.has(name) && isInLoopContext(n)) {
+        if (loopVariables.has(name) && context.inLoop) {
           return;
         }
 
@@ -198,12 +170,12 @@ export class CodeSmellDetector {
         }
 
         // Skip callback parameters with short names
-        if (isCallbackParam(n)) {
+        if (isInCallback()) {
           return;
         }
 
         // Skip error parameters in catch blocks
-        if ((name === 'e' || name === 'err' || name === 'error') && isCatchParam(n)) {
+        if ((name === 'e' || name === 'err' || name === 'error') && context.inCatch) {
           return;
         }
 
@@ -223,36 +195,29 @@ export class CodeSmellDetector {
       }
     };
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      // Check variable declarations
-      if (n.type === 'variable_declarator') {
-        const nameNode = n.childForFieldName('name');
-        if (nameNode) checkIdentifier(nameNode);
-      }
-
-      // Check function parameters
-      if (n.type === 'formal_parameters' || n.type === 'parameters') {
-        for (const child of n.children) {
-          if (child.type === 'identifier' || child.type === 'required_parameter') {
-            checkIdentifier(child);
-          }
-        }
-      }
+    // Check variable declarations
+    engine.on(['variable_declarator'], n => {
+      const nameNode = n.childForFieldName('name');
+      if (nameNode) checkIdentifier(nameNode);
+    });
 
+    // Check function parameters
+    engine.on(['formal_parameters', 'parameters'], n => {
       for (const child of n.children) {
-        traverse(child);
+        if (child.type === 'identifier' || child.type === 'required_parameter') {
+          checkIdentifier(child);
+        }
       }
-    };
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
    * Detect console.log statements (debug code left behind)
    * Allows console.error, console.warn, console.info as they're proper logging methods
    */
-  private detectConsoleLog(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectConsoleLog(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
     // Check if the file uses a proper logging framework
@@ -262,13 +227,16 @@ export class CodeSmellDetector {
         'logger', 'Logger', 'log.', 'logging'
       ];
 
-      return loggingFrameworks.some(framework => this.code.includes(framework));
+      const source = this.context.getText();
+      return loggingFrameworks.some(framework => source.includes(framework));
     };
 
     // Check if this appears to be a test or development file
     const isTestOrDevFile = (): boolean => {
-      const lines = this.code.split('\n').slice(0, 50); // Check first 50 lines
-      const header = lines.join('\n').toLowerCase();
+      const { startLine } = this.context;
+      const header = this.context.lines
+        .getText(startLine, Math.min(this.context.endLine, startLine + 49)) // Check first 50 lines
+        .toLowerCase();
 
       return header.includes('test') ||
              header.includes('spec') ||
@@ -279,56 +247,36 @@ export class CodeSmellDetector {
     };
 
     // If file uses a logging framework or is a test file, be more lenient
-    const hasProperLogging = usesLoggingFramework();
-    const isDevFile = isTestOrDevFile();
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'call_expression') {
-        const functionNode = n.childForFieldName('function');
-        if (functionNode && functionNode.type === 'member_expression') {
-          const objectNode = functionNode.childForFieldName('object');
-          const propertyNode = functionNode.childForFieldName('property');
-
-          // Only flag console.log, not console.error/warn/info
-          if (objectNode?.text === 'console' && propertyNode?.text === 'log') {
-            // Skip if file has proper logging framework or is a dev/test file
-            if (hasProperLogging || isDevFile) {
-              return;
-            }
-
-            const line = n.startPosition.row + 1;
-            // Extract code from parent statement node for better context
-            let codeSnippet = n.text.trim();
-            if (n.parent && n.parent.type === 'expression_statement') {
-              codeSnippet = n.parent.text.trim();
-            }
-
-            issues.push({
-              type: IssueType.CONSOLE_LOG,
-              category: IssueCategory.CODE_SMELL,
-              severity: 'low',
-              line,
-              message: 'console.log() statement found - remove before production',
-              suggestion: 'Use a proper logging library (winston, pino, etc.) or console.error/warn/info for intentional logging',
-              codeSnippet,
-            });
-          }
-        }
+    if (usesLoggingFramework() || isTestOrDevFile()) {
+      return () => issues;
+    }
+
+    engine.onMatch('console-log', ({ node }) => {
+      const line = node.startPosition.row + 1;
+      // Extract code from parent statement node for better context
+      let codeSnippet = node.text.trim();
+      if (node.parent && node.parent.type === 'expression_statement') {
+        codeSnippet = node.parent.text.trim();
       }
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
+      issues.push({
+        type: IssueType.CONSOLE_LOG,
+        category: IssueCategory.CODE_SMELL,
+        severity: 'low',
+        line,
+        message: 'console.log() statement found - remove before production',
+        suggestion: 'Use a proper logging library (winston, pino, etc.) or console.error/warn/info for intentional logging',
+        codeSnippet,
+      });
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
    * Detect empty catch blocks (without explanatory comments)
    */
-  private detectEmptyCatch(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectEmptyCatch(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
     const hasExplanatoryComment = (bodyNode: Parser.SyntaxNode): boolean => {
@@ -337,9 +285,8 @@ export class CodeSmellDetector {
       const endLine = bodyNode.endPosition.row;
 
       // Check if there's a comment in the catch block explaining the empty catch
-      const lines = this.code.split('\n');
       for (let i = startLine; i <= endLine; i++) {
-        const line = lines[i]?.toLowerCase() || '';
+        const line = this.context.lines.getLine(i + 1).toLowerCase();
         // Look for comments indicating intentional empty catch
         if (line.includes('//') || line.includes('/*')) {
           if (line.includes('intentional') ||
@@ -356,47 +303,51 @@ export class CodeSmellDetector {
       return false;
     };
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'catch_clause') {
-        const bodyNode = n.childForFieldName('body');
-        if (bodyNode && this.isEmptyBlock(bodyNode)) {
-          // Skip if there's an explanatory comment
-          if (hasExplanatoryComment(bodyNode)) {
-            return;
-          }
-
-          const line = n.startPosition.row + 1;
-          issues.push({
-            type: IssueType.EMPTY_CATCH,
-            category: IssueCategory.MAINTAINABILITY,
-            severity: 'medium',
-            line,
-            message: 'Empty catch block - errors are being silently ignored',
-            suggestion: 'Handle the error appropriately, log it, or add a comment explaining why it\'s intentionally ignored',
-            codeSnippet: this.getLineContent(line),
-          });
+    engine.on(['catch_clause'], n => {
+      const bodyNode = n.childForFieldName('body');
+      if (bodyNode && this.isEmptyBlock(bodyNode)) {
+        // Skip if there's an explanatory comment
+        if (hasExplanatoryComment(bodyNode)) {
+          return;
         }
-      }
 
-      for (const child of n.children) {
-        traverse(child);
+        const line = n.startPosition.row + 1;
+        issues.push({
+          type: IssueType.EMPTY_CATCH,
+          category: IssueCategory.MAINTAINABILITY,
+          severity: 'medium',
+          line,
+          message: 'Empty catch block - errors are being silently ignored',
+          suggestion: 'Handle the error appropriately, log it, or add a comment explaining why it\'s intentionally ignored',
+          codeSnippet: this.getLineContent(line),
+        });
       }
-    };
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
-   * Detect TODO/FIXME comments
+   * Detect TODO/FIXME comments. Lines of nested functions the walk skipped
+   * are left to those functions, so each comment is reported once.
    */
-  private detectTodoComments(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectTodoComments(engine: TraversalEngine): CodeIssue[] {
     const issues: CodeIssue[] = [];
-    const lines = this.code.split('\n');
+    const { startLine, endLine } = this.context;
+    // Skipped nodes are in source order and do not overlap
+    const nested = engine.skipped;
+    let next = 0;
+
+    for (let lineNum = startLine; lineNum <= endLine; lineNum++) {
+      while (next < nested.length && nested[next].endPosition.row + 1 < lineNum) {
+        next++;
+      }
+      if (next < nested.length && nested[next].startPosition.row + 1 <= lineNum) {
+        lineNum = nested[next].endPosition.row + 1;
+        continue;
+      }
 
-    lines.forEach((line, index) => {
-      const lineNum = index + 1;
-      const trimmed = line.trim();
+      const trimmed = this.context.getLineContent(lineNum);
 
       if (trimmed.includes('TODO') || trimmed.includes('FIXME') || trimmed.includes('HACK')) {
         const keyword = trimmed.includes('FIXME') ? 'FIXME' : trimmed.includes('HACK') ? 'HACK' : 'TODO';
@@ -410,7 +361,7 @@ export class CodeSmellDetector {
           codeSnippet: trimmed,
         });
       }
-    });
+    }
 
     return issues;
   }
@@ -418,7 +369,7 @@ export class CodeSmellDetector {
   /**
    * Detect use of == instead of ===
    */
-  private detectTypeCoercion(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectTypeCoercion(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
     const isNullCheck = (n: Parser.SyntaxNode): boolean => {
@@ -431,106 +382,97 @@ export class CodeSmellDetector {
              (left?.text === 'undefined' || right?.text === 'undefined');
     };
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'binary_expression') {
-        const operator = n.childForFieldName('operator');
-        if (operator && (operator.text === '==' || operator.text === '!=')) {
-          // Skip intentional null/undefined checks
-          if (isNullCheck(n)) {
-            return;
-          }
-
-          const line = n.startPosition.row + 1;
-          const replacement = operator.text === '==' ? '===' : '!==';
-          issues.push({
-            type: IssueType.TYPE_COERCION,
-            category: IssueCategory.MAINTAINABILITY,
-            severity: 'medium',
-            line,
-            message: `Using '${operator.text}' instead of '${replacement}' - can cause unexpected behavior`,
-            suggestion: `Use '${replacement}' for strict equality comparison (or use == null if checking for null/undefined)`,
-            codeSnippet: this.getLineContent(line),
-          });
-        }
+    engine.onMatch('loose-equality', ({ node, captures }) => {
+      // Skip intentional null/undefined checks
+      if (isNullCheck(node)) {
+        return;
       }
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
+      const { operator } = captures;
+      const line = node.startPosition.row + 1;
+      const replacement = operator.text === '==' ? '===' : '!==';
+      issues.push({
+        type: IssueType.TYPE_COERCION,
+        category: IssueCategory.MAINTAINABILITY,
+        severity: 'medium',
+        line,
+        message: `Using '${operator.text}' instead of '${replacement}' - can cause unexpected behavior`,
+        suggestion: `Use '${replacement}' for strict equality comparison (or use == null if checking for null/undefined)`,
+        codeSnippet: this.getLineContent(line),
+      });
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
    * Detect unused variables
    */
-  private detectUnusedVariables(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
+  private detectUnusedVariables(engine: TraversalEngine): () => CodeIssue[] {
     const declaredVars = new Map<string, { line: number; node: Parser.SyntaxNode }>(); // name -> {line, node}
     const usedVars = new Set<string>();
 
     // Collect all variable declarations
-    const collectDeclarations = (n: Parser.SyntaxNode) => {
-      if (n.type === 'variable_declarator') {
-        const nameNode = n.childForFieldName('name');
-        if (nameNode && nameNode.type === 'identifier') {
-          declaredVars.set(nameNode.text, {
-            line: nameNode.startPosition.row + 1,
-            node: n,
-          });
-        }
-      }
-
-      for (const child of n.children) {
-        collectDeclarations(child);
+    engine.on(['variable_declarator'], n => {
+      const nameNode = n.childForFieldName('name');
+      if (nameNode && nameNode.type === 'identifier') {
+        declaredVars.set(nameNode.text, {
+          line: nameNode.startPosition.row + 1,
+          node: n,
+        });
       }
-    };
+    });
 
     // Collect all identifier usages
-    const collectUsages = (n: Parser.SyntaxNode) => {
-      if (n.type === 'identifier' && n.parent?.type !== 'variable_declarator') {
+    const isUse = (n: Parser.SyntaxNode) => n.parent?.type !== 'variable_declarator';
+    engine.on(['identifier'], n => {
+      if (isUse(n)) {
         usedVars.add(n.text);
       }
+    });
 
-      for (const child of n.children) {
-        collectUsages(child);
+    return () => {
+      const issues: CodeIssue[] = [];
+
+      // A variable may only be used by a callback or closure, which this
+      // walk skipped; only search nested functions when needed
+      const unresolved = Array.from(declaredVars.keys()).some(name => !usedVars.has(name));
+      if (unresolved) {
+        for (const nested of engine.skipped) {
+          nested.descendantsOfType('identifier').filter(isUse).forEach(n => usedVars.add(n.text));
+        }
       }
-    };
 
-    collectDeclarations(node);
-    collectUsages(node);
-
-    // Find unused variables
-    declaredVars.forEach((varInfo, name) => {
-      if (!usedVars.has(name) && !name.startsWith('_')) {
-        // Get the full variable declaration statement
-        let declarationNode = varInfo.node;
-        while (declarationNode.parent && declarationNode.parent.type !== 'program' &&
-               declarationNode.parent.type !== 'statement_block' &&
-               declarationNode.parent.type !== 'function') {
-          if (declarationNode.parent.type === 'variable_declaration' ||
-              declarationNode.parent.type === 'lexical_declaration') {
+      // Find unused variables
+      declaredVars.forEach((varInfo, name) => {
+        if (!usedVars.has(name) && !name.startsWith('_')) {
+          // Get the full variable declaration statement
+          let declarationNode = varInfo.node;
+          while (declarationNode.parent && declarationNode.parent.type !== 'program' &&
+                 declarationNode.parent.type !== 'statement_block' &&
+                 declarationNode.parent.type !== 'function') {
+            if (declarationNode.parent.type === 'variable_declaration' ||
+                declarationNode.parent.type === 'lexical_declaration') {
+              declarationNode = declarationNode.parent;
+              break;
+            }
             declarationNode = declarationNode.parent;
-            break;
           }
-          declarationNode = declarationNode.parent;
-        }
 
-        issues.push({
-          type: IssueType.DEAD_CODE,
-          category: IssueCategory.CODE_SMELL,
-          severity: 'low',
-          line: varInfo.line,
-          message: `Variable '${name}' is declared but never used`,
-          suggestion: 'Remove unused variable or prefix with _ if intentionally unused',
-          codeSnippet: declarationNode.text.trim(),
-        });
-      }
-    });
+          issues.push({
+            type: IssueType.DEAD_CODE,
+            category: IssueCategory.CODE_SMELL,
+            severity: 'low',
+            line: varInfo.line,
+            message: `Variable '${name}' is declared but never used`,
+            suggestion: 'Remove unused variable or prefix with _ if intentionally unused',
+            codeSnippet: declarationNode.text.trim(),
+          });
+        }
+      });
 
-    return issues;
+      return issues;
+    };
   }
 
   // Helper methods
@@ -550,7 +492,6 @@ export class CodeSmellDetector {
   }
 
   private getLineContent(line: number): string {
-    const lines = this.code.split('\n');
-    return lines[line - 1]?.trim() || '';
+    return this.context.getLineContent(line);
   }
 }
@@ -1,4 +1,21 @@
 import Parser from 'tree-sitter';
+import { TraversalEngine } from './TraversalEngine';
+
+/**
+ * Cognitive complexity of a function's own body, with what an enclosing
+ * function needs to fold it into its own
+ */
+export interface CognitiveComplexityParts {
+  complexity: number;
+  // Callee name that counts as recursion, or '<anonymous>' for none
+  name: string;
+  // Flow-break increments; each level of nesting around the function adds
+  // one to every one of them
+  increments: number;
+  // Calls in the body by callee, so an enclosing function can count
+  // recursion through the functions nested in it
+  calls: Map<string, number>;
+}
 
 /**
  * Calculate Cognitive Complexity
@@ -19,6 +36,13 @@ export class CognitiveComplexityCalculator {
     this.breakFlowNodes = this.getBreakFlowNodes(language);
   }
 
+  /**
+   * Node types that nest the code inside them one level deeper
+   */
+  get nestingTypes(): string[] {
+    return Array.from(this.breakFlowNodes);
+  }
+
   private getBreakFlowNodes(language: string): Set<string> {
     const common = new Set([
       'if_statement',
@@ -43,45 +67,68 @@ export class CognitiveComplexityCalculator {
    * Calculate cognitive complexity
    */
   calculate(functionNode: Parser.SyntaxNode): number {
-    let complexity = 0;
-    let nestingLevel = 0;
+    const engine = new TraversalEngine();
+    const result = this.register(engine, functionNode);
+    engine.walk(functionNode);
+    return result();
+  }
 
-    const traverse = (node: Parser.SyntaxNode, parentNesting: number) => {
-      const isBreakFlow = this.breakFlowNodes.has(node.type);
+  /**
+   * Register cognitive complexity rules on a shared traversal engine.
+   * Returns a callback that yields the complexity once the walk is done.
+   */
+  register(engine: TraversalEngine, functionNode: Parser.SyntaxNode): () => number {
+    const parts = this.registerParts(engine, functionNode);
+    return () => parts().complexity;
+  }
 
-      if (isBreakFlow) {
-        // Add 1 + nesting level
-        complexity += 1 + parentNesting;
+  /**
+   * Like register(), also yielding the parts an enclosing function needs
+   * to fold this function's complexity into its own
+   */
+  registerParts(engine: TraversalEngine, functionNode: Parser.SyntaxNode): () => CognitiveComplexityParts {
+    let complexity = 0;
+    let increments = 0;
+    let nestingLevel = 0;
+    const calls: Map<string, number> = new Map();
+    const functionName = this.getFunctionName(functionNode);
 
-        // Special case: else if doesn't increase complexity
-        if (this.isElseIf(node)) {
-          complexity -= (1 + parentNesting); // Undo the addition
+    engine.on(
+      Array.from(this.breakFlowNodes),
+      node => {
+        // Add 1 + nesting level, except for else if (continuation of if)
+        if (!this.isElseIf(node)) {
+          complexity += 1 + nestingLevel;
+          increments++;
         }
 
         // Increase nesting for children
-        nestingLevel = parentNesting + 1;
-      } else {
-        nestingLevel = parentNesting;
+        nestingLevel++;
+      },
+      () => {
+        nestingLevel--;
       }
+    );
 
-      // Binary logical operators (&&, ||)
+    // Binary logical operators (&&, ||)
+    engine.on(['logical_expression', 'boolean_operator'], node => {
       if (this.isLogicalOperator(node)) {
         complexity += 1;
       }
-
-      // Recursion and loops add complexity
-      if (this.isRecursiveCall(node, functionNode)) {
-        complexity += 1;
-      }
-
-      // Traverse children with appropriate nesting
-      for (const child of node.children) {
-        traverse(child, nestingLevel);
-      }
-    };
-
-    traverse(functionNode, 0);
-    return complexity;
+    });
+
+    engine.on(['call_expression'], node => {
+      const callee = this.getCallName(node);
+      calls.set(callee, (calls.get(callee) ?? 0) + 1);
+    });
+
+    return () => ({
+      // Recursion adds complexity
+      complexity: complexity + (functionName !== '<anonymous>' ? calls.get(functionName) ?? 0 : 0),
+      name: functionName,
+      increments,
+      calls,
+    });
   }
 
   /**
@@ -111,18 +158,6 @@ export class CognitiveComplexityCalculator {
     return false;
   }
 
-  /**
-   * Check if node is a recursive call
-   */
-  private isRecursiveCall(node: Parser.SyntaxNode, functionNode: Parser.SyntaxNode): boolean {
-    if (node.type !== 'call_expression') return false;
-
-    const functionName = this.getFunctionName(functionNode);
-    const callName = this.getCallName(node);
-
-    return functionName !== '<anonymous>' && functionName === callName;
-  }
-
   private getFunctionName(node: Parser.SyntaxNode): string {
     const nameNode = node.childForFieldName('name');
     return nameNode ? nameNode.text : '<anonymous>';
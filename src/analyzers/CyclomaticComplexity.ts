@@ -1,4 +1,5 @@
 import Parser from 'tree-sitter';
+import { TraversalEngine } from './TraversalEngine';
 
 /**
  * Calculate Cyclomatic Complexity
@@ -54,38 +55,24 @@ export class CyclomaticComplexityCalculator {
    * Calculate cyclomatic complexity for a function node
    */
   calculate(functionNode: Parser.SyntaxNode): number {
-    let complexity = 1; // Base complexity
-
-    const traverse = (node: Parser.SyntaxNode) => {
-      // Count decision points
-      if (this.decisionNodes.has(node.type)) {
-        complexity++;
-
-        // Special handling for logical operators (each && or || adds 1)
-        if (node.type === 'logical_expression' || node.type === 'boolean_operator') {
-          const operator = this.getOperator(node);
-          if (operator === '&&' || operator === '||' || operator === 'and' || operator === 'or') {
-            // Already counted above
-          }
-        }
-      }
-
-      // Recursively traverse children
-      for (const child of node.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(functionNode);
-    return complexity;
+    const engine = new TraversalEngine();
+    const result = this.register(engine);
+    engine.walk(functionNode);
+    return result();
   }
 
   /**
-   * Get operator from a binary/logical expression node
+   * Register decision point counting on a shared traversal engine.
+   * Returns a callback that yields the complexity once the walk is done.
    */
-  private getOperator(node: Parser.SyntaxNode): string {
-    const operatorNode = node.childForFieldName('operator');
-    return operatorNode ? operatorNode.text : '';
+  register(engine: TraversalEngine): () => number {
+    let complexity = 1; // Base complexity
+
+    engine.on(Array.from(this.decisionNodes), () => {
+      complexity++;
+    });
+
+    return () => complexity;
   }
 
   /**
@@ -0,0 +1,257 @@
+import { CodeIssue, FileAnalysis, FunctionInfo, IssueCategory, IssueType, ModuleImport } from '../types';
+import { ModuleResolver } from './ModuleResolver';
+
+// A module both imported by and importing at least this many modules is a hub
+const HUB_FAN_IN = 10;
+const HUB_FAN_OUT = 10;
+// Cycle members listed in each issue message
+const MAX_LISTED = 5;
+
+export interface DependencyEdge {
+  from: string;
+  to: string;
+  // Line of the first import of `to` in `from`
+  line: number;
+}
+
+export interface ModuleNode {
+  filePath: string;
+  // Analyzed modules importing this one, and imported by it
+  fanIn: number;
+  fanOut: number;
+  // Index in DependencyReport.cycles, when the module is part of a cycle
+  cycle?: number;
+}
+
+export interface DependencyReport {
+  // In path order
+  modules: ModuleNode[];
+  edges: DependencyEdge[];
+  // Strongly connected components of more than one module, each in path
+  // order (imports of a module by itself are ignored)
+  cycles: string[][];
+}
+
+/**
+ * Project-wide module dependency graph
+ *
+ * Files are added with the imports recorded by their analysis; the
+ * imports are part of the cached analysis, so unchanged files add their
+ * edges without being parsed again, and adding a file again replaces its
+ * edges. analyze() resolves every import against the files added,
+ * computes fan-in and fan-out, and finds import cycles as strongly
+ * connected components (Tarjan's algorithm, iterative), all in time linear
+ * in modules and edges.
+ */
+export class DependencyGraph {
+  private imports: Map<string, ModuleImport[]> = new Map();
+  private issues: Map<string, CodeIssue[]> = new Map();
+
+  get size(): number {
+    return this.imports.size;
+  }
+
+  // Whether the last analyze() found anything for annotate() to attach
+  get hasIssues(): boolean {
+    return this.issues.size > 0;
+  }
+
+  /**
+   * Record (or replace) the imports of a file
+   */
+  add(analysis: FileAnalysis): void {
+    this.imports.set(analysis.filePath, analysis.imports ?? []);
+  }
+
+  remove(filePath: string): void {
+    this.imports.delete(filePath);
+  }
+
+  /**
+   * Resolve the graph of the files added so far, and prepare the
+   * CIRCULAR_DEPENDENCY and HUB_MODULE issues that annotate() attaches
+   */
+  analyze(): DependencyReport {
+    const paths = Array.from(this.imports.keys()).sort();
+    const indexes = new Map(paths.map((filePath, i) => [filePath, i]));
+    const resolver = new ModuleResolver(paths);
+
+    // Adjacency as offsets into one array of targets (CSR)
+    const edges: DependencyEdge[] = [];
+    const offsets = new Int32Array(paths.length + 1);
+    const fanIn = new Int32Array(paths.length);
+    paths.forEach((from, i) => {
+      const seen: Set<string> = new Set();
+      for (const moduleImport of this.imports.get(from)!) {
+        for (const to of resolver.resolve(from, moduleImport)) {
+          const target = indexes.get(to);
+          if (target !== undefined && !seen.has(to)) {
+            seen.add(to);
+            edges.push({ from, to, line: moduleImport.line });
+            fanIn[target]++;
+          }
+        }
+      }
+      offsets[i + 1] = edges.length;
+    });
+    const targets = Int32Array.from(edges, edge => indexes.get(edge.to)!);
+
+    const components = stronglyConnectedComponents(paths.length, offsets, targets);
+    const cycles = components
+      .filter(members => members.length > 1)
+      .map(members => members.sort((a, b) => a - b))
+      .sort((a, b) => a[0] - b[0]);
+
+    const modules: ModuleNode[] = paths.map((filePath, i) => ({
+      filePath,
+      fanIn: fanIn[i],
+      fanOut: offsets[i + 1] - offsets[i],
+    }));
+    cycles.forEach((members, cycle) => members.forEach(i => {
+      modules[i].cycle = cycle;
+    }));
+
+    this.issues = new Map();
+    cycles.forEach(members => this.createCycleIssues(members.map(i => paths[i]), edges, indexes, offsets));
+    modules
+      .filter(module => module.fanIn >= HUB_FAN_IN && module.fanOut >= HUB_FAN_OUT)
+      .forEach(module => this.addIssue(module.filePath, {
+        type: IssueType.HUB_MODULE,
+        category: IssueCategory.ARCHITECTURE,
+        severity: 'medium',
+        line: 1,
+        message: `Module is imported by ${module.fanIn} and imports ${module.fanOut} analyzed modules - changes ripple both ways`,
+        suggestion: 'Split it by what its importers use, or move its own dependencies behind an interface',
+      }));
+
+    return { modules, edges, cycles: cycles.map(members => members.map(i => paths[i])) };
+  }
+
+  /**
+   * Attach the issues found by analyze() to a file, on its first function
+   * or class method like other file-level issues. Functions are copied,
+   * never modified.
+   */
+  annotate(analysis: FileAnalysis): FileAnalysis {
+    const issues = this.issues.get(analysis.filePath);
+    const first = analysis.functions[0] ?? analysis.classes.find(cls => cls.methods.length > 0)?.methods[0];
+    if (!issues || !first) {
+      return analysis;
+    }
+
+    // Methods listed both as functions and under their class stay shared
+    const copy: FunctionInfo = { ...first, issues: [...first.issues, ...issues] };
+    let added = 0;
+    const withIssues = (func: FunctionInfo): FunctionInfo => {
+      if (func !== first) {
+        return func;
+      }
+      added += issues.length;
+      return copy;
+    };
+
+    const functions = analysis.functions.map(withIssues);
+    const classes = analysis.classes.map(cls => ({ ...cls, methods: cls.methods.map(withIssues) }));
+
+    return { ...analysis, functions, classes, totalIssues: analysis.totalIssues + added };
+  }
+
+  private createCycleIssues(
+    members: string[],
+    edges: DependencyEdge[],
+    indexes: Map<string, number>,
+    offsets: Int32Array
+  ): void {
+    const inCycle = new Set(members);
+
+    for (const filePath of members) {
+      // Reported on the file's first import that stays inside the cycle
+      const i = indexes.get(filePath)!;
+      const edge = edges.slice(offsets[i], offsets[i + 1]).find(candidate => inCycle.has(candidate.to))!;
+      const others = members.filter(member => member !== filePath);
+      const listed = others.slice(0, MAX_LISTED).join(', ');
+      const more = others.length > MAX_LISTED ? ` and ${others.length - MAX_LISTED} more` : '';
+
+      this.addIssue(filePath, {
+        type: IssueType.CIRCULAR_DEPENDENCY,
+        category: IssueCategory.ARCHITECTURE,
+        severity: 'high',
+        line: edge.line,
+        message: `Module is in an import cycle with ${others.length} other module(s): ${listed}${more}`,
+        suggestion: 'Break the cycle by moving the shared code into a module both sides import, or by inverting one dependency',
+      });
+    }
+  }
+
+  private addIssue(filePath: string, issue: CodeIssue): void {
+    const issues = this.issues.get(filePath);
+    if (issues) {
+      issues.push(issue);
+    } else {
+      this.issues.set(filePath, [issue]);
+    }
+  }
+}
+
+/**
+ * Tarjan's algorithm over a graph in compressed sparse row form, with an
+ * explicit stack so deep import chains cannot overflow the call stack
+ */
+function stronglyConnectedComponents(count: number, offsets: Int32Array, targets: Int32Array): number[][] {
+  const index = new Int32Array(count).fill(-1);
+  const lowLink = new Int32Array(count);
+  const onStack = new Uint8Array(count);
+  // Next edge to follow, per node on the call stack
+  const nextEdge = new Int32Array(count);
+  const stack: number[] = [];
+  const callStack: number[] = [];
+  const components: number[][] = [];
+  let counter = 0;
+
+  for (let root = 0; root < count; root++) {
+    if (index[root] !== -1) {
+      continue;
+    }
+
+    callStack.push(root);
+    while (callStack.length > 0) {
+      const node = callStack[callStack.length - 1];
+
+      if (index[node] === -1) {
+        index[node] = lowLink[node] = counter++;
+        nextEdge[node] = offsets[node];
+        stack.push(node);
+        onStack[node] = 1;
+      }
+
+      if (nextEdge[node] < offsets[node + 1]) {
+        const target = targets[nextEdge[node]++];
+        if (index[target] === -1) {
+          callStack.push(target);
+        } else if (onStack[target]) {
+          lowLink[node] = Math.min(lowLink[node], index[target]);
+        }
+        continue;
+      }
+
+      callStack.pop();
+      if (callStack.length > 0) {
+        const caller = callStack[callStack.length - 1];
+        lowLink[caller] = Math.min(lowLink[caller], lowLink[node]);
+      }
+
+      if (lowLink[node] === index[node]) {
+        const component: number[] = [];
+        let member: number;
+        do {
+          member = stack.pop()!;
+          onStack[member] = 0;
+          component.push(member);
+        } while (member !== node);
+        components.push(component);
+      }
+    }
+  }
+
+  return components;
+}
@@ -0,0 +1,380 @@
+import { CodeIssue, DEFAULT_CONFIG, FileAnalysis, FunctionFingerprint, FunctionInfo, IssueCategory, IssueType } from '../types';
+import { TraversalEngine } from './TraversalEngine';
+
+// Normalized tokens per shingle, and shingles per winnowing window
+const SHINGLE_TOKENS = 8;
+const WINDOW = 4;
+// MinHash signature length; LSH splits it into bands of BAND_ROWS values
+const SIGNATURE_SIZE = 32;
+const BAND_ROWS = 4;
+// Members of larger LSH buckets are only compared with the first member
+const MAX_BUCKET_SIZE = 64;
+// Clone locations listed in each issue message
+const MAX_LISTED = 5;
+
+const ROLLING_BASE = 0x01000193;
+const ROLLING_BASE_POW = power(ROLLING_BASE, SHINGLE_TOKENS);
+const SEEDS = Uint32Array.from({ length: SIGNATURE_SIZE }, (_, i) => mix(Math.imul(i + 1, 0x9e3779b9)));
+
+const tokenHashes: Map<string, number> = new Map();
+const NESTED_FUNCTION = tokenHash('<function>');
+
+/**
+ * Fingerprints a function's own body during its shared walk
+ *
+ * Leaf tokens are normalized (identifiers and literals abstracted,
+ * comments dropped, nested functions collapsed to one token), hashed into
+ * overlapping shingles with a rolling hash, thinned by winnowing, and
+ * summarized as a fixed-size MinHash signature.
+ */
+export class FunctionFingerprinter {
+  constructor(private readonly minTokens: number = DEFAULT_CONFIG.minDuplicateTokens) {}
+
+  register(engine: TraversalEngine, functionTypes: readonly string[]): () => FunctionFingerprint | undefined {
+    const tokens: number[] = [];
+
+    engine.onLeaf(cursor => {
+      const type = cursor.nodeType;
+      if (!type.includes('comment')) {
+        tokens.push(tokenHash(cursor.nodeIsNamed ? normalizeNamed(type) : type));
+      }
+    });
+    engine.onSkip(functionTypes, () => {
+      tokens.push(NESTED_FUNCTION);
+    });
+
+    return () => (tokens.length >= this.minTokens ? fingerprint(tokens) : undefined);
+  }
+}
+
+/**
+ * Functions whose fingerprints are alike, from one or more files
+ */
+export interface DuplicateGroup {
+  members: Array<{ filePath: string; name: string; startLine: number; tokens: number }>;
+}
+
+/**
+ * Finds duplicated functions across a whole run
+ *
+ * Fingerprinted functions are added file by file; only their signatures
+ * and locations are kept. detect() then buckets signatures by LSH bands,
+ * so only functions sharing a band are compared, and merges similar pairs
+ * into groups. The work grows with the number of functions, not pairs.
+ */
+export class DuplicateDetector {
+  private files: string[] = [];
+  private names: string[] = [];
+  private fileIndexes: number[] = [];
+  private startLines: number[] = [];
+  private tokenCounts: number[] = [];
+  private signatures: Uint32Array = new Uint32Array(SIGNATURE_SIZE * 256);
+  private issues: Map<string, Map<string, CodeIssue>> = new Map();
+
+  constructor(private readonly similarity: number = DEFAULT_CONFIG.duplicateSimilarity) {}
+
+  get size(): number {
+    return this.names.length;
+  }
+
+  /**
+   * Record the fingerprinted functions of a file
+   */
+  add(analysis: FileAnalysis): void {
+    let file = -1;
+
+    for (const func of analysis.functions) {
+      if (!func.fingerprint) {
+        continue;
+      }
+      if (file === -1) {
+        file = this.files.push(analysis.filePath) - 1;
+      }
+
+      const index = this.names.length;
+      if ((index + 1) * SIGNATURE_SIZE > this.signatures.length) {
+        const grown = new Uint32Array(this.signatures.length * 2);
+        grown.set(this.signatures);
+        this.signatures = grown;
+      }
+
+      this.signatures.set(func.fingerprint.minHash, index * SIGNATURE_SIZE);
+      this.names.push(func.name);
+      this.fileIndexes.push(file);
+      this.startLines.push(func.startLine);
+      this.tokenCounts.push(func.fingerprint.tokens);
+    }
+  }
+
+  /**
+   * Group the functions added so far, and prepare the DUPLICATED_CODE
+   * issues that annotate() attaches
+   */
+  detect(): DuplicateGroup[] {
+    const count = this.size;
+    const parent = Int32Array.from({ length: count }, (_, i) => i);
+    const find = (i: number): number => {
+      while (parent[i] !== i) {
+        parent[i] = parent[parent[i]];
+        i = parent[i];
+      }
+      return i;
+    };
+    const join = (a: number, b: number) => {
+      const rootA = find(a);
+      const rootB = find(b);
+      if (rootA !== rootB && this.isSimilar(a, b)) {
+        parent[Math.max(rootA, rootB)] = Math.min(rootA, rootB);
+      }
+    };
+
+    for (let band = 0; band < SIGNATURE_SIZE; band += BAND_ROWS) {
+      const buckets: Map<number, number[]> = new Map();
+      for (let i = 0; i < count; i++) {
+        const key = this.bandKey(i, band);
+        const bucket = buckets.get(key);
+        if (bucket) {
+          bucket.push(i);
+        } else {
+          buckets.set(key, [i]);
+        }
+      }
+
+      for (const bucket of buckets.values()) {
+        if (bucket.length > MAX_BUCKET_SIZE) {
+          bucket.forEach(member => join(bucket[0], member));
+          continue;
+        }
+        for (let a = 0; a < bucket.length; a++) {
+          for (let b = a + 1; b < bucket.length; b++) {
+            join(bucket[a], bucket[b]);
+          }
+        }
+      }
+    }
+
+    const grouped: Map<number, number[]> = new Map();
+    for (let i = 0; i < count; i++) {
+      const root = find(i);
+      const members = grouped.get(root);
+      if (members) {
+        members.push(i);
+      } else {
+        grouped.set(root, [i]);
+      }
+    }
+
+    // Listed by location, so results do not depend on the order files finished in
+    const byLocation = (a: number, b: number) =>
+      this.files[this.fileIndexes[a]].localeCompare(this.files[this.fileIndexes[b]]) ||
+      this.startLines[a] - this.startLines[b];
+    const groups = Array.from(grouped.values())
+      .filter(members => members.length > 1)
+      .map(members => members.sort(byLocation))
+      .sort((a, b) => byLocation(a[0], b[0]));
+    this.issues = new Map();
+    groups.forEach(members => this.createIssues(members));
+
+    return groups.map(members => ({
+      members: members.map(i => ({
+        filePath: this.files[this.fileIndexes[i]],
+        name: this.names[i],
+        startLine: this.startLines[i],
+        tokens: this.tokenCounts[i],
+      })),
+    }));
+  }
+
+  /**
+   * Attach the issues found by detect() to a file's functions. Functions
+   * are copied, never modified.
+   */
+  annotate(analysis: FileAnalysis): FileAnalysis {
+    const issues = this.issues.get(analysis.filePath);
+    if (!issues) {
+      return analysis;
+    }
+
+    // Methods listed both as functions and under their class stay shared
+    const copies: Map<FunctionInfo, FunctionInfo> = new Map();
+    let added = 0;
+    const withIssue = (func: FunctionInfo): FunctionInfo => {
+      const issue = issues.get(functionKey(func.name, func.startLine));
+      if (!issue) {
+        return func;
+      }
+      added++;
+      let copy = copies.get(func);
+      if (!copy) {
+        copy = { ...func, issues: [...func.issues, issue] };
+        copies.set(func, copy);
+      }
+      return copy;
+    };
+
+    const functions = analysis.functions.map(withIssue);
+    const classes = analysis.classes.map(cls => ({ ...cls, methods: cls.methods.map(withIssue) }));
+
+    return { ...analysis, functions, classes, totalIssues: analysis.totalIssues + added };
+  }
+
+  private createIssues(members: number[]): void {
+    for (const i of members) {
+      const others = members.filter(other => other !== i);
+      const listed = others.slice(0, MAX_LISTED)
+        .map(other => `'${this.names[other]}' (${this.files[this.fileIndexes[other]]}:${this.startLines[other]})`)
+        .join(', ');
+      const more = others.length > MAX_LISTED ? ` and ${others.length - MAX_LISTED} more` : '';
+
+      const filePath = this.files[this.fileIndexes[i]];
+      let fileIssues = this.issues.get(filePath);
+      if (!fileIssues) {
+        fileIssues = new Map();
+        this.issues.set(filePath, fileIssues);
+      }
+
+      fileIssues.set(functionKey(this.names[i], this.startLines[i]), {
+        type: IssueType.DUPLICATED_CODE,
+        category: IssueCategory.CODE_SMELL,
+        severity: 'medium',
+        line: this.startLines[i],
+        message: `Function '${this.names[i]}' duplicates ${others.length} other function(s): ${listed}${more}`,
+        suggestion: 'Extract the shared logic into one function and call it from each place',
+      });
+    }
+  }
+
+  private isSimilar(a: number, b: number): boolean {
+    const { signatures } = this;
+    let equal = 0;
+    for (let k = 0; k < SIGNATURE_SIZE; k++) {
+      if (signatures[a * SIGNATURE_SIZE + k] === signatures[b * SIGNATURE_SIZE + k]) {
+        equal++;
+      }
+    }
+    return equal / SIGNATURE_SIZE >= this.similarity;
+  }
+
+  private bandKey(i: number, band: number): number {
+    let key = band;
+    for (let k = 0; k < BAND_ROWS; k++) {
+      key = mix(Math.imul(key, ROLLING_BASE) ^ this.signatures[i * SIGNATURE_SIZE + band + k]);
+    }
+    return key;
+  }
+}
+
+function functionKey(name: string, startLine: number): string {
+  return `${startLine}:${name}`;
+}
+
+/**
+ * Identifiers of any kind become one token, other named leaves (numbers,
+ * strings, booleans...) another; keywords and punctuation stay as they are
+ */
+function normalizeNamed(type: string): string {
+  return type.endsWith('identifier') ? '<identifier>' : '<literal>';
+}
+
+function fingerprint(tokens: number[]): FunctionFingerprint {
+  return { tokens: tokens.length, minHash: minHash(winnow(shingle(tokens))) };
+}
+
+/**
+ * Rolling hash of every run of SHINGLE_TOKENS consecutive tokens
+ */
+function shingle(tokens: number[]): number[] {
+  const width = Math.min(SHINGLE_TOKENS, tokens.length);
+  const dropFactor = width === SHINGLE_TOKENS ? ROLLING_BASE_POW : power(ROLLING_BASE, width);
+  const hashes: number[] = [];
+  let hash = 0;
+
+  for (let i = 0; i < tokens.length; i++) {
+    hash = (Math.imul(hash, ROLLING_BASE) + tokens[i]) | 0;
+    if (i >= width) {
+      hash = (hash - Math.imul(tokens[i - width], dropFactor)) | 0;
+    }
+    if (i >= width - 1) {
+      hashes.push(hash >>> 0);
+    }
+  }
+
+  return hashes;
+}
+
+/**
+ * Keep the smallest hash of each window of WINDOW shingles (the rightmost
+ * on ties), once per position it is selected at
+ */
+function winnow(hashes: number[]): number[] {
+  const window = Math.min(WINDOW, hashes.length);
+  const selected: number[] = [];
+  if (window === 0) {
+    return selected;
+  }
+  let last = -1;
+
+  for (let start = 0; start + window <= hashes.length; start++) {
+    let min = start;
+    for (let i = start + 1; i < start + window; i++) {
+      if (hashes[i] <= hashes[min]) {
+        min = i;
+      }
+    }
+    if (min !== last) {
+      selected.push(hashes[min]);
+      last = min;
+    }
+  }
+
+  return selected;
+}
+
+function minHash(hashes: number[]): number[] {
+  const signature = new Array<number>(SIGNATURE_SIZE).fill(0xffffffff);
+
+  for (const hash of hashes) {
+    for (let k = 0; k < SIGNATURE_SIZE; k++) {
+      const value = mix(hash ^ SEEDS[k]);
+      if (value < signature[k]) {
+        signature[k] = value;
+      }
+    }
+  }
+
+  return signature;
+}
+
+function tokenHash(token: string): number {
+  let hash = tokenHashes.get(token);
+  if (hash === undefined) {
+    // FNV-1a
+    hash = 0x811c9dc5;
+    for (let i = 0; i < token.length; i++) {
+      hash = Math.imul(hash ^ token.charCodeAt(i), 0x01000193);
+    }
+    hash >>>= 0;
+    tokenHashes.set(token, hash);
+  }
+  return hash;
+}
+
+/**
+ * 32-bit finalizer of MurmurHash3, as an unsigned integer
+ */
+function mix(value: number): number {
+  value ^= value >>> 16;
+  value = Math.imul(value, 0x85ebca6b);
+  value ^= value >>> 13;
+  value = Math.imul(value, 0xc2b2ae35);
+  value ^= value >>> 16;
+  return value >>> 0;
+}
+
+function power(base: number, exponent: number): number {
+  let result = 1;
+  for (let i = 0; i < exponent; i++) {
+    result = Math.imul(result, base);
+  }
+  return result;
+}
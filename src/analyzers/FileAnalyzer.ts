@@ -1,74 +1,188 @@
 import * as fs from 'fs';
 import * as path from 'path';
-import { FileAnalysis, ParserInterface, AnalysisResult, AnalysisError } from '../types';
-import { JavaScriptParser } from '../parsers/JavaScriptParser';
-import { PythonParser } from '../parsers/PythonParser';
+import {
+  FileAnalysis,
+  ParserInterface,
+  AnalysisResult,
+  AnalysisError,
+  AnalyzerConfig,
+  DEFAULT_CONFIG,
+  ParseOptions,
+} from '../types';
+import { AnalysisWorkerPool } from './AnalysisWorkerPool';
+import { AnalysisCache } from '../cache/AnalysisCache';
+import { profile } from '../profiling/Profiler';
+import { AnalysisBudget, AnalysisLimitError, detectGeneratedCode } from './AnalysisLimits';
+
+/**
+ * A supported language. Its parser module, with the native grammar and the
+ * detectors it pulls in, is only loaded once a file of the language is met.
+ */
+interface ParserRegistration {
+  // Same as the parser's getLanguageName()
+  language: string;
+  extensions: string[];
+  load(): ParserInterface;
+}
+
+const DEFAULT_PARSERS: ParserRegistration[] = [
+  { language: 'JavaScript', extensions: ['.js', '.jsx'], load: () => loadJavaScriptParser(false) },
+  { language: 'TypeScript', extensions: ['.ts', '.tsx'], load: () => loadJavaScriptParser(true) },
+  { language: 'Python', extensions: ['.py'], load: loadPythonParser },
+];
+
+function loadJavaScriptParser(isTypeScript: boolean): ParserInterface {
+  const { JavaScriptParser } = require('../parsers/JavaScriptParser') as typeof import('../parsers/JavaScriptParser');
+  return new JavaScriptParser(isTypeScript);
+}
+
+function loadPythonParser(): ParserInterface {
+  const { PythonParser } = require('../parsers/PythonParser') as typeof import('../parsers/PythonParser');
+  return new PythonParser();
+}
 
 /**
  * Main file analyzer that coordinates parsing and analysis
  */
 export class FileAnalyzer {
-  private parsers: Map<string, ParserInterface>;
+  private registrations: Map<string, ParserRegistration>;
+  private parsers: Map<ParserRegistration, ParserInterface>;
+  private cache: AnalysisCache | null;
+  private config: AnalyzerConfig;
 
-  constructor() {
+  constructor(cache?: AnalysisCache, config: AnalyzerConfig = DEFAULT_CONFIG) {
+    this.registrations = new Map();
     this.parsers = new Map();
+    this.cache = cache ?? null;
+    this.config = config;
     this.registerDefaultParsers();
   }
 
   private registerDefaultParsers() {
-    // JavaScript
-    const jsParser = new JavaScriptParser(false);
-    jsParser.getSupportedExtensions().forEach(ext => {
-      this.parsers.set(ext, jsParser);
+    DEFAULT_PARSERS.forEach(registration => {
+      registration.extensions.forEach(ext => this.registrations.set(ext, registration));
     });
+  }
 
-    // TypeScript
-    const tsParser = new JavaScriptParser(true);
-    tsParser.getSupportedExtensions().forEach(ext => {
-      this.parsers.set(ext, tsParser);
-    });
+  /**
+   * The parser for an extension, loading it on first use
+   */
+  private parserFor(ext: string): ParserInterface | undefined {
+    const registration = this.registrations.get(ext);
+    if (!registration) {
+      return undefined;
+    }
 
-    // Python
-    const pyParser = new PythonParser();
-    pyParser.getSupportedExtensions().forEach(ext => {
-      this.parsers.set(ext, pyParser);
-    });
+    let parser = this.parsers.get(registration);
+    if (!parser) {
+      parser = profile('stage', 'load', () => registration.load());
+      this.parsers.set(registration, parser);
+    }
+    return parser;
   }
 
   /**
    * Analyze a single file
    */
   analyzeFile(filePath: string): FileAnalysis {
+    return profile('file', filePath, () => this.analyzeFileUnprofiled(filePath));
+  }
+
+  private analyzeFileUnprofiled(filePath: string): FileAnalysis {
     if (!fs.existsSync(filePath)) {
       throw new Error(`File not found: ${filePath}`);
     }
 
     const ext = path.extname(filePath);
-    const parser = this.parsers.get(ext);
+    const parser = this.parserFor(ext);
 
     if (!parser) {
       throw new Error(`No parser available for file extension: ${ext}`);
     }
 
-    const code = fs.readFileSync(filePath, 'utf-8');
-    return parser.parse(code, filePath);
+    const size = this.getFileSize(filePath);
+    if (size > this.config.maxFileBytes) {
+      throw new AnalysisLimitError('FILE_TOO_LARGE', `File is ${size} bytes (limit: ${this.config.maxFileBytes})`);
+    }
+
+    const code = profile('stage', 'read', () => fs.readFileSync(filePath, 'utf-8'));
+    return this.analyzeCode(parser, code, filePath);
   }
 
   /**
-   * Analyze multiple files
+   * Analyze source text that need not be saved, e.g. an editor buffer.
+   * `filePath` selects the parser by its extension and is reported as is.
    */
-  analyzeFiles(filePaths: string[]): FileAnalysis[] {
-    const result = this.analyzeFilesWithErrors(filePaths);
+  analyzeSource(code: string, filePath: string): FileAnalysis {
+    const parser = this.parserFor(path.extname(filePath));
+    if (!parser) {
+      throw new Error(`No parser available for file extension: ${path.extname(filePath)}`);
+    }
 
-    // Log errors but still return successful analyses
-    if (result.failed.length > 0) {
-      console.error(`\n⚠️  Failed to analyze ${result.failed.length} file(s):`);
-      result.failed.forEach(err => {
-        console.error(`  - ${err.filePath}: ${err.error}`);
-      });
+    return this.analyzeCode(parser, code, filePath);
+  }
+
+  private analyzeCode(parser: ParserInterface, code: string, filePath: string): FileAnalysis {
+    const parse = (options: ParseOptions) => parser.parse(code, filePath, options);
+    if (!this.cache) {
+      return this.analyzeWithinLimits(code, filePath, parse);
     }
 
-    return result.successful;
+    const key = this.cache.getKey(code, parser.getLanguageName());
+    const cached = this.cache.get(key, filePath);
+    if (cached) {
+      return cached;
+    }
+
+    const analysis = this.analyzeWithinLimits(code, filePath, parse);
+    this.cache.set(key, analysis);
+    return analysis;
+  }
+
+  /**
+   * Run `analyze` under the configured limits: files over the byte limit
+   * are refused, the parse options carry the node and time budgets, and
+   * minified and generated files are only measured and say why in
+   * `degraded`. Callers that parse on their own, such as
+   * IncrementalAnalyzer, go through here too.
+   */
+  analyzeWithinLimits(
+    code: string,
+    filePath: string,
+    analyze: (options: ParseOptions) => FileAnalysis
+  ): FileAnalysis {
+    const size = Buffer.byteLength(code, 'utf-8');
+    if (size > this.config.maxFileBytes) {
+      throw new AnalysisLimitError('FILE_TOO_LARGE', `File is ${size} bytes (limit: ${this.config.maxFileBytes})`);
+    }
+
+    const generated = this.config.detectGenerated ? detectGeneratedCode(code) : null;
+    const budget = new AnalysisBudget(this.config.maxAstNodes, this.config.fileTimeoutMs);
+
+    const analysis = analyze({
+      budget,
+      metricsOnly: generated !== null,
+      minFingerprintTokens: this.config.detectDuplicates ? this.config.minDuplicateTokens : undefined,
+      collectImports: this.config.analyzeDependencies,
+    });
+    if (!generated) {
+      return analysis;
+    }
+    return { ...analysis, degraded: { filePath, error: generated.message, errorType: generated.reason } };
+  }
+
+  /**
+   * Analyze multiple files
+   */
+  analyzeFiles(filePaths: string[]): FileAnalysis[] {
+    return this.logFailures(this.analyzeFilesWithErrors(filePaths));
+  }
+
+  /**
+   * Analyze multiple files on up to `jobs` worker threads
+   */
+  async analyzeFilesParallel(filePaths: string[], jobs: number): Promise<FileAnalysis[]> {
+    return this.logFailures(await this.analyzeFilesWithErrorsParallel(filePaths, jobs));
   }
 
   /**
@@ -83,26 +197,183 @@ export class FileAnalyzer {
         const analysis = this.analyzeFile(filePath);
         successful.push(analysis);
       } catch (error) {
-        const errorMessage = error instanceof Error ? error.message : String(error);
-        let errorType: AnalysisError['errorType'] = 'PARSE_ERROR';
-
-        if (!fs.existsSync(filePath)) {
-          errorType = 'FILE_NOT_FOUND';
-        } else if (errorMessage.includes('No parser available')) {
-          errorType = 'UNSUPPORTED_EXTENSION';
-        } else if (errorMessage.includes('EACCES') || errorMessage.includes('permission')) {
-          errorType = 'READ_ERROR';
+        failed.push(this.toAnalysisError(filePath, error));
+      }
+    }
+
+    return { successful, failed };
+  }
+
+  /**
+   * Like analyzeFilesWithErrors, for source text already read from `filePath`
+   */
+  analyzeSourceWithErrors(code: string, filePath: string): AnalysisResult {
+    try {
+      return { successful: [this.analyzeSource(code, filePath)], failed: [] };
+    } catch (error) {
+      return { successful: [], failed: [this.toAnalysisError(filePath, error)] };
+    }
+  }
+
+  private toAnalysisError(filePath: string, error: unknown): AnalysisError {
+    const errorMessage = error instanceof Error ? error.message : String(error);
+    let errorType: AnalysisError['errorType'] = 'PARSE_ERROR';
+
+    if (error instanceof AnalysisLimitError) {
+      errorType = error.reason;
+    } else if (!fs.existsSync(filePath)) {
+      errorType = 'FILE_NOT_FOUND';
+    } else if (errorMessage.includes('No parser available')) {
+      errorType = 'UNSUPPORTED_EXTENSION';
+    } else if (errorMessage.includes('EACCES') || errorMessage.includes('permission')) {
+      errorType = 'READ_ERROR';
+    }
+
+    return {
+      filePath,
+      error: errorMessage,
+      errorType,
+    };
+  }
+
+  /**
+   * Parallel variant of analyzeFilesWithErrors. Results keep the input
+   * order. Falls back to in-process analysis for a single job or when
+   * the compiled worker script is unavailable.
+   */
+  async analyzeFilesWithErrorsParallel(filePaths: string[], jobs: number): Promise<AnalysisResult> {
+    const results: AnalysisResult[] = new Array(filePaths.length);
+
+    for await (const { index, result } of this.runAnalysis(filePaths, jobs)) {
+      results[index] = result;
+    }
+
+    return {
+      successful: results.flatMap(result => result.successful),
+      failed: results.flatMap(result => result.failed),
+    };
+  }
+
+  /**
+   * Analyze files, yielding each one's result as soon as it finishes.
+   * Each yielded result holds exactly one analysis or one failure.
+   * Work is only scheduled while the consumer keeps pulling, so memory
+   * stays bounded by the number of jobs rather than the number of files.
+   */
+  async *analyzeFilesStream(filePaths: string[], jobs: number = 1): AsyncGenerator<AnalysisResult> {
+    for await (const { result } of this.runAnalysis(filePaths, jobs)) {
+      yield result;
+    }
+  }
+
+  /**
+   * Yield per-file results in completion order, tagged with their input index.
+   * Files are scheduled largest-first so one big file does not finish the
+   * run on its own, with at most two files in flight per worker.
+   */
+  private async *runAnalysis(
+    filePaths: string[],
+    jobs: number
+  ): AsyncGenerator<{ index: number; result: AnalysisResult }> {
+    const poolSize = Math.min(jobs, filePaths.length);
+    if (poolSize <= 1 || !AnalysisWorkerPool.isAvailable()) {
+      for (let index = 0; index < filePaths.length; index++) {
+        yield { index, result: this.analyzeFilesWithErrors([filePaths[index]]) };
+      }
+      return;
+    }
+
+    const sizes = filePaths.map(filePath => this.getFileSize(filePath));
+    const order = filePaths.map((_, index) => index).sort((a, b) => sizes[b] - sizes[a] || a - b);
+    const maxInFlight = poolSize * 2;
+    const inFlight: Map<number, Promise<{ index: number; result: AnalysisResult }>> = new Map();
+
+    // Workers are only started once a file misses the cache
+    let pool: AnalysisWorkerPool | null = null;
+    const getPool = () => (pool ??= new AnalysisWorkerPool(poolSize, this.config));
+
+    let next = 0;
+    try {
+      while (next < order.length || inFlight.size > 0) {
+        while (next < order.length && inFlight.size < maxInFlight) {
+          const index = order[next++];
+          inFlight.set(
+            index,
+            this.analyzeOnPool(getPool, filePaths[index]).then(result => ({ index, result }))
+          );
         }
 
-        failed.push({
-          filePath,
-          error: errorMessage,
-          errorType,
-        });
+        const settled = await Promise.race(inFlight.values());
+        inFlight.delete(settled.index);
+        yield settled;
       }
+    } finally {
+      await (pool as AnalysisWorkerPool | null)?.close();
     }
+  }
 
-    return { successful, failed };
+  /**
+   * Serve a file from the cache on this thread, or analyze it on the pool.
+   * A miss hands the worker the text already read for the cache key.
+   */
+  private async analyzeOnPool(getPool: () => AnalysisWorkerPool, filePath: string): Promise<AnalysisResult> {
+    const probe = this.probeCache(filePath);
+    if (probe?.analysis) {
+      return { successful: [probe.analysis], failed: [] };
+    }
+
+    const result = await getPool().analyzeFile(filePath, probe?.code);
+    if (this.cache && probe && result.successful.length > 0) {
+      this.cache.set(probe.key, result.successful[0]);
+    }
+    return result;
+  }
+
+  private logFailures(result: AnalysisResult): FileAnalysis[] {
+    // Log errors but still return successful analyses
+    if (result.failed.length > 0) {
+      console.error(`\n⚠️  Failed to analyze ${result.failed.length} file(s):`);
+      result.failed.forEach(err => {
+        console.error(`  - ${err.filePath}: ${err.error}`);
+      });
+    }
+
+    return result.successful;
+  }
+
+  /**
+   * Read a file and look it up in the cache. Returns null when there is
+   * no cache or the file cannot be analyzed, so the caller reports the error.
+   * Only the language name is needed for the key, so no grammar is loaded.
+   */
+  private probeCache(filePath: string): { key: string; code: string; analysis: FileAnalysis | null } | null {
+    const registration = this.registrations.get(path.extname(filePath));
+    if (!this.cache || !registration || this.getFileSize(filePath) > this.config.maxFileBytes) {
+      return null;
+    }
+
+    try {
+      const code = fs.readFileSync(filePath, 'utf-8');
+      const key = this.cache.getKey(code, registration.language);
+      return { key, code, analysis: this.cache.get(key, filePath) };
+    } catch {
+      return null;
+    }
+  }
+
+  private getFileSize(filePath: string): number {
+    try {
+      return fs.statSync(filePath).size;
+    } catch {
+      return 0;
+    }
+  }
+
+  /**
+   * Get the parser registered for a file's extension
+   */
+  getParser(filePath: string): ParserInterface | undefined {
+    return this.parserFor(path.extname(filePath));
   }
 
   /**
@@ -110,13 +381,31 @@ export class FileAnalyzer {
    */
   isSupported(filePath: string): boolean {
     const ext = path.extname(filePath);
-    return this.parsers.has(ext);
+    return this.registrations.has(ext);
   }
 
   /**
-   * Get all supported extensions
+   * Get all supported extensions, or only those of some languages. Languages
+   * are comma-separated extensions (`js,py`) or language names (`python`).
    */
-  getSupportedExtensions(): string[] {
-    return Array.from(this.parsers.keys());
+  getSupportedExtensions(languages?: string): string[] {
+    if (!languages) {
+      return Array.from(this.registrations.keys());
+    }
+
+    const extensions = new Set<string>();
+    for (const language of languages.split(',').map(name => name.trim().toLowerCase())) {
+      const matches = Array.from(new Set(this.registrations.values())).filter(registration =>
+        registration.language.toLowerCase() === language ||
+        registration.extensions.includes(`.${language}`)
+      );
+
+      if (matches.length === 0) {
+        throw new Error(`Unsupported language: ${language}`);
+      }
+      matches.forEach(registration => registration.extensions.forEach(ext => extensions.add(ext)));
+    }
+
+    return Array.from(extensions);
   }
 }
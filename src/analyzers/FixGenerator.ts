@@ -1,4 +1,7 @@
-import { CodeIssue, IssueType } from '../types';
+import * as fs from 'fs';
+import { CodeIssue, FileAnalysis, IssueType } from '../types';
+import { AnalysisContext } from './AnalysisContext';
+import { measure } from '../profiling/Profiler';
 
 /**
  * Generates automatic fixes for detected issues
@@ -11,19 +14,68 @@ export interface CodeFix {
   automated: boolean; // Can this be auto-applied?
 }
 
+/**
+ * Fixes already generated, keyed by rule and the code they fix
+ */
+export type FixMemo = Map<string, CodeFix | null>;
+
+// Issue types createFix() has a fix for
+const FIXABLE_TYPES: ReadonlySet<IssueType> = new Set([
+  IssueType.TYPE_COERCION,
+  IssueType.CONSOLE_LOG,
+  IssueType.DEAD_CODE,
+  IssueType.MAGIC_NUMBER,
+  IssueType.STRING_CONCAT_IN_LOOP,
+  IssueType.EMPTY_CATCH,
+  IssueType.EVAL_USAGE,
+  IssueType.INNERHTML_USAGE,
+  IssueType.HARDCODED_SECRET,
+  IssueType.DOM_IN_LOOP,
+  IssueType.NESTED_LOOPS,
+  IssueType.TOO_MANY_PARAMETERS,
+  IssueType.HIGH_COMPLEXITY,
+  IssueType.DEEP_NESTING,
+]);
+
 export class FixGenerator {
-  private code: string;
-  private lines: string[];
+  private source: string | AnalysisContext | (() => string);
+  private context: AnalysisContext | null = null;
+  private memo: FixMemo;
 
-  constructor(code: string) {
-    this.code = code;
-    this.lines = code.split('\n');
+  /**
+   * `source` may be a callback, which is only called if an issue without
+   * a code snippet needs its line. Generators sharing a memo reuse each
+   * other's fixes.
+   */
+  constructor(source: string | AnalysisContext | (() => string), memo: FixMemo = new Map()) {
+    this.source = source;
+    this.memo = memo;
   }
 
   /**
    * Generate a fix for an issue
    */
   generateFix(issue: CodeIssue): CodeFix | null {
+    if (!FIXABLE_TYPES.has(issue.type)) {
+      return null;
+    }
+
+    // Every fix is a function of the rule and the code it applies to;
+    // magic number fixes also take the number from the message
+    const originalCode = issue.codeSnippet || this.getLine(issue.line);
+    const key = issue.type === IssueType.MAGIC_NUMBER
+      ? `${issue.type}\0${originalCode}\0${issue.message}`
+      : `${issue.type}\0${originalCode}`;
+
+    let fix = this.memo.get(key);
+    if (fix === undefined) {
+      fix = this.createFix({ ...issue, codeSnippet: originalCode });
+      this.memo.set(key, fix);
+    }
+    return fix;
+  }
+
+  private createFix(issue: CodeIssue): CodeFix | null {
     switch (issue.type) {
       case IssueType.TYPE_COERCION:
         return this.fixTypeCoercion(issue);
@@ -156,8 +208,13 @@ export class FixGenerator {
    * Safely get a line
    */
   private getLine(lineNumber: number): string {
-    const line = this.lines[lineNumber - 1];
-    return line ? line.trim() : '<code not available>';
+    if (!this.context) {
+      const source = typeof this.source === 'function' ? this.source() : this.source;
+      this.context = AnalysisContext.from(source);
+    }
+
+    const line = this.context.getLineContent(lineNumber);
+    return line || '<code not available>';
   }
 
   /**
@@ -294,3 +351,40 @@ export class FixGenerator {
     return match ? match[1] : 'value';
   }
 }
+
+/**
+ * Attach a fix to every issue of the analyses that has one
+ *
+ * Fixes are not generated during analysis, since most reports never show
+ * them; reporters and output formats that do call this first. A file is
+ * only read again if one of its issues has no code snippet.
+ */
+export function attachFixes(analyses: FileAnalysis[]): void {
+  const memo: FixMemo = new Map();
+
+  measure('detector', 'FixGenerator.generateFix', () => {
+    for (const analysis of analyses) {
+      const fixGenerator = new FixGenerator(() => readSource(analysis.filePath), memo);
+      const functions = [...analysis.functions, ...analysis.classes.flatMap(cls => cls.methods)];
+
+      for (const fn of functions) {
+        for (const issue of fn.issues) {
+          if (!issue.fix) {
+            const fix = fixGenerator.generateFix(issue);
+            if (fix) {
+              issue.fix = fix;
+            }
+          }
+        }
+      }
+    }
+  });
+}
+
+function readSource(filePath: string): string {
+  try {
+    return fs.readFileSync(filePath, 'utf-8');
+  } catch {
+    return '';
+  }
+}
@@ -0,0 +1,82 @@
+import Parser from 'tree-sitter';
+import { ModuleImport } from '../types';
+import { compileQuery, languageOf } from './QueryRules';
+
+// `import ... from`, `export ... from`, require() and dynamic import().
+// Also used for TypeScript, whose grammar extends the JavaScript one.
+const JAVASCRIPT_IMPORTS = `
+(import_statement source: (string) @source)
+
+(export_statement source: (string) @source)
+
+(call_expression
+  function: (identifier) @callee
+  arguments: (arguments . (string) @source)
+  (#eq? @callee "require"))
+
+(call_expression
+  function: (import)
+  arguments: (arguments . (string) @source))
+`;
+
+const PYTHON_IMPORTS = `
+(import_statement) @statement
+
+(import_from_statement) @statement
+`;
+
+const IMPORT_SOURCES = [JAVASCRIPT_IMPORTS, PYTHON_IMPORTS];
+
+// Compiled once per grammar; null when no import source applies to it
+const compiled: WeakMap<object, Parser.Query | null> = new WeakMap();
+
+/**
+ * The modules imported anywhere in the tree rooted at `root`, in source
+ * order. Specifiers are kept as written; resolving them to files is left
+ * to ModuleResolver, which sees the whole set of analyzed files.
+ */
+export function extractImports(root: Parser.SyntaxNode): ModuleImport[] {
+  const query = compileQuery(languageOf(root), IMPORT_SOURCES, compiled);
+  if (!query) {
+    return [];
+  }
+
+  const imports: ModuleImport[] = [];
+  for (const capture of query.captures(root)) {
+    if (capture.name === 'source') {
+      imports.push({ source: unquote(capture.node.text), line: capture.node.startPosition.row + 1 });
+    } else if (capture.name === 'statement') {
+      imports.push(...pythonImports(capture.node));
+    }
+  }
+
+  return imports;
+}
+
+/**
+ * `import a.b, c as d` imports each module; `from .a import b, c` imports
+ * one module, whose names may be submodules
+ */
+function pythonImports(statement: Parser.SyntaxNode): ModuleImport[] {
+  const line = statement.startPosition.row + 1;
+  const names = statement.childrenForFieldName('name').map(name =>
+    dottedName(name.type === 'aliased_import' ? name.childForFieldName('name') ?? name : name));
+
+  if (statement.type === 'import_statement') {
+    return names.map(source => ({ source, line }));
+  }
+
+  const module = statement.childForFieldName('module_name');
+  if (!module) {
+    return [];
+  }
+  return [{ source: dottedName(module), names, line }];
+}
+
+function dottedName(node: Parser.SyntaxNode): string {
+  return node.text.replace(/\s+/g, '');
+}
+
+function unquote(text: string): string {
+  return text.slice(1, -1);
+}
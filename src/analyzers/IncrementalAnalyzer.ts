@@ -0,0 +1,290 @@
+import * as fs from 'fs';
+import Parser from 'tree-sitter';
+import { FileAnalysis, FunctionRef } from '../types';
+import { BaseParser } from '../parsers/BaseParser';
+import { AnalysisContext, FunctionCache, FunctionTree } from './AnalysisContext';
+import { FileAnalyzer } from './FileAnalyzer';
+
+interface OpenFile {
+  code: string;
+  tree: Parser.Tree;
+  analysis: FileAnalysis;
+  functions: Map<string, FunctionTree>;
+}
+
+export interface IncrementalUpdate {
+  previous: FileAnalysis | null;
+  current: FileAnalysis;
+  reanalyzedFunctions: number;
+  reusedFunctions: number;
+  durationMs: number;
+}
+
+/**
+ * Keeps the syntax tree of each open file and re-analyzes edits incrementally
+ *
+ * On change the old tree is edited and reparsed by tree-sitter, and only
+ * functions whose byte ranges intersect the changed ranges are analyzed
+ * again. Results for the other functions are reused, shifted to their new
+ * lines. A reused function brings the results of its nested functions
+ * along, and an edit to an enclosing function's own body leaves the
+ * functions nested in it reusable.
+ *
+ * Files are analyzed under the FileAnalyzer's limits, as by analyzeFile.
+ */
+export class IncrementalAnalyzer {
+  private fileAnalyzer: FileAnalyzer;
+  private files: Map<string, OpenFile> = new Map();
+
+  constructor(fileAnalyzer: FileAnalyzer = new FileAnalyzer()) {
+    this.fileAnalyzer = fileAnalyzer;
+  }
+
+  /**
+   * Fully analyze a file and keep its tree for later updates. `code`
+   * defaults to the file's content on disk; editors pass their buffer.
+   */
+  open(filePath: string, code: string = fs.readFileSync(filePath, 'utf-8')): FileAnalysis {
+    const parser = this.getParser(filePath);
+    const functions: Map<string, FunctionTree> = new Map();
+
+    let tree!: Parser.Tree;
+    const analysis = this.fileAnalyzer.analyzeWithinLimits(code, filePath, options => {
+      tree = parser.parseTree(code);
+      return parser.analyzeTree(tree, AnalysisContext.fromCode(code, recordingCache(functions), options), filePath);
+    });
+
+    this.files.set(filePath, { code, tree, analysis, functions });
+    return analysis;
+  }
+
+  /**
+   * Re-read a file, or take its new `code`, and re-analyze the functions
+   * the edit touched. Files that are not open yet are opened. Returns null
+   * when the content has not changed.
+   */
+  update(filePath: string, code: string = fs.readFileSync(filePath, 'utf-8')): IncrementalUpdate | null {
+    const start = performance.now();
+    const file = this.files.get(filePath);
+
+    if (!file) {
+      const current = this.open(filePath, code);
+      return {
+        previous: null,
+        current,
+        reanalyzedFunctions: this.files.get(filePath)!.functions.size,
+        reusedFunctions: 0,
+        durationMs: performance.now() - start,
+      };
+    }
+
+    if (code === file.code) {
+      return null;
+    }
+
+    // The old tree is edited in place, so drop the file until the new
+    // state is stored; a failed update then reopens it from scratch
+    this.files.delete(filePath);
+
+    const parser = this.getParser(filePath);
+    const edit = computeEdit(file.code, code);
+
+    let tree!: Parser.Tree;
+    let cache!: EditedFunctionCache;
+    const current = this.fileAnalyzer.analyzeWithinLimits(code, filePath, options => {
+      file.tree.edit(edit);
+      tree = parser.parseTree(code, file.tree);
+
+      // Changed ranges only cover structural changes, so the edited text
+      // itself is always treated as changed too
+      const changedRanges: Array<[number, number]> = file.tree
+        .getChangedRanges(tree)
+        .map(range => [range.startIndex, range.endIndex] as [number, number]);
+      changedRanges.push([edit.startIndex, edit.newEndIndex]);
+
+      // Results from before the file became (or stopped being) generated
+      // were computed with the other set of checks
+      const previous = options.metricsOnly === Boolean(file.analysis.degraded) ? file.functions : new Map();
+      cache = new EditedFunctionCache(previous, edit, changedRanges);
+      return parser.analyzeTree(tree, AnalysisContext.fromCode(code, cache, options), filePath);
+    });
+
+    this.files.set(filePath, { code, tree, analysis: current, functions: cache.functions });
+
+    return {
+      previous: file.analysis,
+      current,
+      reanalyzedFunctions: cache.reanalyzed.size,
+      reusedFunctions: cache.reused.size,
+      durationMs: performance.now() - start,
+    };
+  }
+
+  /**
+   * Forget a file, e.g. once it has been deleted
+   */
+  close(filePath: string): FileAnalysis | null {
+    const file = this.files.get(filePath);
+    this.files.delete(filePath);
+    return file ? file.analysis : null;
+  }
+
+  isOpen(filePath: string): boolean {
+    return this.files.has(filePath);
+  }
+
+  private getParser(filePath: string): BaseParser {
+    const parser = this.fileAnalyzer.getParser(filePath);
+
+    if (!(parser instanceof BaseParser)) {
+      throw new Error(`No incremental parser available for file: ${filePath}`);
+    }
+
+    return parser;
+  }
+}
+
+/**
+ * Function cache that reuses results from before an edit
+ */
+class EditedFunctionCache implements FunctionCache {
+  readonly functions: Map<string, FunctionTree> = new Map();
+  readonly reanalyzed: Set<string> = new Set();
+  readonly reused: Set<string> = new Set();
+
+  constructor(
+    private previous: Map<string, FunctionTree>,
+    private edit: Parser.Edit,
+    private changedRanges: Array<[number, number]>
+  ) {}
+
+  get(node: Parser.SyntaxNode): FunctionTree | undefined {
+    const key = nodeKey(node);
+    const known = this.functions.get(key);
+    if (known) {
+      return known;
+    }
+
+    if (this.changedRanges.some(([start, end]) => node.startIndex <= end && node.endIndex >= start)) {
+      return undefined;
+    }
+
+    const { startIndex, oldEndIndex, newEndIndex, oldEndPosition, newEndPosition } = this.edit;
+    let byteDelta = 0;
+    let lineDelta = 0;
+
+    if (node.startIndex >= newEndIndex) {
+      byteDelta = newEndIndex - oldEndIndex;
+      lineDelta = newEndPosition.row - oldEndPosition.row;
+    } else if (node.endIndex > startIndex) {
+      return undefined;
+    }
+
+    const tree = this.previous.get(`${node.startIndex - byteDelta}:${node.endIndex - byteDelta}`);
+    if (!tree) {
+      return undefined;
+    }
+
+    const shifted = byteDelta === 0 && lineDelta === 0 ? tree : shiftTree(tree, byteDelta, lineDelta);
+    this.keep(shifted);
+    return shifted;
+  }
+
+  set(node: Parser.SyntaxNode, tree: FunctionTree): void {
+    const key = nodeKey(node);
+    this.functions.set(key, tree);
+    this.reanalyzed.add(key);
+  }
+
+  /**
+   * Record a reused function and its nested functions under their new keys
+   */
+  private keep(tree: FunctionTree): void {
+    const key = `${tree.startIndex}:${tree.endIndex}`;
+    this.functions.set(key, tree);
+    this.reused.add(key);
+    tree.children.forEach(child => this.keep(child));
+  }
+}
+
+/**
+ * Move a function's results, and those of its nested functions, by the
+ * bytes and lines an edit before them inserted or removed
+ */
+function shiftTree(tree: FunctionTree, byteDelta: number, lineDelta: number): FunctionTree {
+  const { info } = tree;
+  const shiftRef = (ref: FunctionRef): FunctionRef => ({ ...ref, startLine: ref.startLine + lineDelta });
+
+  return {
+    ...tree,
+    startIndex: tree.startIndex + byteDelta,
+    endIndex: tree.endIndex + byteDelta,
+    info: {
+      ...info,
+      startLine: info.startLine + lineDelta,
+      endLine: info.endLine + lineDelta,
+      issues: info.issues.map(issue => ({ ...issue, line: issue.line + lineDelta })),
+      ...(info.parent ? { parent: shiftRef(info.parent) } : {}),
+      ...(info.children ? { children: info.children.map(shiftRef) } : {}),
+    },
+    children: tree.children.map(child => shiftTree(child, byteDelta, lineDelta)),
+  };
+}
+
+function recordingCache(functions: Map<string, FunctionTree>): FunctionCache {
+  return {
+    get: node => functions.get(nodeKey(node)),
+    set: (node, tree) => functions.set(nodeKey(node), tree),
+  };
+}
+
+function nodeKey(node: Parser.SyntaxNode): string {
+  return `${node.startIndex}:${node.endIndex}`;
+}
+
+/**
+ * Describe the change between two versions of a file as a single edit
+ * spanning everything between their common prefix and common suffix
+ */
+function computeEdit(oldCode: string, newCode: string): Parser.Edit {
+  const maxPrefix = Math.min(oldCode.length, newCode.length);
+  let prefix = 0;
+  while (prefix < maxPrefix && oldCode.charCodeAt(prefix) === newCode.charCodeAt(prefix)) {
+    prefix++;
+  }
+
+  const maxSuffix = maxPrefix - prefix;
+  let suffix = 0;
+  while (
+    suffix < maxSuffix &&
+    oldCode.charCodeAt(oldCode.length - 1 - suffix) === newCode.charCodeAt(newCode.length - 1 - suffix)
+  ) {
+    suffix++;
+  }
+
+  const oldEndIndex = oldCode.length - suffix;
+  const newEndIndex = newCode.length - suffix;
+
+  return {
+    startIndex: prefix,
+    oldEndIndex,
+    newEndIndex,
+    startPosition: positionAt(oldCode, prefix),
+    oldEndPosition: positionAt(oldCode, oldEndIndex),
+    newEndPosition: positionAt(newCode, newEndIndex),
+  };
+}
+
+function positionAt(code: string, index: number): Parser.Point {
+  let row = 0;
+  let lineStart = 0;
+  let newline = code.indexOf('\n');
+
+  while (newline !== -1 && newline < index) {
+    row++;
+    lineStart = newline + 1;
+    newline = code.indexOf('\n', lineStart);
+  }
+
+  return { row, column: index - lineStart };
+}
@@ -1,216 +1,288 @@
 import Parser from 'tree-sitter';
 import { CodeIssue, IssueType, IssueCategory } from '../types';
+import { TraversalEngine } from './TraversalEngine';
+import { AnalysisContext } from './AnalysisContext';
 
 /**
  * Detects potential memory leaks in code
  */
 export class MemoryLeakDetector {
-  private code: string;
+  private context: AnalysisContext;
 
-  constructor(code: string) {
-    this.code = code;
+  constructor(source: string | AnalysisContext) {
+    this.context = AnalysisContext.from(source);
   }
 
   /**
    * Detect all memory leak issues
    */
   detectLeaks(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-
-    issues.push(...this.detectEventListenerLeaks(node));
-    issues.push(...this.detectIntervalLeaks(node));
-    issues.push(...this.detectClosureLeaks(node));
-    issues.push(...this.detectGlobalLeaks(node));
+    const engine = new TraversalEngine();
+    const collect = this.register(engine);
+    engine.walk(node);
+    return collect();
+  }
 
-    return issues;
+  /**
+   * Register all memory leak checks on a shared traversal engine.
+   * Returns a callback that collects the issues once the walk is done.
+   */
+  register(engine: TraversalEngine): () => CodeIssue[] {
+    const checks = [
+      engine.section('MemoryLeakDetector.detectEventListenerLeaks', () => this.detectEventListenerLeaks(engine)),
+      engine.section('MemoryLeakDetector.detectIntervalLeaks', () => this.detectIntervalLeaks(engine)),
+      engine.section('MemoryLeakDetector.detectClosureLeaks', () => this.detectClosureLeaks(engine)),
+      engine.section('MemoryLeakDetector.detectGlobalLeaks', () => this.detectGlobalLeaks(engine)),
+    ];
+
+    return () => checks.flatMap(collect => collect());
   }
 
   /**
    * Detect addEventListener without removeEventListener
    */
-  private detectEventListenerLeaks(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
+  private detectEventListenerLeaks(engine: TraversalEngine): () => CodeIssue[] {
     const addListenerCalls: Array<{ line: number; element: string; event: string }> = [];
     const removeListenerCalls: Set<string> = new Set();
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'call_expression') {
-        const functionNode = n.childForFieldName('function');
-
-        if (functionNode && functionNode.type === 'member_expression') {
-          const propertyNode = functionNode.childForFieldName('property');
-          const objectNode = functionNode.childForFieldName('object');
-
-          if (propertyNode && objectNode) {
-            const method = propertyNode.text;
-            const element = objectNode.text;
-
-            if (method === 'addEventListener') {
-              const args = n.childForFieldName('arguments');
-              const eventType = this.getFirstArgument(args);
-
-              addListenerCalls.push({
-                line: n.startPosition.row + 1,
-                element,
-                event: eventType,
-              });
-            } else if (method === 'removeEventListener') {
-              const args = n.childForFieldName('arguments');
-              const eventType = this.getFirstArgument(args);
-              removeListenerCalls.add(`${element}:${eventType}`);
-            }
+    engine.on(['call_expression'], n => {
+      const call = this.getListenerCall(n);
+
+      if (call?.method === 'addEventListener') {
+        addListenerCalls.push({
+          line: n.startPosition.row + 1,
+          element: call.element,
+          event: call.event,
+        });
+      } else if (call?.method === 'removeEventListener') {
+        removeListenerCalls.add(`${call.element}:${call.event}`);
+      }
+    });
+
+    return () => {
+      const issues: CodeIssue[] = [];
+      const isRemoved = (element: string, event: string) => removeListenerCalls.has(`${element}:${event}`);
+
+      // Listeners are usually removed by a cleanup closure, which was
+      // skipped by this walk; only search nested functions when needed
+      if (addListenerCalls.some(({ element, event }) => !isRemoved(element, event))) {
+        for (const call of this.findNestedCalls(engine)) {
+          const removal = this.getListenerCall(call);
+          if (removal?.method === 'removeEventListener') {
+            removeListenerCalls.add(`${removal.element}:${removal.event}`);
           }
         }
       }
 
-      for (const child of n.children) {
-        traverse(child);
-      }
+      // Check for listeners without corresponding remove
+      addListenerCalls.forEach(({ line, element, event }) => {
+        if (!isRemoved(element, event)) {
+          issues.push({
+            type: IssueType.EVENT_LISTENER_LEAK,
+            category: IssueCategory.MEMORY_LEAK,
+            severity: 'high',
+            line,
+            message: `Event listener on ${element} for '${event}' is never removed - potential memory leak`,
+            suggestion: `Add removeEventListener in cleanup/unmount: ${element}.removeEventListener('${event}', handler)`,
+            codeSnippet: this.getLineContent(line),
+          });
+        }
+      });
+
+      return issues;
     };
+  }
+
+  /**
+   * Detect setInterval without clearInterval
+   */
+  private detectIntervalLeaks(engine: TraversalEngine): () => CodeIssue[] {
+    let hasSetInterval = false;
+    let hasClearInterval = false;
+    let setIntervalLine = 0;
+
+    engine.on(['call_expression'], n => {
+      const callee = this.getCalleeName(n);
 
-    traverse(node);
+      if (callee === 'setInterval') {
+        hasSetInterval = true;
+        setIntervalLine = n.startPosition.row + 1;
+      } else if (callee === 'clearInterval') {
+        hasClearInterval = true;
+      }
+    });
+
+    return () => {
+      const issues: CodeIssue[] = [];
 
-    // Check for listeners without corresponding remove
-    addListenerCalls.forEach(({ line, element, event }) => {
-      const key = `${element}:${event}`;
-      if (!removeListenerCalls.has(key)) {
+      // The interval is usually cleared by a cleanup closure the walk skipped
+      if (hasSetInterval && !hasClearInterval) {
+        hasClearInterval = this.findNestedCalls(engine).some(call => this.getCalleeName(call) === 'clearInterval');
+      }
+
+      if (hasSetInterval && !hasClearInterval) {
         issues.push({
-          type: IssueType.EVENT_LISTENER_LEAK,
+          type: IssueType.INTERVAL_LEAK,
           category: IssueCategory.MEMORY_LEAK,
-          severity: 'high',
-          line,
-          message: `Event listener on ${element} for '${event}' is never removed - potential memory leak`,
-          suggestion: `Add removeEventListener in cleanup/unmount: ${element}.removeEventListener('${event}', handler)`,
-          codeSnippet: this.getLineContent(line),
+          severity: 'critical',
+          line: setIntervalLine,
+          message: 'setInterval called without corresponding clearInterval - will run forever',
+          suggestion: 'Store interval ID and clear it: const id = setInterval(...); clearInterval(id);',
+          codeSnippet: this.getLineContent(setIntervalLine),
         });
       }
-    });
 
-    return issues;
+      return issues;
+    };
   }
 
   /**
-   * Detect setInterval without clearInterval
+   * Detect closures that might leak memory
    */
-  private detectIntervalLeaks(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-    let hasSetInterval = false;
-    let hasClearInterval = false;
-    let setIntervalLine = 0;
+  private detectClosureLeaks(engine: TraversalEngine): () => CodeIssue[] {
+    // Slots are reserved when a closure is entered so issues keep source order,
+    // even though captured variables are only known once its body has been walked
+    const issues: Array<CodeIssue | null> = [];
+    const closureStack: Array<{ slot: number; capturedVars: string[] } | null> = [];
+    const maxCapturedVars = 5; // Limit to first 5 for readability
+
+    // Check for arrow functions or function expressions that return functions
+    const isReturnedClosure = (n: Parser.SyntaxNode): boolean =>
+      n.parent?.type === 'return_statement';
+
+    const capture = (closure: { capturedVars: string[] }, name: string) => {
+      if (closure.capturedVars.length < maxCapturedVars && !closure.capturedVars.includes(name)) {
+        closure.capturedVars.push(name);
+      }
+    };
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'call_expression') {
-        const functionNode = n.childForFieldName('function');
+    engine.on(
+      ['arrow_function', 'function', 'function_expression'],
+      n => {
+        if (isReturnedClosure(n)) {
+          closureStack.push({ slot: issues.length, capturedVars: [] });
+          issues.push(null);
+        } else {
+          closureStack.push(null);
+        }
+      },
+      n => {
+        const closure = closureStack.pop();
+        if (!closure) {
+          return;
+        }
 
-        if (functionNode && functionNode.type === 'identifier') {
-          if (functionNode.text === 'setInterval') {
-            hasSetInterval = true;
-            setIntervalLine = n.startPosition.row + 1;
-          } else if (functionNode.text === 'clearInterval') {
-            hasClearInterval = true;
+        // Functions nested in the closure were skipped by the walk, but
+        // what they reference is captured too
+        for (const nested of engine.skipped) {
+          if (closure.capturedVars.length >= maxCapturedVars) {
+            break;
+          }
+          if (nested.startIndex >= n.startIndex && nested.endIndex <= n.endIndex) {
+            nested.descendantsOfType('identifier').forEach(identifier => capture(closure, identifier.text));
           }
         }
+        if (closure.capturedVars.length === 0) {
+          return;
+        }
+
+        const line = n.startPosition.row + 1;
+        issues[closure.slot] = {
+          type: IssueType.CLOSURE_LEAK,
+          category: IssueCategory.MEMORY_LEAK,
+          severity: 'medium',
+          line,
+          message: `Closure captures ${closure.capturedVars.length} variable(s) - verify they don't hold large objects`,
+          suggestion: `Review captured variables: ${closure.capturedVars.join(', ')}. Consider WeakMap for object references.`,
+          codeSnippet: this.getLineContent(line),
+        };
       }
+    );
 
-      for (const child of n.children) {
-        traverse(child);
+    // Simple heuristic: any identifier used inside the closure counts as captured
+    engine.on(['identifier'], n => {
+      if (closureStack.length === 0) {
+        return;
       }
-    };
 
-    traverse(node);
-
-    if (hasSetInterval && !hasClearInterval) {
-      issues.push({
-        type: IssueType.INTERVAL_LEAK,
-        category: IssueCategory.MEMORY_LEAK,
-        severity: 'critical',
-        line: setIntervalLine,
-        message: 'setInterval called without corresponding clearInterval - will run forever',
-        suggestion: 'Store interval ID and clear it: const id = setInterval(...); clearInterval(id);',
-        codeSnippet: this.getLineContent(setIntervalLine),
-      });
-    }
+      for (const closure of closureStack) {
+        if (closure) {
+          capture(closure, n.text);
+        }
+      }
+    });
 
-    return issues;
+    return () => issues.filter((issue): issue is CodeIssue => issue !== null);
   }
 
   /**
-   * Detect closures that might leak memory
+   * Detect global variable accumulation
    */
-  private detectClosureLeaks(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectGlobalLeaks(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      // Check for arrow functions or function expressions that return functions
-      if ((n.type === 'arrow_function' || n.type === 'function') &&
-          n.parent?.type === 'return_statement') {
-
-        // Check if it captures variables
-        const capturedVars = this.findCapturedVariables(n);
+    // Detect window.something = or window.something.push()
+    engine.on(['assignment_expression', 'call_expression'], n => {
+      const text = n.text;
 
-        if (capturedVars.length > 0) {
+      if (text.includes('window.') || text.includes('global.')) {
+        // Check if it's array push or object assignment that accumulates data
+        if (text.includes('.push(') || text.includes('.concat(') ||
+            (text.includes('=') && text.includes('||'))) {
           const line = n.startPosition.row + 1;
           issues.push({
-            type: IssueType.CLOSURE_LEAK,
+            type: IssueType.GLOBAL_LEAK,
             category: IssueCategory.MEMORY_LEAK,
-            severity: 'medium',
+            severity: 'high',
             line,
-            message: `Closure captures ${capturedVars.length} variable(s) - verify they don't hold large objects`,
-            suggestion: `Review captured variables: ${capturedVars.join(', ')}. Consider WeakMap for object references.`,
+            message: 'Accumulating data in global scope - may grow unbounded',
+            suggestion: 'Use local state or implement cleanup mechanism. Consider using WeakMap for automatic GC.',
             codeSnippet: this.getLineContent(line),
           });
         }
       }
+    });
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
+    return () => issues;
+  }
+
+  // Helper methods
 
-    traverse(node);
-    return issues;
+  /**
+   * Calls inside the nested functions the walk skipped
+   */
+  private findNestedCalls(engine: TraversalEngine): Parser.SyntaxNode[] {
+    return engine.skipped.flatMap(nested => nested.descendantsOfType('call_expression'));
+  }
+
+  private getCalleeName(callNode: Parser.SyntaxNode): string | null {
+    const functionNode = callNode.childForFieldName('function');
+    return functionNode?.type === 'identifier' ? functionNode.text : null;
   }
 
   /**
-   * Detect global variable accumulation
+   * The element and event of an addEventListener or removeEventListener call
    */
-  private detectGlobalLeaks(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
+  private getListenerCall(callNode: Parser.SyntaxNode): { method: string; element: string; event: string } | null {
+    const functionNode = callNode.childForFieldName('function');
+    if (!functionNode || functionNode.type !== 'member_expression') {
+      return null;
+    }
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      // Detect window.something = or window.something.push()
-      if (n.type === 'assignment_expression' || n.type === 'call_expression') {
-        const text = n.text;
-
-        if (text.includes('window.') || text.includes('global.')) {
-          // Check if it's array push or object assignment that accumulates data
-          if (text.includes('.push(') || text.includes('.concat(') ||
-              (text.includes('=') && text.includes('||'))) {
-            const line = n.startPosition.row + 1;
-            issues.push({
-              type: IssueType.GLOBAL_LEAK,
-              category: IssueCategory.MEMORY_LEAK,
-              severity: 'high',
-              line,
-              message: 'Accumulating data in global scope - may grow unbounded',
-              suggestion: 'Use local state or implement cleanup mechanism. Consider using WeakMap for automatic GC.',
-              codeSnippet: this.getLineContent(line),
-            });
-          }
-        }
-      }
+    const propertyNode = functionNode.childForFieldName('property');
+    const objectNode = functionNode.childForFieldName('object');
+    if (!propertyNode || !objectNode ||
+        (propertyNode.text !== 'addEventListener' && propertyNode.text !== 'removeEventListener')) {
+      return null;
+    }
 
-      for (const child of n.children) {
-        traverse(child);
-      }
+    return {
+      method: propertyNode.text,
+      element: objectNode.text,
+      event: this.getFirstArgument(callNode.childForFieldName('arguments')),
     };
-
-    traverse(node);
-    return issues;
   }
 
-  // Helper methods
-
   private getFirstArgument(argsNode: Parser.SyntaxNode | null): string {
     if (!argsNode) return 'unknown';
 
@@ -223,28 +295,7 @@ export class MemoryLeakDetector {
     return 'unknown';
   }
 
-  private findCapturedVariables(node: Parser.SyntaxNode): string[] {
-    const variables: string[] = [];
-    const seen = new Set<string>();
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'identifier' && !seen.has(n.text)) {
-        // Simple heuristic: if identifier is used but not defined locally
-        variables.push(n.text);
-        seen.add(n.text);
-      }
-
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return variables.slice(0, 5); // Limit to first 5 for readability
-  }
-
   private getLineContent(line: number): string {
-    const lines = this.code.split('\n');
-    return lines[line - 1]?.trim() || '';
+    return this.context.getLineContent(line);
   }
 }
@@ -0,0 +1,111 @@
+import * as path from 'path';
+import { ModuleImport } from '../types';
+
+// Tried in order after the specifier as written, then as a directory index
+const SCRIPT_EXTENSIONS = ['.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs'];
+// ESM TypeScript imports its own modules by their compiled names
+const COMPILED_EXTENSIONS: Record<string, string[]> = {
+  '.js': ['.ts', '.tsx'],
+  '.jsx': ['.tsx'],
+  '.mjs': ['.mts'],
+  '.cjs': ['.cts'],
+};
+
+/**
+ * Resolves import specifiers to files of the analyzed set
+ *
+ * Only the analyzed files are looked at, never the file system, so
+ * resolution is cheap and a file outside the set (a package, the standard
+ * library, an ignored directory) is simply not a dependency.
+ *
+ * JavaScript and TypeScript: relative and absolute paths, with or without
+ * extension, directory indexes, and `.js` specifiers of `.ts` files. Bare
+ * specifiers (packages, path aliases) are left unresolved.
+ *
+ * Python: relative modules from the importing file's package, absolute
+ * modules from its directory or any directory above it, packages by their
+ * `__init__.py`, and `from package import submodule`.
+ */
+export class ModuleResolver {
+  private files: Set<string>;
+
+  constructor(filePaths: Iterable<string>) {
+    this.files = new Set(Array.from(filePaths, filePath => path.normalize(filePath)));
+  }
+
+  /**
+   * The analyzed files `moduleImport`, made by `fromFile`, refers to
+   */
+  resolve(fromFile: string, moduleImport: ModuleImport): string[] {
+    return path.extname(fromFile) === '.py'
+      ? this.resolvePython(fromFile, moduleImport)
+      : this.resolveScript(fromFile, moduleImport.source);
+  }
+
+  private resolveScript(fromFile: string, source: string): string[] {
+    if (!source.startsWith('.') && !path.isAbsolute(source)) {
+      return [];
+    }
+
+    const base = path.join(path.dirname(fromFile), source);
+    const extension = path.extname(base);
+    const stem = base.slice(0, base.length - extension.length);
+    const candidates = [
+      base,
+      ...(COMPILED_EXTENSIONS[extension] ?? []).map(compiled => stem + compiled),
+      ...SCRIPT_EXTENSIONS.map(ext => base + ext),
+      ...SCRIPT_EXTENSIONS.map(ext => path.join(base, 'index' + ext)),
+    ];
+
+    const found = candidates.find(candidate => this.files.has(candidate));
+    return found && found !== fromFile ? [found] : [];
+  }
+
+  private resolvePython(fromFile: string, { source, names = [] }: ModuleImport): string[] {
+    const dots = source.length - source.replace(/^\.+/, '').length;
+    const parts = source.slice(dots).split('.').filter(Boolean);
+
+    // Relative imports start from the file's own package; absolute ones
+    // from the nearest directory, going up, that has the module
+    const roots: string[] = [];
+    let dir = path.dirname(fromFile);
+    if (dots > 0) {
+      for (let i = 1; i < dots; i++) {
+        dir = path.dirname(dir);
+      }
+      roots.push(dir);
+    } else {
+      for (let parent = dir; ; dir = parent) {
+        roots.push(dir);
+        parent = path.dirname(dir);
+        if (parent === dir) {
+          break;
+        }
+      }
+    }
+
+    for (const root of roots) {
+      const modulePath = path.join(root, ...parts);
+      const module = parts.length > 0 ? this.pythonModule(modulePath) : this.existing(path.join(root, '__init__.py'));
+      const submodules = names.map(name => this.pythonModule(path.join(modulePath, name)));
+      if (!module && !submodules.some(Boolean)) {
+        continue;
+      }
+
+      // Names that are not submodules come from the module itself
+      const targets = names.length > 0 ? submodules.map(submodule => submodule ?? module) : [module];
+      return Array.from(new Set(targets))
+        .filter((target): target is string => target !== null && target !== fromFile);
+    }
+
+    return [];
+  }
+
+  private pythonModule(modulePath: string): string | null {
+    return this.existing(modulePath + '.py') ?? this.existing(path.join(modulePath, '__init__.py'));
+  }
+
+  private existing(filePath: string): string | null {
+    return this.files.has(filePath) ? filePath : null;
+  }
+}
@@ -1,294 +1,247 @@
 import Parser from 'tree-sitter';
 import { CodeIssue, IssueType, IssueCategory } from '../types';
+import { TraversalEngine } from './TraversalEngine';
+import { AnalysisContext } from './AnalysisContext';
 
 /**
  * Detects performance issues in code
  */
 export class PerformanceDetector {
-  private code: string;
+  private context: AnalysisContext;
 
-  constructor(code: string) {
-    this.code = code;
+  constructor(source: string | AnalysisContext) {
+    this.context = AnalysisContext.from(source);
   }
 
   /**
    * Detect all performance issues in a node
    */
   detectPerformanceIssues(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-
-    issues.push(...this.detectNestedLoops(node));
-    issues.push(...this.detectDOMInLoop(node));
-    issues.push(...this.detectStringConcatInLoop(node));
-    issues.push(...this.detectRegexInLoop(node));
-    issues.push(...this.detectInefficientArrayOps(node));
+    const engine = new TraversalEngine();
+    const collect = this.register(engine);
+    engine.walk(node);
+    return collect();
+  }
 
-    return issues;
+  /**
+   * Register all performance checks on a shared traversal engine.
+   * Returns a callback that collects the issues once the walk is done.
+   */
+  register(engine: TraversalEngine): () => CodeIssue[] {
+    const checks = [
+      engine.section('PerformanceDetector.detectNestedLoops', () => this.detectNestedLoops(engine)),
+      engine.section('PerformanceDetector.detectDOMInLoop', () => this.detectDOMInLoop(engine)),
+      engine.section('PerformanceDetector.detectStringConcatInLoop', () => this.detectStringConcatInLoop(engine)),
+      engine.section('PerformanceDetector.detectRegexInLoop', () => this.detectRegexInLoop(engine)),
+      engine.section('PerformanceDetector.detectInefficientArrayOps', () => this.detectInefficientArrayOps(engine)),
+    ];
+
+    return () => checks.flatMap(collect => collect());
   }
 
   /**
    * Detect nested loops (O(n²) or worse)
    */
-  private detectNestedLoops(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
+  private detectNestedLoops(engine: TraversalEngine): () => CodeIssue[] {
+    // Slots are reserved when a loop is entered so issues keep source order,
+    // even though a loop's depth is only known once its body has been walked
+    const issues: Array<CodeIssue | null> = [];
     const loopTypes = ['for_statement', 'while_statement', 'for_in_statement', 'for_of_statement'];
+    const openLoops: Array<{ slot: number; maxDepthBelow: number; outerDepth: number }> = [];
+
+    engine.on(
+      loopTypes,
+      () => {
+        // A walk's outermost loops also nest in the loops around its root,
+        // e.g. a loop in a forEach callback inside a for loop
+        const outerDepth = openLoops.length === 0 ? engine.context.loopDepth : 0;
+        openLoops.push({ slot: issues.length, maxDepthBelow: 0, outerDepth });
+        issues.push(null);
+      },
+      n => {
+        const loop = openLoops.pop()!;
+        const depth = loop.maxDepthBelow + 1;
+
+        const enclosing = openLoops[openLoops.length - 1];
+        if (enclosing) {
+          enclosing.maxDepthBelow = Math.max(enclosing.maxDepthBelow, depth);
+        }
 
-    const countLoopDepth = (n: Parser.SyntaxNode, depth = 0): number => {
-      if (loopTypes.includes(n.type)) {
-        depth++;
-      }
-
-      let maxDepth = depth;
-      for (const child of n.children) {
-        const childDepth = countLoopDepth(child, depth);
-        maxDepth = Math.max(maxDepth, childDepth);
-      }
-
-      return maxDepth;
-    };
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (loopTypes.includes(n.type)) {
-        const depth = countLoopDepth(n);
-        if (depth >= 2) {
+        const nestedDepth = depth + loop.outerDepth;
+        if (nestedDepth >= 2) {
           const line = n.startPosition.row + 1;
-          const complexity = depth === 2 ? 'O(n²)' : depth === 3 ? 'O(n³)' : `O(n^${depth})`;
+          const complexity = nestedDepth === 2 ? 'O(n²)' : nestedDepth === 3 ? 'O(n³)' : `O(n^${nestedDepth})`;
 
-          issues.push({
+          issues[loop.slot] = {
             type: IssueType.NESTED_LOOPS,
             category: IssueCategory.PERFORMANCE,
-            severity: depth >= 3 ? 'critical' : 'high',
+            severity: nestedDepth >= 3 ? 'critical' : 'high',
             line,
             message: `Nested loops detected - ${complexity} complexity`,
             suggestion: 'Consider using a Map/Set for lookups, or restructure algorithm',
             codeSnippet: this.getLineContent(line),
-          });
+          };
         }
       }
+    );
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return issues;
+    return () => issues.filter((issue): issue is CodeIssue => issue !== null);
   }
 
   /**
    * Detect DOM queries inside loops
    */
-  private detectDOMInLoop(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectDOMInLoop(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
     const domMethods = ['querySelector', 'querySelectorAll', 'getElementById', 'getElementsByClassName', 'getElementsByTagName'];
 
-    const isInLoop = (n: Parser.SyntaxNode): boolean => {
-      const loopTypes = ['for_statement', 'while_statement', 'for_in_statement', 'for_of_statement'];
-      let current = n.parent;
-      while (current) {
-        if (loopTypes.includes(current.type)) return true;
-        current = current.parent;
-      }
-      return false;
-    };
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'call_expression' && isInLoop(n)) {
-        const functionNode = n.childForFieldName('function');
-        if (functionNode && functionNode.type === 'member_expression') {
-          const propertyNode = functionNode.childForFieldName('property');
-
-          if (propertyNode && domMethods.includes(propertyNode.text)) {
-            const line = n.startPosition.row + 1;
-            issues.push({
-              type: IssueType.DOM_IN_LOOP,
-              category: IssueCategory.PERFORMANCE,
-              severity: 'high',
-              line,
-              message: `DOM query '${propertyNode.text}' inside loop - very slow`,
-              suggestion: 'Move DOM queries outside the loop and cache results',
-              codeSnippet: this.getLineContent(line),
-            });
-          }
-        }
-      }
+    engine.on(['call_expression'], n => {
+      const functionNode = n.childForFieldName('function');
+      if (functionNode && functionNode.type === 'member_expression') {
+        const propertyNode = functionNode.childForFieldName('property');
 
-      for (const child of n.children) {
-        traverse(child);
+        if (propertyNode && domMethods.includes(propertyNode.text) && engine.context.inLoop) {
+          const line = n.startPosition.row + 1;
+          issues.push({
+            type: IssueType.DOM_IN_LOOP,
+            category: IssueCategory.PERFORMANCE,
+            severity: 'high',
+            line,
+            message: `DOM query '${propertyNode.text}' inside loop - very slow`,
+            suggestion: 'Move DOM queries outside the loop and cache results',
+            codeSnippet: this.getLineContent(line),
+          });
+        }
       }
-    };
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
    * Detect string concatenation in loops
    */
-  private detectStringConcatInLoop(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectStringConcatInLoop(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
-    const isInLoop = (n: Parser.SyntaxNode): boolean => {
-      const loopTypes = ['for_statement', 'while_statement', 'for_in_statement', 'for_of_statement'];
-      let current = n.parent;
-      while (current) {
-        if (loopTypes.includes(current.type)) return true;
-        current = current.parent;
-      }
-      return false;
-    };
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      // Check for += with strings
-      if (n.type === 'augmented_assignment_expression' && isInLoop(n)) {
-        const operator = n.childForFieldName('operator');
-        if (operator?.text === '+=') {
-          const left = n.childForFieldName('left');
-          const right = n.childForFieldName('right');
-
-          // Check if it might be a string (has quotes or template literal)
-          if (right && (right.type === 'string' || right.type === 'template_string')) {
-            const line = n.startPosition.row + 1;
-            issues.push({
-              type: IssueType.STRING_CONCAT_IN_LOOP,
-              category: IssueCategory.PERFORMANCE,
-              severity: 'medium',
-              line,
-              message: 'String concatenation in loop is slow',
-              suggestion: 'Use an array and join() instead: arr.push(str); return arr.join("")',
-              codeSnippet: this.getLineContent(line),
-            });
-          }
-        }
-      }
+    // Check for += with strings
+    engine.on(['augmented_assignment_expression'], n => {
+      const operator = n.childForFieldName('operator');
+      if (operator?.text === '+=') {
+        const right = n.childForFieldName('right');
 
-      // Check for + operator with strings
-      if (n.type === 'binary_expression' && isInLoop(n)) {
-        const operator = n.childForFieldName('operator');
-        if (operator?.text === '+') {
-          const left = n.childForFieldName('left');
-          const right = n.childForFieldName('right');
-
-          if ((left?.type === 'string' || left?.type === 'template_string') ||
-              (right?.type === 'string' || right?.type === 'template_string')) {
-            const line = n.startPosition.row + 1;
-            issues.push({
-              type: IssueType.STRING_CONCAT_IN_LOOP,
-              category: IssueCategory.PERFORMANCE,
-              severity: 'medium',
-              line,
-              message: 'String concatenation in loop is inefficient',
-              suggestion: 'Use an array and join() for better performance',
-              codeSnippet: this.getLineContent(line),
-            });
-          }
+        // Check if it might be a string (has quotes or template literal)
+        if (right && (right.type === 'string' || right.type === 'template_string') && engine.context.inLoop) {
+          const line = n.startPosition.row + 1;
+          issues.push({
+            type: IssueType.STRING_CONCAT_IN_LOOP,
+            category: IssueCategory.PERFORMANCE,
+            severity: 'medium',
+            line,
+            message: 'String concatenation in loop is slow',
+            suggestion: 'Use an array and join() instead: arr.push(str); return arr.join("")',
+            codeSnippet: this.getLineContent(line),
+          });
         }
       }
+    });
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return issues;
-  }
-
-  /**
-   * Detect regex creation in loops
-   */
-  private detectRegexInLoop(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
-
-    const isInLoop = (n: Parser.SyntaxNode): boolean => {
-      const loopTypes = ['for_statement', 'while_statement', 'for_in_statement', 'for_of_statement'];
-      let current = n.parent;
-      while (current) {
-        if (loopTypes.includes(current.type)) return true;
-        current = current.parent;
-      }
-      return false;
-    };
+    // Check for + operator with strings
+    engine.on(['binary_expression'], n => {
+      const operator = n.childForFieldName('operator');
+      if (operator?.text === '+') {
+        const left = n.childForFieldName('left');
+        const right = n.childForFieldName('right');
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      // Check for new RegExp() or regex literal in loop
-      if (isInLoop(n)) {
-        if (n.type === 'regex') {
+        if (((left?.type === 'string' || left?.type === 'template_string') ||
+             (right?.type === 'string' || right?.type === 'template_string')) && engine.context.inLoop) {
           const line = n.startPosition.row + 1;
           issues.push({
-            type: IssueType.REGEX_IN_LOOP,
+            type: IssueType.STRING_CONCAT_IN_LOOP,
             category: IssueCategory.PERFORMANCE,
             severity: 'medium',
             line,
-            message: 'Regular expression created inside loop',
-            suggestion: 'Define regex outside loop as a constant',
+            message: 'String concatenation in loop is inefficient',
+            suggestion: 'Use an array and join() for better performance',
             codeSnippet: this.getLineContent(line),
           });
         }
-
-        if (n.type === 'new_expression') {
-          const constructorNode = n.childForFieldName('constructor');
-          if (constructorNode?.text === 'RegExp') {
-            const line = n.startPosition.row + 1;
-            issues.push({
-              type: IssueType.REGEX_IN_LOOP,
-              category: IssueCategory.PERFORMANCE,
-              severity: 'medium',
-              line,
-              message: 'RegExp object created inside loop',
-              suggestion: 'Create RegExp outside loop and reuse',
-              codeSnippet: this.getLineContent(line),
-            });
-          }
-        }
-      }
-
-      for (const child of n.children) {
-        traverse(child);
       }
-    };
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
-   * Detect inefficient array operations
+   * Detect regex creation in loops
    */
-  private detectInefficientArrayOps(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectRegexInLoop(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
-    let chainedMethods: { line: number; methods: string[] } | null = null;
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      // Detect chained array methods that could be combined
-      if (n.type === 'call_expression') {
-        const methods = this.getChainedMethods(n);
+    // Check for new RegExp() or regex literal in loop
+    engine.on(['regex'], n => {
+      if (engine.context.inLoop) {
+        const line = n.startPosition.row + 1;
+        issues.push({
+          type: IssueType.REGEX_IN_LOOP,
+          category: IssueCategory.PERFORMANCE,
+          severity: 'medium',
+          line,
+          message: 'Regular expression created inside loop',
+          suggestion: 'Define regex outside loop as a constant',
+          codeSnippet: this.getLineContent(line),
+        });
+      }
+    });
+
+    engine.on(['new_expression'], n => {
+      const constructorNode = n.childForFieldName('constructor');
+      if (constructorNode?.text === 'RegExp' && engine.context.inLoop) {
+        const line = n.startPosition.row + 1;
+        issues.push({
+          type: IssueType.REGEX_IN_LOOP,
+          category: IssueCategory.PERFORMANCE,
+          severity: 'medium',
+          line,
+          message: 'RegExp object created inside loop',
+          suggestion: 'Create RegExp outside loop and reuse',
+          codeSnippet: this.getLineContent(line),
+        });
+      }
+    });
 
-        // Check for multiple map/filter/reduce in a chain
-        const mapCount = methods.filter(m => m === 'map').length;
-        const filterCount = methods.filter(m => m === 'filter').length;
+    return () => issues;
+  }
 
-        if (mapCount > 1 || (mapCount > 0 && filterCount > 0)) {
-          const line = n.startPosition.row + 1;
-          issues.push({
-            type: IssueType.INEFFICIENT_ARRAY_OPS,
-            category: IssueCategory.PERFORMANCE,
-            severity: 'medium',
-            line,
-            message: `Multiple array iterations detected: ${methods.join(' → ')}`,
-            suggestion: 'Combine operations into a single pass for better performance',
-            codeSnippet: this.getLineContent(line),
-          });
-        }
-      }
+  /**
+   * Detect inefficient array operations
+   */
+  private detectInefficientArrayOps(engine: TraversalEngine): () => CodeIssue[] {
+    const issues: CodeIssue[] = [];
 
-      for (const child of n.children) {
-        traverse(child);
+    // Detect chained array methods that could be combined
+    engine.on(['call_expression'], n => {
+      const methods = this.getChainedMethods(n);
+
+      // Check for multiple map/filter/reduce in a chain
+      const mapCount = methods.filter(m => m === 'map').length;
+      const filterCount = methods.filter(m => m === 'filter').length;
+
+      if (mapCount > 1 || (mapCount > 0 && filterCount > 0)) {
+        const line = n.startPosition.row + 1;
+        issues.push({
+          type: IssueType.INEFFICIENT_ARRAY_OPS,
+          category: IssueCategory.PERFORMANCE,
+          severity: 'medium',
+          line,
+          message: `Multiple array iterations detected: ${methods.join(' → ')}`,
+          suggestion: 'Combine operations into a single pass for better performance',
+          codeSnippet: this.getLineContent(line),
+        });
       }
-    };
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   // Helper methods
@@ -314,7 +267,6 @@ export class PerformanceDetector {
   }
 
   private getLineContent(line: number): string {
-    const lines = this.code.split('\n');
-    return lines[line - 1]?.trim() || '';
+    return this.context.getLineContent(line);
   }
 }
@@ -0,0 +1,252 @@
+import Parser from 'tree-sitter';
+
+/**
+ * Structural rules matched by native tree-sitter queries
+ *
+ * Every pattern captures the node an issue is reported on under the rule's
+ * name, and any nodes the rule needs under `<rule>.<part>`. Queries are
+ * written in tree-sitter's S-expression syntax and kept in this module
+ * (rather than .scm files) so they ship with the compiled output.
+ */
+export type QueryRuleName = 'eval-call' | 'inner-html-assignment' | 'console-log' | 'loose-equality';
+
+export interface QueryRuleMatch {
+  node: Parser.SyntaxNode;
+  captures: Record<string, Parser.SyntaxNode>;
+}
+
+// Also used for TypeScript, whose grammar extends the JavaScript one
+const JAVASCRIPT_RULES = `
+(call_expression
+  function: (identifier) @eval-call.callee
+  (#match? @eval-call.callee "^(eval|Function)$")) @eval-call
+
+(assignment_expression
+  left: (member_expression
+    property: (property_identifier) @inner-html-assignment.property)
+  (#match? @inner-html-assignment.property "^(innerHTML|outerHTML)$")) @inner-html-assignment
+
+(augmented_assignment_expression
+  left: (member_expression
+    property: (property_identifier) @inner-html-assignment.property)
+  (#match? @inner-html-assignment.property "^(innerHTML|outerHTML)$")) @inner-html-assignment
+
+(call_expression
+  function: (member_expression
+    object: (_) @console-log.object
+    property: (property_identifier) @console-log.property)
+  (#eq? @console-log.object "console")
+  (#eq? @console-log.property "log")) @console-log
+
+(binary_expression
+  operator: ["==" "!="] @loose-equality.operator) @loose-equality
+`;
+
+const RULE_SOURCES = [JAVASCRIPT_RULES];
+
+// Compiled once per grammar; null when no rule source applies to it
+const compiled: WeakMap<object, Parser.Query | null> = new WeakMap();
+
+/**
+ * Run the rule query for the tree's grammar over the subtree rooted at
+ * `root`, returning the matches of each rule in source order.
+ *
+ * Grammars without the queried node types (Python) fail to compile every
+ * source and get no matches, the same as the node-type handlers these
+ * rules replace.
+ */
+export function matchQueryRules(root: Parser.SyntaxNode): Map<QueryRuleName, QueryRuleMatch[]> {
+  const results: Map<QueryRuleName, QueryRuleMatch[]> = new Map();
+  const query = compileQuery(languageOf(root), RULE_SOURCES, compiled);
+  if (!query) {
+    return results;
+  }
+
+  for (const match of query.matches(root)) {
+    let rule: QueryRuleName | null = null;
+    const captures: Record<string, Parser.SyntaxNode> = {};
+
+    for (const capture of match.captures) {
+      const dot = capture.name.indexOf('.');
+      if (dot === -1) {
+        rule = capture.name as QueryRuleName;
+      } else {
+        captures[capture.name.slice(dot + 1)] = capture.node;
+      }
+    }
+
+    if (rule) {
+      const node = match.captures.find(capture => capture.name === rule)!.node;
+      const matches = results.get(rule);
+      if (matches) {
+        matches.push({ node, captures });
+      } else {
+        results.set(rule, [{ node, captures }]);
+      }
+    }
+  }
+
+  // Pre-order: outer nodes come before the nodes they contain
+  for (const matches of results.values()) {
+    matches.sort((a, b) => a.node.startIndex - b.node.startIndex || b.node.endIndex - a.node.endIndex);
+  }
+
+  return results;
+}
+
+type RuleMatches = Map<QueryRuleName, QueryRuleMatch[]>;
+
+// Per tree, then per set of owner types: matches keyed by their owner
+const ownedMatches: WeakMap<object, Map<string, Map<string, RuleMatches>>> = new WeakMap();
+
+/**
+ * The rule matches in the region of `root` that is not inside a nested node
+ * of `ownerTypes` (functions), as TraversalEngine walks it with those types
+ * skipped.
+ *
+ * The query runs once per tree, over the whole file, and each match is
+ * filed under the innermost owner node containing it. Each function's walk
+ * then takes its own matches instead of matching its nested functions
+ * again at every enclosing level.
+ */
+export function matchOwnQueryRules(root: Parser.SyntaxNode, ownerTypes: readonly string[]): RuleMatches {
+  const tree = root.tree as object;
+  const typesKey = [...ownerTypes].sort().join(',');
+  let byTypes = ownedMatches.get(tree);
+  if (!byTypes) {
+    byTypes = new Map();
+    ownedMatches.set(tree, byTypes);
+  }
+  let byOwner = byTypes.get(typesKey);
+  if (!byOwner) {
+    byOwner = matchByOwner(root.tree.rootNode, ownerTypes);
+    byTypes.set(typesKey, byOwner);
+  }
+
+  if (!root.parent) {
+    return byOwner.get(NO_OWNER) ?? new Map();
+  }
+  if (ownerTypes.includes(root.type)) {
+    return byOwner.get(rangeKey(root)) ?? new Map();
+  }
+
+  // Any other root: its matches are those whose owner is not inside it
+  const results: RuleMatches = new Map();
+  for (const [owner, matches] of byOwner) {
+    const [start, end] = owner === NO_OWNER ? [-1, Infinity] : owner.split(':').map(Number);
+    const inside = start >= root.startIndex && end <= root.endIndex &&
+      (start !== root.startIndex || end !== root.endIndex);
+    if (inside) {
+      continue;
+    }
+    for (const [rule, ruleMatches] of matches) {
+      const own = ruleMatches.filter(match =>
+        match.node.startIndex >= root.startIndex && match.node.endIndex <= root.endIndex);
+      if (own.length > 0) {
+        results.set(rule, [...(results.get(rule) ?? []), ...own]);
+      }
+    }
+  }
+  for (const matches of results.values()) {
+    matches.sort((a, b) => a.node.startIndex - b.node.startIndex || b.node.endIndex - a.node.endIndex);
+  }
+  return results;
+}
+
+const NO_OWNER = '';
+
+function rangeKey(node: Parser.SyntaxNode): string {
+  return `${node.startIndex}:${node.endIndex}`;
+}
+
+/**
+ * Match the whole tree and file each match under the innermost node of
+ * `ownerTypes` containing it. Owners and matches are both in source order,
+ * so one sweep with a stack of open owners does it.
+ */
+function matchByOwner(treeRoot: Parser.SyntaxNode, ownerTypes: readonly string[]): Map<string, RuleMatches> {
+  const byOwner: Map<string, RuleMatches> = new Map();
+  const results = matchQueryRules(treeRoot);
+  if (results.size === 0) {
+    return byOwner;
+  }
+
+  const owners = treeRoot.descendantsOfType([...ownerTypes]);
+  for (const [rule, matches] of results) {
+    const open: Parser.SyntaxNode[] = [];
+    let next = 0;
+
+    for (const match of matches) {
+      const { startIndex, endIndex } = match.node;
+      while (next < owners.length && owners[next].startIndex <= startIndex) {
+        const owner = owners[next++];
+        while (open.length > 0 && open[open.length - 1].endIndex <= owner.startIndex) {
+          open.pop();
+        }
+        open.push(owner);
+      }
+      while (open.length > 0 && open[open.length - 1].endIndex <= startIndex) {
+        open.pop();
+      }
+
+      // Open owners all start at or before the match; an owner starting
+      // with the match may be inside it rather than around it
+      let i = open.length - 1;
+      while (i >= 0 && open[i].endIndex < endIndex) {
+        i--;
+      }
+
+      const key = i >= 0 ? rangeKey(open[i]) : NO_OWNER;
+      let owned = byOwner.get(key);
+      if (!owned) {
+        owned = new Map();
+        byOwner.set(key, owned);
+      }
+      const ownedMatches = owned.get(rule);
+      if (ownedMatches) {
+        ownedMatches.push(match);
+      } else {
+        owned.set(rule, [match]);
+      }
+    }
+  }
+
+  return byOwner;
+}
+
+/**
+ * The first of `sources` that compiles for `language`, compiled once per
+ * grammar and kept in `compiled`; null when none does
+ */
+export function compileQuery(
+  language: object | undefined,
+  sources: readonly string[],
+  compiled: WeakMap<object, Parser.Query | null>
+): Parser.Query | null {
+  if (!language) {
+    return null;
+  }
+
+  let query = compiled.get(language);
+  if (query === undefined) {
+    query = null;
+    for (const source of sources) {
+      try {
+        query = new Parser.Query(language, source);
+        break;
+      } catch {
+        // Source uses node types this grammar does not have
+      }
+    }
+    compiled.set(language, query);
+  }
+
+  return query;
+}
+
+/**
+ * node-tree-sitter records the parser's language on every tree it returns
+ */
+export function languageOf(node: Parser.SyntaxNode): object | undefined {
+  return (node.tree as unknown as { language?: object }).language;
+}
@@ -1,118 +1,105 @@
 import Parser from 'tree-sitter';
 import { CodeIssue, IssueType, IssueCategory } from '../types';
+import { TraversalEngine } from './TraversalEngine';
+import { AnalysisContext } from './AnalysisContext';
 
 /**
  * Detects security vulnerabilities in code
  */
 export class SecurityDetector {
-  private code: string;
+  private context: AnalysisContext;
 
-  constructor(code: string) {
-    this.code = code;
+  constructor(source: string | AnalysisContext) {
+    this.context = AnalysisContext.from(source);
   }
 
   /**
    * Detect all security issues in a node
    */
   detectSecurityIssues(node: Parser.SyntaxNode): CodeIssue[] {
-    const issues: CodeIssue[] = [];
+    const engine = new TraversalEngine();
+    const collect = this.register(engine);
+    engine.walk(node);
+    return collect();
+  }
 
-    issues.push(...this.detectEvalUsage(node));
-    issues.push(...this.detectInnerHTMLUsage(node));
-    issues.push(...this.detectHardcodedSecrets(node));
-    issues.push(...this.detectSQLInjectionRisk(node));
+  /**
+   * Register all security checks on a shared traversal engine.
+   * Returns a callback that collects the issues once the walk is done.
+   */
+  register(engine: TraversalEngine): () => CodeIssue[] {
+    const checks = [
+      engine.section('SecurityDetector.detectEvalUsage', () => this.detectEvalUsage(engine)),
+      engine.section('SecurityDetector.detectInnerHTMLUsage', () => this.detectInnerHTMLUsage(engine)),
+      engine.section('SecurityDetector.detectHardcodedSecrets', () => this.detectHardcodedSecrets(engine)),
+      engine.section('SecurityDetector.detectSQLInjectionRisk', () => this.detectSQLInjectionRisk(engine)),
+    ];
 
-    return issues;
+    return () => checks.flatMap(collect => collect());
   }
 
   /**
    * Detect eval() usage
    */
-  private detectEvalUsage(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectEvalUsage(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'call_expression') {
-        const functionNode = n.childForFieldName('function');
-
-        if (functionNode?.type === 'identifier' && functionNode.text === 'eval') {
-          const line = n.startPosition.row + 1;
-          issues.push({
-            type: IssueType.EVAL_USAGE,
-            category: IssueCategory.SECURITY,
-            severity: 'critical',
-            line,
-            message: 'eval() is dangerous - can execute arbitrary code',
-            suggestion: 'Use safer alternatives like JSON.parse() or avoid dynamic code execution',
-            codeSnippet: this.getLineContent(line),
-          });
-        }
-
-        // Also check for Function constructor
-        if (functionNode?.type === 'identifier' && functionNode.text === 'Function') {
-          const line = n.startPosition.row + 1;
-          issues.push({
-            type: IssueType.EVAL_USAGE,
-            category: IssueCategory.SECURITY,
-            severity: 'critical',
-            line,
-            message: 'Function constructor is similar to eval() - security risk',
-            suggestion: 'Avoid dynamic code generation',
-            codeSnippet: this.getLineContent(line),
-          });
-        }
+    engine.onMatch('eval-call', ({ node, captures }) => {
+      const line = node.startPosition.row + 1;
+
+      if (captures.callee.text === 'eval') {
+        issues.push({
+          type: IssueType.EVAL_USAGE,
+          category: IssueCategory.SECURITY,
+          severity: 'critical',
+          line,
+          message: 'eval() is dangerous - can execute arbitrary code',
+          suggestion: 'Use safer alternatives like JSON.parse() or avoid dynamic code execution',
+          codeSnippet: this.getLineContent(line),
+        });
+      } else {
+        // Function constructor
+        issues.push({
+          type: IssueType.EVAL_USAGE,
+          category: IssueCategory.SECURITY,
+          severity: 'critical',
+          line,
+          message: 'Function constructor is similar to eval() - security risk',
+          suggestion: 'Avoid dynamic code generation',
+          codeSnippet: this.getLineContent(line),
+        });
       }
+    });
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
    * Detect innerHTML usage (XSS risk)
    */
-  private detectInnerHTMLUsage(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectInnerHTMLUsage(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'assignment_expression' || n.type === 'augmented_assignment_expression') {
-        const left = n.childForFieldName('left');
-
-        if (left && left.type === 'member_expression') {
-          const propertyNode = left.childForFieldName('property');
-
-          if (propertyNode && (propertyNode.text === 'innerHTML' || propertyNode.text === 'outerHTML')) {
-            const line = n.startPosition.row + 1;
-            issues.push({
-              type: IssueType.INNERHTML_USAGE,
-              category: IssueCategory.SECURITY,
-              severity: 'high',
-              line,
-              message: `${propertyNode.text} can cause XSS vulnerabilities if used with untrusted data`,
-              suggestion: 'Use textContent for text, or sanitize HTML with a library like DOMPurify',
-              codeSnippet: this.getLineContent(line),
-            });
-          }
-        }
-      }
-
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return issues;
+    engine.onMatch('inner-html-assignment', ({ node, captures }) => {
+      const line = node.startPosition.row + 1;
+      issues.push({
+        type: IssueType.INNERHTML_USAGE,
+        category: IssueCategory.SECURITY,
+        severity: 'high',
+        line,
+        message: `${captures.property.text} can cause XSS vulnerabilities if used with untrusted data`,
+        suggestion: 'Use textContent for text, or sanitize HTML with a library like DOMPurify',
+        codeSnippet: this.getLineContent(line),
+      });
+    });
+
+    return () => issues;
   }
 
   /**
    * Detect hardcoded secrets (API keys, passwords, tokens)
    */
-  private detectHardcodedSecrets(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectHardcodedSecrets(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
     const secretPatterns = [
       { pattern: /api[_-]?key/i, name: 'API key' },
@@ -144,92 +131,80 @@ export class SecurityDetector {
       return placeholderPatterns.some(pattern => pattern.test(value));
     };
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (n.type === 'variable_declarator' || n.type === 'property_identifier') {
-        const nameNode = n.childForFieldName('name') || n;
-        const valueNode = n.childForFieldName('value');
-
-        if (nameNode && valueNode) {
-          const name = nameNode.text.toLowerCase();
-
-          for (const { pattern, name: secretType } of secretPatterns) {
-            if (pattern.test(name) && valueNode.type === 'string') {
-              const value = valueNode.text;
-              // Skip empty strings, short values, and obvious placeholders
-              if (value.length > 6 && !isPlaceholder(value)) {
-                const line = n.startPosition.row + 1;
-                issues.push({
-                  type: IssueType.HARDCODED_SECRET,
-                  category: IssueCategory.SECURITY,
-                  severity: 'critical',
-                  line,
-                  message: `Possible hardcoded ${secretType} detected`,
-                  suggestion: 'Use environment variables or a secure secrets management system',
-                  codeSnippet: this.getLineContent(line).replace(/['"].*['"]/, '"***"'),
-                });
-              }
+    engine.on(['variable_declarator', 'property_identifier'], n => {
+      const nameNode = n.childForFieldName('name') || n;
+      const valueNode = n.childForFieldName('value');
+
+      if (nameNode && valueNode) {
+        const name = nameNode.text.toLowerCase();
+
+        for (const { pattern, name: secretType } of secretPatterns) {
+          if (pattern.test(name) && valueNode.type === 'string') {
+            const value = valueNode.text;
+            // Skip empty strings, short values, and obvious placeholders
+            if (value.length > 6 && !isPlaceholder(value)) {
+              const line = n.startPosition.row + 1;
+              issues.push({
+                type: IssueType.HARDCODED_SECRET,
+                category: IssueCategory.SECURITY,
+                severity: 'critical',
+                line,
+                message: `Possible hardcoded ${secretType} detected`,
+                suggestion: 'Use environment variables or a secure secrets management system',
+                codeSnippet: this.getLineContent(line).replace(/['"].*['"]/, '"***"'),
+              });
             }
           }
         }
       }
+    });
 
-      for (const child of n.children) {
-        traverse(child);
-      }
-    };
-
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   /**
    * Detect SQL injection risks (string concatenation in SQL queries)
    */
-  private detectSQLInjectionRisk(node: Parser.SyntaxNode): CodeIssue[] {
+  private detectSQLInjectionRisk(engine: TraversalEngine): () => CodeIssue[] {
     const issues: CodeIssue[] = [];
-    const sqlKeywords = ['SELECT', 'INSERT', 'UPDATE', 'DELETE', 'FROM', 'WHERE'];
-
-    const traverse = (n: Parser.SyntaxNode) => {
-      // Check for template literals or string concatenation with SQL keywords
-      if (n.type === 'template_string' || n.type === 'binary_expression') {
-        const text = n.text.toUpperCase();
-
-        // Check if contains SQL keywords
-        const hasSQLKeyword = sqlKeywords.some(keyword => text.includes(keyword));
-
-        if (hasSQLKeyword) {
-          // Check if it contains interpolation or concatenation
-          const hasInterpolation = n.type === 'template_string' && n.text.includes('${');
-          const isConcatenation = n.type === 'binary_expression';
-
-          if (hasInterpolation || isConcatenation) {
-            const line = n.startPosition.row + 1;
-            issues.push({
-              type: IssueType.SQL_INJECTION_RISK,
-              category: IssueCategory.SECURITY,
-              severity: 'critical',
-              line,
-              message: 'SQL query with string interpolation - SQL injection risk',
-              suggestion: 'Use parameterized queries or prepared statements',
-              codeSnippet: this.getLineContent(line),
-            });
-          }
-        }
+    const sqlKeyword = /SELECT|INSERT|UPDATE|DELETE|FROM|WHERE/i;
+
+    // Check for template literals or string concatenation with SQL keywords
+    engine.on(['template_string', 'binary_expression'], n => {
+      // A concatenation chain is checked once, at its outermost operator,
+      // so long chains are not rescanned at every level
+      if (n.type === 'binary_expression' && n.parent?.type === 'binary_expression') {
+        return;
       }
 
-      for (const child of n.children) {
-        traverse(child);
+      const text = n.text;
+
+      if (sqlKeyword.test(text)) {
+        // Check if it contains interpolation or concatenation
+        const hasInterpolation = n.type === 'template_string' && text.includes('${');
+        const isConcatenation = n.type === 'binary_expression';
+
+        if (hasInterpolation || isConcatenation) {
+          const line = n.startPosition.row + 1;
+          issues.push({
+            type: IssueType.SQL_INJECTION_RISK,
+            category: IssueCategory.SECURITY,
+            severity: 'critical',
+            line,
+            message: 'SQL query with string interpolation - SQL injection risk',
+            suggestion: 'Use parameterized queries or prepared statements',
+            codeSnippet: this.getLineContent(line),
+          });
+        }
       }
-    };
+    });
 
-    traverse(node);
-    return issues;
+    return () => issues;
   }
 
   // Helper methods
 
   private getLineContent(line: number): string {
-    const lines = this.code.split('\n');
-    return lines[line - 1]?.trim() || '';
+    return this.context.getLineContent(line);
   }
 }
@@ -0,0 +1,122 @@
+import Parser from 'tree-sitter';
+
+const LOOP_TYPES = ['for_statement', 'for_in_statement', 'for_of_statement', 'while_statement'];
+const CATCH_TYPES = ['catch_clause'];
+const CALLBACK_TYPES = ['arrow_function', 'function_expression'];
+const FUNCTION_TYPES = [
+  ...CALLBACK_TYPES,
+  'function_declaration',
+  'function',
+  'generator_function_declaration',
+  'method_definition',
+  'function_definition',
+];
+const CLASS_TYPES = ['class_declaration', 'class', 'class_definition'];
+
+export interface FunctionFrame {
+  node: Parser.SyntaxNode;
+  // Named children of the `parameters` list; null when there is no list (x => x)
+  parameterCount: number | null;
+}
+
+/**
+ * Enclosing loops, catch clauses, callbacks, functions and classes of the
+ * node currently being visited by a TraversalEngine walk
+ *
+ * The engine pushes and pops frames as it descends, so rules can ask for
+ * loop depth or the enclosing function in constant time instead of walking
+ * `node.parent` to the root. Ancestors above the walk's root are seeded
+ * once per walk, so a function nested in a loop still counts as inside it.
+ *
+ * Handlers see the context of their node's ancestors; the node itself is
+ * pushed after its enter handlers and popped before its leave handlers.
+ */
+export class TraversalContext {
+  static readonly TRACKED_TYPES: ReadonlySet<string> = new Set([
+    ...LOOP_TYPES,
+    ...CATCH_TYPES,
+    ...FUNCTION_TYPES,
+    ...CLASS_TYPES,
+  ]);
+
+  readonly loops: Parser.SyntaxNode[] = [];
+  readonly catches: Parser.SyntaxNode[] = [];
+  readonly functions: FunctionFrame[] = [];
+  readonly callbacks: FunctionFrame[] = [];
+  readonly classes: Parser.SyntaxNode[] = [];
+
+  get loopDepth(): number {
+    return this.loops.length;
+  }
+
+  get inLoop(): boolean {
+    return this.loops.length > 0;
+  }
+
+  get inCatch(): boolean {
+    return this.catches.length > 0;
+  }
+
+  get enclosingFunction(): FunctionFrame | null {
+    return this.functions[this.functions.length - 1] ?? null;
+  }
+
+  get enclosingClass(): Parser.SyntaxNode | null {
+    return this.classes[this.classes.length - 1] ?? null;
+  }
+
+  /**
+   * Clear the stacks and seed them with the ancestors of a walk's root
+   */
+  reset(root: Parser.SyntaxNode): void {
+    this.loops.length = 0;
+    this.catches.length = 0;
+    this.functions.length = 0;
+    this.callbacks.length = 0;
+    this.classes.length = 0;
+
+    const ancestors: Parser.SyntaxNode[] = [];
+    for (let current = root.parent; current; current = current.parent) {
+      ancestors.push(current);
+    }
+
+    for (let i = ancestors.length - 1; i >= 0; i--) {
+      const type = ancestors[i].type;
+      if (TraversalContext.TRACKED_TYPES.has(type)) {
+        this.enter(ancestors[i], type);
+      }
+    }
+  }
+
+  enter(node: Parser.SyntaxNode, type: string = node.type): void {
+    if (LOOP_TYPES.includes(type)) {
+      this.loops.push(node);
+    } else if (CATCH_TYPES.includes(type)) {
+      this.catches.push(node);
+    } else if (CLASS_TYPES.includes(type)) {
+      this.classes.push(node);
+    } else if (FUNCTION_TYPES.includes(type)) {
+      const parameters = node.childForFieldName('parameters');
+      const frame: FunctionFrame = { node, parameterCount: parameters ? parameters.namedChildCount : null };
+      this.functions.push(frame);
+      if (CALLBACK_TYPES.includes(type)) {
+        this.callbacks.push(frame);
+      }
+    }
+  }
+
+  leave(node: Parser.SyntaxNode, type: string = node.type): void {
+    if (LOOP_TYPES.includes(type)) {
+      this.loops.pop();
+    } else if (CATCH_TYPES.includes(type)) {
+      this.catches.pop();
+    } else if (CLASS_TYPES.includes(type)) {
+      this.classes.pop();
+    } else if (FUNCTION_TYPES.includes(type)) {
+      this.functions.pop();
+      if (CALLBACK_TYPES.includes(type)) {
+        this.callbacks.pop();
+      }
+    }
+  }
+}
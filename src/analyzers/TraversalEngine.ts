@@ -0,0 +1,269 @@
+import Parser from 'tree-sitter';
+import { Profiler } from '../profiling/Profiler';
+import { QueryRuleMatch, QueryRuleName, matchOwnQueryRules, matchQueryRules } from './QueryRules';
+import { TraversalContext } from './TraversalContext';
+import { NodeBudget } from '../types';
+
+export type NodeHandler = (node: Parser.SyntaxNode) => void;
+export type MatchHandler = (match: QueryRuleMatch) => void;
+// Receives the cursor positioned on a leaf, so no SyntaxNode is created
+export type LeafHandler = (cursor: Parser.TreeCursor) => void;
+
+interface HandlerEntry {
+  enter: NodeHandler;
+  leave?: NodeHandler;
+}
+
+/**
+ * Single-pass AST traversal engine
+ *
+ * Detectors and calculators register handlers for the node types they care
+ * about, then one depth-first walk dispatches every node to its handlers
+ * through a node-type -> handlers table. This replaces the separate recursive
+ * walk each check used to do over the same subtree.
+ *
+ * The walk uses a TreeCursor so that nodes without handlers are never
+ * materialized as SyntaxNode objects.
+ *
+ * Checks that are a plain structural match register with onMatch()
+ * instead: their rule query runs in native code, so no JS handler runs
+ * for nodes that do not match. While nested regions are skipped, the
+ * query runs once per file and each walk takes the matches of its own
+ * region (see matchOwnQueryRules).
+ *
+ * Node types registered with onSkip() are not descended into, which lets
+ * a caller analyze nested regions (functions) with walks of their own
+ * without visiting any node twice. Checks whose answer can depend on code
+ * in those regions (a cleanup closure, a callback using a variable) look
+ * into skipped() once the walk is done.
+ *
+ * While a profiler is active, handlers registered inside section() are
+ * timed and their time is attributed to the section's label.
+ */
+export class TraversalEngine {
+  /**
+   * Enclosing loops, catches, functions and classes of the node being
+   * visited. Only valid inside node handlers, during walk().
+   */
+  readonly context: TraversalContext = new TraversalContext();
+
+  private handlers: Map<string, HandlerEntry[]> = new Map();
+  private matchHandlers: Map<QueryRuleName, MatchHandler[]> = new Map();
+  private skipHandlers: Map<string, NodeHandler[]> = new Map();
+  private leafHandlers: LeafHandler[] = [];
+  private skippedNodes: Parser.SyntaxNode[] = [];
+  private profiler: Profiler | null = Profiler.active;
+  private label: string | null = null;
+
+  /**
+   * @param budget Charged for every node walked, e.g. to stop pathological files
+   */
+  constructor(private readonly budget?: NodeBudget) {}
+
+  /**
+   * Run a check's registration under a profiling label. The collector it
+   * returns is timed under the same label.
+   */
+  section<T extends (...args: any[]) => any>(label: string, register: () => T): T {
+    const profiler = this.profiler;
+    if (!profiler) {
+      return register();
+    }
+
+    const outer = this.label;
+    this.label = label;
+    try {
+      const collect = register();
+      return ((...args: any[]) => {
+        const start = performance.now();
+        try {
+          return collect(...args);
+        } finally {
+          profiler.add('detector', label, performance.now() - start);
+        }
+      }) as T;
+    } finally {
+      this.label = outer;
+    }
+  }
+
+  /**
+   * Register handlers for one or more node types.
+   * `enter` runs before the node's children are visited, `leave` after.
+   */
+  on(nodeTypes: readonly string[], enter: NodeHandler, leave?: NodeHandler): void {
+    const { profiler, label } = this;
+    const entry: HandlerEntry = profiler && label
+      ? { enter: this.timed(profiler, label, enter), leave: leave && this.timed(profiler, label, leave) }
+      : { enter, leave };
+    for (const type of nodeTypes) {
+      const existing = this.handlers.get(type);
+      if (existing) {
+        existing.push(entry);
+      } else {
+        this.handlers.set(type, [entry]);
+      }
+    }
+  }
+
+  /**
+   * Register a handler for every match of a query rule (see QueryRules)
+   */
+  onMatch(rule: QueryRuleName, handler: MatchHandler): void {
+    const { profiler, label } = this;
+    const entry = profiler && label ? this.timed(profiler, label, handler) : handler;
+
+    const existing = this.matchHandlers.get(rule);
+    if (existing) {
+      existing.push(entry);
+    } else {
+      this.matchHandlers.set(rule, [entry]);
+    }
+  }
+
+  /**
+   * Register a handler for every leaf node (token) walked, e.g. to
+   * fingerprint the token stream
+   */
+  onLeaf(handler: LeafHandler): void {
+    const { profiler, label } = this;
+    this.leafHandlers.push(profiler && label ? this.timed(profiler, label, handler) : handler);
+  }
+
+  /**
+   * Stop the walk at nodes of these types below the root instead of
+   * descending into them. `handler` receives each skipped node; no other
+   * handler sees it or its descendants, including query rule matches.
+   * Skipped nodes are listed by skipped().
+   */
+  onSkip(nodeTypes: readonly string[], handler: NodeHandler): void {
+    for (const type of nodeTypes) {
+      const existing = this.skipHandlers.get(type);
+      if (existing) {
+        existing.push(handler);
+      } else {
+        this.skipHandlers.set(type, [handler]);
+      }
+    }
+  }
+
+  /**
+   * Nodes the walk has stopped at so far (see onSkip), in source order.
+   * Checks that could not resolve something from the walked region alone
+   * search these instead of having every walk descend into them.
+   */
+  get skipped(): readonly Parser.SyntaxNode[] {
+    return this.skippedNodes;
+  }
+
+  /**
+   * Walk the subtree rooted at `root` once, dispatching to registered handlers
+   */
+  walk(root: Parser.SyntaxNode): void {
+    if (this.matchHandlers.size > 0) {
+      this.dispatchMatches(root);
+    }
+
+    this.context.reset(root);
+    this.skippedNodes = [];
+    const cursor = root.walk();
+    // One entry per depth: the node if it had handlers or is tracked by
+    // the context, otherwise null
+    const stack: Array<Parser.SyntaxNode | null> = [];
+
+    for (;;) {
+      const skip = stack.length > 0 ? this.skipHandlers.get(cursor.nodeType) : undefined;
+      if (skip) {
+        const node = cursor.currentNode;
+        this.skippedNodes.push(node);
+        skip.forEach(handler => handler(node));
+        stack.push(null);
+      } else {
+        this.budget?.visit();
+        stack.push(this.enter(cursor));
+
+        if (cursor.gotoFirstChild()) {
+          continue;
+        }
+        for (const handler of this.leafHandlers) {
+          handler(cursor);
+        }
+      }
+
+      for (;;) {
+        this.leave(stack.pop() as Parser.SyntaxNode | null);
+        if (stack.length === 0) {
+          return;
+        }
+        if (cursor.gotoNextSibling()) {
+          break;
+        }
+        cursor.gotoParent();
+      }
+    }
+  }
+
+  private dispatchMatches(root: Parser.SyntaxNode): void {
+    const start = this.profiler ? performance.now() : 0;
+    const results = this.skipHandlers.size > 0
+      ? matchOwnQueryRules(root, [...this.skipHandlers.keys()])
+      : matchQueryRules(root);
+    this.profiler?.add('detector', 'QueryRules.match', performance.now() - start);
+
+    for (const [rule, handlers] of this.matchHandlers) {
+      for (const match of results.get(rule) ?? []) {
+        handlers.forEach(handler => handler(match));
+      }
+    }
+  }
+
+  private timed<T>(profiler: Profiler, label: string, handler: (arg: T) => void): (arg: T) => void {
+    return arg => {
+      const start = performance.now();
+      handler(arg);
+      profiler.add('detector', label, performance.now() - start);
+    };
+  }
+
+  private enter(cursor: Parser.TreeCursor): Parser.SyntaxNode | null {
+    const type = cursor.nodeType;
+    const entries = this.handlers.get(type);
+    const tracked = TraversalContext.TRACKED_TYPES.has(type);
+    if (!entries && !tracked) {
+      return null;
+    }
+
+    const node = cursor.currentNode;
+    if (entries) {
+      for (const entry of entries) {
+        entry.enter(node);
+      }
+    }
+    if (tracked) {
+      this.context.enter(node, type);
+    }
+    return node;
+  }
+
+  private leave(node: Parser.SyntaxNode | null): void {
+    if (!node) {
+      return;
+    }
+
+    const type = node.type;
+    if (TraversalContext.TRACKED_TYPES.has(type)) {
+      this.context.leave(node, type);
+    }
+
+    const entries = this.handlers.get(type);
+    if (!entries) {
+      return;
+    }
+    for (let i = entries.length - 1; i >= 0; i--) {
+      const leave = entries[i].leave;
+      if (leave) {
+        leave(node);
+      }
+    }
+  }
+}
@@ -0,0 +1,49 @@
+import { AnalysisBudget, AnalysisLimitError, detectGeneratedCode } from '../AnalysisLimits';
+
+describe('AnalysisLimits', () => {
+  describe('detectGeneratedCode', () => {
+    it('should recognize generated-file markers in the header', () => {
+      expect(detectGeneratedCode('// @generated by protoc\nexport const a = 1;\n')?.reason).toBe('GENERATED');
+      expect(detectGeneratedCode('// Code generated by go generate; DO NOT EDIT.\n')?.reason).toBe('GENERATED');
+    });
+
+    it('should recognize minified code by its line lengths', () => {
+      const bundle = 'var a=1;'.repeat(2000);
+
+      expect(detectGeneratedCode(bundle)?.reason).toBe('MINIFIED');
+    });
+
+    it('should accept ordinary source', () => {
+      const code = ['function add(a, b) {', '  return a + b;', '}', ''].join('\n');
+
+      expect(detectGeneratedCode(code)).toBeNull();
+    });
+  });
+
+  describe('AnalysisBudget', () => {
+    it('should stop a walk past its node budget', () => {
+      const budget = new AnalysisBudget(3, 10_000);
+
+      budget.visit();
+      budget.visit();
+      budget.visit();
+
+      expect(() => budget.visit()).toThrow(AnalysisLimitError);
+    });
+
+    it('should stop a walk past its deadline', () => {
+      const budget = new AnalysisBudget(Infinity, 0);
+      let error: unknown;
+
+      try {
+        for (let i = 0; i < 10_000; i++) {
+          budget.visit();
+        }
+      } catch (caught) {
+        error = caught;
+      }
+
+      expect((error as AnalysisLimitError).reason).toBe('TIMEOUT');
+    });
+  });
+});
@@ -0,0 +1,143 @@
+import { AnalysisStore, joinMessage, splitMessage } from '../AnalysisStore';
+import { FileAnalysis, FunctionInfo, IssueCategory, IssueType } from '../../types';
+
+describe('AnalysisStore', () => {
+  const metrics = {
+    cyclomaticComplexity: 3,
+    cognitiveComplexity: 2,
+    linesOfCode: 5,
+    effectiveLinesOfCode: 4,
+    nestingDepth: 1,
+    functionLength: 5,
+    parameterCount: 2,
+  };
+
+  const method: FunctionInfo = {
+    name: 'render',
+    startLine: 8,
+    endLine: 12,
+    metrics: { ...metrics, cyclomaticComplexity: 7 },
+    exclusiveMetrics: metrics,
+    children: [{ name: 'callback', startLine: 9 }],
+    issues: [
+      {
+        type: IssueType.TOO_MANY_PARAMETERS,
+        category: IssueCategory.COMPLEXITY,
+        severity: 'medium',
+        line: 8,
+        message: "Function 'render' has 6 parameters (threshold: 4)",
+        suggestion: 'Group related parameters into an object',
+        fix: { description: 'Use an options object', originalCode: 'a', fixedCode: 'b', automated: false },
+      },
+    ],
+  };
+
+  const makeAnalysis = (filePath: string): FileAnalysis => ({
+    filePath,
+    language: 'JavaScript',
+    overallMetrics: { ...metrics, cyclomaticComplexity: 4.5 },
+    functions: [
+      {
+        name: 'load',
+        startLine: 1,
+        endLine: 5,
+        metrics,
+        previousMetrics: { ...metrics, cyclomaticComplexity: 1 },
+        issues: [
+          {
+            type: IssueType.MAGIC_NUMBER,
+            category: IssueCategory.CODE_SMELL,
+            severity: 'low',
+            line: 3,
+            message: 'Magic number 42 should be a named constant',
+            codeSnippet: 'return 42;',
+          },
+        ],
+      },
+      method,
+      { name: 'callback', startLine: 9, endLine: 10, metrics, parent: { name: 'render', startLine: 8 }, issues: [] },
+    ],
+    classes: [{ name: 'View', startLine: 7, endLine: 13, methods: [method], metrics }],
+    totalIssues: 2,
+    analysisDate: new Date('2024-01-01T00:00:00Z'),
+  });
+
+  it('should read back what was added', () => {
+    const store = new AnalysisStore();
+    const analysis = makeAnalysis('src/view.js');
+
+    store.add(analysis);
+
+    expect(store).toHaveLength(1);
+    expect(store.get(0)).toEqual(analysis);
+  });
+
+  it('should keep degraded records and empty lists', () => {
+    const store = new AnalysisStore();
+    const analysis: FileAnalysis = {
+      ...makeAnalysis('dist/bundle.min.js'),
+      functions: [],
+      classes: [],
+      totalIssues: 0,
+      degraded: { filePath: 'dist/bundle.min.js', error: 'Minified file', errorType: 'MINIFIED' },
+    };
+
+    store.add(analysis);
+
+    expect(store.get(0)).toEqual(analysis);
+  });
+
+  it('should keep fingerprints and imports for later whole-run checks', () => {
+    const store = new AnalysisStore();
+    const analysis: FileAnalysis = {
+      ...makeAnalysis('pkg/view.py'),
+      imports: [
+        { source: 'os', line: 1 },
+        { source: '..models', names: ['user', 'order'], line: 2 },
+        { source: '.empty', names: [], line: 3 },
+      ],
+    };
+    analysis.functions[0] = {
+      ...analysis.functions[0],
+      fingerprint: { tokens: 48, minHash: [0, 7, 0xffffffff, 123456789] },
+    };
+
+    store.add(analysis);
+    store.add({ ...makeAnalysis('pkg/empty.py'), imports: [] });
+
+    expect(store.get(0)).toEqual(analysis);
+    expect(store.get(0).functions[1].fingerprint).toBeUndefined();
+    expect(store.get(1).imports).toEqual([]);
+    expect(store.get(1).functions[0].fingerprint).toBeUndefined();
+  });
+
+  it('should materialize a method once for the function list and its class', () => {
+    const store = new AnalysisStore();
+    store.add(makeAnalysis('src/view.js'));
+
+    const analysis = store.get(0);
+
+    expect(analysis.classes[0].methods[0]).toBe(analysis.functions[1]);
+  });
+
+  it('should iterate, slice and sort like an array', () => {
+    const store = new AnalysisStore();
+    ['src/c.js', 'src/a.js', 'src/b.js'].forEach(filePath => store.add(makeAnalysis(filePath)));
+
+    store.sortByPath();
+
+    expect(Array.from(store, a => a.filePath)).toEqual(['src/a.js', 'src/b.js', 'src/c.js']);
+    expect(store.slice(1).map(a => a.filePath)).toEqual(['src/b.js', 'src/c.js']);
+    expect(store.slice(-1).map(a => a.filePath)).toEqual(['src/c.js']);
+    expect(() => store.get(3)).toThrow(RangeError);
+  });
+
+  it('should share one message template between issues of a rule', () => {
+    const first = splitMessage("Function 'load' has 6 parameters (threshold: 4)");
+    const second = splitMessage("Function 'save' has 9 parameters (threshold: 4)");
+
+    expect(first.template).toBe(second.template);
+    expect(first.params).toEqual(["'load'", '6', '4']);
+    expect(joinMessage(second.template, second.params)).toBe("Function 'save' has 9 parameters (threshold: 4)");
+  });
+});
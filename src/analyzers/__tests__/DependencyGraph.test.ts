@@ -0,0 +1,130 @@
+import { DependencyGraph } from '../DependencyGraph';
+import { ModuleResolver } from '../ModuleResolver';
+import { JavaScriptParser } from '../../parsers/JavaScriptParser';
+import { PythonParser } from '../../parsers/PythonParser';
+import { FileAnalysis, IssueType, ModuleImport } from '../../types';
+
+const file = (filePath: string, imports: ModuleImport[]): FileAnalysis => ({
+  filePath,
+  language: 'TypeScript',
+  overallMetrics: {} as any,
+  functions: [{ name: 'run', startLine: 1, endLine: 1, metrics: {} as any, issues: [] }],
+  classes: [],
+  totalIssues: 0,
+  analysisDate: new Date(),
+  imports,
+});
+
+describe('import extraction', () => {
+  it('should record JavaScript imports, re-exports, require() and import() only when asked to', () => {
+    const code = [
+      "import { a } from './a';",
+      "export * from './b';",
+      "const c = require('./c');",
+      "const d = () => import('./d');",
+      "import fs from 'fs';",
+    ].join('\n');
+    const parser = new JavaScriptParser(false);
+
+    expect(parser.parse(code, 'main.js').imports).toBeUndefined();
+    expect(parser.parse(code, 'main.js', { collectImports: true }).imports).toEqual([
+      { source: './a', line: 1 },
+      { source: './b', line: 2 },
+      { source: './c', line: 3 },
+      { source: './d', line: 4 },
+      { source: 'fs', line: 5 },
+    ]);
+  });
+
+  it('should record Python imports with the names taken from modules', () => {
+    const code = 'import os.path, json as j\nfrom ..models import user, orm\nfrom . import views\n';
+
+    expect(new PythonParser().parse(code, 'app.py', { collectImports: true }).imports).toEqual([
+      { source: 'os.path', line: 1 },
+      { source: 'json', line: 1 },
+      { source: '..models', names: ['user', 'orm'], line: 2 },
+      { source: '.', names: ['views'], line: 3 },
+    ]);
+  });
+});
+
+describe('ModuleResolver', () => {
+  const resolver = new ModuleResolver([
+    'src/a.ts',
+    'src/util/index.ts',
+    'app/pkg/__init__.py',
+    'app/pkg/core.py',
+    'app/pkg/models/__init__.py',
+    'app/pkg/models/user.py',
+  ]);
+
+  it('should resolve relative scripts by extension, directory index and compiled name', () => {
+    expect(resolver.resolve('src/b.ts', { source: './a', line: 1 })).toEqual(['src/a.ts']);
+    expect(resolver.resolve('src/b.ts', { source: './a.js', line: 1 })).toEqual(['src/a.ts']);
+    expect(resolver.resolve('src/b.ts', { source: './util', line: 1 })).toEqual(['src/util/index.ts']);
+    expect(resolver.resolve('src/b.ts', { source: 'lodash', line: 1 })).toEqual([]);
+  });
+
+  it('should resolve relative, absolute and submodule Python imports', () => {
+    const from = 'app/pkg/models/user.py';
+
+    expect(resolver.resolve(from, { source: '..core', line: 1 })).toEqual(['app/pkg/core.py']);
+    expect(resolver.resolve(from, { source: 'pkg.core', line: 1 })).toEqual(['app/pkg/core.py']);
+    expect(resolver.resolve('app/pkg/core.py', { source: '.models', names: ['user', 'Base'], line: 1 }))
+      .toEqual(['app/pkg/models/user.py', 'app/pkg/models/__init__.py']);
+    expect(resolver.resolve(from, { source: 'os', line: 1 })).toEqual([]);
+  });
+});
+
+describe('DependencyGraph', () => {
+  it('should compute fan-in, fan-out and import cycles', () => {
+    const graph = new DependencyGraph();
+    [
+      file('src/a.ts', [{ source: './b', line: 2 }]),
+      file('src/b.ts', [{ source: './c', line: 1 }, { source: './c', line: 5 }]),
+      file('src/c.ts', [{ source: './a', line: 3 }]),
+      file('src/main.ts', [{ source: './a', line: 1 }, { source: 'react', line: 2 }]),
+    ].forEach(analysis => graph.add(analysis));
+
+    const report = graph.analyze();
+
+    expect(report.cycles).toEqual([['src/a.ts', 'src/b.ts', 'src/c.ts']]);
+    expect(report.edges).toHaveLength(4);
+    expect(report.modules.find(module => module.filePath === 'src/a.ts')).toEqual({
+      filePath: 'src/a.ts',
+      fanIn: 2,
+      fanOut: 1,
+      cycle: 0,
+    });
+    expect(report.modules.find(module => module.filePath === 'src/main.ts')?.cycle).toBeUndefined();
+  });
+
+  it('should report each module of a cycle on its import into the cycle', () => {
+    const graph = new DependencyGraph();
+    const a = file('src/a.ts', [{ source: './b', line: 4 }]);
+    graph.add(a);
+    graph.add(file('src/b.ts', [{ source: './a', line: 1 }]));
+    graph.analyze();
+
+    const annotated = graph.annotate(a);
+    const [issue] = annotated.functions[0].issues;
+
+    expect(issue.type).toBe(IssueType.CIRCULAR_DEPENDENCY);
+    expect(issue.line).toBe(4);
+    expect(issue.message).toContain('src/b.ts');
+    expect(annotated.totalIssues).toBe(1);
+    expect(a.functions[0].issues).toEqual([]);
+  });
+
+  it('should drop the edges of a file once it is replaced', () => {
+    const graph = new DependencyGraph();
+    graph.add(file('src/a.ts', [{ source: './b', line: 1 }]));
+    graph.add(file('src/b.ts', [{ source: './a', line: 1 }]));
+    expect(graph.analyze().cycles).toHaveLength(1);
+
+    graph.add(file('src/b.ts', []));
+
+    expect(graph.analyze().cycles).toEqual([]);
+    expect(graph.hasIssues).toBe(false);
+  });
+});
@@ -0,0 +1,85 @@
+import { DuplicateDetector } from '../DuplicateDetector';
+import { JavaScriptParser } from '../../parsers/JavaScriptParser';
+import { IssueType } from '../../types';
+
+const TOTALS = `
+  function totals(orders) {
+    let sum = 0;
+    for (const order of orders) {
+      if (order.status === 'paid' && order.items.length > 0) {
+        sum += order.items.reduce((acc, item) => acc + item.price * item.quantity, 0);
+      }
+    }
+    return { sum, count: orders.length };
+  }
+`;
+
+// The same code with every identifier and literal renamed
+const RENAMED = `
+  function computeRevenue(invoices) {
+    let total = 1;
+    for (const invoice of invoices) {
+      if (invoice.state === 'settled' && invoice.lines.length > 2) {
+        total += invoice.lines.reduce((memo, line) => memo + line.cost * line.units, 5);
+      }
+    }
+    return { total, size: invoices.length };
+  }
+`;
+
+const UNRELATED = `
+  function render(node, depth) {
+    const children = node.children.map(child => render(child, depth + 1));
+    if (depth > 3) {
+      return '<details>' + children.join('') + '</details>';
+    }
+    return ['<div class="level-', depth, '">', node.label, children.join(''), '</div>'].join('');
+  }
+`;
+
+describe('DuplicateDetector', () => {
+  const parser = new JavaScriptParser(false);
+  const parse = (code: string, filePath: string) => parser.parse(code, filePath, { minFingerprintTokens: 20 });
+
+  it('should only fingerprint functions when asked to', () => {
+    expect(parser.parse(TOTALS, 'a.js').functions[0].fingerprint).toBeUndefined();
+    expect(parse(TOTALS, 'a.js').functions[0].fingerprint?.minHash).toHaveLength(32);
+    expect(parser.parse(TOTALS, 'a.js', { minFingerprintTokens: 10_000 }).functions[0].fingerprint).toBeUndefined();
+  });
+
+  it('should group renamed copies across files and leave other functions alone', () => {
+    const detector = new DuplicateDetector();
+    const files = [parse(TOTALS, 'a.js'), parse(RENAMED, 'b.js'), parse(UNRELATED, 'c.js')];
+    files.forEach(file => detector.add(file));
+
+    const groups = detector.detect();
+
+    expect(groups).toHaveLength(1);
+    expect(groups[0].members.map(member => [member.filePath, member.name])).toEqual([
+      ['a.js', 'totals'],
+      ['b.js', 'computeRevenue'],
+    ]);
+
+    const [a, b, c] = files.map(file => detector.annotate(file));
+    const duplicate = a.functions[0].issues.find(issue => issue.type === IssueType.DUPLICATED_CODE);
+
+    expect(duplicate?.message).toContain("'computeRevenue' (b.js:2)");
+    expect(b.functions[0].issues.some(issue => issue.type === IssueType.DUPLICATED_CODE)).toBe(true);
+    expect(a.totalIssues).toBe(files[0].totalIssues + 1);
+    expect(c).toBe(files[2]);
+    expect(files[0].functions[0].issues.some(issue => issue.type === IssueType.DUPLICATED_CODE)).toBe(false);
+  });
+
+  it('should keep a method shared between its class and the function list', () => {
+    const detector = new DuplicateDetector();
+    const withClass = parse(`class Report {\n${TOTALS.replace('function totals', 'totals')}}\n`, 'a.js');
+    detector.add(withClass);
+    detector.add(parse(RENAMED, 'b.js'));
+    detector.detect();
+
+    const annotated = detector.annotate(withClass);
+
+    expect(annotated.classes[0].methods[0]).toBe(annotated.functions[0]);
+    expect(annotated.totalIssues).toBe(withClass.totalIssues + 2);
+  });
+});
@@ -1,4 +1,5 @@
 import { FileAnalyzer } from '../FileAnalyzer';
+import { DEFAULT_CONFIG } from '../../types';
 import * as fs from 'fs';
 import * as path from 'path';
 
@@ -42,6 +43,28 @@ describe('FileAnalyzer', () => {
       expect(extensions).toContain('.py');
       expect(extensions.length).toBeGreaterThanOrEqual(3);
     });
+
+    it('should select extensions by language name without loading parsers', () => {
+      const loaded = jest.fn();
+
+      jest.isolateModules(() => {
+        jest.doMock('../../parsers/PythonParser', () => {
+          loaded();
+          return jest.requireActual('../../parsers/PythonParser');
+        });
+        const { FileAnalyzer: IsolatedAnalyzer } = require('../FileAnalyzer');
+        const isolated = new IsolatedAnalyzer();
+
+        expect(isolated.getSupportedExtensions('python')).toEqual(['.py']);
+        expect(isolated.isSupported('script.py')).toBe(true);
+        isolated.analyzeSource('function test() { return 1; }', 'test.js');
+        expect(loaded).not.toHaveBeenCalled();
+
+        isolated.analyzeSource('def test():\n    return 1\n', 'test.py');
+        isolated.analyzeSource('def other():\n    return 2\n', 'other.py');
+        expect(loaded).toHaveBeenCalledTimes(1);
+      });
+    });
   });
 
   describe('analyzeFile', () => {
@@ -123,4 +146,96 @@ describe('FileAnalyzer', () => {
       expect(unsupportedError?.errorType).toBe('UNSUPPORTED_EXTENSION');
     });
   });
+
+  describe('analyzeSourceWithErrors', () => {
+    it('should analyze text already read without reading the file again', () => {
+      mockFs.existsSync.mockReturnValue(true);
+
+      const result = analyzer.analyzeSourceWithErrors('function test() { return 1; }', 'test.js');
+
+      expect(result.successful.map(a => a.filePath)).toEqual(['test.js']);
+      expect(mockFs.readFileSync).not.toHaveBeenCalled();
+    });
+
+    it('should report failures as analysis errors', () => {
+      mockFs.existsSync.mockReturnValue(true);
+
+      const result = analyzer.analyzeSourceWithErrors('x', 'test.java');
+
+      expect(result.failed[0].errorType).toBe('UNSUPPORTED_EXTENSION');
+    });
+  });
+
+  describe('analysis limits', () => {
+    beforeEach(() => {
+      mockFs.existsSync.mockReturnValue(true);
+    });
+
+    it('should skip files over the byte budget without reading them', () => {
+      mockFs.statSync.mockReturnValue({ size: 2048 } as fs.Stats);
+      const limited = new FileAnalyzer(undefined, { ...DEFAULT_CONFIG, maxFileBytes: 1024 });
+
+      const result = limited.analyzeFilesWithErrors(['bundle.js']);
+
+      expect(result.failed[0].errorType).toBe('FILE_TOO_LARGE');
+      expect(mockFs.readFileSync).not.toHaveBeenCalled();
+    });
+
+    it('should skip files over the node budget', () => {
+      mockFs.readFileSync.mockReturnValue('function test(a) { if (a) { return a + 1; } return 0; }');
+      const limited = new FileAnalyzer(undefined, { ...DEFAULT_CONFIG, maxAstNodes: 5 });
+
+      const result = limited.analyzeFilesWithErrors(['test.js']);
+
+      expect(result.failed[0].errorType).toBe('TOO_MANY_NODES');
+    });
+
+    it('should only measure minified files', () => {
+      const minified = 'function f(a){if(a==1){return eval(a)}return 0}' + 'var x=1;'.repeat(100);
+      mockFs.readFileSync.mockReturnValue(minified);
+
+      const result = analyzer.analyzeFile('bundle.min.js');
+
+      expect(result.degraded?.errorType).toBe('MINIFIED');
+      expect(result.functions[0].metrics.cyclomaticComplexity).toBe(2);
+      expect(result.totalIssues).toBe(0);
+    });
+  });
+
+  describe('analyzeFilesWithErrorsParallel', () => {
+    it('should fall back to in-process analysis when workers are unavailable', async () => {
+      const jsCode = 'function test() { return 1; }';
+      mockFs.existsSync.mockImplementation((filepath) => {
+        return filepath === 'exists.js';
+      });
+      mockFs.readFileSync.mockReturnValue(jsCode);
+
+      const result = await analyzer.analyzeFilesWithErrorsParallel(
+        ['missing.js', 'exists.js', 'test.java'],
+        4
+      );
+
+      expect(result.successful.map(a => a.filePath)).toEqual(['exists.js']);
+      expect(result.failed.map(e => e.filePath)).toEqual(['missing.js', 'test.java']);
+    });
+  });
+
+  describe('analyzeFilesStream', () => {
+    it('should yield one result per file', async () => {
+      const jsCode = 'function test() { return 1; }';
+      mockFs.existsSync.mockImplementation((filepath) => {
+        return filepath === 'exists.js';
+      });
+      mockFs.readFileSync.mockReturnValue(jsCode);
+
+      const results = [];
+      for await (const result of analyzer.analyzeFilesStream(['exists.js', 'missing.js'])) {
+        results.push(result);
+      }
+
+      expect(results.length).toBe(2);
+      expect(results[0].successful[0].filePath).toBe('exists.js');
+      expect(results[1].failed[0].errorType).toBe('FILE_NOT_FOUND');
+    });
+  });
 });
@@ -0,0 +1,44 @@
+import { FixGenerator, attachFixes } from '../FixGenerator';
+import { JavaScriptParser } from '../../parsers/JavaScriptParser';
+import { CodeIssue, IssueCategory, IssueType } from '../../types';
+
+describe('FixGenerator', () => {
+  const coercion = (line: number, codeSnippet?: string): CodeIssue => ({
+    type: IssueType.TYPE_COERCION,
+    category: IssueCategory.CODE_SMELL,
+    severity: 'low',
+    line,
+    message: 'Use strict equality',
+    codeSnippet,
+  });
+
+  it('should reuse fixes for the same rule and code', () => {
+    const generator = new FixGenerator('');
+    const first = generator.generateFix(coercion(1, 'if (a == b) {'));
+
+    expect(first?.fixedCode).toBe('if (a === b) {');
+    expect(generator.generateFix(coercion(7, 'if (a == b) {'))).toBe(first);
+  });
+
+  it('should only read the source for issues without a snippet', () => {
+    const source = jest.fn(() => 'x = 1;\nif (a == b) {}');
+    const generator = new FixGenerator(source);
+
+    generator.generateFix(coercion(1, 'if (c == d) {'));
+    expect(source).not.toHaveBeenCalled();
+
+    expect(generator.generateFix(coercion(2))?.originalCode).toBe('if (a == b) {}');
+    expect(source).toHaveBeenCalledTimes(1);
+  });
+
+  it('should leave fixes out of an analysis until they are attached', () => {
+    const analysis = new JavaScriptParser(false).parse('function f(a) {\n  if (a == 1) { return a; }\n}', 'f.js');
+    const issues = analysis.functions[0].issues;
+
+    expect(issues.some(issue => issue.fix)).toBe(false);
+
+    attachFixes([analysis]);
+
+    expect(issues.find(issue => issue.type === IssueType.TYPE_COERCION)?.fix?.fixedCode).toContain('===');
+  });
+});
@@ -0,0 +1,103 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { IncrementalAnalyzer } from '../IncrementalAnalyzer';
+import { FileAnalyzer } from '../FileAnalyzer';
+import { JavaScriptParser } from '../../parsers/JavaScriptParser';
+import { DEFAULT_CONFIG } from '../../types';
+
+describe('IncrementalAnalyzer', () => {
+  let dir: string;
+  let filePath: string;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-watch-'));
+    filePath = path.join(dir, 'app.js');
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('should only re-analyze functions touched by an edit', () => {
+    fs.writeFileSync(filePath, [
+      'function first() { return 1; }',
+      'function second(x) {',
+      '  if (x == 1) { return 2; }',
+      '  return 3;',
+      '}',
+    ].join('\n'));
+
+    const incremental = new IncrementalAnalyzer();
+    incremental.open(filePath);
+
+    const edited = [
+      'function first(a) {',
+      '  if (a) { return 1; }',
+      '  return 0;',
+      '}',
+      'function second(x) {',
+      '  if (x == 1) { return 2; }',
+      '  return 3;',
+      '}',
+    ].join('\n');
+    fs.writeFileSync(filePath, edited);
+
+    const update = incremental.update(filePath);
+    const fresh = new JavaScriptParser(false).parse(edited, filePath);
+
+    expect(update?.reanalyzedFunctions).toBe(1);
+    expect(update?.reusedFunctions).toBe(1);
+    // Reused results are shifted to the new lines
+    expect(update?.current.functions).toEqual(fresh.functions);
+  });
+
+  it('should reuse nested functions when only their parent changed', () => {
+    const lines = [
+      'function outer(items) {',
+      '  const limit = 1;',
+      '  return items.map(item => {',
+      '    if (item > limit) { return item; }',
+      '    return 0;',
+      '  });',
+      '}',
+    ];
+    fs.writeFileSync(filePath, lines.join('\n'));
+
+    const incremental = new IncrementalAnalyzer();
+    incremental.open(filePath);
+
+    lines[1] = '  const limit = 2;';
+    const edited = lines.join('\n');
+    fs.writeFileSync(filePath, edited);
+
+    const update = incremental.update(filePath);
+    const fresh = new JavaScriptParser(false).parse(edited, filePath);
+
+    expect(update?.reanalyzedFunctions).toBe(1);
+    expect(update?.reusedFunctions).toBe(1);
+    expect(update?.current.functions).toEqual(fresh.functions);
+  });
+
+  it('should return null when the content is unchanged', () => {
+    fs.writeFileSync(filePath, 'function only() { return 1; }');
+
+    const incremental = new IncrementalAnalyzer();
+    incremental.open(filePath);
+
+    expect(incremental.update(filePath)).toBeNull();
+  });
+
+  it('should analyze under the file analyzer\'s limits', () => {
+    const minified = 'function f(a){if(a==1){return eval(a)}return 0}' + 'var x=1;'.repeat(100);
+    const limited = new FileAnalyzer(undefined, { ...DEFAULT_CONFIG, maxAstNodes: 5 });
+
+    const incremental = new IncrementalAnalyzer();
+    const measured = incremental.open(filePath, minified);
+
+    expect(measured.degraded?.errorType).toBe('MINIFIED');
+    expect(measured.totalIssues).toBe(0);
+    expect(() => new IncrementalAnalyzer(limited).open(filePath, 'function f(a) { return a + 1; }'))
+      .toThrow('nodes');
+  });
+});
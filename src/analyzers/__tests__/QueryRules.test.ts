@@ -0,0 +1,77 @@
+import Parser from 'tree-sitter';
+import JavaScript from 'tree-sitter-javascript';
+import Python from 'tree-sitter-python';
+import { matchOwnQueryRules, matchQueryRules } from '../QueryRules';
+import { TraversalEngine } from '../TraversalEngine';
+
+describe('QueryRules', () => {
+  const parse = (language: any, code: string) => {
+    const parser = new Parser();
+    parser.setLanguage(language);
+    return parser.parse(code);
+  };
+
+  it('should match each rule in source order', () => {
+    const tree = parse(JavaScript, [
+      'eval(a);',
+      'el.innerHTML = html;',
+      'console.log(x); console.error(x);',
+      'if (a == b && c != null) { Function(s); }',
+    ].join('\n'));
+
+    const results = matchQueryRules(tree.rootNode);
+
+    expect(results.get('eval-call')?.map(m => m.captures.callee.text)).toEqual(['eval', 'Function']);
+    expect(results.get('inner-html-assignment')?.map(m => m.captures.property.text)).toEqual(['innerHTML']);
+    expect(results.get('console-log')?.map(m => m.node.text)).toEqual(['console.log(x)']);
+    expect(results.get('loose-equality')?.map(m => m.captures.operator.text)).toEqual(['==', '!=']);
+  });
+
+  it('should only match inside the given subtree', () => {
+    const tree = parse(JavaScript, 'function a() { eval(x); }\nfunction b() { eval(y); }');
+    const first = tree.rootNode.descendantsOfType('function_declaration')[0];
+
+    expect(matchQueryRules(first).get('eval-call')?.map(m => m.node.text)).toEqual(['eval(x)']);
+  });
+
+  it('should give each function only the matches outside its nested functions', () => {
+    const tree = parse(JavaScript, [
+      'eval(top);',
+      'function outer() {',
+      '  eval(a);',
+      '  items.forEach(x => { eval(x); const f = function () { eval(y); }; });',
+      '  return eval(b) == (() => eval(c));',
+      '}',
+    ].join('\n'));
+    const types = ['function_declaration', 'function_expression', 'arrow_function'];
+    const own = (node: Parser.SyntaxNode) =>
+      matchOwnQueryRules(node, types).get('eval-call')?.map(m => m.node.text) ?? [];
+    const [outer] = tree.rootNode.descendantsOfType('function_declaration');
+    const [callback, returned] = tree.rootNode.descendantsOfType('arrow_function');
+    const [inner] = tree.rootNode.descendantsOfType('function_expression');
+
+    expect(own(tree.rootNode)).toEqual(['eval(top)']);
+    expect(own(outer)).toEqual(['eval(a)', 'eval(b)']);
+    expect(own(callback)).toEqual(['eval(x)']);
+    expect(own(inner)).toEqual(['eval(y)']);
+    expect(own(returned)).toEqual(['eval(c)']);
+    expect(matchOwnQueryRules(outer, types).get('loose-equality')).toHaveLength(1);
+  });
+
+  it('should not match grammars the rules do not apply to', () => {
+    const tree = parse(Python, 'eval(a)\nprint(a == b)');
+
+    expect(matchQueryRules(tree.rootNode).size).toBe(0);
+  });
+
+  it('should dispatch matches to handlers registered on the engine', () => {
+    const tree = parse(JavaScript, 'function f() { eval(a); g(); }');
+    const engine = new TraversalEngine();
+    const matched: string[] = [];
+
+    engine.onMatch('eval-call', match => matched.push(match.node.text));
+    engine.walk(tree.rootNode);
+
+    expect(matched).toEqual(['eval(a)']);
+  });
+});
@@ -0,0 +1,124 @@
+import { TraversalEngine } from '../TraversalEngine';
+import { CognitiveComplexityCalculator } from '../CognitiveComplexity';
+import { PerformanceDetector } from '../PerformanceDetector';
+import Parser from 'tree-sitter';
+import JavaScript from 'tree-sitter-javascript';
+import { IssueType } from '../../types';
+
+describe('TraversalEngine', () => {
+  let parser: Parser;
+
+  beforeEach(() => {
+    parser = new Parser();
+    parser.setLanguage(JavaScript);
+  });
+
+  it('should dispatch only registered node types', () => {
+    const code = 'function f(a) { if (a) { g(a); } return h(a); }';
+    const tree = parser.parse(code);
+    const engine = new TraversalEngine();
+    const calls: string[] = [];
+
+    engine.on(['call_expression'], node => calls.push(node.text));
+    engine.walk(tree.rootNode);
+
+    expect(calls).toEqual(['g(a)', 'h(a)']);
+  });
+
+  it('should call enter before children and leave after them', () => {
+    const code = 'for (;;) { for (;;) {} }';
+    const tree = parser.parse(code);
+    const engine = new TraversalEngine();
+    const events: string[] = [];
+
+    engine.on(
+      ['for_statement'],
+      node => events.push(`enter:${node.startIndex}`),
+      node => events.push(`leave:${node.startIndex}`)
+    );
+    engine.walk(tree.rootNode);
+
+    expect(events).toEqual(['enter:0', 'enter:11', 'leave:11', 'leave:0']);
+  });
+
+  it('should not walk past the root node', () => {
+    const code = 'function a() { x(); }\nfunction b() { y(); }';
+    const tree = parser.parse(code);
+    const first = tree.rootNode.descendantsOfType('function_declaration')[0];
+    const engine = new TraversalEngine();
+    const calls: string[] = [];
+
+    engine.on(['call_expression'], node => calls.push(node.text));
+    engine.walk(first);
+
+    expect(calls).toEqual(['x()']);
+  });
+
+  it('should track enclosing loops, catches and functions', () => {
+    const code = `
+      for (const row of rows) {
+        items.forEach((item) => {
+          try { while (item) { use(item); } } catch (e) { report(e); }
+        });
+      }
+    `;
+    const tree = parser.parse(code);
+    const callback = tree.rootNode.descendantsOfType('arrow_function')[0];
+    const engine = new TraversalEngine();
+    const seen: Array<{ call: string; loops: number; inCatch: boolean; callbacks: number }> = [];
+
+    engine.on(['call_expression'], node => seen.push({
+      call: node.text,
+      loops: engine.context.loopDepth,
+      inCatch: engine.context.inCatch,
+      callbacks: engine.context.callbacks.length,
+    }));
+    // Walking only the callback still sees the loop around it
+    engine.walk(callback);
+
+    expect(seen).toEqual([
+      { call: 'use(item)', loops: 2, inCatch: false, callbacks: 1 },
+      { call: 'report(e)', loops: 1, inCatch: true, callbacks: 1 },
+    ]);
+  });
+
+  it('should stop at skipped node types and list them', () => {
+    const code = 'function f(a) { g(a); a.map(x => h(x)); return () => k(a); }';
+    const tree = parser.parse(code);
+    const root = tree.rootNode.descendantsOfType('function_declaration')[0];
+    const engine = new TraversalEngine();
+    const calls: string[] = [];
+
+    engine.on(['call_expression'], node => calls.push(node.text));
+    engine.onSkip(['arrow_function'], () => undefined);
+    engine.walk(root);
+
+    expect(calls).toEqual(['g(a)', 'a.map(x => h(x))']);
+    expect(engine.skipped.map(node => node.text)).toEqual(['x => h(x)', '() => k(a)']);
+  });
+
+  it('should let several passes share one walk', () => {
+    const code = `
+      function search(rows) {
+        for (const row of rows) {
+          for (const cell of row) {
+            if (cell) {
+              return cell;
+            }
+          }
+        }
+      }
+    `;
+    const tree = parser.parse(code);
+    const functionNode = tree.rootNode.descendantsOfType('function_declaration')[0];
+    const engine = new TraversalEngine();
+
+    const cognitive = new CognitiveComplexityCalculator('javascript').register(engine, functionNode);
+    const performance = new PerformanceDetector(code).register(engine);
+    engine.walk(functionNode);
+
+    // if_statement is the only break-flow node, nested in two loops
+    expect(cognitive()).toBe(1);
+    expect(performance().some(issue => issue.type === IssueType.NESTED_LOOPS)).toBe(true);
+  });
+});
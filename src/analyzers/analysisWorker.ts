@@ -0,0 +1,15 @@
+import { parentPort, workerData } from 'worker_threads';
+import { FileAnalyzer } from './FileAnalyzer';
+
+/**
+ * Worker thread entry point used by AnalysisWorkerPool.
+ * Each worker keeps one FileAnalyzer, and its parsers, for its whole lifetime.
+ */
+const analyzer = new FileAnalyzer(undefined, workerData?.config);
+
+parentPort?.on('message', (task: { id: number; filePath: string; code?: string }) => {
+  const result = task.code !== undefined
+    ? analyzer.analyzeSourceWithErrors(task.code, task.filePath)
+    : analyzer.analyzeFilesWithErrors([task.filePath]);
+  parentPort!.postMessage({ id: task.id, result });
+});
@@ -0,0 +1,162 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import Parser from 'tree-sitter';
+import { FileAnalyzer } from '../analyzers/FileAnalyzer';
+import { BaseParser } from '../parsers/BaseParser';
+
+export interface BenchmarkResult {
+  name: string;
+  timestamp: string;
+  environment: {
+    node: string;
+    platform: string;
+    arch: string;
+    cpus: number;
+  };
+  corpus: Record<string, unknown>;
+  files: number;
+  failedFiles: number;
+  bytes: number;
+  astNodes: number;
+  totalIssues: number;
+  durationMs: number;
+  filesPerSecond: number;
+  bytesPerSecond: number;
+  nodesPerSecond: number;
+  latencyMs: {
+    p50: number;
+    p95: number;
+    max: number;
+  };
+  peakRssBytes: number;
+}
+
+/**
+ * Measures FileAnalyzer throughput over a set of files
+ *
+ * Files are analyzed one at a time in-process so per-file latency is
+ * meaningful. A short warm-up pass loads grammars before timing starts.
+ */
+export class Benchmark {
+  private static WARMUP_FILES = 5;
+
+  private analyzer: FileAnalyzer;
+
+  constructor(analyzer: FileAnalyzer = new FileAnalyzer()) {
+    this.analyzer = analyzer;
+  }
+
+  run(name: string, filePaths: string[], corpus: Record<string, unknown>): BenchmarkResult {
+    filePaths.slice(0, Benchmark.WARMUP_FILES).forEach(filePath => {
+      try {
+        this.analyzer.analyzeFile(filePath);
+      } catch {
+        // Failures are counted in the timed pass
+      }
+    });
+
+    const latencies: number[] = [];
+    let failedFiles = 0;
+    let totalIssues = 0;
+
+    const start = performance.now();
+    for (const filePath of filePaths) {
+      const fileStart = performance.now();
+      try {
+        totalIssues += this.analyzer.analyzeFile(filePath).totalIssues;
+      } catch {
+        failedFiles++;
+      }
+      latencies.push(performance.now() - fileStart);
+    }
+    const durationMs = performance.now() - start;
+
+    // Sizes are gathered outside the timed section so they do not skew it
+    let bytes = 0;
+    let astNodes = 0;
+    for (const filePath of filePaths) {
+      try {
+        bytes += fs.statSync(filePath).size;
+        astNodes += this.countNodes(filePath);
+      } catch {
+        // Unreadable files were already counted as failures
+      }
+    }
+
+    const seconds = durationMs / 1000;
+    const sorted = [...latencies].sort((a, b) => a - b);
+
+    return {
+      name,
+      timestamp: new Date().toISOString(),
+      environment: {
+        node: process.version,
+        platform: process.platform,
+        arch: process.arch,
+        cpus: os.cpus().length,
+      },
+      corpus,
+      files: filePaths.length,
+      failedFiles,
+      bytes,
+      astNodes,
+      totalIssues,
+      durationMs: round(durationMs),
+      filesPerSecond: round(filePaths.length / seconds),
+      bytesPerSecond: round(bytes / seconds),
+      nodesPerSecond: round(astNodes / seconds),
+      latencyMs: {
+        p50: round(percentile(sorted, 0.5)),
+        p95: round(percentile(sorted, 0.95)),
+        max: round(sorted[sorted.length - 1] ?? 0),
+      },
+      // maxRSS is reported in kilobytes
+      peakRssBytes: process.resourceUsage().maxRSS * 1024,
+    };
+  }
+
+  private countNodes(filePath: string): number {
+    const parser = this.analyzer.getParser(filePath);
+    if (!(parser instanceof BaseParser)) {
+      return 0;
+    }
+
+    const tree = parser.parseTree(fs.readFileSync(filePath, 'utf-8'));
+    return countTreeNodes(tree.rootNode);
+  }
+}
+
+function countTreeNodes(root: Parser.SyntaxNode): number {
+  const cursor = root.walk();
+  let count = 1;
+
+  // Pre-order walk; the cursor never leaves the root's subtree
+  for (;;) {
+    if (cursor.gotoFirstChild() || cursor.gotoNextSibling()) {
+      count++;
+      continue;
+    }
+
+    let advanced = false;
+    while (cursor.gotoParent()) {
+      if (cursor.gotoNextSibling()) {
+        count++;
+        advanced = true;
+        break;
+      }
+    }
+
+    if (!advanced) {
+      return count;
+    }
+  }
+}
+
+function percentile(sorted: number[], p: number): number {
+  if (sorted.length === 0) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.ceil(p * sorted.length) - 1)];
+}
+
+function round(value: number): number {
+  return Number.isFinite(value) ? Math.round(value * 100) / 100 : 0;
+}
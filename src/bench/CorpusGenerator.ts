@@ -0,0 +1,184 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { CorpusFile, CorpusLanguage, CorpusOptions, DEFAULT_CORPUS_OPTIONS } from './CorpusOptions';
+
+const EXTENSIONS: Record<CorpusLanguage, string> = {
+  javascript: '.js',
+  typescript: '.ts',
+  python: '.py',
+};
+
+/**
+ * Generates deterministic synthetic source files for benchmarking
+ *
+ * The same options always produce byte-identical files, so throughput
+ * numbers from different releases are comparable. Files are assigned
+ * languages round-robin; statement shapes, nesting and injected issues
+ * (eval, console.log/print, ==, innerHTML, magic numbers, string
+ * concatenation in loops) are drawn from a seeded PRNG.
+ */
+export class CorpusGenerator {
+  private options: CorpusOptions;
+  private random: () => number;
+
+  constructor(options: Partial<CorpusOptions> = {}) {
+    this.options = { ...DEFAULT_CORPUS_OPTIONS, ...options };
+    this.random = mulberry32(this.options.seed);
+  }
+
+  /**
+   * Generate the whole corpus
+   */
+  generate(): CorpusFile[] {
+    const files: CorpusFile[] = [];
+
+    for (let i = 0; i < this.options.files; i++) {
+      const language = this.options.languages[i % this.options.languages.length];
+      files.push({
+        relativePath: `file_${String(i).padStart(5, '0')}${EXTENSIONS[language]}`,
+        language,
+        code: this.generateFile(i, language),
+      });
+    }
+
+    return files;
+  }
+
+  /**
+   * Generate the corpus into a directory and return the written file paths
+   */
+  writeTo(directory: string): string[] {
+    fs.mkdirSync(directory, { recursive: true });
+
+    return this.generate().map(file => {
+      const filePath = path.join(directory, file.relativePath);
+      fs.writeFileSync(filePath, file.code);
+      return filePath;
+    });
+  }
+
+  private generateFile(fileIndex: number, language: CorpusLanguage): string {
+    const functions: string[] = [];
+
+    for (let i = 0; i < this.options.functionsPerFile; i++) {
+      const name = `fn_${fileIndex}_${i}`;
+      const body = this.generateBlock(this.options.nestingDepth, this.options.statementsPerFunction, language);
+      functions.push(this.wrapFunction(name, body, language));
+    }
+
+    return functions.join('\n\n') + '\n';
+  }
+
+  private wrapFunction(name: string, body: string[], language: CorpusLanguage): string {
+    const indented = body.map(line => (language === 'python' ? '    ' : '  ') + line);
+
+    switch (language) {
+      case 'python':
+        return [`def ${name}(a, b, c):`, '    total = 0', ...indented, '    return total'].join('\n');
+      case 'typescript':
+        return [
+          `function ${name}(a: number, b: number, c: any): number {`,
+          '  let total = 0;',
+          ...indented,
+          '  return total;',
+          '}',
+        ].join('\n');
+      default:
+        return [`function ${name}(a, b, c) {`, '  let total = 0;', ...indented, '  return total;', '}'].join('\n');
+    }
+  }
+
+  /**
+   * Generate `budget` statements, nesting compound statements up to `depth`
+   */
+  private generateBlock(depth: number, budget: number, language: CorpusLanguage): string[] {
+    const lines: string[] = [];
+    let remaining = budget;
+
+    while (remaining > 0) {
+      remaining--;
+
+      if (depth > 0 && remaining > 0 && this.random() < 0.35) {
+        const innerBudget = 1 + Math.floor(this.random() * Math.min(remaining, 4));
+        remaining -= innerBudget;
+        const inner = this.generateBlock(depth - 1, innerBudget, language);
+        lines.push(...this.compound(depth, inner, language));
+      } else {
+        lines.push(this.simpleStatement(language));
+      }
+    }
+
+    return lines;
+  }
+
+  private compound(depth: number, inner: string[], language: CorpusLanguage): string[] {
+    const indent = language === 'python' ? '    ' : '  ';
+    const body = inner.map(line => indent + line);
+    const loopVar = `i${depth}`;
+    const kind = Math.floor(this.random() * 3);
+
+    if (language === 'python') {
+      const header = kind === 0 ? `if a > ${depth}:`
+        : kind === 1 ? `for ${loopVar} in range(b):`
+        : `while total < ${depth * 10}:`;
+      // Keep while loops terminating
+      const tail = kind === 2 ? [`${indent}total += 1`] : [];
+      return [header, ...body, ...tail];
+    }
+
+    const header = kind === 0 ? `if (a > ${depth}) {`
+      : kind === 1 ? `for (let ${loopVar} = 0; ${loopVar} < b; ${loopVar}++) {`
+      : `while (total < ${depth * 10}) {`;
+    const tail = kind === 2 ? [`${indent}total += 1;`] : [];
+    return [header, ...body, ...tail, '}'];
+  }
+
+  private simpleStatement(language: CorpusLanguage): string {
+    if (this.random() < this.options.issueDensity) {
+      return this.issueStatement(language);
+    }
+
+    const operand = ['a', 'b', 'total'][Math.floor(this.random() * 3)];
+    const semicolon = language === 'python' ? '' : ';';
+    return `total += ${operand} * 2${semicolon}`;
+  }
+
+  private issueStatement(language: CorpusLanguage): string {
+    const kind = Math.floor(this.random() * 6);
+
+    if (language === 'python') {
+      return [
+        'eval(str(a))',
+        'print(total)',
+        'total += 86400',
+        'c.innerHTML = str(total)',
+        'total += 1 if a == b else 0',
+        'c = c + str(total)',
+      ][kind];
+    }
+
+    return [
+      'eval(String(a));',
+      'console.log(total);',
+      'total += 86400;',
+      'c.innerHTML = String(total);',
+      'if (a == b) { total += 1; }',
+      'c = c + String(total);',
+    ][kind];
+  }
+}
+
+/**
+ * Small, fast seeded PRNG
+ */
+function mulberry32(seed: number): () => number {
+  let state = seed >>> 0;
+
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
@@ -0,0 +1,30 @@
+// Kept apart from CorpusGenerator so the CLI can show the defaults in
+// its help without loading the generator
+
+export type CorpusLanguage = 'javascript' | 'typescript' | 'python';
+
+export interface CorpusOptions {
+  files: number;
+  functionsPerFile: number;
+  statementsPerFunction: number;
+  nestingDepth: number;
+  issueDensity: number; // Probability (0-1) that a statement carries a known issue
+  languages: CorpusLanguage[];
+  seed: number;
+}
+
+export interface CorpusFile {
+  relativePath: string;
+  language: CorpusLanguage;
+  code: string;
+}
+
+export const DEFAULT_CORPUS_OPTIONS: CorpusOptions = {
+  files: 200,
+  functionsPerFile: 10,
+  statementsPerFunction: 20,
+  nestingDepth: 3,
+  issueDensity: 0.1,
+  languages: ['javascript', 'typescript', 'python'],
+  seed: 42,
+};
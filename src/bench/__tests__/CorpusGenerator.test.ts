@@ -0,0 +1,29 @@
+import { CorpusGenerator } from '../CorpusGenerator';
+import { JavaScriptParser } from '../../parsers/JavaScriptParser';
+import { PythonParser } from '../../parsers/PythonParser';
+
+describe('CorpusGenerator', () => {
+  it('should generate identical corpora for the same seed', () => {
+    const options = { files: 6, functionsPerFile: 3, seed: 7 };
+
+    expect(new CorpusGenerator(options).generate()).toEqual(new CorpusGenerator(options).generate());
+    expect(new CorpusGenerator({ ...options, seed: 8 }).generate()).not.toEqual(
+      new CorpusGenerator(options).generate()
+    );
+  });
+
+  it('should generate parseable files with the requested number of functions', () => {
+    const files = new CorpusGenerator({ files: 3, functionsPerFile: 4, issueDensity: 0.5 }).generate();
+
+    expect(files.map(file => file.relativePath)).toEqual(['file_00000.js', 'file_00001.ts', 'file_00002.py']);
+
+    for (const file of files) {
+      const parser = file.language === 'python'
+        ? new PythonParser()
+        : new JavaScriptParser(file.language === 'typescript');
+      const analysis = parser.parse(file.code, file.relativePath);
+
+      expect(analysis.functions.length).toBe(4);
+    }
+  });
+});
@@ -0,0 +1,173 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as path from 'path';
+import { AnalyzerConfig, FileAnalysis } from '../types';
+
+/**
+ * Persistent on-disk cache of file analyses
+ *
+ * Entries are keyed by a hash of the file content, language, effective
+ * config and analyzer version, so an unchanged file skips parsing entirely
+ * and any change to those inputs simply misses. Each entry is a single
+ * JSON file, sharded by the first two characters of its key.
+ *
+ * The cache keeps at most `maxEntries` entries. Hits refresh an entry's
+ * modification time, and pruning removes the least recently used entries
+ * beyond the cap. The first write of a run prunes, and so does every
+ * PRUNE_INTERVAL-th write after it, so long-running processes stay
+ * bounded too.
+ */
+export class AnalysisCache {
+  private static VERSION = AnalysisCache.readAnalyzerVersion();
+  private static PRUNE_INTERVAL = 500;
+
+  private cacheDir: string;
+  private configFingerprint: string;
+  private maxEntries: number;
+  private writesSincePrune = 0;
+  private hits = 0;
+  private misses = 0;
+
+  constructor(cacheDir: string = '.complexity-cache', config?: AnalyzerConfig, maxEntries: number = 10000) {
+    this.cacheDir = cacheDir;
+    this.configFingerprint = JSON.stringify(config ?? {}, Object.keys(config ?? {}).sort());
+    this.maxEntries = maxEntries;
+  }
+
+  /**
+   * Compute the cache key for a file's content
+   */
+  getKey(code: string, language: string): string {
+    return crypto
+      .createHash('sha256')
+      .update(AnalysisCache.VERSION)
+      .update('\0')
+      .update(language)
+      .update('\0')
+      .update(this.configFingerprint)
+      .update('\0')
+      .update(code)
+      .digest('hex');
+  }
+
+  /**
+   * Load a cached analysis, re-targeted at the given file path
+   */
+  get(key: string, filePath: string): FileAnalysis | null {
+    try {
+      const entryPath = this.getEntryPath(key);
+      const entry = fs.readFileSync(entryPath, 'utf-8');
+      const analysis = JSON.parse(entry) as FileAnalysis;
+      this.touch(entryPath);
+
+      this.hits++;
+      return {
+        ...analysis,
+        filePath,
+        analysisDate: new Date(analysis.analysisDate),
+        ...(analysis.degraded && { degraded: { ...analysis.degraded, filePath } }),
+      };
+    } catch {
+      // Missing or corrupt entries are treated as misses
+      this.misses++;
+      return null;
+    }
+  }
+
+  /**
+   * Store an analysis. Write failures never fail the analysis itself.
+   */
+  set(key: string, analysis: FileAnalysis): void {
+    const entryPath = this.getEntryPath(key);
+    const tempPath = `${entryPath}.${process.pid}.tmp`;
+
+    if (this.writesSincePrune === 0) {
+      this.prune();
+    }
+    this.writesSincePrune = (this.writesSincePrune + 1) % AnalysisCache.PRUNE_INTERVAL;
+
+    try {
+      fs.mkdirSync(path.dirname(entryPath), { recursive: true });
+      // Write then rename so concurrent runs never see a partial entry
+      fs.writeFileSync(tempPath, JSON.stringify(analysis));
+      fs.renameSync(tempPath, entryPath);
+    } catch (error) {
+      console.warn(`Warning: Failed to write cache entry for ${analysis.filePath}`);
+      console.warn(error instanceof Error ? error.message : String(error));
+    }
+  }
+
+  /**
+   * Hit/miss counters for this run
+   */
+  getStats(): { hits: number; misses: number } {
+    return { hits: this.hits, misses: this.misses };
+  }
+
+  /**
+   * Remove the least recently used entries beyond the cap. Returns the
+   * number of entries removed; failures only leave the cache larger.
+   */
+  prune(): number {
+    const entries: Array<{ entryPath: string; mtimeMs: number }> = [];
+
+    try {
+      for (const shard of fs.readdirSync(this.cacheDir, { withFileTypes: true })) {
+        if (!shard.isDirectory()) {
+          continue;
+        }
+        const shardPath = path.join(this.cacheDir, shard.name);
+        for (const name of fs.readdirSync(shardPath)) {
+          if (name.endsWith('.json')) {
+            const entryPath = path.join(shardPath, name);
+            entries.push({ entryPath, mtimeMs: fs.statSync(entryPath).mtimeMs });
+          }
+        }
+      }
+    } catch {
+      // A missing cache directory has nothing to prune
+    }
+
+    if (entries.length <= this.maxEntries) {
+      return 0;
+    }
+
+    entries.sort((a, b) => a.mtimeMs - b.mtimeMs);
+    let removed = 0;
+    for (const { entryPath } of entries.slice(0, entries.length - this.maxEntries)) {
+      try {
+        fs.unlinkSync(entryPath);
+        removed++;
+      } catch {
+        // Removed concurrently by another run
+      }
+    }
+    return removed;
+  }
+
+  /**
+   * Mark an entry as recently used
+   */
+  private touch(entryPath: string): void {
+    try {
+      const now = new Date();
+      fs.utimesSync(entryPath, now, now);
+    } catch {
+      // A read-only cache still serves hits
+    }
+  }
+
+  private getEntryPath(key: string): string {
+    return path.join(this.cacheDir, key.slice(0, 2), `${key}.json`);
+  }
+
+  private static readAnalyzerVersion(): string {
+    try {
+      // Same relative location from src/cache and dist/cache
+      const packagePath = path.join(__dirname, '..', '..', 'package.json');
+      return JSON.parse(fs.readFileSync(packagePath, 'utf-8')).version;
+    } catch {
+      return 'unknown';
+    }
+  }
+}
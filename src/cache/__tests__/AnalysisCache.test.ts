@@ -0,0 +1,81 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { AnalysisCache } from '../AnalysisCache';
+import { JavaScriptParser } from '../../parsers/JavaScriptParser';
+import { DEFAULT_CONFIG } from '../../types';
+
+describe('AnalysisCache', () => {
+  let cacheDir: string;
+
+  beforeEach(() => {
+    cacheDir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-cache-'));
+  });
+
+  afterEach(() => {
+    fs.rmSync(cacheDir, { recursive: true, force: true });
+  });
+
+  it('should round-trip an analysis and count hits and misses', () => {
+    const code = 'function test(a) { if (a) { return 1; } return 0; }';
+    const analysis = new JavaScriptParser(false).parse(code, 'a.js');
+    const cache = new AnalysisCache(cacheDir, DEFAULT_CONFIG);
+    const key = cache.getKey(code, 'javascript');
+
+    expect(cache.get(key, 'a.js')).toBeNull();
+    cache.set(key, analysis);
+    const cached = cache.get(key, 'b.js');
+
+    expect(cached?.filePath).toBe('b.js');
+    expect(cached?.analysisDate).toBeInstanceOf(Date);
+    expect(cached?.functions).toEqual(analysis.functions);
+    expect(cache.getStats()).toEqual({ hits: 1, misses: 1 });
+  });
+
+  it('should re-target degraded analyses at the given file path', () => {
+    const cache = new AnalysisCache(cacheDir);
+    const key = cache.getKey('x = 1', 'javascript');
+    const analysis = new JavaScriptParser(false).parse('x = 1', 'a.js');
+    cache.set(key, { ...analysis, degraded: { filePath: 'a.js', error: 'minified', errorType: 'MINIFIED' } });
+
+    expect(cache.get(key, 'b.js')?.degraded?.filePath).toBe('b.js');
+  });
+
+  it('should prune the least recently used entries beyond the cap', () => {
+    const cache = new AnalysisCache(cacheDir, DEFAULT_CONFIG, 2);
+    const analysis = new JavaScriptParser(false).parse('x = 1', 'a.js');
+    const keys = ['x = 1', 'x = 2', 'x = 3'].map(code => cache.getKey(code, 'javascript'));
+    keys.forEach(key => cache.set(key, analysis));
+
+    // Age every entry, then use the first one again
+    const past = new Date(Date.now() - 60000);
+    keys.forEach(key => fs.utimesSync(path.join(cacheDir, key.slice(0, 2), `${key}.json`), past, past));
+    cache.get(keys[0], 'a.js');
+
+    expect(cache.prune()).toBe(1);
+    expect(cache.get(keys[0], 'a.js')).not.toBeNull();
+    expect([cache.get(keys[1], 'a.js'), cache.get(keys[2], 'a.js')].filter(Boolean)).toHaveLength(1);
+  });
+
+  it('should key entries by content, language and config', () => {
+    const cache = new AnalysisCache(cacheDir, DEFAULT_CONFIG);
+    const stricter = new AnalysisCache(cacheDir, { ...DEFAULT_CONFIG, cyclomaticThreshold: 5 });
+    const key = cache.getKey('x = 1', 'javascript');
+
+    expect(cache.getKey('x = 1', 'javascript')).toBe(key);
+    expect(cache.getKey('x = 2', 'javascript')).not.toBe(key);
+    expect(cache.getKey('x = 1', 'python')).not.toBe(key);
+    expect(stricter.getKey('x = 1', 'javascript')).not.toBe(key);
+  });
+
+  it('should treat corrupt entries as misses', () => {
+    const cache = new AnalysisCache(cacheDir);
+    const key = cache.getKey('x = 1', 'javascript');
+    const entryPath = path.join(cacheDir, key.slice(0, 2), `${key}.json`);
+    fs.mkdirSync(path.dirname(entryPath), { recursive: true });
+    fs.writeFileSync(entryPath, '{ not json');
+
+    expect(cache.get(key, 'a.js')).toBeNull();
+    expect(cache.getStats()).toEqual({ hits: 0, misses: 1 });
+  });
+});
@@ -1,32 +1,69 @@
 #!/usr/bin/env node
+// Enables the compile cache, so it must come before every other import
+import { getStartupTimings, markStartup } from '../profiling/Startup';
 
 import { Command } from 'commander';
 import * as fs from 'fs';
+import * as os from 'os';
 import * as path from 'path';
-import { glob } from 'glob';
+import { once } from 'events';
 import chalk from 'chalk';
 import { FileAnalyzer } from '../analyzers/FileAnalyzer';
-import { ConsoleReporter } from '../reporters/ConsoleReporter';
-import { HTMLReporter } from '../reporters/HTMLReporter';
-import { HistoryDatabase } from '../database/HistoryDatabase';
-import { CLIOptions } from '../types';
+import type { AnalysisStore } from '../analyzers/AnalysisStore';
+import type { DataReporter } from '../reporters/DataReporter';
+import { AnalysisList, AnalyzerConfig, CLIOptions, FileAnalysis, AnalysisError, AnalysisResult } from '../types';
 import { ConfigLoader } from '../config/ConfigLoader';
+import { AnalysisCache } from '../cache/AnalysisCache';
+import type { GitDiff } from '../discovery/GitDiff';
+import type { DaemonClient } from '../server/DaemonClient';
+import { defaultDaemonAddress, formatDaemonAddress, parseDaemonAddress } from '../server/protocol';
+import { Profiler, measure, profile } from '../profiling/Profiler';
+import { CorpusLanguage, DEFAULT_CORPUS_OPTIONS } from '../bench/CorpusOptions';
+
+// Reporters, the history database, the servers, file discovery, the
+// whole-run checks and the tree-sitter grammars are loaded by the commands
+// that use them, so short commands such as `init` and `stats` start quickly
 
 const program = new Command();
 
 program
   .name('complexity')
   .description('Code Complexity Analyzer - Analyze code quality and complexity')
-  .version('0.1.0');
+  .version('0.1.0')
+  .option('--timings', 'Print startup and command timings to stderr');
+
+program.hook('postAction', async () => {
+  markStartup('command');
+  if (program.opts().timings) {
+    const { ConsoleReporter } = await import('../reporters/ConsoleReporter');
+    new ConsoleReporter().reportTimings(getStartupTimings(), console.error);
+  }
+});
 
 program
   .command('analyze <path>')
   .description('Analyze a file or directory')
   .option('-l, --language <lang>', 'Filter by language (js, ts, py)')
-  .option('-o, --output <format>', 'Output format (table, json, html)', 'table')
+  .option('-o, --output <format>', 'Output format (table, json, ndjson, csv, html)', 'table')
   .option('-t, --threshold <number>', 'Complexity threshold for warnings', '10')
   .option('--history', 'Track in database for historical analysis')
   .option('--recursive', 'Recursively analyze directories', true)
+  .option('--git-ls-files', 'List files with git ls-files instead of walking directories')
+  .option('--since <ref>', 'Only analyze files changed since a git revision, reporting changed functions')
+  .option('--previous-metrics', 'With --since, include each changed function\'s metrics at that revision')
+  .option('-j, --jobs <number>', 'Number of worker threads to analyze files with', '1')
+  .option('--no-cache', 'Disable the incremental analysis cache')
+  .option('--cache-dir <path>', 'Directory for the incremental analysis cache', '.complexity-cache')
+  .option('--profile', 'Print a per-stage, per-detector and per-file timing breakdown')
+  .option('--trace-out <file>', 'Write Chrome trace-event JSON of the profiled run (implies --profile)')
+  .option('--fixes', 'Generate fix suggestions for issues in JSON and NDJSON output, and in the table for a single file')
+  .option('--max-file-bytes <bytes>', 'Skip files larger than this')
+  .option('--max-ast-nodes <count>', 'Skip files whose analysis walks more syntax nodes than this')
+  .option('--file-timeout <ms>', 'Skip files that take longer than this to analyze')
+  .option('--include-generated', 'Fully analyze minified and generated files instead of measuring them only')
+  .option('--duplicates', 'Report functions duplicated across the analyzed files')
+  .option('--dependencies', 'Report import cycles and hub modules from the module dependency graph')
+  .option('--no-daemon', 'Analyze in this process even when a `complexity serve` daemon is running')
   .action(async (targetPath: string, options) => {
     try {
       await analyzeCommand(targetPath, options);
@@ -36,14 +73,115 @@ program
     }
   });
 
+program
+  .command('watch <path>')
+  .description('Watch files and re-analyze only the functions each change touches')
+  .option('-l, --language <lang>', 'Filter by language (js, ts, py)')
+  .option('--git-ls-files', 'List files with git ls-files instead of walking directories')
+  .option('--max-file-bytes <bytes>', 'Skip files larger than this')
+  .option('--max-ast-nodes <count>', 'Skip files whose analysis walks more syntax nodes than this')
+  .option('--file-timeout <ms>', 'Skip files that take longer than this to analyze')
+  .option('--include-generated', 'Fully analyze minified and generated files instead of measuring them only')
+  .action(async (targetPath: string, options) => {
+    try {
+      await watchCommand(targetPath, options);
+    } catch (error) {
+      console.error(chalk.red('Error:'), error instanceof Error ? error.message : error);
+      process.exit(1);
+    }
+  });
+
+program
+  .command('deps <path>')
+  .description('Export the module dependency graph with fan-in, fan-out and import cycles')
+  .option('-l, --language <lang>', 'Filter by language (js, ts, py)')
+  .option('-f, --format <format>', 'Graph format (json, dot)', 'json')
+  .option('--out <file>', 'Write the graph to a file instead of stdout')
+  .option('--git-ls-files', 'List files with git ls-files instead of walking directories')
+  .option('-j, --jobs <number>', 'Number of worker threads to analyze files with', '1')
+  .option('--no-cache', 'Disable the incremental analysis cache')
+  .option('--cache-dir <path>', 'Directory for the incremental analysis cache', '.complexity-cache')
+  .action(async (targetPath: string, options) => {
+    try {
+      await depsCommand(targetPath, options);
+    } catch (error) {
+      console.error(chalk.red('Error:'), error instanceof Error ? error.message : error);
+      process.exit(1);
+    }
+  });
+
+program
+  .command('bench [path]')
+  .description('Benchmark analyzer throughput on a synthetic corpus, a directory or the bundled examples')
+  .option('--examples', 'Benchmark the bundled examples/ fixtures')
+  .option('--files <number>', 'Number of generated files', String(DEFAULT_CORPUS_OPTIONS.files))
+  .option('--functions <number>', 'Functions per generated file', String(DEFAULT_CORPUS_OPTIONS.functionsPerFile))
+  .option('--statements <number>', 'Statements per generated function', String(DEFAULT_CORPUS_OPTIONS.statementsPerFunction))
+  .option('--depth <number>', 'Maximum nesting depth of generated code', String(DEFAULT_CORPUS_OPTIONS.nestingDepth))
+  .option('--issue-density <number>', 'Probability (0-1) that a generated statement carries an issue', String(DEFAULT_CORPUS_OPTIONS.issueDensity))
+  .option('--languages <list>', 'Comma-separated generated languages (js, ts, py)', 'js,ts,py')
+  .option('--seed <number>', 'Seed for the corpus generator', String(DEFAULT_CORPUS_OPTIONS.seed))
+  .option('--out <file>', 'Write the JSON result to a file instead of stdout')
+  .action(async (targetPath: string | undefined, options) => {
+    try {
+      await benchCommand(targetPath, options);
+    } catch (error) {
+      console.error(chalk.red('Error:'), error instanceof Error ? error.message : error);
+      process.exit(1);
+    }
+  });
+
+program
+  .command('serve')
+  .description('Run an analysis daemon that keeps parsers, config and recent results warm')
+  .option('--socket <path>', 'Unix socket or named pipe to listen on (default: one per project)')
+  .option('--port <number>', 'Listen on a localhost TCP port instead of a socket')
+  .option('--lru-size <number>', 'Recent results kept in memory', '5000')
+  .option('--no-cache', 'Disable the on-disk analysis cache')
+  .option('--cache-dir <path>', 'Directory for the on-disk analysis cache', '.complexity-cache')
+  .option('--status', 'Print the running daemon\'s statistics')
+  .option('--stop', 'Stop the running daemon')
+  .action(async (options) => {
+    try {
+      await serveCommand(options);
+    } catch (error) {
+      console.error(chalk.red('Error:'), error instanceof Error ? error.message : error);
+      process.exit(1);
+    }
+  });
+
+program
+  .command('lsp')
+  .description('Run a language server that publishes issues as editor diagnostics')
+  .option('--stdio', 'Communicate over stdin and stdout (the default)')
+  .option('--debounce <ms>', 'Quiet period after an edit before re-analyzing', '250')
+  .action(async (options) => {
+    const { LanguageServer } = await import('../lsp/LanguageServer');
+    const { LspConnection } = await import('../lsp/LspConnection');
+
+    // stdout carries the protocol, so nothing else may be printed to it
+    const server = new LanguageServer(new LspConnection(process.stdin, process.stdout), {
+      debounceMs: Math.max(0, parseInt(options.debounce, 10) || 0),
+    });
+    server.listen();
+  });
+
 program
   .command('report')
   .description('Generate a detailed report from history')
   .option('-i, --id <id>', 'Analysis ID from history')
   .option('-o, --output <path>', 'Output file path', 'complexity-report.html')
-  .option('-f, --format <format>', 'Output format (html, json)', 'html')
+  .option('-f, --format <format>', 'Output format (html, json, ndjson, csv)', 'html')
   .action(async (options) => {
     try {
+      const { DataReporter, isDataFormat } = await import('../reporters/DataReporter');
+      if (options.format !== 'html' && !isDataFormat(options.format)) {
+        throw new Error(`Unknown report format: ${options.format}`);
+      }
+
+      // Machine-readable output owns stdout, so progress messages go to stderr
+      const log = options.format === 'html' ? console.log : console.error;
+      const { HistoryDatabase } = await import('../database/HistoryDatabase');
       const db = new HistoryDatabase();
 
       let analyses;
@@ -51,27 +189,33 @@ program
       if (options.id) {
         const record = db.getAnalysis(options.id);
         if (!record) {
-          console.log(chalk.red(`❌ Analysis not found: ${options.id}`));
+          log(chalk.red(`❌ Analysis not found: ${options.id}`));
           return;
         }
         analyses = record.analyses;
-        console.log(chalk.cyan(`📊 Generating report for analysis ${options.id}`));
+        log(chalk.cyan(`📊 Generating report for analysis ${options.id}`));
       } else {
         const recent = db.getRecentAnalyses(1);
         if (recent.length === 0) {
-          console.log(chalk.yellow('⚠️  No analyses found in history'));
-          console.log(chalk.white('Run "complexity analyze <path> --history" to save analyses'));
+          log(chalk.yellow('⚠️  No analyses found in history'));
+          log(chalk.white('Run "complexity analyze <path> --history" to save analyses'));
           return;
         }
-        analyses = recent[0].analyses;
-        console.log(chalk.cyan(`📊 Generating report for latest analysis`));
+        analyses = db.getAnalysis(recent[0].id)!.analyses;
+        log(chalk.cyan(`📊 Generating report for latest analysis`));
       }
 
-      if (options.format === 'json') {
-        console.log(JSON.stringify(analyses, null, 2));
+      if (isDataFormat(options.format)) {
+        const reporter = new DataReporter(options.format);
+        await writeStdout(reporter.header());
+        for (const analysis of analyses) {
+          await writeStdout(reporter.serialize(analysis));
+        }
+        await writeStdout(reporter.footer());
       } else {
+        const { HTMLReporter } = await import('../reporters/HTMLReporter');
         const htmlReporter = new HTMLReporter();
-        htmlReporter.generateReport(analyses, options.output);
+        await htmlReporter.generateReport(analyses, options.output);
       }
     } catch (error) {
       console.error(chalk.red('Error:'), error instanceof Error ? error.message : error);
@@ -85,8 +229,12 @@ program
   .option('-l, --list', 'List recent analyses')
   .option('-c, --compare <id1,id2>', 'Compare two analyses')
   .option('-f, --file <path>', 'Show history for a specific file')
-  .action((options) => {
+  .option('-d, --dir <path>', 'Show history for the files under a directory')
+  .option('-g, --granularity <period>', 'Points of --file and --dir history (run, day, week)', 'run')
+  .option('--limit <number>', 'Most recent points of --file and --dir history to show', '30')
+  .action(async (options) => {
     try {
+      const { HistoryDatabase } = await import('../database/HistoryDatabase');
       const db = new HistoryDatabase();
 
       if (options.list) {
@@ -138,20 +286,30 @@ program
         return;
       }
 
-      if (options.file) {
-        const history = db.getFileHistory(options.file);
+      if (options.file || options.dir) {
+        const granularity = options.granularity;
+        if (!['run', 'day', 'week'].includes(granularity)) {
+          throw new Error(`Unknown granularity: ${granularity}`);
+        }
+
+        // Paths are recorded as analyzed; relative ones are also tried from here
+        const target: string = options.file ?? options.dir;
+        const series = (candidate: string) => options.file
+          ? db.getFileSeries(candidate, granularity)
+          : db.getDirectorySeries(candidate, granularity);
+        let points = series(target);
+        if (points.length === 0 && !path.isAbsolute(target)) {
+          points = series(path.resolve(target));
+        }
 
-        if (history.length === 0) {
-          console.log(chalk.yellow(`⚠️  No history found for ${options.file}`));
+        if (points.length === 0) {
+          console.log(chalk.yellow(`⚠️  No history found for ${target}`));
           return;
         }
 
-        console.log(chalk.cyan.bold(`\n📈 History for ${options.file}\n`));
-        history.forEach(record => {
-          const date = new Date(record.timestamp).toLocaleString();
-          console.log(chalk.white(`${date}:`));
-          console.log(chalk.gray(`  Complexity: ${record.metrics.cyclomaticComplexity}, Issues: ${record.issues}`));
-        });
+        const limit = Math.max(1, parseInt(options.limit, 10) || 30);
+        const { ConsoleReporter } = await import('../reporters/ConsoleReporter');
+        new ConsoleReporter().reportSeries(`History for ${target}`, points.slice(-limit), granularity);
         console.log('');
         return;
       }
@@ -194,7 +352,17 @@ program
   });
 
 async function analyzeCommand(targetPath: string, options: CLIOptions) {
-  console.log(chalk.cyan.bold('\n🔍 Code Complexity Analyzer\n'));
+  const { DataReporter, isDataFormat } = await import('../reporters/DataReporter');
+  const output = options.output ?? 'table';
+  if (!['table', 'html'].includes(output) && !isDataFormat(output)) {
+    throw new Error(`Unknown output format: ${output}`);
+  }
+
+  // Machine-readable output owns stdout, so progress messages go to stderr
+  const dataOutput = isDataFormat(output);
+  const log = dataOutput ? console.error : console.log;
+
+  log(chalk.cyan.bold('\n🔍 Code Complexity Analyzer\n'));
 
   // Load configuration
   const config = ConfigLoader.loadConfig(process.cwd());
@@ -203,6 +371,13 @@ async function analyzeCommand(targetPath: string, options: CLIOptions) {
   if (options.threshold) {
     config.cyclomaticThreshold = parseInt(options.threshold, 10);
   }
+  applyLimitOptions(config, options);
+  if (options.duplicates) {
+    config.detectDuplicates = true;
+  }
+  if (options.dependencies) {
+    config.analyzeDependencies = true;
+  }
 
   // Resolve path
   const absolutePath = path.resolve(targetPath);
@@ -211,49 +386,560 @@ async function analyzeCommand(targetPath: string, options: CLIOptions) {
     throw new Error(`Path does not exist: ${absolutePath}`);
   }
 
-  const analyzer = new FileAnalyzer();
-  const consoleReporter = new ConsoleReporter();
-  const htmlReporter = new HTMLReporter();
+  // Workers are not instrumented, so a profiled run analyzes on this thread
+  const profiler = options.profile || options.traceOut ? Profiler.start() : null;
+  let jobs = Math.max(1, parseInt(options.jobs || '1', 10) || 1);
+  if (profiler && jobs > 1) {
+    log(chalk.yellow('⚠️  --profile analyzes on the main thread; ignoring --jobs'));
+    jobs = 1;
+  }
+
+  const cache = options.cache === false ? undefined : new AnalysisCache(options.cacheDir, config);
+  const analyzer = new FileAnalyzer(cache, config);
+  // A running daemon analyzes unless the run must be fresh or profiled here
+  let daemon: DaemonClient | null = null;
+  if (options.daemon !== false && options.cache !== false && !profiler) {
+    const { DaemonClient } = await import('../server/DaemonClient');
+    daemon = await DaemonClient.connect(defaultDaemonAddress(), config);
+  }
 
   // Get files to analyze
-  const filesToAnalyze = await getFilesToAnalyze(absolutePath, analyzer, options);
+  const discoveryStart = performance.now();
+  let filesToAnalyze = await getFilesToAnalyze(absolutePath, analyzer, options);
+  const diff = options.since
+    ? (await import('../discovery/GitDiff')).GitDiff.load(absolutePath, options.since)
+    : null;
+  if (diff) {
+    filesToAnalyze = filesToAnalyze.filter(filePath => diff.has(filePath));
+  }
+  profiler?.add('stage', 'discover', performance.now() - discoveryStart);
 
   if (filesToAnalyze.length === 0) {
-    console.log(chalk.yellow('⚠️  No supported files found'));
+    log(chalk.yellow(diff ? `⚠️  No supported files changed since ${diff.ref}` : '⚠️  No supported files found'));
+    daemon?.close();
     return;
   }
 
-  console.log(chalk.white(`Analyzing ${filesToAnalyze.length} file(s)...\n`));
+  // Only functions that overlap changed lines are reported
+  const scope = diff
+    ? (analysis: FileAnalysis) => diff.scope(
+        analysis,
+        options.previousMetrics ? analyzePrevious(analyzer, diff, analysis.filePath) : null
+      )
+    : undefined;
+
+  log(chalk.white(`Analyzing ${filesToAnalyze.length} file(s)...\n`));
+
+  // Analyze files; whole-run reports read them back from a compact store.
+  // Whole-run checks only report once every file is in, so streaming waits.
+  const source = daemon ?? analyzer;
+  const checks = await createRunChecks(config);
+  const fixes = options.fixes === true && output !== 'csv';
+  let analyses: AnalysisStore;
+  try {
+    analyses = isDataFormat(output) && checks.length === 0
+      ? await writeData(
+          source,
+          filesToAnalyze,
+          jobs,
+          options.history === true,
+          fixes,
+          new DataReporter(output),
+          scope
+        )
+      : await collectAnalyses(source, filesToAnalyze, jobs, scope, checks);
+  } finally {
+    daemon?.close();
+  }
 
-  // Analyze files
-  const analyses = analyzer.analyzeFiles(filesToAnalyze);
+  if (isDataFormat(output) && checks.length > 0) {
+    await writeAnalyses(analyses, fixes, new DataReporter(output));
+  }
 
-  if (analyses.length === 0) {
-    console.log(chalk.red('❌ No files could be analyzed'));
+  if (analyses.length === 0 && !dataOutput) {
+    log(chalk.red('❌ No files could be analyzed'));
     return;
   }
 
   // Save to history database if requested
-  if (options.history) {
+  if (options.history && analyses.length > 0) {
+    const { HistoryDatabase } = await import('../database/HistoryDatabase');
     const db = new HistoryDatabase();
     const analysisId = db.saveAnalysis(analyses);
-    console.log(chalk.green(`✓ Saved to history database (ID: ${analysisId})`));
+    log(chalk.green(`✓ Saved to history database (ID: ${analysisId})`));
   }
 
-  // Output results
-  if (options.output === 'json') {
-    console.log(JSON.stringify(analyses, null, 2));
-  } else if (options.output === 'html') {
+  // Output results (machine-readable output has already been streamed)
+  const { ConsoleReporter } = await import('../reporters/ConsoleReporter');
+  const consoleReporter = new ConsoleReporter();
+  const fixer = output === 'table' && options.fixes ? await import('../analyzers/FixGenerator') : null;
+
+  if (output === 'html') {
+    const reportStart = performance.now();
     const outputFile = 'complexity-report.html';
-    htmlReporter.generateReport(analyses, outputFile);
+    const { HTMLReporter } = await import('../reporters/HTMLReporter');
+    await new HTMLReporter().generateReport(analyses, outputFile);
+    profiler?.add('stage', 'report', performance.now() - reportStart);
+  } else if (output === 'table') {
+    profile('stage', 'report', () => {
+      // Default: console output. Only the single-file view shows fixes.
+      if (analyses.length === 1) {
+        const files = analyses.slice(0, 1);
+        fixer?.attachFixes(files);
+        consoleReporter.reportFile(files[0]);
+      } else {
+        consoleReporter.reportMultipleFiles(analyses);
+      }
+    });
+  }
+
+  if (daemon) {
+    log(chalk.gray(`\nAnalyzed by the daemon at ${formatDaemonAddress(defaultDaemonAddress())}`));
+  } else if (cache) {
+    const { hits, misses } = cache.getStats();
+    log(chalk.gray(`\nCache: ${hits} hit(s), ${misses} miss(es)`));
+  }
+
+  if (profiler) {
+    Profiler.stop();
+    // Profile output goes to stderr so it never mixes with report output
+    consoleReporter.reportProfile(profiler.getReport(), console.error);
+
+    if (options.traceOut) {
+      profiler.writeTrace(options.traceOut);
+      console.error(chalk.green(`✓ Trace written to ${options.traceOut}`));
+    }
+  }
+}
+
+/**
+ * A check over the whole run: fed every analysis, then asked to annotate
+ * each once all files are in
+ */
+interface RunCheck {
+  add(analysis: FileAnalysis): void;
+  // Whether annotate() has any issues to attach
+  finish(): boolean;
+  annotate(analysis: FileAnalysis): FileAnalysis;
+}
+
+async function createRunChecks(config: AnalyzerConfig): Promise<RunCheck[]> {
+  const checks: RunCheck[] = [];
+
+  if (config.detectDuplicates) {
+    const { DuplicateDetector } = await import('../analyzers/DuplicateDetector');
+    const duplicates = new DuplicateDetector(config.duplicateSimilarity);
+    checks.push({
+      add: analysis => duplicates.add(analysis),
+      finish: () => profile('stage', 'duplicates', () => duplicates.detect()).length > 0,
+      annotate: analysis => duplicates.annotate(analysis),
+    });
+  }
+
+  if (config.analyzeDependencies) {
+    const { DependencyGraph } = await import('../analyzers/DependencyGraph');
+    const graph = new DependencyGraph();
+    checks.push({
+      add: analysis => graph.add(analysis),
+      finish: () => {
+        profile('stage', 'dependencies', () => graph.analyze());
+        return graph.hasIssues;
+      },
+      annotate: analysis => graph.annotate(analysis),
+    });
+  }
+
+  return checks;
+}
+
+/**
+ * Analyzes files in this process (FileAnalyzer) or in a daemon (DaemonClient)
+ */
+interface AnalysisSource {
+  analyzeFilesStream(filePaths: string[], jobs: number): AsyncGenerator<AnalysisResult>;
+}
+
+/**
+ * Stream analyses to stdout as they finish, serialized by `reporter`.
+ * Analyses are only kept, in a store, when `keep` is set (e.g. for --history).
+ */
+async function writeData(
+  source: AnalysisSource,
+  filePaths: string[],
+  jobs: number,
+  keep: boolean,
+  fixes: boolean,
+  reporter: DataReporter,
+  scope?: (analysis: FileAnalysis) => FileAnalysis
+): Promise<AnalysisStore> {
+  const { AnalysisStore } = await import('../analyzers/AnalysisStore');
+  const fixer = fixes ? await import('../analyzers/FixGenerator') : null;
+  const kept = new AnalysisStore();
+  const failed: AnalysisError[] = [];
+
+  await writeStdout(reporter.header());
+
+  for await (const result of source.analyzeFilesStream(filePaths, jobs)) {
+    failed.push(...result.failed);
+    const successful = scope ? result.successful.map(scope) : result.successful;
+
+    fixer?.attachFixes(successful);
+
+    for (const analysis of successful) {
+      if (keep) {
+        kept.add(analysis);
+      }
+
+      // Respect stdout backpressure before pulling the next result
+      await writeStdout(measure('stage', 'report', () => reporter.serialize(analysis)));
+    }
+  }
+
+  await writeStdout(reporter.footer());
+  logFailures(failed);
+
+  return kept;
+}
+
+/**
+ * Write analyses that were collected first, serialized by `reporter`
+ */
+async function writeAnalyses(analyses: AnalysisList, fixes: boolean, reporter: DataReporter): Promise<void> {
+  const fixer = fixes ? await import('../analyzers/FixGenerator') : null;
+  await writeStdout(reporter.header());
+
+  for (const analysis of analyses) {
+    fixer?.attachFixes([analysis]);
+    await writeStdout(measure('stage', 'report', () => reporter.serialize(analysis)));
+  }
+
+  await writeStdout(reporter.footer());
+}
+
+/**
+ * Analyze files into a compact store, for reports that need the whole run.
+ * Each analysis is dropped once stored; the store reads them back in path
+ * order, as discovered, rather than in the order they finished. Issues
+ * of whole-run checks are attached once all files are in.
+ */
+async function collectAnalyses(
+  source: AnalysisSource,
+  filePaths: string[],
+  jobs: number,
+  scope?: (analysis: FileAnalysis) => FileAnalysis,
+  checks: RunCheck[] = []
+): Promise<AnalysisStore> {
+  const { AnalysisStore } = await import('../analyzers/AnalysisStore');
+  const store = new AnalysisStore();
+  const failed: AnalysisError[] = [];
+
+  for await (const result of source.analyzeFilesStream(filePaths, jobs)) {
+    failed.push(...result.failed);
+    result.successful.forEach(analysis => {
+      checks.forEach(check => check.add(analysis));
+      store.add(scope ? scope(analysis) : analysis);
+    });
+  }
+
+  store.sortByPath();
+  logFailures(failed);
+
+  // Every check runs, even when an earlier one found issues
+  const found = checks.filter(check => check.finish());
+  if (found.length === 0) {
+    return store;
+  }
+
+  const annotated = new AnalysisStore();
+  for (const analysis of store) {
+    annotated.add(found.reduce((current, check) => check.annotate(current), analysis));
+  }
+  return annotated;
+}
+
+function logFailures(failed: AnalysisError[]): void {
+  if (failed.length > 0) {
+    console.error(`\n⚠️  Failed to analyze ${failed.length} file(s):`);
+    failed.forEach(err => {
+      console.error(`  - ${err.filePath}: ${err.error}`);
+    });
+  }
+}
+
+/**
+ * Override the analysis limits of `config` with those given on the command line
+ */
+function applyLimitOptions(config: AnalyzerConfig, options: CLIOptions): void {
+  if (options.maxFileBytes) {
+    config.maxFileBytes = parseInt(options.maxFileBytes, 10);
+  }
+  if (options.maxAstNodes) {
+    config.maxAstNodes = parseInt(options.maxAstNodes, 10);
+  }
+  if (options.fileTimeout) {
+    config.fileTimeoutMs = parseInt(options.fileTimeout, 10);
+  }
+  if (options.includeGenerated) {
+    config.detectGenerated = false;
+  }
+}
+
+/**
+ * Analyze a file as it was at the diff's revision, under the same limits
+ * as the current version; null when it did not exist there or cannot be
+ * analyzed
+ */
+function analyzePrevious(analyzer: FileAnalyzer, diff: GitDiff, filePath: string): FileAnalysis | null {
+  const code = diff.readPrevious(filePath);
+  if (code === null) {
+    return null;
+  }
+
+  try {
+    return analyzer.analyzeSource(code, filePath);
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Write to stdout, waiting for it to drain when its buffer is full
+ */
+async function writeStdout(chunk: string): Promise<void> {
+  if (chunk.length > 0 && !process.stdout.write(chunk)) {
+    await once(process.stdout, 'drain');
+  }
+}
+
+/**
+ * Analyze files for their imports only as far as the cache does not have
+ * them, and write the resolved module graph
+ */
+async function depsCommand(targetPath: string, options: CLIOptions & { format?: string; out?: string }) {
+  const { GraphReporter, isGraphFormat } = await import('../reporters/GraphReporter');
+  const format = options.format ?? 'json';
+  if (!isGraphFormat(format)) {
+    throw new Error(`Unknown graph format: ${format}`);
+  }
+
+  const absolutePath = path.resolve(targetPath);
+  if (!fs.existsSync(absolutePath)) {
+    throw new Error(`Path does not exist: ${absolutePath}`);
+  }
+
+  const config = ConfigLoader.loadConfig(process.cwd());
+  config.analyzeDependencies = true;
+  const cache = options.cache === false ? undefined : new AnalysisCache(options.cacheDir, config);
+  const analyzer = new FileAnalyzer(cache, config);
+  const jobs = Math.max(1, parseInt(options.jobs || '1', 10) || 1);
+  const filesToAnalyze = await getFilesToAnalyze(absolutePath, analyzer, options);
+
+  const { DependencyGraph } = await import('../analyzers/DependencyGraph');
+  const graph = new DependencyGraph();
+  const failed: AnalysisError[] = [];
+  for await (const result of analyzer.analyzeFilesStream(filesToAnalyze, jobs)) {
+    failed.push(...result.failed);
+    result.successful.forEach(analysis => graph.add(analysis));
+  }
+  logFailures(failed);
+
+  const report = graph.analyze();
+  const root = fs.statSync(absolutePath).isDirectory() ? absolutePath : path.dirname(absolutePath);
+  const text = new GraphReporter(format, root).serialize(report);
+
+  if (options.out) {
+    fs.writeFileSync(options.out, text);
+    console.error(chalk.green(`✓ Graph written to ${options.out}`));
+  } else {
+    await writeStdout(text);
+  }
+  console.error(chalk.gray(
+    `${report.modules.length} module(s), ${report.edges.length} import(s), ${report.cycles.length} cycle(s)`
+  ));
+}
+
+async function watchCommand(targetPath: string, options: CLIOptions) {
+  const absolutePath = path.resolve(targetPath);
+
+  if (!fs.existsSync(absolutePath)) {
+    throw new Error(`Path does not exist: ${absolutePath}`);
+  }
+
+  const config = ConfigLoader.loadConfig(process.cwd());
+  applyLimitOptions(config, options);
+
+  const { IncrementalAnalyzer } = await import('../analyzers/IncrementalAnalyzer');
+  const { ConsoleReporter } = await import('../reporters/ConsoleReporter');
+  const analyzer = new FileAnalyzer(undefined, config);
+  const incremental = new IncrementalAnalyzer(analyzer);
+  const consoleReporter = new ConsoleReporter();
+  const files = await getFilesToAnalyze(absolutePath, analyzer, options);
+
+  for (const filePath of files) {
+    try {
+      incremental.open(filePath);
+    } catch (error) {
+      console.error(chalk.red(`  - ${filePath}: ${error instanceof Error ? error.message : error}`));
+    }
+  }
+
+  console.log(chalk.cyan.bold(`\n👀 Watching ${files.length} file(s) in ${targetPath} (Ctrl+C to stop)`));
+
+  // Editors often write a file in several steps, so changes are debounced per file
+  const pending = new Map<string, NodeJS.Timeout>();
+  const isDirectory = fs.statSync(absolutePath).isDirectory();
+  const ignored = /[\\/](node_modules|dist|build|\.git)[\\/]/;
+
+  const handleChange = (filePath: string) => {
+    pending.delete(filePath);
+
+    if (!fs.existsSync(filePath)) {
+      if (incremental.close(filePath)) {
+        console.log(chalk.red(`\n✗ ${filePath} removed`));
+      }
+      return;
+    }
+
+    try {
+      const update = incremental.update(filePath);
+      if (update) {
+        consoleReporter.reportDelta(update);
+      }
+    } catch (error) {
+      console.error(chalk.red(`\n✗ ${filePath}: ${error instanceof Error ? error.message : error}`));
+    }
+  };
+
+  fs.watch(absolutePath, { recursive: isDirectory }, (_event, filename) => {
+    const filePath = isDirectory && filename ? path.join(absolutePath, filename.toString()) : absolutePath;
+
+    if (!analyzer.isSupported(filePath) || ignored.test(filePath)) {
+      return;
+    }
+
+    clearTimeout(pending.get(filePath));
+    pending.set(filePath, setTimeout(() => handleChange(filePath), 20));
+  });
+}
+
+async function benchCommand(targetPath: string | undefined, options: any) {
+  const { Benchmark } = await import('../bench/Benchmark');
+  const analyzer = new FileAnalyzer();
+  const benchmark = new Benchmark(analyzer);
+  let result;
+
+  if (targetPath || options.examples) {
+    const absolutePath = targetPath
+      ? path.resolve(targetPath)
+      : path.resolve(__dirname, '../../examples');
+
+    if (!fs.existsSync(absolutePath)) {
+      throw new Error(`Path does not exist: ${absolutePath}`);
+    }
+
+    const files = await getFilesToAnalyze(absolutePath, analyzer, options);
+    console.error(chalk.gray(`Benchmarking ${files.length} file(s) in ${absolutePath}...`));
+    result = benchmark.run(targetPath ? 'directory' : 'examples', files, { path: absolutePath });
   } else {
-    // Default: console output
-    if (analyses.length === 1) {
-      consoleReporter.reportFile(analyses[0]);
-    } else {
-      consoleReporter.reportMultipleFiles(analyses);
+    const languageNames: Record<string, CorpusLanguage> = {
+      js: 'javascript',
+      ts: 'typescript',
+      py: 'python',
+    };
+    const languages = String(options.languages).split(',').map(name => {
+      const language = languageNames[name.trim()];
+      if (!language) {
+        throw new Error(`Unknown corpus language: ${name}`);
+      }
+      return language;
+    });
+
+    const corpus = {
+      files: parseInt(options.files, 10),
+      functionsPerFile: parseInt(options.functions, 10),
+      statementsPerFunction: parseInt(options.statements, 10),
+      nestingDepth: parseInt(options.depth, 10),
+      issueDensity: parseFloat(options.issueDensity),
+      languages,
+      seed: parseInt(options.seed, 10),
+    };
+
+    const { CorpusGenerator } = await import('../bench/CorpusGenerator');
+    const corpusDir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-bench-'));
+    try {
+      const files = new CorpusGenerator(corpus).writeTo(corpusDir);
+      console.error(chalk.gray(`Benchmarking ${files.length} generated file(s)...`));
+      result = benchmark.run('synthetic', files, { ...corpus });
+    } finally {
+      fs.rmSync(corpusDir, { recursive: true, force: true });
     }
   }
+
+  const json = JSON.stringify(result, null, 2);
+  if (options.out) {
+    fs.writeFileSync(options.out, json + '\n');
+    console.error(chalk.green(`✓ Benchmark result written to ${options.out}`));
+  } else {
+    console.log(json);
+  }
+}
+
+async function serveCommand(options: any) {
+  const address = options.port
+    ? parseDaemonAddress(String(options.port))
+    : options.socket
+      ? { path: path.resolve(options.socket) }
+      : defaultDaemonAddress();
+  const where = formatDaemonAddress(address);
+
+  if (options.status || options.stop) {
+    const { DaemonClient } = await import('../server/DaemonClient');
+    const client = await DaemonClient.connect(address);
+    if (!client) {
+      console.log(chalk.yellow(`⚠️  No daemon is running at ${where}`));
+      return;
+    }
+
+    try {
+      if (options.stop) {
+        await client.shutdown();
+        console.log(chalk.green(`✓ Stopped the daemon at ${where}`));
+      } else {
+        const stats = await client.stats();
+        console.log(chalk.cyan.bold(`\n🛰️  Analysis daemon at ${stats.address} (pid ${stats.pid})\n`));
+        console.log(chalk.white(`   Uptime: ${Math.round(stats.uptimeMs / 1000)}s`));
+        console.log(chalk.white(`   Requests: ${stats.requests}`));
+        console.log(chalk.white(`   Files analyzed: ${stats.filesAnalyzed}`));
+        console.log(chalk.white(`   Warm configs: ${stats.analyzers}`));
+        console.log(chalk.white(
+          `   Recent results: ${stats.results.size}/${stats.results.maxEntries} ` +
+          `(${stats.results.hits} hit(s), ${stats.results.misses} miss(es))`
+        ));
+        console.log(chalk.white(`   Memory: ${(stats.rssBytes / 1024 / 1024).toFixed(1)} MB`));
+      }
+    } finally {
+      client.close();
+    }
+    return;
+  }
+
+  const { AnalysisServer } = await import('../server/AnalysisServer');
+  const server = new AnalysisServer({
+    address,
+    config: ConfigLoader.loadConfig(process.cwd()),
+    cacheDir: options.cache === false ? null : path.resolve(options.cacheDir),
+    lruSize: Math.max(0, parseInt(options.lruSize, 10) || 0),
+  });
+  await server.listen();
+  console.log(chalk.green(`✓ Analysis daemon listening on ${where} (pid ${process.pid})`));
+  console.log(chalk.gray('  complexity analyze now uses it from this project; stop it with --stop or Ctrl+C'));
+
+  const stop = () => void server.close();
+  process.once('SIGINT', stop);
+  process.once('SIGTERM', stop);
+
+  await server.closed();
+  console.log(chalk.gray('Daemon stopped'));
 }
 
 async function getFilesToAnalyze(
@@ -262,28 +948,19 @@ async function getFilesToAnalyze(
   options: CLIOptions
 ): Promise<string[]> {
   const stat = fs.statSync(targetPath);
+  const extensions = analyzer.getSupportedExtensions(options.language);
 
   if (stat.isFile()) {
     if (!analyzer.isSupported(targetPath)) {
       throw new Error(`File type not supported: ${path.extname(targetPath)}`);
     }
-    return [targetPath];
-  }
-
-  // Directory - glob for supported files
-  const extensions = analyzer.getSupportedExtensions();
-  const patterns = extensions.map(ext => `**/*${ext}`);
-
-  let files: string[] = [];
-  for (const pattern of patterns) {
-    const globPattern = path.join(targetPath, pattern).replace(/\\/g, '/');
-    const matches = await glob(globPattern, {
-      ignore: ['**/node_modules/**', '**/dist/**', '**/build/**', '**/.git/**'],
-    });
-    files = files.concat(matches);
+    return extensions.includes(path.extname(targetPath)) ? [targetPath] : [];
   }
 
-  return files;
+  // Directory - one walk for all extensions, honoring ignore files
+  const { FileDiscovery } = await import('../discovery/FileDiscovery');
+  const discovery = new FileDiscovery({ extensions, gitLsFiles: options.gitLsFiles === true });
+  return discovery.discover(targetPath);
 }
 
 // Display banner
@@ -298,7 +975,8 @@ function showBanner() {
   `));
 }
 
-program.parse(process.argv);
+markStartup('modules');
+program.parseAsync(process.argv);
 
 // Show help if no command provided
 if (!process.argv.slice(2).length) {
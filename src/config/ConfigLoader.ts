@@ -106,6 +106,27 @@ export class ConfigLoader {
       errors.push('maxParameters must be at least 0');
     }
 
+    if (config.maxFileBytes !== undefined && config.maxFileBytes < 1) {
+      errors.push('maxFileBytes must be at least 1');
+    }
+
+    if (config.maxAstNodes !== undefined && config.maxAstNodes < 1) {
+      errors.push('maxAstNodes must be at least 1');
+    }
+
+    if (config.fileTimeoutMs !== undefined && config.fileTimeoutMs < 1) {
+      errors.push('fileTimeoutMs must be at least 1');
+    }
+
+    if (config.minDuplicateTokens !== undefined && config.minDuplicateTokens < 1) {
+      errors.push('minDuplicateTokens must be at least 1');
+    }
+
+    if (config.duplicateSimilarity !== undefined &&
+        (config.duplicateSimilarity <= 0 || config.duplicateSimilarity > 1)) {
+      errors.push('duplicateSimilarity must be greater than 0 and at most 1');
+    }
+
     return errors;
   }
 }
@@ -1,56 +1,100 @@
+import * as crypto from 'crypto';
 import * as fs from 'fs';
 import * as path from 'path';
-import { FileAnalysis } from '../types';
+import { AnalysisList, FileAnalysis, FunctionInfo, IssueCategory } from '../types';
+
+// Granularities rolled up on every save
+const ROLLUP_GRANULARITIES: ReadonlyArray<Exclude<SeriesGranularity, 'run'>> = ['day', 'week'];
+// Enough to hold the last line of a rollup log
+const TAIL_BYTES = 4096;
 
 /**
- * Simple file-based database for tracking historical analysis results
- * Uses JSON for simplicity (can be replaced with SQLite if needed)
+ * Append-only, indexed store for tracking historical analysis results
+ *
+ * Layout of the store directory:
+ * - analyses.ndjson: one line per analysis holding its FileAnalysis[] (data log)
+ * - index.ndjson:    one summary line per analysis, with the byte range of its
+ *                    entry in the data log
+ * - files/<hash>.ndjson: per-file history, one line per analysis of that file
+ * - dirs/<hash>.ndjson:  per-directory totals, one line per analysis of files
+ *                        under that directory
+ * - rollups/<day|week>/<hash>.ndjson: per-file and per-directory series
+ *                        downsampled to one line per day or week
+ *
+ * Saving appends, except that the last line of a rollup log is rewritten
+ * while its day or week is still current. Only the small summary index is
+ * loaded on open, so lookups by id, timestamp, file or directory do not
+ * depend on how many FileAnalysis records the history holds, and rollups
+ * answer long-horizon trend queries in one short read. Rollups outlive
+ * pruning, so trends reach back past the kept analyses. A legacy
+ * .complexity-history.json file is migrated on first open. The directories
+ * are created by the first save, so reading never writes to disk.
  */
 export class HistoryDatabase {
-  private dbPath: string;
-  private data: DatabaseSchema;
-
-  constructor(dbPath: string = '.complexity-history.json') {
-    this.dbPath = dbPath;
-    this.data = this.loadDatabase();
+  private storeDir: string;
+  private legacyPath: string;
+  private summaries: AnalysisSummary[] = [];
+  private summariesById: Map<string, IndexEntry> = new Map();
+  private directoriesCreated = false;
+
+  constructor(dbPath: string = '.complexity-history') {
+    this.storeDir = dbPath.endsWith('.json') ? dbPath.slice(0, -'.json'.length) : dbPath;
+    this.legacyPath = `${this.storeDir}.json`;
+
+    this.loadIndex();
+    this.migrateLegacyDatabase();
   }
 
   /**
    * Store analysis results
    */
-  saveAnalysis(analyses: FileAnalysis[]): string {
-    const analysisId = this.generateId();
-    const timestamp = new Date().toISOString();
+  saveAnalysis(analyses: AnalysisList): string {
+    let totalIssues = 0;
+    let totalFunctions = 0;
+    let totalComplexity = 0;
+    for (const analysis of analyses) {
+      totalIssues += analysis.totalIssues;
+      totalFunctions += analysis.functions.length;
+      totalComplexity += analysis.overallMetrics.cyclomaticComplexity;
+    }
 
-    const record: AnalysisRecord = {
-      id: analysisId,
-      timestamp,
+    return this.appendRecord({
+      id: this.generateId(),
+      timestamp: new Date().toISOString(),
       files: analyses.length,
-      totalIssues: analyses.reduce((sum, a) => sum + a.totalIssues, 0),
-      totalFunctions: analyses.reduce((sum, a) => sum + a.functions.length, 0),
-      avgComplexity: this.calculateAvgComplexity(analyses),
+      totalIssues,
+      totalFunctions,
+      avgComplexity: analyses.length > 0 ? Math.round((totalComplexity / analyses.length) * 10) / 10 : 0,
       analyses,
-    };
-
-    this.data.analyses.push(record);
-    this.data.lastUpdated = timestamp;
-
-    this.saveDatabase();
-    return analysisId;
+    });
   }
 
   /**
-   * Get analysis by ID
+   * Get analysis by ID, including its file analyses
    */
   getAnalysis(id: string): AnalysisRecord | null {
-    return this.data.analyses.find(a => a.id === id) || null;
+    const entry = this.summariesById.get(id);
+    if (!entry) return null;
+
+    const fd = fs.openSync(this.dataPath, 'r');
+    try {
+      const buffer = Buffer.alloc(entry.length);
+      fs.readSync(fd, buffer, 0, entry.length, entry.offset);
+      const analyses: FileAnalysis[] = JSON.parse(buffer.toString('utf-8'));
+      return { ...this.toSummary(entry), analyses };
+    } finally {
+      fs.closeSync(fd);
+    }
   }
 
   /**
-   * Get recent analyses
+   * Get recent analyses, newest first (summaries only; use getAnalysis
+   * to load the file analyses of one)
    */
-  getRecentAnalyses(limit: number = 10): AnalysisRecord[] {
-    return this.data.analyses
+  getRecentAnalyses(limit: number = 10): AnalysisSummary[] {
+    // Reversed first so records saved within the same millisecond keep newest-first order
+    return [...this.summaries]
+      .reverse()
       .sort((a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime())
       .slice(0, limit);
   }
@@ -59,29 +103,61 @@ export class HistoryDatabase {
    * Get analyses for a specific file
    */
   getFileHistory(filePath: string): FileHistory[] {
-    const history: FileHistory[] = [];
-
-    this.data.analyses.forEach(record => {
-      const fileAnalysis = record.analyses.find(a => a.filePath === filePath);
-      if (fileAnalysis) {
-        history.push({
-          timestamp: record.timestamp,
-          metrics: fileAnalysis.overallMetrics,
-          issues: fileAnalysis.totalIssues,
-        });
-      }
-    });
+    const historyPath = this.getFileHistoryPath(filePath);
+    if (!fs.existsSync(historyPath)) return [];
+
+    return this.readLines<FileHistoryEntry>(historyPath)
+      // Entries of pruned analyses stay in the log but are no longer indexed
+      .filter(entry => entry.filePath === filePath && this.summariesById.has(entry.analysisId))
+      .map(({ timestamp, metrics, issues, categories }) => ({ timestamp, metrics, issues, categories }))
+      .sort((a, b) => new Date(a.timestamp).getTime() - new Date(b.timestamp).getTime());
+  }
+
+  /**
+   * A file's metrics over time, oldest first: one point per analysis, or
+   * per day or week (UTC) averaged over that period's analyses
+   */
+  getFileSeries(filePath: string, granularity: SeriesGranularity = 'run'): SeriesPoint[] {
+    if (granularity !== 'run') {
+      return this.readRollup(granularity, `file:${filePath}`);
+    }
 
-    return history.sort((a, b) =>
-      new Date(a.timestamp).getTime() - new Date(b.timestamp).getTime()
-    );
+    return this.getFileHistory(filePath).map(({ timestamp, metrics, issues, categories }) => ({
+      timestamp,
+      runs: 1,
+      files: 1,
+      cyclomatic: metrics.cyclomaticComplexity,
+      cognitive: metrics.cognitiveComplexity ?? 0,
+      issues,
+      issuesByCategory: categories ?? {},
+    }));
+  }
+
+  /**
+   * Totals of the files under a directory over time, oldest first, like
+   * getFileSeries. Directories are recorded up to the deepest one holding
+   * every file of an analysis.
+   */
+  getDirectorySeries(dirPath: string, granularity: SeriesGranularity = 'run'): SeriesPoint[] {
+    const normalized = normalizeDirectory(dirPath);
+    if (granularity !== 'run') {
+      return this.readRollup(granularity, `dir:${normalized}`);
+    }
+
+    const historyPath = this.seriesPath('dirs', normalized);
+    if (!fs.existsSync(historyPath)) return [];
+
+    return this.readLines<DirectoryHistoryEntry>(historyPath)
+      .filter(entry => entry.dirPath === normalized && this.summariesById.has(entry.analysisId))
+      .map(entry => toPoint(entry.timestamp, 1, entry))
+      .sort((a, b) => new Date(a.timestamp).getTime() - new Date(b.timestamp).getTime());
   }
 
   /**
    * Get statistics over time
    */
   getStatistics(): DatabaseStatistics {
-    if (this.data.analyses.length === 0) {
+    if (this.summaries.length === 0) {
       return {
         totalAnalyses: 0,
         totalFiles: 0,
@@ -91,11 +167,11 @@ export class HistoryDatabase {
       };
     }
 
-    const totalAnalyses = this.data.analyses.length;
-    const totalFiles = this.data.analyses.reduce((sum, a) => sum + a.files, 0);
-    const totalIssues = this.data.analyses.reduce((sum, a) => sum + a.totalIssues, 0);
+    const totalAnalyses = this.summaries.length;
+    const totalFiles = this.summaries.reduce((sum, a) => sum + a.files, 0);
+    const totalIssues = this.summaries.reduce((sum, a) => sum + a.totalIssues, 0);
     const avgIssuesPerFile = totalIssues / totalFiles;
-    const avgComplexity = this.data.analyses.reduce((sum, a) => sum + a.avgComplexity, 0) / totalAnalyses;
+    const avgComplexity = this.summaries.reduce((sum, a) => sum + a.avgComplexity, 0) / totalAnalyses;
 
     // Calculate trend (comparing last 5 vs previous 5)
     const trend = this.calculateTrend();
@@ -113,8 +189,8 @@ export class HistoryDatabase {
    * Compare two analyses
    */
   compareAnalyses(id1: string, id2: string): ComparisonResult | null {
-    const analysis1 = this.getAnalysis(id1);
-    const analysis2 = this.getAnalysis(id2);
+    const analysis1 = this.summariesById.get(id1);
+    const analysis2 = this.summariesById.get(id2);
 
     if (!analysis1 || !analysis2) return null;
 
@@ -129,65 +205,257 @@ export class HistoryDatabase {
   }
 
   /**
-   * Clear old analyses (keep last N)
+   * Clear old analyses (keep last N). This is the only operation that
+   * rewrites the store: the data log is compacted to the kept entries.
    */
   pruneHistory(keepLast: number = 50): number {
-    const originalLength = this.data.analyses.length;
+    const kept = this.getRecentAnalyses(keepLast)
+      .map(summary => this.summariesById.get(summary.id)!)
+      .reverse();
+    const removed = this.summaries.length - kept.length;
+    if (removed === 0) return 0;
+
+    const dataTemp = `${this.dataPath}.tmp`;
+    const indexTemp = `${this.indexPath}.tmp`;
+    const source = fs.openSync(this.dataPath, 'r');
+    const target = fs.openSync(dataTemp, 'w');
+    const index: IndexEntry[] = [];
+    let offset = 0;
 
-    this.data.analyses = this.data.analyses
-      .sort((a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime())
-      .slice(0, keepLast);
+    try {
+      for (const entry of kept) {
+        const buffer = Buffer.alloc(entry.length);
+        fs.readSync(source, buffer, 0, entry.length, entry.offset);
+        fs.writeSync(target, buffer);
+        fs.writeSync(target, '\n');
+        index.push({ ...entry, offset });
+        offset += entry.length + 1;
+      }
+    } finally {
+      fs.closeSync(source);
+      fs.closeSync(target);
+    }
+
+    fs.writeFileSync(indexTemp, index.map(entry => JSON.stringify(entry) + '\n').join(''));
+    fs.renameSync(dataTemp, this.dataPath);
+    fs.renameSync(indexTemp, this.indexPath);
 
-    this.saveDatabase();
-    return originalLength - this.data.analyses.length;
+    this.summaries = [];
+    this.summariesById.clear();
+    index.forEach(entry => this.addToIndex(entry));
+
+    return removed;
   }
 
-  private loadDatabase(): DatabaseSchema {
-    if (!fs.existsSync(this.dbPath)) {
-      return {
-        version: 1,
-        createdAt: new Date().toISOString(),
-        lastUpdated: new Date().toISOString(),
-        analyses: [],
-      };
+  private get dataPath(): string {
+    return path.join(this.storeDir, 'analyses.ndjson');
+  }
+
+  private get indexPath(): string {
+    return path.join(this.storeDir, 'index.ndjson');
+  }
+
+  private getFileHistoryPath(filePath: string): string {
+    return this.seriesPath('files', filePath);
+  }
+
+  private seriesPath(subdirectory: string, key: string): string {
+    const hash = crypto.createHash('sha1').update(key).digest('hex');
+    return path.join(this.storeDir, subdirectory, `${hash}.ndjson`);
+  }
+
+  /**
+   * Append a record: data first, then per-file and per-directory history,
+   * then the index line, then the rollups. A record only becomes visible
+   * once its index line is written, so an interrupted save leaves at most
+   * unreferenced bytes, or a rollup missing that analysis, behind.
+   */
+  private appendRecord(record: AnalysisSummary & { analyses: AnalysisList }): string {
+    this.createDirectories();
+    const { analyses, ...summary } = record;
+    // Serialized one analysis at a time, so a store is never materialized whole
+    const serialized: string[] = [];
+    const history: FileHistoryEntry[] = [];
+    let root: string | null = null;
+    for (const analysis of analyses) {
+      serialized.push(JSON.stringify(analysis));
+      history.push({
+        filePath: analysis.filePath,
+        analysisId: record.id,
+        timestamp: record.timestamp,
+        metrics: analysis.overallMetrics,
+        issues: analysis.totalIssues,
+        categories: countCategories(analysis),
+      });
+      root = commonDirectory(root, path.dirname(analysis.filePath));
+    }
+    const directories = root === null ? new Map<string, SeriesTotals>() : directoryTotals(history, root);
+    const data = Buffer.from(`[${serialized.join(',')}]`, 'utf-8');
+
+    const offset = fs.existsSync(this.dataPath) ? fs.statSync(this.dataPath).size : 0;
+    fs.appendFileSync(this.dataPath, Buffer.concat([data, Buffer.from('\n')]));
+
+    for (const entry of history) {
+      fs.appendFileSync(this.getFileHistoryPath(entry.filePath), JSON.stringify(entry) + '\n');
+    }
+    for (const [dirPath, totals] of directories) {
+      const entry: DirectoryHistoryEntry = { dirPath, analysisId: record.id, timestamp: record.timestamp, ...totals };
+      fs.appendFileSync(this.seriesPath('dirs', dirPath), JSON.stringify(entry) + '\n');
+    }
+
+    const entry: IndexEntry = { ...summary, offset, length: data.length };
+    fs.appendFileSync(this.indexPath, JSON.stringify(entry) + '\n');
+    this.addToIndex(entry);
+
+    for (const granularity of ROLLUP_GRANULARITIES) {
+      const bucket = bucketStart(record.timestamp, granularity);
+      for (const file of history) {
+        this.rollUp(granularity, { key: `file:${file.filePath}`, bucket, runs: 1, ...fileTotals(file) });
+      }
+      for (const [dirPath, totals] of directories) {
+        this.rollUp(granularity, { key: `dir:${dirPath}`, bucket, runs: 1, ...totals });
+      }
+    }
+
+    return record.id;
+  }
+
+  /**
+   * Fold one analysis into a rollup log. The log's last line is rewritten
+   * in place while its bucket is current, so the log holds one line per
+   * bucket; a torn rewrite is skipped on read like any torn line.
+   */
+  private rollUp(granularity: Exclude<SeriesGranularity, 'run'>, point: RollupEntry): void {
+    const rollupPath = this.seriesPath(path.join('rollups', granularity), point.key);
+    if (!fs.existsSync(rollupPath)) {
+      fs.appendFileSync(rollupPath, JSON.stringify(point) + '\n');
+      return;
     }
 
+    const fd = fs.openSync(rollupPath, 'r+');
     try {
-      const content = fs.readFileSync(this.dbPath, 'utf-8');
-      return JSON.parse(content);
-    } catch (error) {
-      console.warn('Failed to load history database, creating new one');
-      return {
-        version: 1,
-        createdAt: new Date().toISOString(),
-        lastUpdated: new Date().toISOString(),
-        analyses: [],
-      };
+      const size = fs.fstatSync(fd).size;
+      const tailLength = Math.min(size, TAIL_BYTES);
+      const tail = Buffer.alloc(tailLength);
+      fs.readSync(fd, tail, 0, tailLength, size - tailLength);
+
+      // Start of the last line, when it fits in the tail. A line without
+      // its newline was torn by an interrupted save and is written over.
+      const lineStart = tail.lastIndexOf('\n', tailLength - 2) + 1;
+      const found = lineStart > 0 || tailLength === size;
+      const torn = tail[tailLength - 1] !== 0x0a;
+      let last: RollupEntry | null = null;
+      if (found && !torn) {
+        try {
+          last = JSON.parse(tail.subarray(lineStart).toString('utf-8'));
+        } catch {
+          // Unreadable line; the bucket starts over
+        }
+      }
+
+      const merged = last && last.key === point.key && last.bucket === point.bucket ? mergeRollup(last, point) : null;
+      const separator = torn && !found ? '\n' : '';
+      const line = Buffer.from(separator + JSON.stringify(merged ?? point) + '\n', 'utf-8');
+      const position = merged || (torn && found) ? size - tailLength + lineStart : size;
+      fs.writeSync(fd, line, 0, line.length, position);
+      fs.ftruncateSync(fd, position + line.length);
+    } finally {
+      fs.closeSync(fd);
     }
   }
 
-  private saveDatabase(): void {
-    const content = JSON.stringify(this.data, null, 2);
-    fs.writeFileSync(this.dbPath, content, 'utf-8');
+  private createDirectories(): void {
+    if (this.directoriesCreated) return;
+
+    fs.mkdirSync(path.join(this.storeDir, 'files'), { recursive: true });
+    fs.mkdirSync(path.join(this.storeDir, 'dirs'), { recursive: true });
+    ROLLUP_GRANULARITIES.forEach(granularity =>
+      fs.mkdirSync(path.join(this.storeDir, 'rollups', granularity), { recursive: true }));
+    this.directoriesCreated = true;
   }
 
-  private generateId(): string {
-    return `analysis_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
+  private readRollup(granularity: Exclude<SeriesGranularity, 'run'>, key: string): SeriesPoint[] {
+    const rollupPath = this.seriesPath(path.join('rollups', granularity), key);
+    if (!fs.existsSync(rollupPath)) return [];
+
+    return this.readLines<RollupEntry>(rollupPath)
+      .filter(entry => entry.key === key)
+      .map(entry => toPoint(new Date(entry.bucket).toISOString(), entry.runs, entry));
+  }
+
+  private loadIndex(): void {
+    if (!fs.existsSync(this.indexPath)) return;
+
+    this.readLines<IndexEntry>(this.indexPath).forEach(entry => this.addToIndex(entry));
   }
 
-  private calculateAvgComplexity(analyses: FileAnalysis[]): number {
-    const total = analyses.reduce((sum, a) => sum + a.overallMetrics.cyclomaticComplexity, 0);
-    return analyses.length > 0 ? Math.round((total / analyses.length) * 10) / 10 : 0;
+  private addToIndex(entry: IndexEntry): void {
+    this.summaries.push(this.toSummary(entry));
+    this.summariesById.set(entry.id, entry);
   }
 
+  private toSummary(entry: IndexEntry): AnalysisSummary {
+    const { offset, length, ...summary } = entry;
+    return summary;
+  }
+
+  /**
+   * Parse an NDJSON file, skipping a torn final line from an interrupted write
+   */
+  private readLines<T>(filePath: string): T[] {
+    const entries: T[] = [];
+
+    for (const line of fs.readFileSync(filePath, 'utf-8').split('\n')) {
+      if (!line) continue;
+      try {
+        entries.push(JSON.parse(line));
+      } catch {
+        console.warn(`Skipping unreadable history entry in ${filePath}`);
+      }
+    }
+
+    return entries;
+  }
+
+  /**
+   * One-time import of the old single-file JSON database
+   */
+  private migrateLegacyDatabase(): void {
+    if (!fs.existsSync(this.legacyPath) || this.summaries.length > 0) return;
+
+    try {
+      const legacy: LegacyDatabaseSchema = JSON.parse(fs.readFileSync(this.legacyPath, 'utf-8'));
+      const records = [...(legacy.analyses || [])].sort((a, b) =>
+        new Date(a.timestamp).getTime() - new Date(b.timestamp).getTime()
+      );
+
+      records.forEach(record => this.appendRecord(record));
+      fs.renameSync(this.legacyPath, `${this.legacyPath}.migrated`);
+      console.warn(`Migrated ${records.length} analyses from ${this.legacyPath}`);
+    } catch (error) {
+      console.warn(`Failed to migrate history database ${this.legacyPath}`);
+      console.warn(error instanceof Error ? error.message : String(error));
+    }
+  }
+
+  private generateId(): string {
+    return `analysis_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
+  }
+
+  /**
+   * Issues per file of the last 5 analyses against the 5 before them.
+   * Per-file rates keep runs over more or fewer files comparable.
+   */
   private calculateTrend(): 'improving' | 'degrading' | 'stable' {
-    if (this.data.analyses.length < 6) return 'stable';
+    if (this.summaries.length < 6) return 'stable';
 
-    const recent = this.data.analyses.slice(-5);
-    const previous = this.data.analyses.slice(-10, -5);
+    const recent = this.summaries.slice(-5);
+    const previous = this.summaries.slice(-10, -5);
+    const issuesPerFile = (runs: AnalysisSummary[]) =>
+      runs.reduce((sum, a) => sum + (a.files > 0 ? a.totalIssues / a.files : 0), 0) / runs.length;
 
-    const recentAvg = recent.reduce((sum, a) => sum + a.totalIssues, 0) / recent.length;
-    const previousAvg = previous.reduce((sum, a) => sum + a.totalIssues, 0) / previous.length;
+    const recentAvg = issuesPerFile(recent);
+    const previousAvg = issuesPerFile(previous);
 
     const diff = recentAvg - previousAvg;
 
@@ -197,27 +465,86 @@ export class HistoryDatabase {
   }
 }
 
-interface DatabaseSchema {
+interface LegacyDatabaseSchema {
   version: number;
   createdAt: string;
   lastUpdated: string;
   analyses: AnalysisRecord[];
 }
 
-interface AnalysisRecord {
+export interface AnalysisSummary {
   id: string;
   timestamp: string;
   files: number;
   totalIssues: number;
   totalFunctions: number;
   avgComplexity: number;
+}
+
+export interface AnalysisRecord extends AnalysisSummary {
   analyses: FileAnalysis[];
 }
 
+interface IndexEntry extends AnalysisSummary {
+  offset: number;
+  length: number;
+}
+
+interface FileHistoryEntry extends FileHistory {
+  filePath: string;
+  analysisId: string;
+}
+
 interface FileHistory {
   timestamp: string;
   metrics: any;
   issues: number;
+  // Absent from entries saved before categories were recorded
+  categories?: CategoryCounts;
+}
+
+type CategoryCounts = Partial<Record<IssueCategory, number>>;
+
+export type SeriesGranularity = 'run' | 'day' | 'week';
+
+/**
+ * Metrics of a file, or totals of the files under a directory, at one
+ * analysis or averaged over the analyses of a day or week
+ */
+export interface SeriesPoint {
+  // The analysis time, or the start of the day or week (UTC)
+  timestamp: string;
+  // Analyses summarized by this point
+  runs: number;
+  files: number;
+  cyclomatic: number;
+  cognitive: number;
+  issues: number;
+  issuesByCategory: CategoryCounts;
+}
+
+interface SeriesTotals {
+  files: number;
+  cyclomatic: number;
+  cognitive: number;
+  issues: number;
+  categories: CategoryCounts;
+}
+
+interface DirectoryHistoryEntry extends SeriesTotals {
+  dirPath: string;
+  analysisId: string;
+  timestamp: string;
+}
+
+/**
+ * Sums over the `runs` analyses of a bucket
+ */
+interface RollupEntry extends SeriesTotals {
+  key: string;
+  // Start of the day or week, as YYYY-MM-DD (UTC)
+  bucket: string;
+  runs: number;
 }
 
 interface DatabaseStatistics {
@@ -236,3 +563,126 @@ interface ComparisonResult {
   complexityDiff: number;
   improvement: boolean;
 }
+
+/**
+ * Issues per category over a file's functions and methods, each counted
+ * once even when a method is also listed as a function
+ */
+function countCategories(analysis: FileAnalysis): CategoryCounts {
+  const counts: CategoryCounts = {};
+  const seen: Set<string> = new Set();
+  const count = (fn: FunctionInfo) => {
+    const key = `${fn.startLine}:${fn.name}`;
+    if (seen.has(key)) return;
+    seen.add(key);
+    for (const issue of fn.issues) {
+      counts[issue.category] = (counts[issue.category] ?? 0) + 1;
+    }
+  };
+
+  analysis.functions.forEach(count);
+  analysis.classes.forEach(cls => cls.methods.forEach(count));
+  return counts;
+}
+
+function fileTotals(entry: FileHistoryEntry): SeriesTotals {
+  return {
+    files: 1,
+    cyclomatic: entry.metrics.cyclomaticComplexity,
+    cognitive: entry.metrics.cognitiveComplexity ?? 0,
+    issues: entry.issues,
+    categories: entry.categories ?? {},
+  };
+}
+
+/**
+ * Totals of every directory from each file's own up to `root`
+ */
+function directoryTotals(history: FileHistoryEntry[], root: string): Map<string, SeriesTotals> {
+  const directories: Map<string, SeriesTotals> = new Map();
+
+  for (const file of history) {
+    const totals = fileTotals(file);
+    for (let dir = normalizeDirectory(path.dirname(file.filePath)); ; dir = path.dirname(dir)) {
+      const current = directories.get(dir);
+      directories.set(dir, current ? addTotals(current, totals) : totals);
+      if (dir === root || path.dirname(dir) === dir) break;
+    }
+  }
+
+  return directories;
+}
+
+function addTotals(a: SeriesTotals, b: SeriesTotals): SeriesTotals {
+  const categories: CategoryCounts = { ...a.categories };
+  for (const [category, count] of Object.entries(b.categories) as Array<[IssueCategory, number]>) {
+    categories[category] = (categories[category] ?? 0) + count;
+  }
+
+  return {
+    files: a.files + b.files,
+    cyclomatic: a.cyclomatic + b.cyclomatic,
+    cognitive: a.cognitive + b.cognitive,
+    issues: a.issues + b.issues,
+    categories,
+  };
+}
+
+function mergeRollup(a: RollupEntry, b: RollupEntry): RollupEntry {
+  return { key: a.key, bucket: a.bucket, runs: a.runs + b.runs, ...addTotals(a, b) };
+}
+
+/**
+ * Averages of totals summed over `runs` analyses, to one decimal
+ */
+function toPoint(timestamp: string, runs: number, totals: SeriesTotals): SeriesPoint {
+  const mean = (value: number) => Math.round((value / runs) * 10) / 10;
+  const issuesByCategory: CategoryCounts = {};
+  for (const [category, count] of Object.entries(totals.categories) as Array<[IssueCategory, number]>) {
+    issuesByCategory[category] = mean(count);
+  }
+
+  return {
+    timestamp,
+    runs,
+    files: mean(totals.files),
+    cyclomatic: mean(totals.cyclomatic),
+    cognitive: mean(totals.cognitive),
+    issues: mean(totals.issues),
+    issuesByCategory,
+  };
+}
+
+/**
+ * Deepest directory holding both `current` (null for none yet) and `dir`
+ */
+function commonDirectory(current: string | null, dir: string): string {
+  let common = current === null ? normalizeDirectory(dir) : current;
+  const target = normalizeDirectory(dir);
+  while (!isWithin(common, target) && path.dirname(common) !== common) {
+    common = path.dirname(common);
+  }
+  return common;
+}
+
+function isWithin(dir: string, target: string): boolean {
+  const relative = path.relative(dir, target);
+  return relative === '' || (!relative.startsWith('..') && !path.isAbsolute(relative));
+}
+
+function normalizeDirectory(dirPath: string): string {
+  const normalized = path.normalize(dirPath);
+  return normalized.length > 1 && normalized.endsWith(path.sep) ? normalized.slice(0, -1) : normalized;
+}
+
+/**
+ * Start of the UTC day, or of the UTC week starting on Monday, holding
+ * `timestamp`, as YYYY-MM-DD
+ */
+function bucketStart(timestamp: string, granularity: Exclude<SeriesGranularity, 'run'>): string {
+  const date = new Date(timestamp);
+  if (granularity === 'week') {
+    date.setUTCDate(date.getUTCDate() - ((date.getUTCDay() + 6) % 7));
+  }
+  return date.toISOString().slice(0, 10);
+}
@@ -0,0 +1,173 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { HistoryDatabase } from '../HistoryDatabase';
+import { FileAnalysis, IssueCategory, IssueType } from '../../types';
+
+function makeAnalysis(filePath: string, complexity: number, issues: number): FileAnalysis {
+  return {
+    filePath,
+    language: 'JavaScript',
+    overallMetrics: {
+      cyclomaticComplexity: complexity,
+      cognitiveComplexity: 0,
+      linesOfCode: 10,
+      effectiveLinesOfCode: 8,
+      nestingDepth: 1,
+      functionLength: 10,
+      parameterCount: 0,
+    },
+    functions: [],
+    classes: [],
+    totalIssues: issues,
+    analysisDate: new Date(),
+  };
+}
+
+describe('HistoryDatabase', () => {
+  let dir: string;
+  let dbPath: string;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-history-'));
+    dbPath = path.join(dir, '.complexity-history');
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('should read back saved analyses after reopening', () => {
+    const db = new HistoryDatabase(dbPath);
+    const first = db.saveAnalysis([makeAnalysis('a.js', 2, 1)]);
+    const second = db.saveAnalysis([makeAnalysis('a.js', 4, 3), makeAnalysis('b.js', 1, 0)]);
+
+    const reopened = new HistoryDatabase(dbPath);
+
+    expect(reopened.getAnalysis(first)?.analyses.map(a => a.filePath)).toEqual(['a.js']);
+    expect(reopened.getAnalysis(second)?.files).toBe(2);
+    expect(reopened.getRecentAnalyses(1)[0].id).toBe(second);
+    expect(reopened.getFileHistory('a.js').map(h => h.issues)).toEqual([1, 3]);
+    expect(reopened.getFileHistory('b.js').length).toBe(1);
+  });
+
+  it('should drop pruned analyses from every lookup', () => {
+    const db = new HistoryDatabase(dbPath);
+    const old = db.saveAnalysis([makeAnalysis('a.js', 2, 1)]);
+    const kept = db.saveAnalysis([makeAnalysis('a.js', 3, 2)]);
+
+    expect(db.pruneHistory(1)).toBe(1);
+    expect(db.getAnalysis(old)).toBeNull();
+    expect(db.getAnalysis(kept)?.analyses[0].totalIssues).toBe(2);
+    expect(new HistoryDatabase(dbPath).getFileHistory('a.js').map(h => h.issues)).toEqual([2]);
+  });
+
+  it('should not create the store until the first save', () => {
+    const db = new HistoryDatabase(dbPath);
+
+    expect(db.getStatistics().totalAnalyses).toBe(0);
+    expect(fs.existsSync(dbPath)).toBe(false);
+
+    db.saveAnalysis([makeAnalysis('a.js', 2, 1)]);
+    expect(fs.existsSync(path.join(dbPath, 'rollups', 'week'))).toBe(true);
+  });
+
+  it('should base the trend on issues per file', () => {
+    const db = new HistoryDatabase(dbPath);
+    // Runs over one file, then runs over the whole project with fewer issues per file
+    for (let i = 0; i < 5; i++) {
+      db.saveAnalysis([makeAnalysis('a.js', 2, 2)]);
+    }
+    for (let i = 0; i < 5; i++) {
+      db.saveAnalysis(['a.js', 'b.js', 'c.js', 'd.js'].map(file => makeAnalysis(file, 2, 1)));
+    }
+
+    expect(db.getStatistics().trend).toBe('improving');
+  });
+
+  it('should migrate a legacy JSON database once', () => {
+    const legacyPath = `${dbPath}.json`;
+    fs.writeFileSync(legacyPath, JSON.stringify({
+      version: 1,
+      createdAt: '2024-01-01T00:00:00.000Z',
+      lastUpdated: '2024-01-02T00:00:00.000Z',
+      analyses: [{
+        id: 'analysis_legacy',
+        timestamp: '2024-01-02T00:00:00.000Z',
+        files: 1,
+        totalIssues: 5,
+        totalFunctions: 0,
+        avgComplexity: 7,
+        analyses: [makeAnalysis('a.js', 7, 5)],
+      }],
+    }));
+
+    const db = new HistoryDatabase(dbPath);
+
+    expect(db.getAnalysis('analysis_legacy')?.totalIssues).toBe(5);
+    expect(db.getFileHistory('a.js').length).toBe(1);
+    expect(fs.existsSync(legacyPath)).toBe(false);
+    expect(new HistoryDatabase(dbPath).getStatistics().totalAnalyses).toBe(1);
+  });
+
+  describe('series', () => {
+    const save = (db: HistoryDatabase, time: string, complexity: number) => {
+      jest.setSystemTime(new Date(time));
+      const a = makeAnalysis('/project/src/a.js', complexity, 1);
+      a.functions = [{
+        name: 'load',
+        startLine: 1,
+        endLine: 3,
+        metrics: a.overallMetrics,
+        issues: [{ type: IssueType.EVAL_USAGE, category: IssueCategory.SECURITY, severity: 'critical', line: 2, message: 'eval' }],
+      }];
+      db.saveAnalysis([a, makeAnalysis('/project/src/lib/b.js', 1, 0), makeAnalysis('/project/test/c.js', 3, 2)]);
+    };
+
+    beforeEach(() => {
+      jest.useFakeTimers();
+    });
+
+    afterEach(() => {
+      jest.useRealTimers();
+    });
+
+    it('should keep per-file points per analysis, day and week', () => {
+      const db = new HistoryDatabase(dbPath);
+      save(db, '2026-10-12T10:00:00Z', 2);
+      save(db, '2026-10-12T18:00:00Z', 4);
+      save(db, '2026-10-14T09:00:00Z', 6);
+      save(db, '2026-10-19T09:00:00Z', 8);
+
+      const reopened = new HistoryDatabase(dbPath);
+
+      expect(reopened.getFileSeries('/project/src/a.js').map(point => point.cyclomatic)).toEqual([2, 4, 6, 8]);
+      expect(reopened.getFileSeries('/project/src/a.js', 'day').map(point => [point.timestamp, point.runs, point.cyclomatic]))
+        .toEqual([
+          ['2026-10-12T00:00:00.000Z', 2, 3],
+          ['2026-10-14T00:00:00.000Z', 1, 6],
+          ['2026-10-19T00:00:00.000Z', 1, 8],
+        ]);
+      expect(reopened.getFileSeries('/project/src/a.js', 'week').map(point => point.runs)).toEqual([3, 1]);
+      expect(reopened.getFileSeries('/project/src/a.js')[0].issuesByCategory).toEqual({ SECURITY: 1 });
+    });
+
+    it('should total directories up to the deepest one holding every file', () => {
+      const db = new HistoryDatabase(dbPath);
+      save(db, '2026-10-12T10:00:00Z', 2);
+      save(db, '2026-10-13T10:00:00Z', 4);
+
+      expect(db.getDirectorySeries('/project/src/').map(point => [point.files, point.cyclomatic])).toEqual([[2, 3], [2, 5]]);
+      expect(db.getDirectorySeries('/project', 'week')).toEqual([{
+        timestamp: '2026-10-12T00:00:00.000Z',
+        runs: 2,
+        files: 3,
+        cyclomatic: 7,
+        cognitive: 0,
+        issues: 3,
+        issuesByCategory: { SECURITY: 1 },
+      }]);
+      expect(db.getDirectorySeries('/')).toEqual([]);
+    });
+  });
+});
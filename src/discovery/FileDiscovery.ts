@@ -0,0 +1,246 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { execFileSync } from 'child_process';
+import { IgnoreRules } from './IgnoreRules';
+
+export interface DiscoveryOptions {
+  // Extensions to collect, e.g. from FileAnalyzer.getSupportedExtensions()
+  extensions: string[];
+  // Directories read at once
+  concurrency?: number;
+  // List files with `git ls-files` instead of walking the file system
+  gitLsFiles?: boolean;
+}
+
+/**
+ * Ignore rules and the directory their patterns are relative to
+ */
+interface IgnoreScope {
+  base: string;
+  rules: IgnoreRules;
+}
+
+const IGNORE_FILES = ['.gitignore', '.complexityignore'];
+
+// Applied below every other rule, so ignore files can re-include these with `!`
+const DEFAULT_RULES = IgnoreRules.parse(['.git/', 'node_modules/', 'dist/', 'build/'].join('\n'));
+
+/**
+ * Finds the files to analyze under a directory in a single walk
+ *
+ * Directories are read concurrently, up to a limit, and each is read once
+ * for all extensions. Files are filtered by extension from their directory
+ * entry, before anything is read. `.gitignore` and `.complexityignore`
+ * files are honored in the walked directories and in their ancestors up to
+ * the repository root. Symbolic links are not followed.
+ */
+export class FileDiscovery {
+  private extensions: Set<string>;
+  private concurrency: number;
+  private gitLsFiles: boolean;
+
+  constructor(options: DiscoveryOptions) {
+    this.extensions = new Set(options.extensions);
+    this.concurrency = Math.max(1, options.concurrency ?? 16);
+    this.gitLsFiles = options.gitLsFiles ?? false;
+  }
+
+  /**
+   * Absolute paths of the matching files under `targetPath`, sorted
+   */
+  async discover(targetPath: string): Promise<string[]> {
+    const root = path.resolve(targetPath);
+    const files = this.gitLsFiles ? this.listTracked(root) : await this.walk(root);
+    return files.sort();
+  }
+
+  private async walk(root: string): Promise<string[]> {
+    const files: string[] = [];
+    const queue: Array<{ dir: string; scopes: IgnoreScope[] }> = [
+      { dir: root, scopes: this.ancestorScopes(root, IGNORE_FILES) },
+    ];
+    let active = 0;
+
+    await new Promise<void>((resolve, reject) => {
+      const next = () => {
+        if (queue.length === 0 && active === 0) {
+          resolve();
+          return;
+        }
+
+        while (active < this.concurrency && queue.length > 0) {
+          const { dir, scopes } = queue.pop()!;
+          active++;
+
+          this.readDirectory(dir, scopes, queue, files).then(() => {
+            active--;
+            next();
+          }, reject);
+        }
+      };
+
+      next();
+    });
+
+    return files;
+  }
+
+  private async readDirectory(
+    dir: string,
+    inherited: IgnoreScope[],
+    queue: Array<{ dir: string; scopes: IgnoreScope[] }>,
+    files: string[]
+  ): Promise<void> {
+    let entries: fs.Dirent[];
+    try {
+      entries = await fs.promises.readdir(dir, { withFileTypes: true });
+    } catch {
+      // Unreadable directories are skipped, like unreadable files are by the analyzer
+      return;
+    }
+    const names = new Set(entries.filter(entry => entry.isFile()).map(entry => entry.name));
+    const scopes = [...inherited];
+
+    for (const name of IGNORE_FILES) {
+      if (names.has(name)) {
+        const scope = await this.loadScope(dir, name);
+        if (scope) {
+          scopes.push(scope);
+        }
+      }
+    }
+
+    for (const entry of entries) {
+      const entryPath = path.join(dir, entry.name);
+
+      if (entry.isDirectory()) {
+        if (!isIgnored(scopes, entryPath, true)) {
+          queue.push({ dir: entryPath, scopes });
+        }
+      } else if (
+        entry.isFile() &&
+        this.extensions.has(path.extname(entry.name)) &&
+        !isIgnored(scopes, entryPath, false)
+      ) {
+        files.push(entryPath);
+      }
+    }
+  }
+
+  private async loadScope(dir: string, name: string): Promise<IgnoreScope | null> {
+    const rules = IgnoreRules.parse(await fs.promises.readFile(path.join(dir, name), 'utf-8'));
+    return rules.size > 0 ? { base: dir, rules } : null;
+  }
+
+  /**
+   * Tracked and untracked, not git-ignored files from `git ls-files`.
+   * Only .complexityignore files still need to be applied to them.
+   */
+  private listTracked(root: string): string[] {
+    const list = (...args: string[]) => {
+      try {
+        const output = execFileSync('git', ['ls-files', '-z', ...args, '--', '.'], {
+          cwd: root,
+          encoding: 'utf-8',
+          maxBuffer: 1024 * 1024 * 1024,
+          stdio: ['ignore', 'pipe', 'pipe'],
+        });
+        return output.split('\0').filter(Boolean);
+      } catch (error) {
+        const detail = error instanceof Error ? error.message : String(error);
+        throw new Error(`--git-ls-files needs a git work tree at ${root}: ${detail}`);
+      }
+    };
+
+    const deleted = new Set(list('--deleted'));
+    const directoryScopes = new Map<string, IgnoreScope[]>();
+    const ignoredDirectories = new Map<string, boolean>();
+
+    // Scopes and ignored state of each directory, resolved from the root down
+    const scopesFor = (dir: string): IgnoreScope[] => {
+      let scopes = directoryScopes.get(dir);
+      if (!scopes) {
+        scopes = dir === root
+          ? this.ancestorScopes(root, ['.complexityignore'])
+          : [...scopesFor(path.dirname(dir))];
+        const filePath = path.join(dir, '.complexityignore');
+        if (fs.existsSync(filePath)) {
+          const rules = IgnoreRules.parse(fs.readFileSync(filePath, 'utf-8'));
+          scopes.push({ base: dir, rules });
+        }
+        directoryScopes.set(dir, scopes);
+      }
+      return scopes;
+    };
+
+    const isIgnoredDirectory = (dir: string): boolean => {
+      if (dir === root) {
+        return false;
+      }
+      let ignored = ignoredDirectories.get(dir);
+      if (ignored === undefined) {
+        const parent = path.dirname(dir);
+        ignored = isIgnoredDirectory(parent) || isIgnored(scopesFor(parent), dir, true);
+        ignoredDirectories.set(dir, ignored);
+      }
+      return ignored;
+    };
+
+    return list('--cached', '--others', '--exclude-standard')
+      .filter(file => this.extensions.has(path.extname(file)) && !deleted.has(file))
+      .map(file => path.join(root, file))
+      .filter(file => {
+        const dir = path.dirname(file);
+        return !isIgnoredDirectory(dir) && !isIgnored(scopesFor(dir), file, false);
+      });
+  }
+
+  /**
+   * Default rules plus the ignore files of the directories above `root`, up
+   * to the enclosing repository's root, outermost first
+   */
+  private ancestorScopes(root: string, ignoreFiles: string[]): IgnoreScope[] {
+    const ancestors: string[] = [];
+    let dir = root;
+
+    while (!fs.existsSync(path.join(dir, '.git'))) {
+      const parent = path.dirname(dir);
+      if (parent === dir) {
+        // Not in a repository: only the walked directories' files apply
+        ancestors.length = 0;
+        break;
+      }
+      dir = parent;
+      ancestors.unshift(dir);
+    }
+
+    const scopes: IgnoreScope[] = [{ base: root, rules: DEFAULT_RULES }];
+    for (const ancestor of ancestors) {
+      for (const name of ignoreFiles) {
+        const filePath = path.join(ancestor, name);
+        if (fs.existsSync(filePath)) {
+          scopes.push({ base: ancestor, rules: IgnoreRules.parse(fs.readFileSync(filePath, 'utf-8')) });
+        }
+      }
+    }
+
+    return scopes;
+  }
+}
+
+/**
+ * Whether a path is ignored; rules of deeper ignore files take precedence
+ */
+function isIgnored(scopes: IgnoreScope[], filePath: string, isDirectory: boolean): boolean {
+  let ignored = false;
+
+  for (const scope of scopes) {
+    const relative = path.relative(scope.base, filePath).split(path.sep).join('/');
+    const match = scope.rules.match(relative, isDirectory);
+    if (match !== undefined) {
+      ignored = match;
+    }
+  }
+
+  return ignored;
+}
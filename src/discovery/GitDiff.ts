@@ -0,0 +1,210 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { execFileSync } from 'child_process';
+import { FileAnalysis, FunctionInfo } from '../types';
+
+/**
+ * Inclusive, 1-based line range of the current version of a file
+ */
+export interface LineRange {
+  start: number;
+  end: number;
+}
+
+const WHOLE_FILE: LineRange[] = [{ start: 1, end: Infinity }];
+
+/**
+ * Files and lines changed in the working tree since a git revision
+ *
+ * Changes come from `git diff --unified=0 <ref>`, so committed, staged and
+ * unstaged edits all count; untracked files count as changed throughout.
+ * Deleted files are left out.
+ */
+export class GitDiff {
+  private constructor(
+    readonly ref: string,
+    private readonly topLevel: string,
+    // Keyed by path relative to the repository root, with `/` separators
+    private readonly changes: Map<string, LineRange[]>
+  ) {}
+
+  /**
+   * Read the changes under `targetPath` since `ref`
+   */
+  static load(targetPath: string, ref: string): GitDiff {
+    const absolutePath = path.resolve(targetPath);
+    const cwd = fs.statSync(absolutePath).isDirectory() ? absolutePath : path.dirname(absolutePath);
+    const git = (...args: string[]) => runGit(cwd, args);
+
+    const topLevel = fs.realpathSync(git('rev-parse', '--show-toplevel').trim());
+    try {
+      git('rev-parse', '--verify', '--quiet', `${ref}^{commit}`);
+    } catch {
+      throw new Error(`Unknown git revision: ${ref}`);
+    }
+
+    const changes = parseDiff(git(
+      '-c', 'core.quotePath=false', 'diff', '--no-color', '--no-ext-diff', '--unified=0',
+      '--diff-filter=d', ref, '--', absolutePath
+    ));
+
+    const untracked = git('ls-files', '-z', '--full-name', '--others', '--exclude-standard', '--', absolutePath);
+    for (const file of untracked.split('\0').filter(Boolean)) {
+      changes.set(file, WHOLE_FILE);
+    }
+
+    return new GitDiff(ref, topLevel, changes);
+  }
+
+  /**
+   * Absolute paths of the changed files
+   */
+  files(): string[] {
+    return Array.from(this.changes.keys(), file => path.join(this.topLevel, file));
+  }
+
+  has(filePath: string): boolean {
+    return this.changes.has(this.key(filePath));
+  }
+
+  /**
+   * Whether any changed line of the file falls in `startLine`..`endLine`
+   */
+  overlaps(filePath: string, startLine: number, endLine: number): boolean {
+    const ranges = this.changes.get(this.key(filePath)) ?? [];
+    return ranges.some(range => range.start <= endLine && range.end >= startLine);
+  }
+
+  /**
+   * Content of the file at `ref`, or null when it did not exist there
+   */
+  readPrevious(filePath: string): string | null {
+    try {
+      return runGit(this.topLevel, ['show', `${this.ref}:${this.key(filePath)}`]);
+    } catch {
+      return null;
+    }
+  }
+
+  /**
+   * Narrow an analysis to the functions that overlap changed lines, so only
+   * their issues are reported. Given the analysis of the file at `ref`,
+   * each remaining function also gets the metrics it had there.
+   */
+  scope(analysis: FileAnalysis, previous?: FileAnalysis | null): FileAnalysis {
+    const before = previous ? indexFunctions(previous) : new Map<string, FunctionInfo>();
+    const occurrences = new Map<string, number>();
+
+    // Match functions by name and occurrence, as for watch mode deltas
+    const matchPrevious = new Map<string, FunctionInfo>();
+    for (const fn of collectFunctions(analysis)) {
+      const n = occurrences.get(fn.name) ?? 0;
+      occurrences.set(fn.name, n + 1);
+      const match = before.get(`${fn.name}#${n}`);
+      if (match) {
+        matchPrevious.set(functionKey(fn), match);
+      }
+    }
+
+    const changed = (fn: { startLine: number; endLine: number }) =>
+      this.overlaps(analysis.filePath, fn.startLine, fn.endLine);
+    const withPrevious = (fn: FunctionInfo): FunctionInfo => {
+      const match = matchPrevious.get(functionKey(fn));
+      return match ? { ...fn, previousMetrics: match.metrics } : fn;
+    };
+
+    const functions = analysis.functions.filter(changed).map(withPrevious);
+    const classes = analysis.classes.filter(changed).map(cls => ({
+      ...cls,
+      methods: cls.methods.filter(changed).map(withPrevious),
+    }));
+
+    const classIssues = classes.reduce((sum, cls) =>
+      sum + cls.methods.reduce((methodSum, method) => methodSum + method.issues.length, 0), 0);
+
+    return {
+      ...analysis,
+      functions,
+      classes,
+      totalIssues: functions.reduce((sum, fn) => sum + fn.issues.length, 0) + classIssues,
+    };
+  }
+
+  private key(filePath: string): string {
+    let resolved = path.resolve(filePath);
+    try {
+      resolved = fs.realpathSync(resolved);
+    } catch {
+      // Keep the resolved path for files that no longer exist
+    }
+    return path.relative(this.topLevel, resolved).split(path.sep).join('/');
+  }
+}
+
+function runGit(cwd: string, args: string[]): string {
+  return execFileSync('git', args, {
+    cwd,
+    encoding: 'utf-8',
+    maxBuffer: 1024 * 1024 * 1024,
+    stdio: ['ignore', 'pipe', 'pipe'],
+  });
+}
+
+/**
+ * Changed line ranges of the new side of a `--unified=0` diff
+ */
+function parseDiff(diff: string): Map<string, LineRange[]> {
+  const changes = new Map<string, LineRange[]>();
+  let ranges: LineRange[] | null = null;
+
+  for (const line of diff.split('\n')) {
+    if (line.startsWith('+++ ')) {
+      ranges = null;
+      if (line.startsWith('+++ b/')) {
+        ranges = [];
+        changes.set(line.slice(6), ranges);
+      }
+      continue;
+    }
+
+    const hunk = ranges && /^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@/.exec(line);
+    if (hunk && ranges) {
+      const start = parseInt(hunk[1], 10);
+      const count = hunk[2] === undefined ? 1 : parseInt(hunk[2], 10);
+      // Pure deletions touch the lines on either side of them
+      ranges.push(count === 0 ? { start, end: start + 1 } : { start, end: start + count - 1 });
+    }
+  }
+
+  return changes;
+}
+
+/**
+ * Functions and class methods, each once
+ */
+function collectFunctions(analysis: FileAnalysis): FunctionInfo[] {
+  const seen = new Set<string>();
+  return [...analysis.functions, ...analysis.classes.flatMap(cls => cls.methods)].filter(fn => {
+    const key = functionKey(fn);
+    if (seen.has(key)) return false;
+    seen.add(key);
+    return true;
+  });
+}
+
+function functionKey(fn: FunctionInfo): string {
+  return `${fn.name}:${fn.startLine}`;
+}
+
+function indexFunctions(analysis: FileAnalysis): Map<string, FunctionInfo> {
+  const index = new Map<string, FunctionInfo>();
+  const occurrences = new Map<string, number>();
+
+  collectFunctions(analysis).forEach(fn => {
+    const n = occurrences.get(fn.name) ?? 0;
+    occurrences.set(fn.name, n + 1);
+    index.set(`${fn.name}#${n}`, fn);
+  });
+
+  return index;
+}
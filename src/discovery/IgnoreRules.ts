@@ -0,0 +1,115 @@
+interface IgnoreRule {
+  regex: RegExp;
+  negated: boolean;
+  directoryOnly: boolean;
+  // Patterns without a slash match a file or directory name at any depth
+  matchBasename: boolean;
+}
+
+/**
+ * The patterns of one .gitignore-style file
+ *
+ * Supports comments, `!` negation, trailing `/` for directories, leading or
+ * inner `/` to anchor a pattern to the file's directory, `*`, `?`, `[...]`
+ * and `**`. As in git, the last matching pattern wins.
+ */
+export class IgnoreRules {
+  private constructor(private readonly rules: IgnoreRule[]) {}
+
+  static parse(content: string): IgnoreRules {
+    const rules: IgnoreRule[] = [];
+
+    for (const raw of content.split(/\r?\n/)) {
+      let line = raw.replace(/(?<!\\)\s+$/, '');
+      if (line === '' || line.startsWith('#')) {
+        continue;
+      }
+
+      let negated = false;
+      if (line.startsWith('!')) {
+        negated = true;
+        line = line.slice(1);
+      } else if (line.startsWith('\\!') || line.startsWith('\\#')) {
+        line = line.slice(1);
+      }
+
+      const directoryOnly = line.endsWith('/');
+      if (directoryOnly) {
+        line = line.slice(0, -1);
+      }
+
+      const anchored = line.includes('/');
+      if (line.startsWith('/')) {
+        line = line.slice(1);
+      }
+
+      if (line !== '') {
+        rules.push({ regex: toRegExp(line), negated, directoryOnly, matchBasename: !anchored });
+      }
+    }
+
+    return new IgnoreRules(rules);
+  }
+
+  get size(): number {
+    return this.rules.length;
+  }
+
+  /**
+   * Whether a path relative to the ignore file's directory, with `/`
+   * separators, is ignored; undefined when no pattern matches it
+   */
+  match(relativePath: string, isDirectory: boolean): boolean | undefined {
+    const basename = relativePath.slice(relativePath.lastIndexOf('/') + 1);
+    let ignored: boolean | undefined;
+
+    for (const rule of this.rules) {
+      if (rule.directoryOnly && !isDirectory) {
+        continue;
+      }
+      if (rule.regex.test(rule.matchBasename ? basename : relativePath)) {
+        ignored = !rule.negated;
+      }
+    }
+
+    return ignored;
+  }
+}
+
+function toRegExp(pattern: string): RegExp {
+  let source = '';
+
+  for (let i = 0; i < pattern.length; i++) {
+    const char = pattern[i];
+
+    if (char === '*' && pattern[i + 1] === '*') {
+      // `**/` matches zero or more directories, any other `**` anything
+      if (pattern[i + 2] === '/') {
+        source += '(?:.*/)?';
+        i += 2;
+      } else {
+        source += '.*';
+        i += 1;
+      }
+    } else if (char === '*') {
+      source += '[^/]*';
+    } else if (char === '?') {
+      source += '[^/]';
+    } else if (char === '[' && pattern.indexOf(']', i + 2) !== -1) {
+      const end = pattern.indexOf(']', i + 2);
+      const range = pattern.slice(i + 1, end).replace(/\\/g, '\\\\');
+      source += `[${range.startsWith('!') ? '^' + range.slice(1) : range}]`;
+      i = end;
+    } else if (char === '\\' && i + 1 < pattern.length) {
+      source += escapeRegExp(pattern[++i]);
+    } else {
+      source += escapeRegExp(char);
+    }
+  }
+
+  return new RegExp(`^${source}$`);
+}
+
+function escapeRegExp(text: string): string {
+  return text.replace(/[.*+?^${}()|[\]\\/]/g, '\\$&');
+}
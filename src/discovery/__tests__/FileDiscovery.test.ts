@@ -0,0 +1,63 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { execFileSync } from 'child_process';
+import { FileDiscovery } from '../FileDiscovery';
+import { FileAnalyzer } from '../../analyzers/FileAnalyzer';
+
+describe('FileDiscovery', () => {
+  let dir: string;
+
+  const write = (file: string, content = '') => {
+    const filePath = path.join(dir, file);
+    fs.mkdirSync(path.dirname(filePath), { recursive: true });
+    fs.writeFileSync(filePath, content);
+  };
+
+  const relative = (files: string[]) => files.map(file => path.relative(dir, file).split(path.sep).join('/'));
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-discovery-'));
+    write('.gitignore', 'generated/\n*.min.js\n');
+    write('.complexityignore', 'src/fixtures/\n');
+    write('src/app.js');
+    write('src/app.min.js');
+    write('src/model.ts');
+    write('src/tool.py');
+    write('src/notes.md');
+    write('src/fixtures/broken.js');
+    write('src/vendor/.complexityignore', '*.js\n!patched.js\n');
+    write('src/vendor/lib.js');
+    write('src/vendor/patched.js');
+    write('generated/api.js');
+    write('node_modules/pkg/index.js');
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('should honor .gitignore, .complexityignore and the default ignores', async () => {
+    const files = await new FileDiscovery({ extensions: ['.js', '.ts', '.py'] }).discover(dir);
+
+    expect(relative(files)).toEqual(['src/app.js', 'src/model.ts', 'src/tool.py', 'src/vendor/patched.js']);
+  });
+
+  it('should only collect files of the requested languages', async () => {
+    const extensions = new FileAnalyzer().getSupportedExtensions('py,typescript');
+    const files = await new FileDiscovery({ extensions }).discover(dir);
+
+    expect(relative(files)).toEqual(['src/model.ts', 'src/tool.py']);
+  });
+
+  it('should list files with git ls-files', async () => {
+    execFileSync('git', ['init', '-q'], { cwd: dir });
+    execFileSync('git', ['add', '.'], { cwd: dir });
+    fs.rmSync(path.join(dir, 'src/model.ts'));
+    write('src/untracked.js');
+
+    const files = await new FileDiscovery({ extensions: ['.js', '.ts', '.py'], gitLsFiles: true }).discover(dir);
+
+    expect(relative(files)).toEqual(['src/app.js', 'src/tool.py', 'src/untracked.js', 'src/vendor/patched.js']);
+  });
+});
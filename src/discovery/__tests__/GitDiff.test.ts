@@ -0,0 +1,93 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { execFileSync } from 'child_process';
+import { GitDiff } from '../GitDiff';
+import { ComplexityMetrics, FileAnalysis, FunctionInfo, IssueCategory, IssueType } from '../../types';
+
+describe('GitDiff', () => {
+  let dir: string;
+
+  const git = (...args: string[]) =>
+    execFileSync('git', ['-c', 'user.name=test', '-c', 'user.email=test@example.com', ...args], { cwd: dir });
+
+  const metrics = (cyclomaticComplexity: number): ComplexityMetrics => ({
+    cyclomaticComplexity,
+    cognitiveComplexity: 0,
+    linesOfCode: 3,
+    effectiveLinesOfCode: 3,
+    nestingDepth: 0,
+    functionLength: 3,
+    parameterCount: 0,
+  });
+
+  const fn = (name: string, startLine: number, endLine: number, cyclomatic: number): FunctionInfo => ({
+    name,
+    startLine,
+    endLine,
+    metrics: metrics(cyclomatic),
+    issues: [{
+      type: IssueType.MAGIC_NUMBER,
+      category: IssueCategory.CODE_SMELL,
+      severity: 'low',
+      line: startLine + 1,
+      message: 'Magic number',
+    }],
+  });
+
+  const analysis = (filePath: string, functions: FunctionInfo[]): FileAnalysis => ({
+    filePath,
+    language: 'JavaScript',
+    overallMetrics: metrics(1),
+    functions,
+    classes: [],
+    totalIssues: functions.length,
+    analysisDate: new Date(),
+  });
+
+  beforeEach(() => {
+    dir = fs.realpathSync(fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-diff-')));
+    git('init', '-q');
+    fs.writeFileSync(path.join(dir, 'a.js'), ['function a() {', '  return 1;', '}', 'function b() {', '  return 2;', '}'].join('\n'));
+    fs.writeFileSync(path.join(dir, 'same.js'), 'function same() {}\n');
+    git('add', '.');
+    git('commit', '-qm', 'initial');
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('should report changed and untracked files with their changed lines', () => {
+    fs.writeFileSync(path.join(dir, 'a.js'), ['function a() {', '  return 1;', '}', 'function b() {', '  return 3;', '}'].join('\n'));
+    fs.writeFileSync(path.join(dir, 'new.js'), 'function fresh() {}\n');
+
+    const diff = GitDiff.load(dir, 'HEAD');
+
+    expect(diff.files().map(file => path.relative(dir, file)).sort()).toEqual(['a.js', 'new.js']);
+    expect(diff.has(path.join(dir, 'same.js'))).toBe(false);
+    expect(diff.overlaps(path.join(dir, 'a.js'), 1, 3)).toBe(false);
+    expect(diff.overlaps(path.join(dir, 'a.js'), 4, 6)).toBe(true);
+    expect(diff.overlaps(path.join(dir, 'new.js'), 1, 1)).toBe(true);
+  });
+
+  it('should keep only changed functions, with their previous metrics', () => {
+    fs.writeFileSync(path.join(dir, 'a.js'), ['function a() {', '  return 1;', '}', 'function b() {', '  return 3;', '}'].join('\n'));
+    const filePath = path.join(dir, 'a.js');
+    const diff = GitDiff.load(dir, 'HEAD');
+
+    const scoped = diff.scope(
+      analysis(filePath, [fn('a', 1, 3, 1), fn('b', 4, 6, 2)]),
+      analysis(filePath, [fn('a', 1, 3, 1), fn('b', 4, 6, 1)])
+    );
+
+    expect(scoped.functions.map(f => f.name)).toEqual(['b']);
+    expect(scoped.functions[0].previousMetrics?.cyclomaticComplexity).toBe(1);
+    expect(scoped.totalIssues).toBe(1);
+    expect(diff.readPrevious(filePath)).toContain('return 2;');
+  });
+
+  it('should reject unknown revisions', () => {
+    expect(() => GitDiff.load(dir, 'no-such-ref')).toThrow('Unknown git revision: no-such-ref');
+  });
+});
@@ -0,0 +1,30 @@
+import { IgnoreRules } from '../IgnoreRules';
+
+describe('IgnoreRules', () => {
+  it('should match unanchored patterns by name at any depth', () => {
+    const rules = IgnoreRules.parse('# minified\n*.min.js\n');
+
+    expect(rules.match('app.min.js', false)).toBe(true);
+    expect(rules.match('src/lib/app.min.js', false)).toBe(true);
+    expect(rules.match('src/app.js', false)).toBeUndefined();
+  });
+
+  it('should anchor patterns with a slash to their directory', () => {
+    const rules = IgnoreRules.parse('/generated\ndocs/*.py\nlib/**/out/\n');
+
+    expect(rules.match('generated', true)).toBe(true);
+    expect(rules.match('src/generated', true)).toBeUndefined();
+    expect(rules.match('docs/conf.py', false)).toBe(true);
+    expect(rules.match('docs/api/conf.py', false)).toBeUndefined();
+    expect(rules.match('lib/out', true)).toBe(true);
+    expect(rules.match('lib/a/b/out', true)).toBe(true);
+    expect(rules.match('lib/a/b/out', false)).toBeUndefined();
+  });
+
+  it('should let the last matching pattern win', () => {
+    const rules = IgnoreRules.parse('*.js\n!keep.js\n');
+
+    expect(rules.match('drop.js', false)).toBe(true);
+    expect(rules.match('keep.js', false)).toBe(false);
+  });
+});
@@ -5,6 +5,7 @@
 
 export { FileAnalyzer } from './analyzers/FileAnalyzer';
 export { ConsoleReporter } from './reporters/ConsoleReporter';
+export { DataReporter } from './reporters/DataReporter';
 export { JavaScriptParser } from './parsers/JavaScriptParser';
 export { CyclomaticComplexityCalculator } from './analyzers/CyclomaticComplexity';
 export { CognitiveComplexityCalculator } from './analyzers/CognitiveComplexity';
@@ -13,12 +14,24 @@ export { PerformanceDetector } from './analyzers/PerformanceDetector';
 export { SecurityDetector } from './analyzers/SecurityDetector';
 export { MemoryLeakDetector } from './analyzers/MemoryLeakDetector';
 export { ArchitectureDetector } from './analyzers/ArchitectureDetector';
-export { FixGenerator } from './analyzers/FixGenerator';
+export { FixGenerator, attachFixes } from './analyzers/FixGenerator';
+export { TraversalEngine } from './analyzers/TraversalEngine';
+export { AnalysisStore } from './analyzers/AnalysisStore';
+export { DuplicateDetector, FunctionFingerprinter } from './analyzers/DuplicateDetector';
+export { DependencyGraph } from './analyzers/DependencyGraph';
+export { ModuleResolver } from './analyzers/ModuleResolver';
+export { GraphReporter } from './reporters/GraphReporter';
+export { AnalysisServer } from './server/AnalysisServer';
+export { DaemonClient, DaemonError } from './server/DaemonClient';
+export { LanguageServer, toDiagnostics } from './lsp/LanguageServer';
+export { LspConnection } from './lsp/LspConnection';
 
 export type {
   ComplexityMetrics,
   FunctionInfo,
   FileAnalysis,
+  ModuleImport,
+  AnalysisList,
   ClassInfo,
   CodeIssue,
   CodeFix,
@@ -0,0 +1,320 @@
+import * as path from 'path';
+import { fileURLToPath } from 'url';
+import { AnalyzerConfig, CodeIssue, DEFAULT_CONFIG, FileAnalysis } from '../types';
+import { ConfigLoader } from '../config/ConfigLoader';
+import { FileAnalyzer } from '../analyzers/FileAnalyzer';
+import { IncrementalAnalyzer } from '../analyzers/IncrementalAnalyzer';
+import { AnalysisLimitError } from '../analyzers/AnalysisLimits';
+import { LspConnection, LspMessage } from './LspConnection';
+
+export interface Position {
+  line: number;
+  character: number;
+}
+
+export interface Range {
+  start: Position;
+  end: Position;
+}
+
+export interface Diagnostic {
+  range: Range;
+  severity: 1 | 2 | 3 | 4;
+  code: string;
+  source: 'complexity';
+  message: string;
+}
+
+export interface LanguageServerOptions {
+  // Quiet period after the last change before a document is re-analyzed
+  debounceMs?: number;
+  // Called on `exit`; defaults to process.exit
+  onExit?: (code: number) => void;
+}
+
+interface TextDocument {
+  uri: string;
+  // Path the analyzer knows the document by
+  filePath: string;
+  version: number;
+  text: string;
+  timer?: NodeJS.Timeout;
+}
+
+interface ContentChange {
+  range?: Range;
+  text: string;
+}
+
+const SEVERITIES: Record<CodeIssue['severity'], Diagnostic['severity']> = {
+  critical: 1,
+  high: 2,
+  medium: 2,
+  low: 3,
+};
+
+// Extensions for documents that are not files yet, e.g. untitled buffers
+const LANGUAGE_EXTENSIONS: Record<string, string> = {
+  javascript: '.js',
+  javascriptreact: '.jsx',
+  typescript: '.ts',
+  typescriptreact: '.tsx',
+  python: '.py',
+};
+
+const METHOD_NOT_FOUND = -32601;
+const REQUEST_FAILED = -32803;
+
+/**
+ * Language server publishing complexity issues as editor diagnostics
+ *
+ * Each open document keeps its syntax tree in an IncrementalAnalyzer.
+ * `didChange` edits are applied to the document text as they arrive and,
+ * once the document has been quiet for `debounceMs`, the tree is reparsed
+ * from the previous one and only the functions the edits touched are
+ * analyzed again.
+ */
+export class LanguageServer {
+  private documents: Map<string, TextDocument> = new Map();
+  private config: AnalyzerConfig = DEFAULT_CONFIG;
+  private fileAnalyzer: FileAnalyzer = new FileAnalyzer();
+  private analyzer: IncrementalAnalyzer = new IncrementalAnalyzer(this.fileAnalyzer);
+  private debounceMs: number;
+  private onExit: (code: number) => void;
+  private shutdownRequested = false;
+
+  constructor(private readonly connection: LspConnection, options: LanguageServerOptions = {}) {
+    this.debounceMs = options.debounceMs ?? 250;
+    this.onExit = options.onExit ?? (code => process.exit(code));
+  }
+
+  listen(): void {
+    this.connection.listen(message => this.handle(message));
+  }
+
+  /**
+   * Dispatch one request or notification
+   */
+  handle(message: LspMessage): void {
+    const { id, method, params } = message;
+    if (!method) {
+      // Responses to requests we never send
+      return;
+    }
+
+    let result: unknown = null;
+    try {
+      result = this.dispatch(method, params);
+    } catch (error) {
+      const text = error instanceof Error ? error.message : String(error);
+      if (id === undefined) {
+        this.log(`${method}: ${text}`);
+      } else {
+        const code = error instanceof MethodNotFoundError ? METHOD_NOT_FOUND : REQUEST_FAILED;
+        this.connection.send({ jsonrpc: '2.0', id, error: { code, message: text } });
+      }
+      return;
+    }
+
+    if (id !== undefined) {
+      this.connection.send({ jsonrpc: '2.0', id, result });
+    }
+  }
+
+  private dispatch(method: string, params: any): unknown {
+    switch (method) {
+      case 'initialize':
+        return this.initialize(params);
+      case 'initialized':
+        return null;
+      case 'textDocument/didOpen':
+        return this.didOpen(params.textDocument);
+      case 'textDocument/didChange':
+        return this.didChange(params.textDocument, params.contentChanges);
+      case 'textDocument/didClose':
+        return this.didClose(params.textDocument.uri);
+      case 'shutdown':
+        this.shutdownRequested = true;
+        this.documents.forEach(document => clearTimeout(document.timer));
+        return null;
+      case 'exit':
+        this.onExit(this.shutdownRequested ? 0 : 1);
+        return null;
+      default:
+        if (method.startsWith('$/')) {
+          // Optional protocol notifications and requests
+          return null;
+        }
+        throw new MethodNotFoundError(method);
+    }
+  }
+
+  private initialize(params: any): unknown {
+    const root = params?.rootUri ? fileURLToPath(params.rootUri) : params?.rootPath;
+    this.config = ConfigLoader.loadConfig(root || undefined);
+
+    this.fileAnalyzer = new FileAnalyzer(undefined, this.config);
+    this.analyzer = new IncrementalAnalyzer(this.fileAnalyzer);
+
+    return {
+      capabilities: {
+        // Incremental: clients send only the changed ranges
+        textDocumentSync: { openClose: true, change: 2 },
+      },
+      serverInfo: { name: 'complexity' },
+    };
+  }
+
+  private didOpen(item: { uri: string; languageId: string; version: number; text: string }): null {
+    const filePath = documentPath(item.uri, item.languageId);
+    if (!this.fileAnalyzer.isSupported(filePath)) {
+      return null;
+    }
+
+    const document: TextDocument = { uri: item.uri, filePath, version: item.version, text: item.text };
+    this.documents.set(item.uri, document);
+    this.analyze(document, () => this.analyzer.open(filePath, document.text));
+    return null;
+  }
+
+  private didChange(identifier: { uri: string; version: number }, changes: ContentChange[]): null {
+    const document = this.documents.get(identifier.uri);
+    if (!document) {
+      return null;
+    }
+
+    document.text = changes.reduce(applyChange, document.text);
+    document.version = identifier.version;
+
+    clearTimeout(document.timer);
+    document.timer = setTimeout(() => {
+      document.timer = undefined;
+      this.analyze(document, () => this.analyzer.update(document.filePath, document.text)?.current ?? null);
+    }, this.debounceMs);
+    return null;
+  }
+
+  private didClose(uri: string): null {
+    const document = this.documents.get(uri);
+    if (!document) {
+      return null;
+    }
+
+    clearTimeout(document.timer);
+    this.documents.delete(uri);
+    this.analyzer.close(document.filePath);
+    this.publish(document, []);
+    return null;
+  }
+
+  /**
+   * Run an analysis of `document` and publish its issues, unless the
+   * content was unchanged. Documents over the configured limits get no
+   * diagnostics; minified and generated ones are only measured.
+   */
+  private analyze(document: TextDocument, run: () => FileAnalysis | null): void {
+    if (Buffer.byteLength(document.text) > this.config.maxFileBytes) {
+      this.analyzer.close(document.filePath);
+      this.publish(document, []);
+      return;
+    }
+
+    let analysis: FileAnalysis | null;
+    try {
+      analysis = run();
+    } catch (error) {
+      this.log(`${document.filePath}: ${error instanceof Error ? error.message : error}`);
+      if (error instanceof AnalysisLimitError) {
+        this.analyzer.close(document.filePath);
+        this.publish(document, []);
+      }
+      return;
+    }
+
+    if (analysis) {
+      this.publish(document, toDiagnostics(analysis, document.text));
+    }
+  }
+
+  private publish(document: TextDocument, diagnostics: Diagnostic[]): void {
+    this.connection.send({
+      jsonrpc: '2.0',
+      method: 'textDocument/publishDiagnostics',
+      params: { uri: document.uri, version: document.version, diagnostics },
+    });
+  }
+
+  private log(message: string): void {
+    this.connection.send({ jsonrpc: '2.0', method: 'window/logMessage', params: { type: 1, message } });
+  }
+}
+
+class MethodNotFoundError extends Error {
+  constructor(method: string) {
+    super(`Unhandled method: ${method}`);
+  }
+}
+
+/**
+ * Convert an analysis to diagnostics, each spanning the issue's line from
+ * its first non-blank character
+ */
+export function toDiagnostics(analysis: FileAnalysis, text: string): Diagnostic[] {
+  // Methods are listed both as functions and under their class
+  const issues: Set<CodeIssue> = new Set();
+  analysis.functions.forEach(func => func.issues.forEach(issue => issues.add(issue)));
+  analysis.classes.forEach(cls => cls.methods.forEach(method => method.issues.forEach(issue => issues.add(issue))));
+
+  const lines = text.split('\n');
+
+  return Array.from(issues, issue => {
+    const line = Math.min(Math.max(issue.line - 1, 0), lines.length - 1);
+    const content = lines[line].replace(/\r$/, '');
+    const indent = content.length - content.trimStart().length;
+
+    return {
+      range: {
+        start: { line, character: indent },
+        end: { line, character: content.length },
+      },
+      severity: SEVERITIES[issue.severity],
+      code: issue.type,
+      source: 'complexity',
+      message: issue.suggestion ? `${issue.message}\n${issue.suggestion}` : issue.message,
+    };
+  });
+}
+
+/**
+ * Apply one `didChange` content change; a change without a range replaces
+ * the whole text. Characters are UTF-16 code units, like JavaScript strings.
+ */
+export function applyChange(text: string, change: ContentChange): string {
+  if (!change.range) {
+    return change.text;
+  }
+  return text.slice(0, offsetAt(text, change.range.start)) + change.text + text.slice(offsetAt(text, change.range.end));
+}
+
+function offsetAt(text: string, position: Position): number {
+  let lineStart = 0;
+  for (let line = 0; line < position.line; line++) {
+    const newline = text.indexOf('\n', lineStart);
+    if (newline === -1) {
+      return text.length;
+    }
+    lineStart = newline + 1;
+  }
+
+  const lineEnd = text.indexOf('\n', lineStart);
+  return Math.min(lineStart + position.character, lineEnd === -1 ? text.length : lineEnd);
+}
+
+function documentPath(uri: string, languageId: string): string {
+  if (uri.startsWith('file:')) {
+    return fileURLToPath(uri);
+  }
+  // Keep the analyzer's per-path state apart for each unsaved buffer
+  const name = uri.replace(/[^\w.-]+/g, '_');
+  return path.extname(name) ? name : name + (LANGUAGE_EXTENSIONS[languageId] ?? '');
+}
@@ -0,0 +1,78 @@
+/**
+ * A JSON-RPC 2.0 request, response or notification
+ */
+export interface LspMessage {
+  jsonrpc: '2.0';
+  id?: number | string | null;
+  method?: string;
+  params?: any;
+  result?: unknown;
+  error?: { code: number; message: string; data?: unknown };
+}
+
+const HEADER_END = Buffer.from('\r\n\r\n');
+
+/**
+ * Reads and writes Language Server Protocol messages: JSON-RPC bodies
+ * framed by `Content-Length` headers, over stdio or any pair of streams
+ */
+export class LspConnection {
+  private buffer: Buffer = Buffer.alloc(0);
+  private listener: ((message: LspMessage) => void) | null = null;
+
+  constructor(
+    private readonly input: NodeJS.ReadableStream,
+    private readonly output: NodeJS.WritableStream
+  ) {}
+
+  /**
+   * Deliver each incoming message to `listener`
+   */
+  listen(listener: (message: LspMessage) => void): void {
+    this.listener = listener;
+    this.input.on('data', (chunk: Buffer | string) => this.receive(Buffer.from(chunk)));
+  }
+
+  send(message: LspMessage): void {
+    const body = Buffer.from(JSON.stringify(message), 'utf-8');
+    this.output.write(`Content-Length: ${body.length}\r\n\r\n`);
+    this.output.write(body);
+  }
+
+  private receive(chunk: Buffer): void {
+    this.buffer = this.buffer.length === 0 ? chunk : Buffer.concat([this.buffer, chunk]);
+
+    while (true) {
+      const headerEnd = this.buffer.indexOf(HEADER_END);
+      if (headerEnd === -1) {
+        return;
+      }
+
+      const header = this.buffer.subarray(0, headerEnd).toString('ascii');
+      const length = /Content-Length:\s*(\d+)/i.exec(header);
+      if (!length) {
+        // Unframed input; drop the header and resynchronize on the next one
+        this.buffer = this.buffer.subarray(headerEnd + HEADER_END.length);
+        continue;
+      }
+
+      const start = headerEnd + HEADER_END.length;
+      const end = start + parseInt(length[1], 10);
+      if (this.buffer.length < end) {
+        return;
+      }
+
+      const body = this.buffer.subarray(start, end).toString('utf-8');
+      this.buffer = this.buffer.subarray(end);
+
+      let message: LspMessage;
+      try {
+        message = JSON.parse(body);
+      } catch {
+        this.send({ jsonrpc: '2.0', id: null, error: { code: -32700, message: 'Parse error' } });
+        continue;
+      }
+      this.listener?.(message);
+    }
+  }
+}
@@ -0,0 +1,147 @@
+import { PassThrough } from 'stream';
+import { LanguageServer, applyChange, toDiagnostics } from '../LanguageServer';
+import { LspConnection, LspMessage } from '../LspConnection';
+import { FileAnalysis, IssueCategory, IssueType } from '../../types';
+
+const frame = (message: object): string => {
+  const body = JSON.stringify(message);
+  return `Content-Length: ${Buffer.byteLength(body)}\r\n\r\n${body}`;
+};
+
+describe('LspConnection', () => {
+  it('should read messages split across and packed into chunks', () => {
+    const input = new PassThrough();
+    const received: LspMessage[] = [];
+    new LspConnection(input, new PassThrough()).listen(message => received.push(message));
+
+    const first = frame({ jsonrpc: '2.0', id: 1, method: 'initialize', params: { text: 'héllo' } });
+    const second = frame({ jsonrpc: '2.0', method: 'initialized' });
+    input.write(first.slice(0, 10));
+    input.write(first.slice(10) + second);
+
+    expect(received.map(message => message.method)).toEqual(['initialize', 'initialized']);
+    expect(received[0].params.text).toBe('héllo');
+  });
+});
+
+describe('applyChange', () => {
+  const text = 'function a() {\n  return 1;\n}\n';
+
+  it('should replace a range given in lines and characters', () => {
+    const changed = applyChange(text, {
+      range: { start: { line: 1, character: 9 }, end: { line: 1, character: 10 } },
+      text: '42',
+    });
+
+    expect(changed).toBe('function a() {\n  return 42;\n}\n');
+  });
+
+  it('should replace the whole text when no range is given', () => {
+    expect(applyChange(text, { text: 'x' })).toBe('x');
+  });
+});
+
+describe('toDiagnostics', () => {
+  it('should report each issue once, spanning its line', () => {
+    const issue = {
+      type: IssueType.TOO_MANY_PARAMETERS,
+      category: IssueCategory.COMPLEXITY,
+      severity: 'high' as const,
+      line: 2,
+      message: 'Too many parameters',
+      suggestion: 'Pass an options object',
+    };
+    const method = {
+      name: 'run',
+      startLine: 2,
+      endLine: 2,
+      metrics: {} as any,
+      issues: [issue],
+    };
+    const analysis = {
+      functions: [method],
+      classes: [{ name: 'Job', startLine: 1, endLine: 3, methods: [method], metrics: {} as any }],
+    } as FileAnalysis;
+
+    const diagnostics = toDiagnostics(analysis, 'class Job {\n  run(a, b) {}\n}\n');
+
+    expect(diagnostics).toEqual([
+      {
+        range: { start: { line: 1, character: 2 }, end: { line: 1, character: 14 } },
+        severity: 2,
+        code: 'TOO_MANY_PARAMETERS',
+        source: 'complexity',
+        message: 'Too many parameters\nPass an options object',
+      },
+    ]);
+  });
+});
+
+describe('LanguageServer', () => {
+  const uri = 'file:///project/app.js';
+  let sent: LspMessage[];
+  let server: LanguageServer;
+
+  const diagnosticsFor = (version: number) =>
+    sent.find(message => message.method === 'textDocument/publishDiagnostics' && message.params.version === version)
+      ?.params.diagnostics;
+
+  beforeEach(() => {
+    sent = [];
+    const connection = new LspConnection(new PassThrough(), new PassThrough());
+    jest.spyOn(connection, 'send').mockImplementation(message => void sent.push(message));
+    server = new LanguageServer(connection, { debounceMs: 10, onExit: jest.fn() });
+    server.handle({ jsonrpc: '2.0', id: 1, method: 'initialize', params: { rootUri: null } });
+  });
+
+  it('should advertise incremental document sync', () => {
+    expect(sent[0].result).toMatchObject({ capabilities: { textDocumentSync: { openClose: true, change: 2 } } });
+  });
+
+  it('should publish diagnostics on open and after debounced edits', async () => {
+    const text = 'function add(a, b) {\n  return a + b;\n}\n';
+    server.handle({
+      jsonrpc: '2.0',
+      method: 'textDocument/didOpen',
+      params: { textDocument: { uri, languageId: 'javascript', version: 1, text } },
+    });
+
+    expect(diagnosticsFor(1)).toEqual([]);
+
+    server.handle({
+      jsonrpc: '2.0',
+      method: 'textDocument/didChange',
+      params: {
+        textDocument: { uri, version: 2 },
+        contentChanges: [
+          { range: { start: { line: 0, character: 17 }, end: { line: 0, character: 17 } }, text: ', c, d, e, f, g' },
+        ],
+      },
+    });
+
+    expect(diagnosticsFor(2)).toBeUndefined();
+    await new Promise(resolve => setTimeout(resolve, 50));
+
+    const codes = (diagnosticsFor(2) ?? []).map((diagnostic: any) => diagnostic.code);
+    expect(codes).toContain('TOO_MANY_PARAMETERS');
+  });
+
+  it('should clear diagnostics on close', () => {
+    server.handle({
+      jsonrpc: '2.0',
+      method: 'textDocument/didOpen',
+      params: { textDocument: { uri, languageId: 'javascript', version: 1, text: 'const x = 1;\n' } },
+    });
+    server.handle({ jsonrpc: '2.0', method: 'textDocument/didClose', params: { textDocument: { uri } } });
+
+    const last = sent[sent.length - 1];
+    expect(last.method).toBe('textDocument/publishDiagnostics');
+    expect(last.params.diagnostics).toEqual([]);
+  });
+
+  it('should reject unknown requests', () => {
+    server.handle({ jsonrpc: '2.0', id: 2, method: 'textDocument/hover', params: {} });
+
+    expect(sent[sent.length - 1].error?.code).toBe(-32601);
+  });
+});
@@ -1,5 +1,30 @@
 import Parser from 'tree-sitter';
-import { FileAnalysis, ParserInterface, ComplexityMetrics } from '../types';
+import {
+  ClassInfo,
+  CodeIssue,
+  FileAnalysis,
+  ParserInterface,
+  ComplexityMetrics,
+  FunctionInfo,
+  FunctionRef,
+  NodeBudget,
+  ParseOptions,
+} from '../types';
+import { TraversalEngine } from '../analyzers/TraversalEngine';
+import { AnalysisContext, FunctionTree } from '../analyzers/AnalysisContext';
+import { CognitiveComplexityParts } from '../analyzers/CognitiveComplexity';
+import { profile } from '../profiling/Profiler';
+
+/**
+ * A function found directly inside the region being walked
+ */
+export interface NestedFunction {
+  node: Parser.SyntaxNode;
+  // Open nesting blocks of the enclosing region around the function
+  nestingOffset: number;
+  // Cognitive complexity nesting level of the enclosing region there
+  cognitiveNesting: number;
+}
 
 /**
  * Abstract base class for language parsers
@@ -13,31 +38,31 @@ export abstract class BaseParser implements ParserInterface {
     this.languageName = languageName;
   }
 
-  abstract parse(code: string, filePath: string): FileAnalysis;
   abstract getSupportedExtensions(): string[];
 
-  getLanguageName(): string {
-    return this.languageName;
+  /**
+   * Analyze a parsed tree. The context's source must be the code the tree
+   * was parsed from.
+   */
+  abstract analyzeTree(tree: Parser.Tree, context: AnalysisContext, filePath: string): FileAnalysis;
+
+  parse(code: string, filePath: string, options?: ParseOptions): FileAnalysis {
+    const tree = profile('stage', 'parse', () => this.parseTree(code));
+    return profile('stage', 'analyze', () =>
+      this.analyzeTree(tree, AnalysisContext.fromCode(code, undefined, options), filePath));
   }
 
   /**
-   * Count lines of code
+   * Parse source into a syntax tree. Passing the previous tree, after the
+   * edit has been applied to it with tree.edit(), lets tree-sitter reuse
+   * the unchanged parts of it.
    */
-  protected countLines(code: string): { total: number; effective: number } {
-    const lines = code.split('\n');
-    const total = lines.length;
-
-    // Count non-empty, non-comment lines
-    const effective = lines.filter(line => {
-      const trimmed = line.trim();
-      return trimmed.length > 0 &&
-             !trimmed.startsWith('//') &&
-             !trimmed.startsWith('/*') &&
-             !trimmed.startsWith('*') &&
-             !trimmed.startsWith('#');
-    }).length;
+  parseTree(code: string, oldTree?: Parser.Tree): Parser.Tree {
+    return this.parser.parse(code, oldTree);
+  }
 
-    return { total, effective };
+  getLanguageName(): string {
+    return this.languageName;
   }
 
   /**
@@ -58,23 +83,162 @@ export abstract class BaseParser implements ParserInterface {
   }
 
   /**
-   * Extract function/method nodes from AST
+   * Track the maximum nesting depth of block nodes during a shared walk
    */
-  protected extractFunctions(node: Parser.SyntaxNode, functionTypes: string[]): Parser.SyntaxNode[] {
-    const functions: Parser.SyntaxNode[] = [];
+  protected registerMaxNesting(engine: TraversalEngine, blockTypes: string[]): () => number {
+    let depth = 0;
+    let maxDepth = 0;
 
-    const traverse = (n: Parser.SyntaxNode) => {
-      if (functionTypes.includes(n.type)) {
-        functions.push(n);
+    engine.on(
+      blockTypes,
+      () => {
+        depth++;
+        maxDepth = Math.max(maxDepth, depth);
+      },
+      () => {
+        depth--;
       }
+    );
 
-      for (const child of n.children) {
-        traverse(child);
-      }
+    return () => maxDepth;
+  }
+
+  /**
+   * Collect the functions directly inside the region walked by `engine`.
+   * The walk stops at them, so each can be analyzed by a walk of its own.
+   */
+  protected registerNestedFunctions(
+    engine: TraversalEngine,
+    functionTypes: string[],
+    blockTypes: string[],
+    cognitiveNestingTypes: string[] = []
+  ): () => NestedFunction[] {
+    const nested: NestedFunction[] = [];
+    let depth = 0;
+    let cognitiveNesting = 0;
+
+    engine.on(blockTypes, () => { depth++; }, () => { depth--; });
+    engine.on(cognitiveNestingTypes, () => { cognitiveNesting++; }, () => { cognitiveNesting--; });
+    engine.onSkip(functionTypes, node => nested.push({ node, nestingOffset: depth, cognitiveNesting }));
+
+    return () => nested;
+  }
+
+  /**
+   * Find the outermost functions of a file, without entering them
+   */
+  protected findFunctions(root: Parser.SyntaxNode, functionTypes: string[], budget?: NodeBudget): NestedFunction[] {
+    const engine = new TraversalEngine(budget);
+    const functions = this.registerNestedFunctions(engine, functionTypes, []);
+    engine.walk(root);
+    return functions();
+  }
+
+  /**
+   * Combine a function's own metrics with those of its nested functions.
+   * Span-based metrics already cover the nested functions. The result is
+   * what one walk over the whole function would have measured.
+   */
+  protected aggregateMetrics(
+    exclusive: ComplexityMetrics,
+    cognitive: CognitiveComplexityParts,
+    nested: NestedFunction[],
+    children: FunctionTree[]
+  ): ComplexityMetrics {
+    const metrics = { ...exclusive };
+
+    children.forEach((child, i) => {
+      const inner = child.info.metrics;
+      // Each nested function contributes its decision points, not its entry
+      metrics.cyclomaticComplexity += inner.cyclomaticComplexity - 1;
+      // Its increments also sit under the nesting around it, and only
+      // calls to this function count as recursion
+      metrics.cognitiveComplexity += inner.cognitiveComplexity - child.cognitive.recursion +
+        nested[i].cognitiveNesting * child.cognitive.increments;
+      metrics.nestingDepth = Math.max(metrics.nestingDepth, nested[i].nestingOffset + inner.nestingDepth);
+    });
+
+    // Recursion from a nested function
+    metrics.cognitiveComplexity += this.countCalls(children, cognitive.name);
+
+    return metrics;
+  }
+
+  /**
+   * Calls to `name` anywhere in the given trees
+   */
+  private countCalls(trees: FunctionTree[], name: string): number {
+    if (name === '<anonymous>') return 0;
+    return trees.reduce(
+      (sum, tree) => sum + (tree.cognitive.calls.get(name) ?? 0) + this.countCalls(tree.children, name),
+      0
+    );
+  }
+
+  /**
+   * Link an analyzed function to its nested functions. Children are
+   * copied so their cached trees are never modified.
+   */
+  protected createFunctionTree(
+    node: Parser.SyntaxNode,
+    info: FunctionInfo,
+    exclusiveMetrics: ComplexityMetrics,
+    children: FunctionTree[],
+    cognitive: CognitiveComplexityParts
+  ): FunctionTree {
+    if (children.length > 0) {
+      const parent: FunctionRef = { name: info.name, startLine: info.startLine };
+      info.exclusiveMetrics = exclusiveMetrics;
+      info.children = children.map(child => ({ name: child.info.name, startLine: child.info.startLine }));
+      children = children.map(child => ({ ...child, info: { ...child.info, parent } }));
+    }
+
+    return {
+      info,
+      startIndex: node.startIndex,
+      endIndex: node.endIndex,
+      children,
+      cognitive: {
+        increments: children.reduce((sum, child) => sum + child.cognitive.increments, cognitive.increments),
+        calls: cognitive.calls,
+        recursion: cognitive.name !== '<anonymous>'
+          ? (cognitive.calls.get(cognitive.name) ?? 0) + this.countCalls(children, cognitive.name)
+          : 0,
+      },
+    };
+  }
+
+  /**
+   * Add file-level issues to the first function or class method. A copy
+   * is attached so cached function results are never modified, and
+   * methods listed both as functions and under their class share it.
+   */
+  protected attachFileIssues(functions: FunctionInfo[], classes: ClassInfo[], issues: CodeIssue[]): void {
+    const first = functions[0] ?? classes[0]?.methods[0];
+    if (issues.length === 0 || !first) {
+      return;
+    }
+
+    const copy: FunctionInfo = { ...first, issues: [...first.issues, ...issues] };
+    const withIssues = (func: FunctionInfo): FunctionInfo => func === first ? copy : func;
+
+    functions.splice(0, functions.length, ...functions.map(withIssues));
+    classes.forEach(cls => { cls.methods = cls.methods.map(withIssues); });
+  }
+
+  /**
+   * All functions of the given trees, outer functions before nested ones
+   */
+  protected flattenFunctionTrees(trees: FunctionTree[]): FunctionTree[] {
+    const flat: FunctionTree[] = [];
+
+    const visit = (tree: FunctionTree) => {
+      flat.push(tree);
+      tree.children.forEach(visit);
     };
 
-    traverse(node);
-    return functions;
+    trees.forEach(visit);
+    return flat;
   }
 
   /**
@@ -1,6 +1,4 @@
 import Parser from 'tree-sitter';
-import JavaScript from 'tree-sitter-javascript';
-import TypeScript from 'tree-sitter-typescript';
 import { BaseParser } from './BaseParser';
 import { FileAnalysis, FunctionInfo, ComplexityMetrics, CodeIssue, IssueType, IssueCategory, DEFAULT_CONFIG, ClassInfo } from '../types';
 import { CyclomaticComplexityCalculator } from '../analyzers/CyclomaticComplexity';
@@ -10,7 +8,29 @@ import { PerformanceDetector } from '../analyzers/PerformanceDetector';
 import { SecurityDetector } from '../analyzers/SecurityDetector';
 import { MemoryLeakDetector } from '../analyzers/MemoryLeakDetector';
 import { ArchitectureDetector } from '../analyzers/ArchitectureDetector';
-import { FixGenerator } from '../analyzers/FixGenerator';
+import { TraversalEngine } from '../analyzers/TraversalEngine';
+import { FunctionFingerprinter } from '../analyzers/DuplicateDetector';
+import { extractImports } from '../analyzers/ImportExtractor';
+import { AnalysisContext, FunctionTree } from '../analyzers/AnalysisContext';
+import { measure } from '../profiling/Profiler';
+
+const NESTING_BLOCK_TYPES = [
+  'if_statement',
+  'for_statement',
+  'while_statement',
+  'do_statement',
+  'switch_statement',
+  'try_statement',
+  'block',
+];
+
+const FUNCTION_TYPES = [
+  'function_declaration',
+  'function',
+  'arrow_function',
+  'method_definition',
+  'function_expression',
+];
 
 export class JavaScriptParser extends BaseParser {
   private cyclomaticCalc: CyclomaticComplexityCalculator;
@@ -21,11 +41,11 @@ export class JavaScriptParser extends BaseParser {
     super(isTypeScript ? 'TypeScript' : 'JavaScript');
     this.isTypeScript = isTypeScript;
 
-    // Set the appropriate language
+    // Set the appropriate language, loading only that native grammar
     if (isTypeScript) {
-      this.parser.setLanguage(TypeScript.typescript);
+      this.parser.setLanguage((require('tree-sitter-typescript') as typeof import('tree-sitter-typescript')).typescript);
     } else {
-      this.parser.setLanguage(JavaScript);
+      this.parser.setLanguage(require('tree-sitter-javascript') as typeof import('tree-sitter-javascript'));
     }
 
     this.cyclomaticCalc = new CyclomaticComplexityCalculator(
@@ -40,33 +60,29 @@ export class JavaScriptParser extends BaseParser {
     return this.isTypeScript ? ['.ts', '.tsx'] : ['.js', '.jsx'];
   }
 
-  parse(code: string, filePath: string): FileAnalysis {
-    const tree = this.parser.parse(code);
+  analyzeTree(tree: Parser.Tree, context: AnalysisContext, filePath: string): FileAnalysis {
     const root = tree.rootNode;
 
-    const lineCount = this.countLines(code);
-    const functions = this.analyzeFunctions(root, code);
-    const classes = this.analyzeClasses(root, code);
+    const lineCount = context.lines.countLines(1, context.lines.lineCount);
+    const analyzed = this.analyzeFunctions(root, context);
+    const functions = analyzed.map(fn => fn.info);
+    const classes = this.analyzeClasses(root, analyzed, context);
     const overallMetrics = this.calculateOverallMetrics(functions, lineCount);
 
     // Run file-level architecture detection (God Class, Tight Coupling)
-    const architectureDetector = new ArchitectureDetector(code);
-    const fileIssues = architectureDetector.detectArchitectureIssues(root);
-
-    // Add file-level issues to the first function or class
-    if (fileIssues.length > 0) {
-      if (functions.length > 0) {
-        functions[0].issues.push(...fileIssues);
-      } else if (classes.length > 0 && classes[0].methods.length > 0) {
-        classes[0].methods[0].issues.push(...fileIssues);
-      }
-    }
+    const architectureDetector = new ArchitectureDetector(context);
+    const fileIssues = context.metricsOnly
+      ? []
+      : measure('detector', 'ArchitectureDetector.detectArchitectureIssues', () =>
+        architectureDetector.detectArchitectureIssues(root));
+
+    this.attachFileIssues(functions, classes, fileIssues);
 
     // Calculate total issues including class methods
     const classIssues = classes.reduce((sum, cls) =>
       sum + cls.methods.reduce((methodSum, method) => methodSum + method.issues.length, 0), 0);
 
-    return {
+    const analysis: FileAnalysis = {
       filePath,
       language: this.languageName,
       overallMetrics,
@@ -75,53 +91,55 @@ export class JavaScriptParser extends BaseParser {
       totalIssues: functions.reduce((sum, fn) => sum + fn.issues.length, 0) + classIssues,
       analysisDate: new Date(),
     };
-  }
-
-  private analyzeFunctions(root: Parser.SyntaxNode, code: string): FunctionInfo[] {
-    const functionTypes = [
-      'function_declaration',
-      'function',
-      'arrow_function',
-      'method_definition',
-      'function_expression',
-    ];
+    if (context.collectImports) {
+      analysis.imports = measure('detector', 'ImportExtractor', () => extractImports(root));
+    }
 
-    const functionNodes = this.extractFunctions(root, functionTypes);
-    return functionNodes.map(node => this.analyzeFunction(node, code));
+    return analysis;
   }
 
-  private analyzeClasses(root: Parser.SyntaxNode, code: string): ClassInfo[] {
-    const classTypes = ['class_declaration', 'class'];
-    const classNodes: Parser.SyntaxNode[] = [];
-
-    const traverse = (node: Parser.SyntaxNode) => {
-      if (classTypes.includes(node.type)) {
-        classNodes.push(node);
-      }
-      for (const child of node.children) {
-        traverse(child);
-      }
-    };
+  /**
+   * Analyze every function bottom-up, each over its own body only.
+   * Methods are included; classes refer to the same results.
+   */
+  private analyzeFunctions(root: Parser.SyntaxNode, context: AnalysisContext): FunctionTree[] {
+    const trees = this.findFunctions(root, FUNCTION_TYPES, context.budget)
+      .map(fn => this.analyzeFunction(fn.node, context));
+    return this.flattenFunctionTrees(trees);
+  }
 
-    traverse(root);
-    return classNodes.map(node => this.analyzeClass(node, code));
+  private analyzeClasses(root: Parser.SyntaxNode, functions: FunctionTree[], context: AnalysisContext): ClassInfo[] {
+    const byStart = new Map(functions.map(tree => [tree.startIndex, tree.info]));
+    return root.descendantsOfType(['class_declaration', 'class'])
+      .map(node => this.analyzeClass(node, byStart, context));
   }
 
-  private analyzeClass(node: Parser.SyntaxNode, code: string): ClassInfo {
+  private analyzeClass(
+    node: Parser.SyntaxNode,
+    functions: Map<number, FunctionInfo>,
+    context: AnalysisContext
+  ): ClassInfo {
     const name = this.getClassName(node);
     const startLine = node.startPosition.row + 1;
     const endLine = node.endPosition.row + 1;
 
-    // Extract methods from the class
+    // Methods were analyzed with the other functions; look their results up
     const methods: FunctionInfo[] = [];
-    const methodNodes = node.children.find(child => child.type === 'class_body');
-
-    if (methodNodes) {
-      for (const child of methodNodes.children) {
-        if (child.type === 'method_definition' || child.type === 'field_definition') {
-          // Analyze method as a function
-          const methodInfo = this.analyzeFunction(child, code);
-          methods.push(methodInfo);
+    const classBody = node.children.find(child => child.type === 'class_body');
+
+    if (classBody) {
+      for (const child of classBody.children) {
+        if (child.type === 'method_definition') {
+          const info = functions.get(child.startIndex);
+          if (info) {
+            methods.push(info);
+          }
+        } else if (child.type === 'field_definition') {
+          // Every field counts as a method: one holding a function takes
+          // that function's results, any other is analyzed on its own
+          const value = child.childForFieldName('value');
+          const info = value ? functions.get(value.startIndex) : undefined;
+          methods.push(info ?? this.analyzeFunction(child, context).info);
         }
       }
     }
@@ -170,92 +188,82 @@ export class JavaScriptParser extends BaseParser {
     };
   }
 
-  private analyzeFunction(node: Parser.SyntaxNode, code: string): FunctionInfo {
+  private analyzeFunction(node: Parser.SyntaxNode, context: AnalysisContext): FunctionTree {
+    const cached = context.functionCache?.get(node);
+    if (cached) {
+      return cached;
+    }
+
     const name = this.getFunctionName(node);
     const startLine = node.startPosition.row + 1;
     const endLine = node.endPosition.row + 1;
     const functionLength = endLine - startLine + 1;
 
-    // Calculate metrics
-    const cyclomaticComplexity = this.cyclomaticCalc.calculate(node);
-    const cognitiveComplexity = this.cognitiveCalc.calculate(node);
-    const nestingDepth = this.calculateMaxNesting(node);
-    const parameterCount = this.countParameters(node);
+    const functionContext = context.forRange(startLine, endLine);
+    const lineCount = context.lines.countLines(startLine, endLine);
+
+    // Register metrics and all detectors on one engine so the function's
+    // own body is walked a single time. Nested functions are skipped and
+    // analyzed on their own, then folded into this one's metrics.
+    const engine = new TraversalEngine(context.budget);
+    const cyclomaticComplexity = engine.section('CyclomaticComplexityCalculator', () =>
+      this.cyclomaticCalc.register(engine));
+    const cognitive = engine.section('CognitiveComplexityCalculator', () =>
+      this.cognitiveCalc.registerParts(engine, node));
+    const nestingDepth = engine.section('maxNestingDepth', () =>
+      this.registerMaxNesting(engine, NESTING_BLOCK_TYPES));
+    const nestedFunctions = this.registerNestedFunctions(
+      engine, FUNCTION_TYPES, NESTING_BLOCK_TYPES, this.cognitiveCalc.nestingTypes);
+    const detectors = context.metricsOnly ? [] : [
+      new CodeSmellDetector(functionContext).register(engine),
+      new PerformanceDetector(functionContext).register(engine),
+      new SecurityDetector(functionContext).register(engine),
+      new MemoryLeakDetector(functionContext).register(engine),
+      new ArchitectureDetector(functionContext).register(engine),
+    ];
+    const fingerprint = context.metricsOnly || context.minFingerprintTokens === undefined
+      ? null
+      : engine.section('FunctionFingerprinter', () =>
+        new FunctionFingerprinter(context.minFingerprintTokens).register(engine, FUNCTION_TYPES));
 
-    const functionCode = code.substring(node.startIndex, node.endIndex);
-    const lineCount = this.countLines(functionCode);
+    engine.walk(node);
 
-    const metrics: ComplexityMetrics = {
-      cyclomaticComplexity,
-      cognitiveComplexity,
+    const cognitiveParts = cognitive();
+    const exclusiveMetrics: ComplexityMetrics = {
+      cyclomaticComplexity: cyclomaticComplexity(),
+      cognitiveComplexity: cognitiveParts.complexity,
       linesOfCode: lineCount.total,
       effectiveLinesOfCode: lineCount.effective,
-      nestingDepth,
+      nestingDepth: nestingDepth(),
       functionLength,
-      parameterCount,
+      parameterCount: this.countParameters(node),
     };
 
+    const nested = nestedFunctions();
+    const children = nested.map(fn => this.analyzeFunction(fn.node, context));
+    const metrics = this.aggregateMetrics(exclusiveMetrics, cognitiveParts, nested, children);
+
     // Detect complexity issues
-    const issues = this.detectIssues(metrics, name, startLine);
-
-    // Detect code smells, performance, security, memory leaks, and architecture issues
-    const codeSmellDetector = new CodeSmellDetector(functionCode);
-    const performanceDetector = new PerformanceDetector(functionCode);
-    const securityDetector = new SecurityDetector(functionCode);
-    const memoryLeakDetector = new MemoryLeakDetector(functionCode);
-    const architectureDetector = new ArchitectureDetector(functionCode);
-
-    // Run all detectors
-    issues.push(...codeSmellDetector.detectSmells(node));
-    issues.push(...performanceDetector.detectPerformanceIssues(node));
-    issues.push(...securityDetector.detectSecurityIssues(node));
-    issues.push(...memoryLeakDetector.detectLeaks(node));
-    issues.push(...architectureDetector.detectArchitectureIssues(node));
-
-    // Generate fixes for issues
-    const fixGenerator = new FixGenerator(functionCode);
-    issues.forEach(issue => {
-      const fix = fixGenerator.generateFix(issue);
-      if (fix) {
-        issue.fix = fix;
-      }
-    });
+    const issues = context.metricsOnly ? [] : this.detectIssues(metrics, name, startLine);
 
-    return {
+    // Collect code smells, performance, security, memory leak, and architecture issues
+    detectors.forEach(collect => issues.push(...collect()));
+
+    const info: FunctionInfo = {
       name,
       startLine,
       endLine,
       metrics,
       issues,
     };
-  }
-
-  private calculateMaxNesting(node: Parser.SyntaxNode): number {
-    let maxDepth = 0;
-
-    const blockTypes = [
-      'if_statement',
-      'for_statement',
-      'while_statement',
-      'do_statement',
-      'switch_statement',
-      'try_statement',
-      'block',
-    ];
-
-    const traverse = (n: Parser.SyntaxNode, depth: number) => {
-      const isBlock = blockTypes.includes(n.type);
-      const currentDepth = isBlock ? depth + 1 : depth;
-
-      maxDepth = Math.max(maxDepth, currentDepth);
-
-      for (const child of n.children) {
-        traverse(child, currentDepth);
-      }
-    };
+    const signature = fingerprint?.();
+    if (signature) {
+      info.fingerprint = signature;
+    }
 
-    traverse(node, 0);
-    return maxDepth;
+    const tree = this.createFunctionTree(node, info, exclusiveMetrics, children, cognitiveParts);
+    context.functionCache?.set(node, tree);
+    return tree;
   }
 
   private detectIssues(metrics: ComplexityMetrics, functionName: string, line: number): CodeIssue[] {
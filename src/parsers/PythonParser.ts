@@ -9,7 +9,22 @@ import { PerformanceDetector } from '../analyzers/PerformanceDetector';
 import { SecurityDetector } from '../analyzers/SecurityDetector';
 import { MemoryLeakDetector } from '../analyzers/MemoryLeakDetector';
 import { ArchitectureDetector } from '../analyzers/ArchitectureDetector';
-import { FixGenerator } from '../analyzers/FixGenerator';
+import { TraversalEngine } from '../analyzers/TraversalEngine';
+import { FunctionFingerprinter } from '../analyzers/DuplicateDetector';
+import { extractImports } from '../analyzers/ImportExtractor';
+import { AnalysisContext, FunctionTree } from '../analyzers/AnalysisContext';
+import { measure } from '../profiling/Profiler';
+
+const NESTING_BLOCK_TYPES = [
+  'if_statement',
+  'for_statement',
+  'while_statement',
+  'with_statement',
+  'try_statement',
+  'block',
+];
+
+const FUNCTION_TYPES = ['function_definition'];
 
 export class PythonParser extends BaseParser {
   private cyclomaticCalc: CyclomaticComplexityCalculator;
@@ -26,33 +41,31 @@ export class PythonParser extends BaseParser {
     return ['.py'];
   }
 
-  parse(code: string, filePath: string): FileAnalysis {
-    const tree = this.parser.parse(code);
+  analyzeTree(tree: Parser.Tree, context: AnalysisContext, filePath: string): FileAnalysis {
     const root = tree.rootNode;
 
-    const lineCount = this.countLines(code);
-    const functions = this.analyzeFunctions(root, code);
-    const classes = this.analyzeClasses(root, code);
+    const lineCount = context.lines.countLines(1, context.lines.lineCount);
+    const analyzed = this.analyzeFunctions(root, context);
+    const classes = this.analyzeClasses(root, analyzed);
+    // Methods are reported under their class only
+    const methods = new Set(classes.flatMap(cls => cls.methods));
+    const functions = analyzed.map(fn => fn.info).filter(info => !methods.has(info));
     const overallMetrics = this.calculateOverallMetrics(functions, lineCount);
 
     // Run file-level architecture detection
-    const architectureDetector = new ArchitectureDetector(code);
-    const fileIssues = architectureDetector.detectArchitectureIssues(root);
-
-    // Add file-level issues to the first function or class
-    if (fileIssues.length > 0) {
-      if (functions.length > 0) {
-        functions[0].issues.push(...fileIssues);
-      } else if (classes.length > 0 && classes[0].methods.length > 0) {
-        classes[0].methods[0].issues.push(...fileIssues);
-      }
-    }
+    const architectureDetector = new ArchitectureDetector(context);
+    const fileIssues = context.metricsOnly
+      ? []
+      : measure('detector', 'ArchitectureDetector.detectArchitectureIssues', () =>
+        architectureDetector.detectArchitectureIssues(root));
+
+    this.attachFileIssues(functions, classes, fileIssues);
 
     // Calculate total issues including class methods
     const classIssues = classes.reduce((sum, cls) =>
       sum + cls.methods.reduce((methodSum, method) => methodSum + method.issues.length, 0), 0);
 
-    return {
+    const analysis: FileAnalysis = {
       filePath,
       language: this.languageName,
       overallMetrics,
@@ -61,58 +74,42 @@ export class PythonParser extends BaseParser {
       totalIssues: functions.reduce((sum, fn) => sum + fn.issues.length, 0) + classIssues,
       analysisDate: new Date(),
     };
-  }
-
-  private analyzeFunctions(root: Parser.SyntaxNode, code: string): FunctionInfo[] {
-    const functionTypes = ['function_definition'];
-    const functionNodes = this.extractFunctions(root, functionTypes);
-
-    // Filter out class methods (they'll be handled in analyzeClasses)
-    const standaloneFunctions = functionNodes.filter(node => {
-      let parent = node.parent;
-      while (parent) {
-        if (parent.type === 'class_definition') {
-          return false;
-        }
-        parent = parent.parent;
-      }
-      return true;
-    });
+    if (context.collectImports) {
+      analysis.imports = measure('detector', 'ImportExtractor', () => extractImports(root));
+    }
 
-    return standaloneFunctions.map(node => this.analyzeFunction(node, code));
+    return analysis;
   }
 
-  private analyzeClasses(root: Parser.SyntaxNode, code: string): ClassInfo[] {
-    const classTypes = ['class_definition'];
-    const classNodes: Parser.SyntaxNode[] = [];
-
-    const traverse = (node: Parser.SyntaxNode) => {
-      if (classTypes.includes(node.type)) {
-        classNodes.push(node);
-      }
-      for (const child of node.children) {
-        traverse(child);
-      }
-    };
+  /**
+   * Analyze every function bottom-up, each over its own body only
+   */
+  private analyzeFunctions(root: Parser.SyntaxNode, context: AnalysisContext): FunctionTree[] {
+    const trees = this.findFunctions(root, FUNCTION_TYPES, context.budget)
+      .map(fn => this.analyzeFunction(fn.node, context));
+    return this.flattenFunctionTrees(trees);
+  }
 
-    traverse(root);
-    return classNodes.map(node => this.analyzeClass(node, code));
+  private analyzeClasses(root: Parser.SyntaxNode, functions: FunctionTree[]): ClassInfo[] {
+    const byStart = new Map(functions.map(tree => [tree.startIndex, tree.info]));
+    return root.descendantsOfType('class_definition')
+      .map(node => this.analyzeClass(node, byStart));
   }
 
-  private analyzeClass(node: Parser.SyntaxNode, code: string): ClassInfo {
+  private analyzeClass(node: Parser.SyntaxNode, functions: Map<number, FunctionInfo>): ClassInfo {
     const name = this.getClassName(node);
     const startLine = node.startPosition.row + 1;
     const endLine = node.endPosition.row + 1;
 
-    // Extract methods from the class
+    // Methods were analyzed with the other functions; look their results up
     const methods: FunctionInfo[] = [];
     const classBody = node.childForFieldName('body');
 
     if (classBody) {
       for (const child of classBody.children) {
-        if (child.type === 'function_definition') {
-          const methodInfo = this.analyzeFunction(child, code);
-          methods.push(methodInfo);
+        const info = child.type === 'function_definition' ? functions.get(child.startIndex) : undefined;
+        if (info) {
+          methods.push(info);
         }
       }
     }
@@ -156,90 +153,82 @@ export class PythonParser extends BaseParser {
     };
   }
 
-  private analyzeFunction(node: Parser.SyntaxNode, code: string): FunctionInfo {
+  private analyzeFunction(node: Parser.SyntaxNode, context: AnalysisContext): FunctionTree {
+    const cached = context.functionCache?.get(node);
+    if (cached) {
+      return cached;
+    }
+
     const name = this.getFunctionName(node);
     const startLine = node.startPosition.row + 1;
     const endLine = node.endPosition.row + 1;
     const functionLength = endLine - startLine + 1;
 
-    // Calculate metrics
-    const cyclomaticComplexity = this.cyclomaticCalc.calculate(node);
-    const cognitiveComplexity = this.cognitiveCalc.calculate(node);
-    const nestingDepth = this.calculateMaxNesting(node);
-    const parameterCount = this.countPythonParameters(node);
+    const functionContext = context.forRange(startLine, endLine);
+    const lineCount = context.lines.countLines(startLine, endLine);
+
+    // Register metrics and all detectors on one engine so the function's
+    // own body is walked a single time. Nested functions are skipped and
+    // analyzed on their own, then folded into this one's metrics.
+    const engine = new TraversalEngine(context.budget);
+    const cyclomaticComplexity = engine.section('CyclomaticComplexityCalculator', () =>
+      this.cyclomaticCalc.register(engine));
+    const cognitive = engine.section('CognitiveComplexityCalculator', () =>
+      this.cognitiveCalc.registerParts(engine, node));
+    const nestingDepth = engine.section('maxNestingDepth', () =>
+      this.registerMaxNesting(engine, NESTING_BLOCK_TYPES));
+    const nestedFunctions = this.registerNestedFunctions(
+      engine, FUNCTION_TYPES, NESTING_BLOCK_TYPES, this.cognitiveCalc.nestingTypes);
+    const detectors = context.metricsOnly ? [] : [
+      new CodeSmellDetector(functionContext).register(engine),
+      new PerformanceDetector(functionContext).register(engine),
+      new SecurityDetector(functionContext).register(engine),
+      new MemoryLeakDetector(functionContext).register(engine),
+      new ArchitectureDetector(functionContext).register(engine),
+    ];
+    const fingerprint = context.metricsOnly || context.minFingerprintTokens === undefined
+      ? null
+      : engine.section('FunctionFingerprinter', () =>
+        new FunctionFingerprinter(context.minFingerprintTokens).register(engine, FUNCTION_TYPES));
 
-    const functionCode = code.substring(node.startIndex, node.endIndex);
-    const lineCount = this.countLines(functionCode);
+    engine.walk(node);
 
-    const metrics: ComplexityMetrics = {
-      cyclomaticComplexity,
-      cognitiveComplexity,
+    const cognitiveParts = cognitive();
+    const exclusiveMetrics: ComplexityMetrics = {
+      cyclomaticComplexity: cyclomaticComplexity(),
+      cognitiveComplexity: cognitiveParts.complexity,
       linesOfCode: lineCount.total,
       effectiveLinesOfCode: lineCount.effective,
-      nestingDepth,
+      nestingDepth: nestingDepth(),
       functionLength,
-      parameterCount,
+      parameterCount: this.countPythonParameters(node),
     };
 
+    const nested = nestedFunctions();
+    const children = nested.map(fn => this.analyzeFunction(fn.node, context));
+    const metrics = this.aggregateMetrics(exclusiveMetrics, cognitiveParts, nested, children);
+
     // Detect complexity issues
-    const issues = this.detectIssues(metrics, name, startLine);
-
-    // Detect code smells, performance, and security issues
-    const codeSmellDetector = new CodeSmellDetector(functionCode);
-    const performanceDetector = new PerformanceDetector(functionCode);
-    const securityDetector = new SecurityDetector(functionCode);
-    const memoryLeakDetector = new MemoryLeakDetector(functionCode);
-    const architectureDetector = new ArchitectureDetector(functionCode);
-
-    issues.push(...codeSmellDetector.detectSmells(node));
-    issues.push(...performanceDetector.detectPerformanceIssues(node));
-    issues.push(...securityDetector.detectSecurityIssues(node));
-    issues.push(...memoryLeakDetector.detectLeaks(node));
-    issues.push(...architectureDetector.detectArchitectureIssues(node));
-
-    // Generate fixes for issues
-    const fixGenerator = new FixGenerator(functionCode);
-    issues.forEach(issue => {
-      const fix = fixGenerator.generateFix(issue);
-      if (fix) {
-        issue.fix = fix;
-      }
-    });
+    const issues = context.metricsOnly ? [] : this.detectIssues(metrics, name, startLine);
 
-    return {
+    // Collect code smells, performance, security, memory leak, and architecture issues
+    detectors.forEach(collect => issues.push(...collect()));
+
+    const info: FunctionInfo = {
       name,
       startLine,
       endLine,
       metrics,
       issues,
     };
-  }
-
-  private calculateMaxNesting(node: Parser.SyntaxNode): number {
-    let maxDepth = 0;
-
-    const blockTypes = [
-      'if_statement',
-      'for_statement',
-      'while_statement',
-      'with_statement',
-      'try_statement',
-      'block',
-    ];
-
-    const traverse = (n: Parser.SyntaxNode, depth: number) => {
-      const isBlock = blockTypes.includes(n.type);
-      const currentDepth = isBlock ? depth + 1 : depth;
-
-      maxDepth = Math.max(maxDepth, currentDepth);
-
-      for (const child of n.children) {
-        traverse(child, currentDepth);
-      }
-    };
+    const signature = fingerprint?.();
+    if (signature) {
+      info.fingerprint = signature;
+    }
 
-    traverse(node, 0);
-    return maxDepth;
+    const tree = this.createFunctionTree(node, info, exclusiveMetrics, children, cognitiveParts);
+    context.functionCache?.set(node, tree);
+    return tree;
   }
 
   private countPythonParameters(node: Parser.SyntaxNode): number {
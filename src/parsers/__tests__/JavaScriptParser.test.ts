@@ -1,5 +1,5 @@
 import { JavaScriptParser } from '../JavaScriptParser';
-import { IssueCategory } from '../../types';
+import { IssueCategory, IssueType } from '../../types';
 
 describe('JavaScriptParser', () => {
   let parser: JavaScriptParser;
@@ -91,6 +91,35 @@ describe('JavaScriptParser', () => {
       expect(result.classes[0].methods[1].name).toBe('subtract');
     });
 
+    it('should attach file-level issues to one copy shared by the function and its class', () => {
+      const methods = Array.from({ length: 11 }, (_, i) => `  m${i}() { return ${i}; }`);
+      const code = ['class Everything {', ...methods, '}'].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const [first] = result.functions;
+
+      expect(result.classes[0].methods[0]).toBe(first);
+      expect(first.issues.some(i => i.type === IssueType.GOD_CLASS)).toBe(true);
+    });
+
+    it('should count every class field as a method', () => {
+      const code = [
+        'class Counter {',
+        '  count = 0;',
+        '  increment = () => { if (this.count < 10) { this.count++; } };',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const [count, increment] = result.classes[0].methods;
+
+      expect(result.classes[0].methods).toHaveLength(2);
+      expect(count.startLine).toBe(2);
+      // A field holding a function shares that function's results
+      expect(increment).toBe(result.functions[0]);
+      expect(increment.metrics.cyclomaticComplexity).toBe(2);
+    });
+
     it('should parse arrow functions', () => {
       const code = `
         const double = (x) => x * 2;
@@ -168,6 +197,169 @@ describe('JavaScriptParser', () => {
       expect(perfIssues.length).toBeGreaterThan(0);
     });
 
+    it('should analyze nested functions once and fold them into their parent', () => {
+      const code = [
+        'function outer(items) {',
+        '  if (items) {',
+        '    items.forEach(item => {',
+        '      if (item) { eval(item); }',
+        '    });',
+        '  }',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const [outer, callback] = result.functions;
+
+      expect(outer.children).toEqual([{ name: '<anonymous>', startLine: 3 }]);
+      expect(callback.parent).toEqual({ name: 'outer', startLine: 1 });
+      expect(outer.exclusiveMetrics?.cyclomaticComplexity).toBe(2);
+      expect(outer.metrics.cyclomaticComplexity).toBe(3);
+      expect(outer.exclusiveMetrics?.nestingDepth).toBe(1);
+      expect(outer.metrics.nestingDepth).toBe(2);
+
+      // The eval is reported by the callback only
+      const securityLines = result.functions
+        .flatMap(fn => fn.issues)
+        .filter(i => i.category === IssueCategory.SECURITY)
+        .map(i => i.line);
+      expect(securityLines).toEqual([4]);
+    });
+
+    it('should fold nested cognitive complexity in at the nesting around it', () => {
+      const code = [
+        'function walk(node) {',
+        '  if (node) {',
+        '    node.children.forEach(child => {',
+        '      if (child.ok) { walk(child); }',
+        '    });',
+        '  }',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const [walk, callback] = result.functions;
+
+      expect(callback.metrics.cognitiveComplexity).toBe(1);
+      expect(walk.exclusiveMetrics?.cognitiveComplexity).toBe(1);
+      // Outer if 1, inner if 1 + 1 for nesting, recursion from the callback 1
+      expect(walk.metrics.cognitiveComplexity).toBe(4);
+    });
+
+    it('should report a TODO comment once, in the innermost function', () => {
+      const code = [
+        'function load(items) {',
+        '  // FIXME: retry',
+        '  return items.map(item => {',
+        '    // TODO: validate',
+        '    return item.id;',
+        '  });',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const [load, callback] = result.functions;
+      const todoLines = (fn: typeof load) => fn.issues
+        .filter(i => i.type === IssueType.TODO_COMMENT)
+        .map(i => i.line);
+
+      expect(todoLines(load)).toEqual([2]);
+      expect(todoLines(callback)).toEqual([4]);
+    });
+
+    it('should pair setInterval with clearInterval in a cleanup closure', () => {
+      const code = [
+        'function poll(refresh) {',
+        '  const id = setInterval(refresh, 1000);',
+        '  return () => clearInterval(id);',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const issues = result.functions.flatMap(fn => fn.issues);
+
+      expect(issues.some(i => i.type === IssueType.INTERVAL_LEAK)).toBe(false);
+      // The id is only used by the closure
+      expect(issues.some(i => i.type === IssueType.DEAD_CODE)).toBe(false);
+    });
+
+    it('should pair addEventListener with removeEventListener in a cleanup closure', () => {
+      const code = [
+        'function watch(onResize) {',
+        "  window.addEventListener('resize', onResize);",
+        "  window.addEventListener('scroll', onResize);",
+        '  return () => {',
+        "    window.removeEventListener('resize', onResize);",
+        '  };',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const leaks = result.functions
+        .flatMap(fn => fn.issues)
+        .filter(i => i.type === IssueType.EVENT_LISTENER_LEAK);
+
+      expect(leaks.map(i => i.line)).toEqual([3]);
+    });
+
+    it('should count variables used only in nested callbacks as used', () => {
+      const code = [
+        'function total(items) {',
+        '  let sum = 0;',
+        '  const unused = 1;',
+        '  items.forEach(item => { sum += item.price; });',
+        '  return items.length;',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const deadCode = result.functions
+        .flatMap(fn => fn.issues)
+        .filter(i => i.type === IssueType.DEAD_CODE);
+
+      expect(deadCode.map(i => i.message)).toEqual(["Variable 'unused' is declared but never used"]);
+    });
+
+    it('should report loops nested through a callback', () => {
+      const code = [
+        'function match(rows, keys) {',
+        '  for (const row of rows) {',
+        '    keys.forEach(key => {',
+        '      for (const cell of row) {',
+        '        if (cell === key) { row.found = true; }',
+        '      }',
+        '    });',
+        '  }',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const nestedLoops = result.functions
+        .flatMap(fn => fn.issues)
+        .filter(i => i.type === IssueType.NESTED_LOOPS);
+
+      expect(nestedLoops).toHaveLength(1);
+      expect(nestedLoops[0].line).toBe(4);
+      expect(nestedLoops[0].message).toContain('O(n²)');
+    });
+
+    it('should count variables captured by functions nested in a returned closure', () => {
+      const code = [
+        'function makeFlush(store) {',
+        '  return () => setTimeout(() => store.flush());',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const closures = result.functions
+        .flatMap(fn => fn.issues)
+        .filter(i => i.type === IssueType.CLOSURE_LEAK);
+
+      expect(closures).toHaveLength(1);
+      expect(closures[0].line).toBe(2);
+      expect(closures[0].suggestion).toContain('setTimeout, store');
+    });
+
     it('should handle empty files', () => {
       const code = '';
 
@@ -194,5 +386,23 @@ describe('JavaScriptParser', () => {
 
       expect(result.totalIssues).toBe(manualCount);
     });
+
+    it('should take issue snippets from absolute file lines', () => {
+      const code = [
+        'function first() {',
+        '  return 1;',
+        '}',
+        'function second(input) {',
+        '  eval(input);',
+        '}',
+      ].join('\n');
+
+      const result = parser.parse(code, 'test.js');
+      const second = result.functions.find(fn => fn.name === 'second');
+      const evalIssue = second?.issues.find(i => i.category === IssueCategory.SECURITY);
+
+      expect(evalIssue?.line).toBe(5);
+      expect(evalIssue?.codeSnippet).toBe('eval(input);');
+    });
   });
 });
@@ -0,0 +1,182 @@
+import * as fs from 'fs';
+
+export type ProfileCategory = 'stage' | 'detector' | 'file';
+
+export interface ProfileEntry {
+  name: string;
+  totalMs: number;
+  count: number;
+}
+
+export interface ProfileReport {
+  wallMs: number;
+  stages: ProfileEntry[];
+  detectors: ProfileEntry[];
+  files: ProfileEntry[];
+}
+
+interface TraceEvent {
+  name: string;
+  cat: ProfileCategory;
+  ph: 'X';
+  ts: number;
+  dur: number;
+  pid: number;
+  tid: number;
+  args?: Record<string, unknown>;
+}
+
+interface OpenSpan {
+  detectorMs: Record<string, number>;
+}
+
+/**
+ * Collects performance.now() spans for the --profile flag
+ *
+ * Stages (read, parse, analyze, report) and whole files are recorded as
+ * spans. Detector time is accumulated from many small measurements taken
+ * inside the traversal walk; since detectors interleave on one walk, it is
+ * attached to the enclosing span's trace args rather than emitted as spans
+ * of its own.
+ *
+ * Instrumented code calls the module-level profile() helper, which costs a
+ * single null check while no profiler is active.
+ */
+export class Profiler {
+  static active: Profiler | null = null;
+
+  private origin = performance.now();
+  private totals: Map<string, ProfileEntry & { category: ProfileCategory }> = new Map();
+  private events: TraceEvent[] = [];
+  private open: OpenSpan[] = [];
+
+  /**
+   * Create a profiler and make it the active one
+   */
+  static start(): Profiler {
+    Profiler.active = new Profiler();
+    return Profiler.active;
+  }
+
+  static stop(): void {
+    Profiler.active = null;
+  }
+
+  /**
+   * Run fn inside a span, recording it as a trace event
+   */
+  span<T>(category: ProfileCategory, name: string, fn: () => T, args?: Record<string, unknown>): T {
+    const frame: OpenSpan = { detectorMs: {} };
+    this.open.push(frame);
+    const start = performance.now();
+
+    try {
+      return fn();
+    } finally {
+      const duration = performance.now() - start;
+      this.open.pop();
+      this.add(category, name, duration);
+
+      const detectorArgs = Object.keys(frame.detectorMs).length > 0
+        ? { detectorMs: roundValues(frame.detectorMs) }
+        : {};
+      this.events.push({
+        name,
+        cat: category,
+        ph: 'X',
+        ts: Math.round((start - this.origin) * 1000),
+        dur: Math.round(duration * 1000),
+        pid: process.pid,
+        tid: 0,
+        args: { ...args, ...detectorArgs },
+      });
+    }
+  }
+
+  /**
+   * Add a measurement to the totals without recording a trace event
+   */
+  add(category: ProfileCategory, name: string, durationMs: number): void {
+    const key = `${category}:${name}`;
+    const total = this.totals.get(key);
+    if (total) {
+      total.totalMs += durationMs;
+      total.count++;
+    } else {
+      this.totals.set(key, { category, name, totalMs: durationMs, count: 1 });
+    }
+
+    if (category === 'detector') {
+      for (const frame of this.open) {
+        frame.detectorMs[name] = (frame.detectorMs[name] ?? 0) + durationMs;
+      }
+    }
+  }
+
+  /**
+   * Ranked totals per stage, detector and file (slowest first)
+   */
+  getReport(limit: number = 10): ProfileReport {
+    const ranked = (category: ProfileCategory) => Array.from(this.totals.values())
+      .filter(entry => entry.category === category)
+      .sort((a, b) => b.totalMs - a.totalMs)
+      .map(({ name, totalMs, count }) => ({ name, totalMs: round(totalMs), count }));
+
+    return {
+      wallMs: round(performance.now() - this.origin),
+      stages: ranked('stage'),
+      detectors: ranked('detector'),
+      files: ranked('file').slice(0, limit),
+    };
+  }
+
+  /**
+   * Write the recorded spans as Chrome trace-event JSON
+   */
+  writeTrace(outputPath: string): void {
+    const trace = {
+      traceEvents: [...this.events].sort((a, b) => a.ts - b.ts),
+      displayTimeUnit: 'ms',
+    };
+    fs.writeFileSync(outputPath, JSON.stringify(trace));
+  }
+}
+
+/**
+ * Run fn in a span of the active profiler, or just run it when profiling is off
+ */
+export function profile<T>(
+  category: ProfileCategory,
+  name: string,
+  fn: () => T,
+  args?: Record<string, unknown>
+): T {
+  const profiler = Profiler.active;
+  return profiler ? profiler.span(category, name, fn, args) : fn();
+}
+
+/**
+ * Time fn into the active profiler's totals without recording a trace event.
+ * Use this for work that runs too often to be worth a span of its own.
+ */
+export function measure<T>(category: ProfileCategory, name: string, fn: () => T): T {
+  const profiler = Profiler.active;
+  if (!profiler) {
+    return fn();
+  }
+
+  const start = performance.now();
+  try {
+    return fn();
+  } finally {
+    profiler.add(category, name, performance.now() - start);
+  }
+}
+
+function round(value: number): number {
+  return Math.round(value * 1000) / 1000;
+}
+
+function roundValues(values: Record<string, number>): Record<string, number> {
+  return Object.fromEntries(Object.entries(values).map(([key, value]) => [key, round(value)]));
+}
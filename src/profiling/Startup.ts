@@ -0,0 +1,101 @@
+import * as nodeModule from 'module';
+import * as os from 'os';
+import * as path from 'path';
+import { performance } from 'perf_hooks';
+
+/**
+ * CLI startup: enables the V8 compile cache and records when each startup
+ * phase ends, for `--timings`. Imported before anything else in
+ * cli/index.ts, so the cache covers every module loaded after it.
+ */
+
+// `0` disables the compile cache; any other value is its directory
+export const COMPILE_CACHE_ENV = 'COMPLEXITY_COMPILE_CACHE';
+
+export type StartupPhase = 'bootstrap' | 'modules' | 'command';
+
+export interface StartupTimings {
+  // Process start until the CLI's first module ran
+  bootstrapMs: number;
+  // Loading the CLI and the modules every command needs
+  modulesMs: number;
+  // Running the command, including the modules it loaded on demand
+  commandMs: number;
+  totalMs: number;
+  modulesAtStart: number;
+  modulesLoaded: number;
+  compileCache: string;
+}
+
+interface CompileCacheResult {
+  status: number;
+  message?: string;
+  directory?: string;
+}
+
+// Node >= 22.1; missing on older versions
+type EnableCompileCache = (directory?: string) => CompileCacheResult;
+
+const marks: Partial<Record<StartupPhase, number>> = { bootstrap: performance.now() };
+let modulesAtStart = 0;
+
+const compileCache = enableCompileCache();
+
+/**
+ * Record the end of a startup phase
+ */
+export function markStartup(phase: StartupPhase): void {
+  marks[phase] = performance.now();
+  if (phase === 'modules') {
+    modulesAtStart = loadedModuleCount();
+  }
+}
+
+export function getStartupTimings(): StartupTimings {
+  const now = performance.now();
+  const bootstrap = marks.bootstrap!;
+  const modules = marks.modules ?? now;
+  const command = marks.command ?? now;
+
+  return {
+    bootstrapMs: bootstrap,
+    modulesMs: modules - bootstrap,
+    commandMs: command - modules,
+    totalMs: command,
+    modulesAtStart,
+    modulesLoaded: loadedModuleCount(),
+    compileCache,
+  };
+}
+
+function enableCompileCache(): string {
+  const enable = (nodeModule as unknown as { enableCompileCache?: EnableCompileCache }).enableCompileCache;
+  const setting = process.env[COMPILE_CACHE_ENV];
+
+  if (setting === '0') {
+    return 'disabled';
+  }
+  if (!enable) {
+    return `unavailable (Node ${process.versions.node})`;
+  }
+
+  try {
+    const result = enable(setting || path.join(os.tmpdir(), 'complexity-compile-cache'));
+    // FAILED, ENABLED, ALREADY_ENABLED, DISABLED (by NODE_DISABLE_COMPILE_CACHE)
+    switch (result.status) {
+      case 1:
+      case 2:
+        return result.directory ?? 'enabled';
+      case 3:
+        return 'disabled';
+      default:
+        return `failed (${result.message ?? 'unknown error'})`;
+    }
+  } catch (error) {
+    return `failed (${error instanceof Error ? error.message : error})`;
+  }
+}
+
+function loadedModuleCount(): number {
+  return Object.keys(require.cache).length;
+}
@@ -0,0 +1,51 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { Profiler, profile, measure } from '../Profiler';
+import { JavaScriptParser } from '../../parsers/JavaScriptParser';
+
+describe('Profiler', () => {
+  afterEach(() => {
+    Profiler.stop();
+  });
+
+  it('should not record anything while inactive', () => {
+    expect(profile('stage', 'parse', () => 42)).toBe(42);
+    expect(measure('detector', 'Some.check', () => 'ok')).toBe('ok');
+    expect(Profiler.active).toBeNull();
+  });
+
+  it('should attribute time to stages and detectors of a parse', () => {
+    const profiler = Profiler.start();
+    new JavaScriptParser(false).parse('function f(a) { if (a == 1) { console.log(a); } }', 'f.js');
+    Profiler.stop();
+
+    const report = profiler.getReport();
+
+    expect(report.stages.map(entry => entry.name)).toEqual(expect.arrayContaining(['parse', 'analyze']));
+    expect(report.detectors.map(entry => entry.name)).toEqual(expect.arrayContaining([
+      'CyclomaticComplexityCalculator',
+      'CodeSmellDetector.detectConsoleLog',
+      'CodeSmellDetector.detectTypeCoercion',
+    ]));
+  });
+
+  it('should write spans as Chrome trace events', () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-trace-'));
+    const tracePath = path.join(dir, 'trace.json');
+
+    const profiler = Profiler.start();
+    profile('file', 'a.js', () => {
+      profile('stage', 'parse', () => undefined);
+      measure('detector', 'Some.check', () => undefined);
+    });
+    profiler.writeTrace(tracePath);
+
+    const trace = JSON.parse(fs.readFileSync(tracePath, 'utf-8'));
+    fs.rmSync(dir, { recursive: true, force: true });
+
+    expect(trace.traceEvents.map((event: { name: string }) => event.name)).toEqual(['a.js', 'parse']);
+    expect(trace.traceEvents[0].ph).toBe('X');
+    expect(trace.traceEvents[0].args.detectorMs).toHaveProperty('Some.check');
+  });
+});
@@ -1,6 +1,12 @@
 import chalk from 'chalk';
 import Table from 'cli-table3';
-import { FileAnalysis, FunctionInfo, CodeIssue, IssueCategory } from '../types';
+import { AnalysisList, FileAnalysis, FunctionInfo, CodeIssue, IssueCategory } from '../types';
+import { IncrementalUpdate } from '../analyzers/IncrementalAnalyzer';
+import { ProfileEntry, ProfileReport } from '../profiling/Profiler';
+import { StartupTimings } from '../profiling/Startup';
+import type { SeriesGranularity, SeriesPoint } from '../database/HistoryDatabase';
+
+const SPARK_LEVELS = '▁▂▃▄▅▆▇█';
 
 /**
  * Console reporter for displaying analysis results
@@ -14,6 +20,10 @@ export class ConsoleReporter {
     console.log(chalk.bold.cyan(`📄 File: ${analysis.filePath}`));
     console.log(chalk.bold.cyan('═'.repeat(80)));
 
+    if (analysis.degraded) {
+      console.log(chalk.yellow(`\n⚠️  Metrics only, no issue detection: ${analysis.degraded.error}`));
+    }
+
     this.printOverallMetrics(analysis);
     this.printFunctionTable(analysis.functions);
     this.printIssues(analysis);
@@ -22,24 +32,14 @@ export class ConsoleReporter {
   }
 
   /**
-   * Display analysis for multiple files
+   * Display analysis for multiple files. The analyses are read once, so an
+   * AnalysisStore only materializes one file at a time.
    */
-  reportMultipleFiles(analyses: FileAnalysis[]) {
+  reportMultipleFiles(analyses: AnalysisList) {
     console.log('\n' + chalk.bold.magenta('═'.repeat(80)));
     console.log(chalk.bold.magenta(`📊 Analysis Summary (${analyses.length} files)`));
     console.log(chalk.bold.magenta('═'.repeat(80)));
 
-    // Overall statistics
-    const totalIssues = analyses.reduce((sum, a) => sum + a.totalIssues, 0);
-    const totalFunctions = analyses.reduce((sum, a) => sum + a.functions.length, 0);
-    const avgComplexity = analyses.reduce((sum, a) => sum + a.overallMetrics.cyclomaticComplexity, 0) / analyses.length;
-
-    console.log(chalk.white(`\n📈 Statistics:`));
-    console.log(chalk.white(`   Total Files: ${analyses.length}`));
-    console.log(chalk.white(`   Total Functions: ${totalFunctions}`));
-    console.log(chalk.white(`   Total Issues: ${this.colorizeIssueCount(totalIssues)}`));
-    console.log(chalk.white(`   Average Complexity: ${this.colorizeComplexity(avgComplexity)}\n`));
-
     // Per-file summary
     const table = new Table({
       head: [
@@ -52,10 +52,23 @@ export class ConsoleReporter {
       colWidths: [40, 12, 18, 18, 10],
     });
 
-    analyses.forEach(analysis => {
+    let totalIssues = 0;
+    let totalFunctions = 0;
+    let totalComplexity = 0;
+    let degraded = 0;
+    let topFunctions: Array<{ file: string; fn: FunctionInfo }> = [];
+
+    for (const analysis of analyses) {
       const avgCyclo = analysis.overallMetrics.cyclomaticComplexity;
       const avgCog = analysis.overallMetrics.cognitiveComplexity;
 
+      totalIssues += analysis.totalIssues;
+      totalFunctions += analysis.functions.length;
+      totalComplexity += avgCyclo;
+      if (analysis.degraded) {
+        degraded++;
+      }
+
       table.push([
         this.truncate(analysis.filePath, 38),
         analysis.functions.length.toString(),
@@ -63,16 +76,247 @@ export class ConsoleReporter {
         this.colorizeComplexity(avgCog),
         this.colorizeIssueCount(analysis.totalIssues),
       ]);
-    });
+
+      topFunctions = this.mostComplexFunctions(topFunctions, analysis);
+    }
+
+    // Overall statistics
+    const avgComplexity = totalComplexity / analyses.length;
+
+    console.log(chalk.white(`\n📈 Statistics:`));
+    console.log(chalk.white(`   Total Files: ${analyses.length}`));
+    console.log(chalk.white(`   Total Functions: ${totalFunctions}`));
+    console.log(chalk.white(`   Total Issues: ${this.colorizeIssueCount(totalIssues)}`));
+    if (degraded > 0) {
+      console.log(chalk.yellow(`   Metrics Only (minified or generated): ${degraded}`));
+    }
+    console.log(chalk.white(`   Average Complexity: ${this.colorizeComplexity(avgComplexity)}\n`));
 
     console.log(table.toString());
 
     // Most complex functions across all files
-    this.printTopComplexFunctions(analyses);
+    this.printTopComplexFunctions(topFunctions);
 
     console.log('\n');
   }
 
+  /**
+   * Display what changed in a file since its previous analysis (watch mode)
+   */
+  reportDelta(update: IncrementalUpdate) {
+    const { previous, current } = update;
+    const total = update.reanalyzedFunctions + update.reusedFunctions;
+    const timing = `${update.durationMs.toFixed(1)}ms, re-analyzed ${update.reanalyzedFunctions} of ${total} functions`;
+
+    console.log(chalk.bold.cyan(`\n↻ ${current.filePath}`) + chalk.gray(` (${timing})`));
+
+    const before = this.indexFunctions(previous ? this.collectFunctions(previous) : []);
+    const after = this.indexFunctions(this.collectFunctions(current));
+    let changes = 0;
+
+    after.forEach((fn, key) => {
+      const old = before.get(key);
+      if (!old) {
+        changes++;
+        console.log(chalk.green(`  + ${fn.name}`) + chalk.gray(` cyclomatic ${fn.metrics.cyclomaticComplexity}, cognitive ${fn.metrics.cognitiveComplexity}`));
+        this.printIssueDelta([], fn.issues);
+        return;
+      }
+
+      const metricChanges = (['cyclomaticComplexity', 'cognitiveComplexity', 'nestingDepth'] as const)
+        .filter(metric => old.metrics[metric] !== fn.metrics[metric])
+        .map(metric => `${metric.replace('Complexity', '').replace('Depth', '')} ${old.metrics[metric]} → ${fn.metrics[metric]}`);
+      const issueChanges = this.hasIssueChanges(old.issues, fn.issues);
+
+      if (metricChanges.length > 0 || issueChanges) {
+        changes++;
+        console.log(chalk.yellow(`  ~ ${fn.name}`) + chalk.gray(` ${metricChanges.join(', ')}`));
+        this.printIssueDelta(old.issues, fn.issues);
+      }
+    });
+
+    before.forEach((fn, key) => {
+      if (!after.has(key)) {
+        changes++;
+        console.log(chalk.red(`  - ${fn.name}`));
+      }
+    });
+
+    if (changes === 0) {
+      console.log(chalk.gray('  No metric or issue changes'));
+    } else if (previous) {
+      console.log(chalk.white(`  Issues: ${previous.totalIssues} → ${this.colorizeIssueCount(current.totalIssues)}`));
+    }
+  }
+
+  /**
+   * Display the ranked --profile breakdown
+   */
+  reportProfile(report: ProfileReport, log: (message: string) => void = console.log) {
+    log('\n' + chalk.bold.yellow('═'.repeat(80)));
+    log(chalk.bold.yellow(`⏱  Profile (${report.wallMs.toFixed(1)} ms wall time)`));
+    log(chalk.bold.yellow('═'.repeat(80)));
+
+    this.printProfileTable('Stage', report.stages, report.wallMs, log);
+    this.printProfileTable('Detector', report.detectors, report.wallMs, log);
+    this.printProfileTable('Slowest Files', report.files, report.wallMs, log);
+  }
+
+  /**
+   * Display the --timings startup breakdown
+   */
+  reportTimings(timings: StartupTimings, log: (message: string) => void = console.log) {
+    const table = new Table({
+      head: [chalk.bold('Phase'), chalk.bold('Time (ms)'), chalk.bold('Modules')],
+      colWidths: [30, 14, 10],
+    });
+
+    table.push(
+      ['Node bootstrap', timings.bootstrapMs.toFixed(1), '-'],
+      ['Module loading', timings.modulesMs.toFixed(1), timings.modulesAtStart.toString()],
+      ['Command', timings.commandMs.toFixed(1), (timings.modulesLoaded - timings.modulesAtStart).toString()],
+      [chalk.bold('Total'), chalk.bold(timings.totalMs.toFixed(1)), timings.modulesLoaded.toString()]
+    );
+
+    log('\n' + chalk.bold.yellow(`⏱  Startup timings`));
+    log(table.toString());
+    log(chalk.gray(`Compile cache: ${timings.compileCache}`));
+  }
+
+  /**
+   * Display a file's or directory's metrics over time, with sparklines of
+   * the trend
+   */
+  reportSeries(
+    title: string,
+    points: SeriesPoint[],
+    granularity: SeriesGranularity,
+    log: (message: string) => void = console.log
+  ) {
+    const table = new Table({
+      head: ['Date', 'Runs', 'Files', 'Cyclomatic', 'Cognitive', 'Issues', 'By category'].map(label => chalk.bold(label)),
+    });
+
+    points.forEach(point => {
+      const date = new Date(point.timestamp);
+      const categories = Object.entries(point.issuesByCategory)
+        .filter(([, count]) => count > 0)
+        .sort((a, b) => b[1] - a[1])
+        .map(([category, count]) => `${category.toLowerCase()} ${count}`)
+        .join(', ');
+
+      table.push([
+        granularity === 'run' ? date.toLocaleString() : date.toISOString().slice(0, 10),
+        point.runs.toString(),
+        point.files.toString(),
+        point.cyclomatic.toString(),
+        point.cognitive.toString(),
+        point.issues.toString(),
+        categories || '-',
+      ]);
+    });
+
+    const per = granularity === 'run' ? 'analysis' : granularity;
+    log('\n' + chalk.bold.cyan(`📈 ${title} (per ${per})\n`));
+    log(table.toString());
+    log(chalk.white(`Cyclomatic ${this.sparkline(points.map(point => point.cyclomatic))}`));
+    log(chalk.white(`Issues     ${this.sparkline(points.map(point => point.issues))}`));
+  }
+
+  private sparkline(values: number[]): string {
+    const min = Math.min(...values);
+    const range = Math.max(...values) - min;
+    return values
+      .map(value => SPARK_LEVELS[range === 0 ? 0 : Math.round(((value - min) / range) * (SPARK_LEVELS.length - 1))])
+      .join('');
+  }
+
+  private printProfileTable(
+    title: string,
+    entries: ProfileEntry[],
+    wallMs: number,
+    log: (message: string) => void
+  ) {
+    if (entries.length === 0) {
+      return;
+    }
+
+    const table = new Table({
+      head: [chalk.bold(title), chalk.bold('Total (ms)'), chalk.bold('% Wall'), chalk.bold('Calls')],
+      colWidths: [50, 14, 10, 10],
+    });
+
+    entries.forEach(entry => {
+      table.push([
+        this.truncate(entry.name, 48),
+        entry.totalMs.toFixed(2),
+        wallMs > 0 ? `${((entry.totalMs / wallMs) * 100).toFixed(1)}%` : '-',
+        entry.count.toString(),
+      ]);
+    });
+
+    log(table.toString());
+  }
+
+  private collectFunctions(analysis: FileAnalysis): FunctionInfo[] {
+    // Class methods can also appear in the function list; keep one of each
+    const seen = new Set<string>();
+    return [...analysis.functions, ...analysis.classes.flatMap(cls => cls.methods)].filter(fn => {
+      const key = `${fn.name}:${fn.startLine}`;
+      if (seen.has(key)) return false;
+      seen.add(key);
+      return true;
+    });
+  }
+
+  /**
+   * Key functions by name and occurrence, so edits that only move a
+   * function do not show up as a change
+   */
+  private indexFunctions(functions: FunctionInfo[]): Map<string, FunctionInfo> {
+    const index = new Map<string, FunctionInfo>();
+    const occurrences = new Map<string, number>();
+
+    functions.forEach(fn => {
+      const n = occurrences.get(fn.name) ?? 0;
+      occurrences.set(fn.name, n + 1);
+      index.set(`${fn.name}#${n}`, fn);
+    });
+
+    return index;
+  }
+
+  private hasIssueChanges(before: CodeIssue[], after: CodeIssue[]): boolean {
+    const signature = (issue: CodeIssue) => `${issue.type}:${issue.message}`;
+    const a = before.map(signature).sort().join('\n');
+    const b = after.map(signature).sort().join('\n');
+    return a !== b;
+  }
+
+  private printIssueDelta(before: CodeIssue[], after: CodeIssue[]) {
+    const signature = (issue: CodeIssue) => `${issue.type}:${issue.message}`;
+    const remaining = new Map<string, number>();
+    before.forEach(issue => remaining.set(signature(issue), (remaining.get(signature(issue)) ?? 0) + 1));
+
+    after.forEach(issue => {
+      const count = remaining.get(signature(issue)) ?? 0;
+      if (count > 0) {
+        remaining.set(signature(issue), count - 1);
+        return;
+      }
+      const color = this.getSeverityColor(issue.severity);
+      console.log(color(`    + ${this.getSeverityIcon(issue.severity)} [Line ${issue.line}] ${issue.message}`));
+    });
+
+    before.forEach(issue => {
+      const count = remaining.get(signature(issue)) ?? 0;
+      if (count > 0) {
+        remaining.set(signature(issue), count - 1);
+        console.log(chalk.gray(`    - [Line ${issue.line}] ${issue.message}`));
+      }
+    });
+  }
+
   private printOverallMetrics(analysis: FileAnalysis) {
     const m = analysis.overallMetrics;
 
@@ -109,12 +353,14 @@ export class ConsoleReporter {
       const cogni = fn.metrics.cognitiveComplexity;
       const nesting = fn.metrics.nestingDepth;
 
+      const previous = fn.previousMetrics;
+
       table.push([
         this.truncate(fn.name, 28),
         `${fn.startLine}-${fn.endLine}`,
-        this.colorizeComplexity(cyclo),
-        this.colorizeComplexity(cogni),
-        this.colorizeNesting(nesting),
+        this.colorizeComplexity(cyclo) + this.formatChange(cyclo, previous?.cyclomaticComplexity),
+        this.colorizeComplexity(cogni) + this.formatChange(cogni, previous?.cognitiveComplexity),
+        this.colorizeNesting(nesting) + this.formatChange(nesting, previous?.nestingDepth),
         fn.issues.length > 0 ? chalk.red(fn.issues.length.toString()) : chalk.green('0'),
       ]);
     });
@@ -212,20 +458,23 @@ export class ConsoleReporter {
     });
   }
 
-  private printTopComplexFunctions(analyses: FileAnalysis[]) {
-    const allFunctions: Array<{ file: string; fn: FunctionInfo }> = [];
-
-    analyses.forEach(analysis => {
-      analysis.functions.forEach(fn => {
-        allFunctions.push({ file: analysis.filePath, fn });
-      });
-    });
+  /**
+   * The ten most complex functions among `top` and the file's functions.
+   * The sort is stable, so ties keep the order the files were read in.
+   */
+  private mostComplexFunctions(
+    top: Array<{ file: string; fn: FunctionInfo }>,
+    analysis: FileAnalysis
+  ): Array<{ file: string; fn: FunctionInfo }> {
+    const candidates = [...top, ...analysis.functions.map(fn => ({ file: analysis.filePath, fn }))];
 
     // Sort by cyclomatic complexity
-    allFunctions.sort((a, b) => b.fn.metrics.cyclomaticComplexity - a.fn.metrics.cyclomaticComplexity);
+    candidates.sort((a, b) => b.fn.metrics.cyclomaticComplexity - a.fn.metrics.cyclomaticComplexity);
 
-    const top10 = allFunctions.slice(0, 10);
+    return candidates.slice(0, 10);
+  }
 
+  private printTopComplexFunctions(top10: Array<{ file: string; fn: FunctionInfo }>) {
     if (top10.length === 0) return;
 
     console.log(chalk.white('\n🔥 Top 10 Most Complex Functions:'));
@@ -268,6 +517,15 @@ export class ConsoleReporter {
     return chalk.red(depth.toString());
   }
 
+  /**
+   * Change from a --since revision's value, e.g. " (+2)"
+   */
+  private formatChange(value: number, previous: number | undefined): string {
+    if (previous === undefined || previous === value) return '';
+    const change = value - previous;
+    return change > 0 ? chalk.red(` (+${change})`) : chalk.green(` (${change})`);
+  }
+
   private colorizeIssueCount(count: number): string {
     if (count === 0) return chalk.green(count.toString());
     if (count <= 3) return chalk.yellow(count.toString());
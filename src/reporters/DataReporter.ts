@@ -0,0 +1,142 @@
+import { FileAnalysis, FunctionInfo, IssueCategory } from '../types';
+
+export type DataFormat = 'json' | 'ndjson' | 'csv';
+
+export const DATA_FORMATS: readonly DataFormat[] = ['json', 'ndjson', 'csv'];
+
+export function isDataFormat(format: string | undefined): format is DataFormat {
+  return DATA_FORMATS.includes(format as DataFormat);
+}
+
+const CATEGORIES = Object.values(IssueCategory);
+
+/**
+ * Columns of the CSV export, one row per function. Every column after
+ * `class` is an integer.
+ */
+export const CSV_COLUMNS = [
+  'file',
+  'language',
+  'function',
+  'class',
+  'startLine',
+  'endLine',
+  'cyclomatic',
+  'cognitive',
+  'nesting',
+  'loc',
+  'effectiveLoc',
+  'parameters',
+  'issues',
+  // e.g. CODE_SMELL -> codeSmellIssues
+  ...CATEGORIES.map(category =>
+    category.toLowerCase().replace(/_(\w)/g, (_, letter: string) => letter.toUpperCase()) + 'Issues'
+  ),
+];
+
+/**
+ * Serializes analyses for machines, one file at a time, so output can be
+ * streamed as files finish:
+ * - `json`: a single compact JSON array
+ * - `ndjson`: one compact JSON object per line and file
+ * - `csv`: one row per function with the columns in CSV_COLUMNS
+ */
+export class DataReporter {
+  private count = 0;
+
+  constructor(private readonly format: DataFormat) {}
+
+  /**
+   * Text to write before the first analysis
+   */
+  header(): string {
+    switch (this.format) {
+      case 'json':
+        return '[';
+      case 'csv':
+        return CSV_COLUMNS.join(',') + '\n';
+      default:
+        return '';
+    }
+  }
+
+  /**
+   * Text for one analysis
+   */
+  serialize(analysis: FileAnalysis): string {
+    const first = this.count++ === 0;
+
+    switch (this.format) {
+      case 'json':
+        return (first ? '' : ',') + JSON.stringify(analysis);
+      case 'ndjson':
+        return JSON.stringify(analysis) + '\n';
+      case 'csv':
+        return this.toRows(analysis).map(row => row.map(escapeCSV).join(',') + '\n').join('');
+    }
+  }
+
+  /**
+   * Text to write after the last analysis
+   */
+  footer(): string {
+    return this.format === 'json' ? ']\n' : '';
+  }
+
+  private toRows(analysis: FileAnalysis): Array<Array<string | number>> {
+    const rows: Array<Array<string | number>> = [];
+    const owners = new Map<string, string>();
+    const emitted = new Set<string>();
+
+    // Methods may also be listed as functions; each is emitted once, with its class
+    for (const cls of analysis.classes) {
+      for (const method of cls.methods) {
+        owners.set(functionKey(method), cls.name);
+      }
+    }
+
+    const add = (fn: FunctionInfo) => {
+      const key = functionKey(fn);
+      if (emitted.has(key)) {
+        return;
+      }
+      emitted.add(key);
+
+      const counts = new Map<IssueCategory, number>();
+      for (const issue of fn.issues) {
+        counts.set(issue.category, (counts.get(issue.category) ?? 0) + 1);
+      }
+
+      rows.push([
+        analysis.filePath,
+        analysis.language,
+        fn.name,
+        owners.get(key) ?? '',
+        fn.startLine,
+        fn.endLine,
+        fn.metrics.cyclomaticComplexity,
+        fn.metrics.cognitiveComplexity,
+        fn.metrics.nestingDepth,
+        fn.metrics.linesOfCode,
+        fn.metrics.effectiveLinesOfCode,
+        fn.metrics.parameterCount,
+        fn.issues.length,
+        ...CATEGORIES.map(category => counts.get(category) ?? 0),
+      ]);
+    };
+
+    analysis.functions.forEach(add);
+    analysis.classes.forEach(cls => cls.methods.forEach(add));
+
+    return rows;
+  }
+}
+
+function functionKey(fn: FunctionInfo): string {
+  return `${fn.startLine}:${fn.name}`;
+}
+
+function escapeCSV(value: string | number): string {
+  const text = String(value);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
@@ -0,0 +1,65 @@
+import * as path from 'path';
+import type { DependencyReport } from '../analyzers/DependencyGraph';
+
+export type GraphFormat = 'json' | 'dot';
+
+export const GRAPH_FORMATS: readonly GraphFormat[] = ['json', 'dot'];
+
+export function isGraphFormat(format: string | undefined): format is GraphFormat {
+  return GRAPH_FORMATS.includes(format as GraphFormat);
+}
+
+/**
+ * Serializes a module dependency graph for dashboards and Graphviz:
+ * - `json`: `{ modules, edges, cycles }`, modules with fanIn, fanOut and
+ *   the index of their cycle
+ * - `dot`: a Graphviz digraph; modules and imports in a cycle are red
+ *
+ * Paths are written relative to `root`, with forward slashes, so output
+ * does not depend on where the project is checked out.
+ */
+export class GraphReporter {
+  constructor(private readonly format: GraphFormat, private readonly root: string = process.cwd()) {}
+
+  serialize(report: DependencyReport): string {
+    return this.format === 'dot' ? this.toDot(report) : this.toJSON(report);
+  }
+
+  private toJSON(report: DependencyReport): string {
+    return JSON.stringify({
+      modules: report.modules.map(module => ({ ...module, filePath: this.relative(module.filePath) })),
+      edges: report.edges.map(edge => ({ ...edge, from: this.relative(edge.from), to: this.relative(edge.to) })),
+      cycles: report.cycles.map(members => members.map(member => this.relative(member))),
+    }) + '\n';
+  }
+
+  private toDot(report: DependencyReport): string {
+    const cycleOf = new Map(report.modules.map(module => [module.filePath, module.cycle]));
+    const lines = ['digraph dependencies {', '  rankdir=LR;', '  node [shape=box, fontname="Helvetica"];'];
+
+    for (const module of report.modules) {
+      const attributes = [`tooltip=${quote(`fan-in ${module.fanIn}, fan-out ${module.fanOut}`)}`];
+      if (module.cycle !== undefined) {
+        attributes.push('color=red', 'fontcolor=red');
+      }
+      lines.push(`  ${quote(this.relative(module.filePath))} [${attributes.join(', ')}];`);
+    }
+
+    for (const edge of report.edges) {
+      const cycle = cycleOf.get(edge.from);
+      const inCycle = cycle !== undefined && cycle === cycleOf.get(edge.to);
+      lines.push(`  ${quote(this.relative(edge.from))} -> ${quote(this.relative(edge.to))}${inCycle ? ' [color=red]' : ''};`);
+    }
+
+    lines.push('}');
+    return lines.join('\n') + '\n';
+  }
+
+  private relative(filePath: string): string {
+    return path.relative(this.root, path.resolve(this.root, filePath)).split(path.sep).join('/');
+  }
+}
+
+function quote(text: string): string {
+  return `"${text.replace(/["\\]/g, '\\$&')}"`;
+}
@@ -1,23 +1,107 @@
 import * as fs from 'fs';
-import { FileAnalysis, IssueCategory } from '../types';
+import { once } from 'events';
+import { finished } from 'stream/promises';
+import { AnalysisList, FileAnalysis, FunctionInfo, CodeIssue } from '../types';
+import { attachFixes } from '../analyzers/FixGenerator';
+
+// Files per embedded JSON chunk; the page parses a chunk when one of its
+// files is first opened
+const CHUNK_SIZE = 200;
+
+// One row of the virtualized file list
+interface FileRow {
+  filePath: string;
+  language: string;
+  cyclomatic: number;
+  cognitive: number;
+  loc: number;
+  functions: number;
+  issues: number;
+}
+
+// Everything shown when a file is opened
+interface FileDetails {
+  issues: Array<{
+    category: string;
+    severity: string;
+    line: number;
+    message: string;
+    source: string;
+    suggestion?: string;
+    fix?: { description: string; automated: boolean };
+  }>;
+  functions: Array<{ name: string; cyclomatic: number; cognitive: number; loc: number; issues: number }>;
+}
 
 /**
  * HTML Reporter - generates interactive HTML reports
+ *
+ * The report is written through a stream, chunk by chunk, so its size is
+ * not bounded by memory. Files are listed from a compact JSON index in a
+ * virtualized list that only materializes the rows in view; each file's
+ * issues and functions are embedded as lazily parsed JSON chunks. The
+ * analyses are read a chunk at a time, so an AnalysisStore only
+ * materializes CHUNK_SIZE files at once.
  */
 export class HTMLReporter {
-  generateReport(analyses: FileAnalysis[], outputPath: string): void {
-    const html = this.buildHTML(analyses);
-    fs.writeFileSync(outputPath, html, 'utf-8');
+  async generateReport(analyses: AnalysisList, outputPath: string): Promise<void> {
+    const out = fs.createWriteStream(outputPath, 'utf-8');
+    const done = finished(out);
+    // Surfaced by the awaits below; avoids an unhandled rejection meanwhile
+    done.catch(() => undefined);
+
+    const write = async (chunk: string) => {
+      if (out.errored) {
+        throw out.errored;
+      }
+      if (!out.write(chunk)) {
+        await once(out, 'drain');
+      }
+    };
+
+    try {
+      await write(this.buildHeader(analyses));
+
+      // File index, written a chunk of rows at a time
+      await write('<script type="application/json" id="file-index">[');
+      for (let start = 0; start < analyses.length; start += CHUNK_SIZE) {
+        const rows = analyses.slice(start, start + CHUNK_SIZE).map(a => toScriptJSON(this.buildFileRow(a)));
+        await write((start > 0 ? ',' : '') + rows.join(','));
+      }
+      await write(']</script>\n');
+
+      for (let start = 0; start < analyses.length; start += CHUNK_SIZE) {
+        const files = analyses.slice(start, start + CHUNK_SIZE);
+        // The report shows a fix under each issue, so it always asks for them
+        attachFixes(files);
+        const details = toScriptJSON(files.map(a => this.buildFileDetails(a)));
+        await write(`<script type="application/json" id="file-chunk-${start / CHUNK_SIZE}">${details}</script>\n`);
+      }
+
+      await write(this.buildFooter());
+    } finally {
+      out.end();
+    }
+
+    await done;
     console.log(`HTML report generated: ${outputPath}`);
   }
 
-  private buildHTML(analyses: FileAnalysis[]): string {
-    const totalIssues = analyses.reduce((sum, a) => sum + a.totalIssues, 0);
-    const totalFunctions = analyses.reduce((sum, a) => sum + a.functions.length, 0);
-    const totalClasses = analyses.reduce((sum, a) => sum + a.classes.length, 0);
-
-    const issuesByCategory = this.groupIssuesByCategory(analyses);
-    const issuesBySeverity = this.groupIssuesBySeverity(analyses);
+  private buildHeader(analyses: AnalysisList): string {
+    let totalIssues = 0;
+    let totalFunctions = 0;
+    let totalClasses = 0;
+    const issuesByCategory = new Map<string, number>();
+    const issuesBySeverity = new Map<string, number>();
+
+    // A single pass, reading each analysis once
+    for (const a of analyses) {
+      totalIssues += a.totalIssues;
+      totalFunctions += a.functions.length;
+      totalClasses += a.classes.length;
+      this.groupIssues(a, issuesByCategory, issue => issue.category);
+      this.groupIssues(a, issuesBySeverity, issue => issue.severity);
+    }
 
     return `<!DOCTYPE html>
 <html lang="en">
@@ -78,140 +162,77 @@ export class HTMLReporter {
     <!-- File Details -->
     <section class="file-details">
       <h2>File Analysis Details</h2>
-      ${analyses.map(a => this.buildFileCard(a)).join('')}
+      <p class="file-list-hint">Select a file to see its issues and most complex functions.</p>
+      <div id="file-list" class="file-list" data-chunk-size="${CHUNK_SIZE}">
+        <div class="file-list-rows">
+          <div class="file-list-spacer"></div>
+        </div>
+      </div>
+      <div id="file-detail" class="file-card" hidden></div>
     </section>
   </div>
 
   <footer>
     <p>Generated by Code Complexity Analyzer</p>
   </footer>
+`;
+  }
 
+  private buildFooter(): string {
+    return `
   <script>
     ${this.getJavaScript()}
   </script>
 </body>
-</html>`;
+</html>
+`;
   }
 
-  private buildFileCard(analysis: FileAnalysis): string {
+  private buildFileRow(analysis: FileAnalysis): FileRow {
     const metrics = analysis.overallMetrics;
-    const complexityLevel = this.getComplexityLevel(metrics.cyclomaticComplexity);
-
-    return `
-    <div class="file-card">
-      <div class="file-header">
-        <h3>${analysis.filePath}</h3>
-        <span class="badge ${analysis.language.toLowerCase()}">${analysis.language}</span>
-      </div>
-
-      <div class="metrics-grid">
-        <div class="metric">
-          <span class="metric-label">Cyclomatic Complexity</span>
-          <span class="metric-value ${complexityLevel}">${metrics.cyclomaticComplexity}</span>
-        </div>
-        <div class="metric">
-          <span class="metric-label">Cognitive Complexity</span>
-          <span class="metric-value">${metrics.cognitiveComplexity}</span>
-        </div>
-        <div class="metric">
-          <span class="metric-label">Lines of Code</span>
-          <span class="metric-value">${metrics.linesOfCode}</span>
-        </div>
-        <div class="metric">
-          <span class="metric-label">Functions</span>
-          <span class="metric-value">${analysis.functions.length}</span>
-        </div>
-        <div class="metric">
-          <span class="metric-label">Issues</span>
-          <span class="metric-value ${analysis.totalIssues > 0 ? 'warning' : ''}">${analysis.totalIssues}</span>
-        </div>
-      </div>
 
-      ${analysis.totalIssues > 0 ? this.buildIssuesList(analysis) : ''}
-      ${analysis.functions.length > 0 ? this.buildFunctionsList(analysis) : ''}
-    </div>`;
+    return {
+      filePath: analysis.filePath,
+      language: analysis.language,
+      cyclomatic: metrics.cyclomaticComplexity,
+      cognitive: metrics.cognitiveComplexity,
+      loc: metrics.linesOfCode,
+      functions: analysis.functions.length,
+      issues: analysis.totalIssues,
+    };
   }
 
-  private buildIssuesList(analysis: FileAnalysis): string {
-    const allIssues: Array<{issue: any, source: string}> = [];
-
-    analysis.functions.forEach(fn => {
-      fn.issues.forEach(issue => {
-        allIssues.push({ issue, source: `Function: ${fn.name}` });
-      });
-    });
-
+  private buildFileDetails(analysis: FileAnalysis): FileDetails {
+    const issues: FileDetails['issues'] = [];
+    const addIssues = (fn: FunctionInfo, source: string) => {
+      fn.issues.forEach(issue => issues.push({
+        category: issue.category,
+        severity: issue.severity,
+        line: issue.line,
+        message: issue.message,
+        source,
+        suggestion: issue.suggestion,
+        fix: issue.fix && { description: issue.fix.description, automated: issue.fix.automated },
+      }));
+    };
+
+    analysis.functions.forEach(fn => addIssues(fn, `Function: ${fn.name}`));
     analysis.classes.forEach(cls => {
-      cls.methods.forEach(method => {
-        method.issues.forEach(issue => {
-          allIssues.push({ issue, source: `Class: ${cls.name}.${method.name}` });
-        });
-      });
+      cls.methods.forEach(method => addIssues(method, `Class: ${cls.name}.${method.name}`));
     });
 
-    if (allIssues.length === 0) return '';
-
-    return `
-    <details class="issues-details">
-      <summary>Issues (${allIssues.length})</summary>
-      <div class="issues-list">
-        ${allIssues.map(({issue, source}) => `
-          <div class="issue-item severity-${issue.severity}">
-            <div class="issue-header">
-              <span class="issue-badge ${issue.category.toLowerCase()}">${issue.category}</span>
-              <span class="severity-badge ${issue.severity}">${issue.severity}</span>
-            </div>
-            <div class="issue-message">${issue.message}</div>
-            <div class="issue-source">Line ${issue.line} in ${source}</div>
-            ${issue.suggestion ? `<div class="issue-suggestion">💡 ${issue.suggestion}</div>` : ''}
-            ${issue.fix ? `
-              <details class="fix-details">
-                <summary>Suggested Fix</summary>
-                <div class="fix-content">
-                  <div class="fix-description">${issue.fix.description}</div>
-                  ${issue.fix.automated ? '<span class="badge automated">Auto-fixable</span>' : ''}
-                </div>
-              </details>
-            ` : ''}
-          </div>
-        `).join('')}
-      </div>
-    </details>`;
-  }
-
-  private buildFunctionsList(analysis: FileAnalysis): string {
-    const topComplexFunctions = analysis.functions
+    const functions = [...analysis.functions]
       .sort((a, b) => b.metrics.cyclomaticComplexity - a.metrics.cyclomaticComplexity)
-      .slice(0, 5);
-
-    if (topComplexFunctions.length === 0) return '';
-
-    return `
-    <details class="functions-details">
-      <summary>Top Complex Functions</summary>
-      <table class="functions-table">
-        <thead>
-          <tr>
-            <th>Function</th>
-            <th>Cyclomatic</th>
-            <th>Cognitive</th>
-            <th>Lines</th>
-            <th>Issues</th>
-          </tr>
-        </thead>
-        <tbody>
-          ${topComplexFunctions.map(fn => `
-            <tr>
-              <td><code>${fn.name}</code></td>
-              <td class="${this.getComplexityLevel(fn.metrics.cyclomaticComplexity)}">${fn.metrics.cyclomaticComplexity}</td>
-              <td>${fn.metrics.cognitiveComplexity}</td>
-              <td>${fn.metrics.linesOfCode}</td>
-              <td>${fn.issues.length}</td>
-            </tr>
-          `).join('')}
-        </tbody>
-      </table>
-    </details>`;
+      .slice(0, 5)
+      .map(fn => ({
+        name: fn.name,
+        cyclomatic: fn.metrics.cyclomaticComplexity,
+        cognitive: fn.metrics.cognitiveComplexity,
+        loc: fn.metrics.linesOfCode,
+        issues: fn.issues.length,
+      }));
+
+    return { issues, functions };
   }
 
   private buildBarChart(data: Map<string, number>, type: string): string {
@@ -235,48 +256,13 @@ export class HTMLReporter {
     </div>`;
   }
 
-  private groupIssuesByCategory(analyses: FileAnalysis[]): Map<string, number> {
-    const counts = new Map<string, number>();
-
-    analyses.forEach(analysis => {
-      analysis.functions.forEach(fn => {
-        fn.issues.forEach(issue => {
-          counts.set(issue.category, (counts.get(issue.category) || 0) + 1);
-        });
-      });
-
-      analysis.classes.forEach(cls => {
-        cls.methods.forEach(method => {
-          method.issues.forEach(issue => {
-            counts.set(issue.category, (counts.get(issue.category) || 0) + 1);
-          });
-        });
-      });
-    });
-
-    return counts;
-  }
-
-  private groupIssuesBySeverity(analyses: FileAnalysis[]): Map<string, number> {
-    const counts = new Map<string, number>();
-
-    analyses.forEach(analysis => {
-      analysis.functions.forEach(fn => {
-        fn.issues.forEach(issue => {
-          counts.set(issue.severity, (counts.get(issue.severity) || 0) + 1);
-        });
-      });
+  private groupIssues(analysis: FileAnalysis, counts: Map<string, number>, key: (issue: CodeIssue) => string): void {
+    const count = (issue: CodeIssue) => counts.set(key(issue), (counts.get(key(issue)) || 0) + 1);
 
-      analysis.classes.forEach(cls => {
-        cls.methods.forEach(method => {
-          method.issues.forEach(issue => {
-            counts.set(issue.severity, (counts.get(issue.severity) || 0) + 1);
-          });
-        });
-      });
+    analysis.functions.forEach(fn => fn.issues.forEach(count));
+    analysis.classes.forEach(cls => {
+      cls.methods.forEach(method => method.issues.forEach(count));
     });
-
-    return counts;
   }
 
   private getComplexityLevel(complexity: number): string {
@@ -414,6 +400,31 @@ export class HTMLReporter {
         font-weight: 600;
         font-size: 0.875rem;
       }
+      .file-list-hint { color: #6c757d; margin-bottom: 1rem; }
+      .file-list-rows { max-height: 60vh; overflow-y: auto; border: 1px solid #e9ecef; border-radius: 8px; }
+      .file-list-spacer { position: relative; }
+      .file-row {
+        position: absolute;
+        left: 0;
+        right: 0;
+        height: 48px;
+        display: flex;
+        align-items: center;
+        gap: 1rem;
+        padding: 0 1rem;
+        border-bottom: 1px solid #f1f3f5;
+        cursor: pointer;
+      }
+      .file-row:hover { background: #f8f9fa; }
+      .file-row.selected { background: #eef0fd; }
+      .file-path { flex: 1; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; font-family: monospace; }
+      .row-metric { font-size: 0.875rem; font-weight: 600; min-width: 5rem; text-align: right; }
+      .row-metric.low { color: #28a745; }
+      .row-metric.medium { color: #ffc107; }
+      .row-metric.high { color: #fd7e14; }
+      .row-metric.critical { color: #dc3545; }
+      .row-metric.warning { color: #ff6b6b; }
+      #file-detail { margin-top: 1.5rem; }
       footer {
         text-align: center;
         padding: 2rem;
@@ -424,16 +435,6 @@ export class HTMLReporter {
 
   private getJavaScript(): string {
     return `
-      // Toggle details on click
-      document.querySelectorAll('summary').forEach(summary => {
-        summary.addEventListener('click', (e) => {
-          const details = e.target.closest('details');
-          if (details) {
-            details.open = !details.open;
-          }
-        });
-      });
-
       // Animate bars on load
       window.addEventListener('load', () => {
         document.querySelectorAll('.bar').forEach(bar => {
@@ -444,6 +445,174 @@ export class HTMLReporter {
           }, 100);
         });
       });
+
+      const ROW_HEIGHT = 48;
+      const OVERSCAN = 10;
+      const list = document.getElementById('file-list');
+      const viewport = list.querySelector('.file-list-rows');
+      const spacer = list.querySelector('.file-list-spacer');
+      const detail = document.getElementById('file-detail');
+      const files = JSON.parse(document.getElementById('file-index').textContent);
+      const chunkSize = Number(list.dataset.chunkSize);
+      const chunks = new Map();
+      let selected = -1;
+      let rendered = '';
+
+      function el(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text !== undefined) node.textContent = String(text);
+        return node;
+      }
+
+      function complexityLevel(value) {
+        if (value <= 5) return 'low';
+        if (value <= 10) return 'medium';
+        if (value <= 20) return 'high';
+        return 'critical';
+      }
+
+      // A file's details are parsed with the rest of its chunk, on first use
+      function getDetails(index) {
+        const chunk = Math.floor(index / chunkSize);
+        if (!chunks.has(chunk)) {
+          chunks.set(chunk, JSON.parse(document.getElementById('file-chunk-' + chunk).textContent));
+        }
+        return chunks.get(chunk)[index - chunk * chunkSize];
+      }
+
+      function renderRow(index) {
+        const file = files[index];
+        const row = el('div', 'file-row' + (index === selected ? ' selected' : ''));
+        row.style.top = (index * ROW_HEIGHT) + 'px';
+        row.dataset.index = index;
+        row.appendChild(el('span', 'file-path', file.filePath));
+        row.appendChild(el('span', 'badge ' + file.language.toLowerCase(), file.language));
+        row.appendChild(el('span', 'row-metric ' + complexityLevel(file.cyclomatic), 'CC ' + file.cyclomatic));
+        row.appendChild(el('span', 'row-metric', file.loc + ' LOC'));
+        row.appendChild(el('span', 'row-metric' + (file.issues > 0 ? ' warning' : ''), file.issues + ' issues'));
+        return row;
+      }
+
+      // Only the rows in view, plus a margin, exist in the DOM
+      function renderRows() {
+        const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        const last = Math.min(files.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+        const key = first + ':' + last + ':' + selected;
+        if (key === rendered) return;
+        rendered = key;
+
+        const fragment = document.createDocumentFragment();
+        for (let i = first; i < last; i++) {
+          fragment.appendChild(renderRow(i));
+        }
+        spacer.replaceChildren(fragment);
+      }
+
+      function metric(label, value, className) {
+        const node = el('div', 'metric');
+        node.appendChild(el('span', 'metric-label', label));
+        node.appendChild(el('span', 'metric-value' + (className ? ' ' + className : ''), value));
+        return node;
+      }
+
+      function renderIssues(issues) {
+        const section = el('details', 'issues-details');
+        section.appendChild(el('summary', null, 'Issues (' + issues.length + ')'));
+        const items = el('div', 'issues-list');
+        issues.forEach(issue => {
+          const item = el('div', 'issue-item severity-' + issue.severity);
+          const header = el('div', 'issue-header');
+          header.appendChild(el('span', 'issue-badge ' + issue.category.toLowerCase(), issue.category));
+          header.appendChild(el('span', 'severity-badge ' + issue.severity, issue.severity));
+          item.appendChild(header);
+          item.appendChild(el('div', 'issue-message', issue.message));
+          item.appendChild(el('div', 'issue-source', 'Line ' + issue.line + ' in ' + issue.source));
+          if (issue.suggestion) {
+            item.appendChild(el('div', 'issue-suggestion', '💡 ' + issue.suggestion));
+          }
+          if (issue.fix) {
+            const fix = el('details', 'fix-details');
+            fix.appendChild(el('summary', null, 'Suggested Fix'));
+            const content = el('div', 'fix-content');
+            content.appendChild(el('div', 'fix-description', issue.fix.description));
+            if (issue.fix.automated) {
+              content.appendChild(el('span', 'badge automated', 'Auto-fixable'));
+            }
+            fix.appendChild(content);
+            item.appendChild(fix);
+          }
+          items.appendChild(item);
+        });
+        section.appendChild(items);
+        return section;
+      }
+
+      function renderFunctions(functions) {
+        const section = el('details', 'functions-details');
+        section.appendChild(el('summary', null, 'Top Complex Functions'));
+        const table = el('table', 'functions-table');
+        const head = el('tr');
+        ['Function', 'Cyclomatic', 'Cognitive', 'Lines', 'Issues'].forEach(label => head.appendChild(el('th', null, label)));
+        table.appendChild(el('thead')).appendChild(head);
+        const body = table.appendChild(el('tbody'));
+        functions.forEach(fn => {
+          const row = el('tr');
+          row.appendChild(el('td')).appendChild(el('code', null, fn.name));
+          row.appendChild(el('td', complexityLevel(fn.cyclomatic), fn.cyclomatic));
+          row.appendChild(el('td', null, fn.cognitive));
+          row.appendChild(el('td', null, fn.loc));
+          row.appendChild(el('td', null, fn.issues));
+          body.appendChild(row);
+        });
+        section.appendChild(table);
+        return section;
+      }
+
+      function showFile(index) {
+        selected = index;
+        renderRows();
+
+        const file = files[index];
+        const details = getDetails(index);
+        const header = el('div', 'file-header');
+        header.appendChild(el('h3', null, file.filePath));
+        header.appendChild(el('span', 'badge ' + file.language.toLowerCase(), file.language));
+
+        const metrics = el('div', 'metrics-grid');
+        metrics.appendChild(metric('Cyclomatic Complexity', file.cyclomatic, complexityLevel(file.cyclomatic)));
+        metrics.appendChild(metric('Cognitive Complexity', file.cognitive));
+        metrics.appendChild(metric('Lines of Code', file.loc));
+        metrics.appendChild(metric('Functions', file.functions));
+        metrics.appendChild(metric('Issues', file.issues, file.issues > 0 ? 'warning' : ''));
+
+        detail.replaceChildren(header, metrics);
+        if (details.issues.length > 0) {
+          detail.appendChild(renderIssues(details.issues));
+        }
+        if (details.functions.length > 0) {
+          detail.appendChild(renderFunctions(details.functions));
+        }
+        detail.hidden = false;
+      }
+
+      spacer.style.height = (files.length * ROW_HEIGHT) + 'px';
+      spacer.addEventListener('click', (e) => {
+        const row = e.target.closest('.file-row');
+        if (row) {
+          showFile(Number(row.dataset.index));
+        }
+      });
+      viewport.addEventListener('scroll', () => requestAnimationFrame(renderRows));
+      window.addEventListener('resize', renderRows);
+      renderRows();
     `;
   }
 }
+
+/**
+ * JSON that is safe to embed in a <script> element
+ */
+function toScriptJSON(value: unknown): string {
+  return JSON.stringify(value).replace(/</g, '\\u003c');
+}
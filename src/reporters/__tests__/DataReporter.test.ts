@@ -0,0 +1,83 @@
+import { CSV_COLUMNS, DataReporter } from '../DataReporter';
+import { FileAnalysis, FunctionInfo, IssueCategory, IssueType } from '../../types';
+
+describe('DataReporter', () => {
+  const metrics = {
+    cyclomaticComplexity: 3,
+    cognitiveComplexity: 2,
+    linesOfCode: 5,
+    effectiveLinesOfCode: 4,
+    nestingDepth: 1,
+    functionLength: 5,
+    parameterCount: 2,
+  };
+
+  const method: FunctionInfo = { name: 'render', startLine: 8, endLine: 12, metrics, issues: [] };
+
+  const analysis: FileAnalysis = {
+    filePath: 'src/a, b.js',
+    language: 'JavaScript',
+    overallMetrics: metrics,
+    functions: [
+      {
+        name: 'load',
+        startLine: 1,
+        endLine: 5,
+        metrics,
+        issues: [
+          {
+            type: IssueType.SQL_INJECTION_RISK,
+            category: IssueCategory.SECURITY,
+            severity: 'critical',
+            line: 2,
+            message: 'Possible SQL injection',
+          },
+          {
+            type: IssueType.MAGIC_NUMBER,
+            category: IssueCategory.CODE_SMELL,
+            severity: 'low',
+            line: 3,
+            message: 'Magic number 42',
+          },
+        ],
+      },
+      method,
+    ],
+    classes: [{ name: 'View', startLine: 7, endLine: 13, methods: [method], metrics }],
+    totalIssues: 2,
+    analysisDate: new Date('2024-01-01T00:00:00Z'),
+  };
+
+  const render = (format: 'json' | 'ndjson' | 'csv', analyses: FileAnalysis[]) => {
+    const reporter = new DataReporter(format);
+    return reporter.header() + analyses.map(a => reporter.serialize(a)).join('') + reporter.footer();
+  };
+
+  it('should write a single compact JSON array', () => {
+    const output = render('json', [analysis, analysis]);
+
+    expect(output).not.toContain('\n  ');
+    expect(JSON.parse(output)).toHaveLength(2);
+  });
+
+  it('should write one JSON object per line for NDJSON', () => {
+    const lines = render('ndjson', [analysis, analysis]).trim().split('\n');
+
+    expect(lines).toHaveLength(2);
+    expect(JSON.parse(lines[0]).filePath).toBe('src/a, b.js');
+  });
+
+  it('should write one CSV row per function with issue counts per category', () => {
+    const [header, ...rows] = render('csv', [analysis]).trim().split('\n');
+    const columns = header.split(',');
+    const load = rows[0].replace('"src/a, b.js"', 'file').split(',');
+
+    // Methods listed as functions too are written once
+    expect(rows).toHaveLength(2);
+    expect(columns).toEqual(CSV_COLUMNS);
+    expect(rows[0].startsWith('"src/a, b.js",JavaScript,load,,1,5,3,2,1,5,4,2,2')).toBe(true);
+    expect(load[columns.indexOf('securityIssues')]).toBe('1');
+    expect(load[columns.indexOf('codeSmellIssues')]).toBe('1');
+    expect(rows[1]).toContain(',render,View,8,12,');
+  });
+});
@@ -0,0 +1,35 @@
+import { GraphReporter } from '../GraphReporter';
+import { DependencyReport } from '../../analyzers/DependencyGraph';
+
+describe('GraphReporter', () => {
+  const report: DependencyReport = {
+    modules: [
+      { filePath: '/project/src/a.ts', fanIn: 1, fanOut: 1, cycle: 0 },
+      { filePath: '/project/src/b.ts', fanIn: 2, fanOut: 1, cycle: 0 },
+      { filePath: '/project/src/main.ts', fanIn: 0, fanOut: 1 },
+    ],
+    edges: [
+      { from: '/project/src/a.ts', to: '/project/src/b.ts', line: 1 },
+      { from: '/project/src/b.ts', to: '/project/src/a.ts', line: 2 },
+      { from: '/project/src/main.ts', to: '/project/src/b.ts', line: 1 },
+    ],
+    cycles: [['/project/src/a.ts', '/project/src/b.ts']],
+  };
+
+  it('should write JSON with paths relative to the root', () => {
+    const graph = JSON.parse(new GraphReporter('json', '/project').serialize(report));
+
+    expect(graph.modules[0]).toEqual({ filePath: 'src/a.ts', fanIn: 1, fanOut: 1, cycle: 0 });
+    expect(graph.edges[2]).toEqual({ from: 'src/main.ts', to: 'src/b.ts', line: 1 });
+    expect(graph.cycles).toEqual([['src/a.ts', 'src/b.ts']]);
+  });
+
+  it('should write a Graphviz digraph that highlights cycles', () => {
+    const dot = new GraphReporter('dot', '/project').serialize(report);
+
+    expect(dot.startsWith('digraph dependencies {')).toBe(true);
+    expect(dot).toContain('"src/a.ts" -> "src/b.ts" [color=red];');
+    expect(dot).toContain('"src/main.ts" -> "src/b.ts";\n');
+    expect(dot).toContain('"src/main.ts" [tooltip="fan-in 0, fan-out 1"];');
+  });
+});
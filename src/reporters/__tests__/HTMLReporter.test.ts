@@ -0,0 +1,83 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { HTMLReporter } from '../HTMLReporter';
+import { FileAnalysis, IssueCategory, IssueType } from '../../types';
+
+describe('HTMLReporter', () => {
+  let dir: string;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-html-'));
+    jest.spyOn(console, 'log').mockImplementation(() => undefined);
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+    jest.restoreAllMocks();
+  });
+
+  const metrics = {
+    cyclomaticComplexity: 2,
+    cognitiveComplexity: 1,
+    linesOfCode: 3,
+    effectiveLinesOfCode: 3,
+    nestingDepth: 1,
+    functionLength: 3,
+    parameterCount: 0,
+  };
+
+  const analysis = (i: number): FileAnalysis => ({
+    filePath: `src/file${i}.js`,
+    language: 'JavaScript',
+    overallMetrics: metrics,
+    functions: [{
+      name: `fn${i}`,
+      startLine: 1,
+      endLine: 3,
+      metrics,
+      issues: [{
+        type: IssueType.TYPE_COERCION,
+        category: IssueCategory.CODE_SMELL,
+        severity: 'low',
+        line: 2,
+        message: 'Comparing with </script> inside',
+        codeSnippet: 'if (a == b) {',
+      }],
+    }],
+    classes: [],
+    totalIssues: 1,
+    analysisDate: new Date(),
+  });
+
+  const embedded = (html: string, id: string) =>
+    JSON.parse(html.match(new RegExp(`id="${id}">(.*?)</script>`, 's'))![1]);
+
+  it('should embed a row per file and details in lazily parsed chunks', async () => {
+    const outputPath = path.join(dir, 'report.html');
+    const analyses = Array.from({ length: 450 }, (_, i) => analysis(i));
+
+    await new HTMLReporter().generateReport(analyses, outputPath);
+    const html = fs.readFileSync(outputPath, 'utf-8');
+
+    const rows = embedded(html, 'file-index');
+    expect(rows).toHaveLength(450);
+    expect(rows[449]).toMatchObject({ filePath: 'src/file449.js', issues: 1 });
+
+    // 450 files in chunks of 200
+    expect(html.match(/id="file-chunk-\d+"/g)).toHaveLength(3);
+    const [first] = embedded(html, 'file-chunk-2');
+    expect(first.issues[0]).toMatchObject({ source: 'Function: fn400', line: 2 });
+    expect(first.issues[0].fix.description).toContain('===');
+  });
+
+  it('should keep issue text from closing the embedding script', async () => {
+    const outputPath = path.join(dir, 'report.html');
+
+    await new HTMLReporter().generateReport([analysis(0)], outputPath);
+    const html = fs.readFileSync(outputPath, 'utf-8');
+
+    expect(html).not.toContain('with </script> inside');
+    expect(embedded(html, 'file-chunk-0')[0].issues[0].message).toBe('Comparing with </script> inside');
+  });
+});
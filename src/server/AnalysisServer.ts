@@ -0,0 +1,381 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as net from 'net';
+import * as path from 'path';
+import { FileAnalyzer } from '../analyzers/FileAnalyzer';
+import { AnalysisLimitError } from '../analyzers/AnalysisLimits';
+import { AnalysisCache } from '../cache/AnalysisCache';
+import { AnalysisError, AnalysisResult, AnalyzerConfig, FileAnalysis } from '../types';
+import { LruCache } from './LruCache';
+import {
+  DaemonAddress,
+  DaemonStats,
+  RPC_ERRORS,
+  RpcError,
+  RpcRequest,
+  RpcResponse,
+  formatDaemonAddress,
+  isLoopbackHost,
+  splitLines,
+} from './protocol';
+
+export interface ServerOptions {
+  address: DaemonAddress;
+  // Used for requests that do not send their own config
+  config: AnalyzerConfig;
+  // On-disk analysis cache shared with the CLI; null disables it
+  cacheDir?: string | null;
+  // Recent results kept in memory
+  lruSize?: number;
+}
+
+// A handful of configs in use at once is typical (e.g. CLI and editor)
+const MAX_ANALYZERS = 4;
+
+class RpcFailure extends Error {
+  constructor(readonly code: number, message: string, readonly data?: unknown) {
+    super(message);
+  }
+}
+
+/**
+ * Long-running analysis daemon behind `complexity serve`
+ *
+ * Keeps parsers, configs and recent results warm between requests, so
+ * each CLI or editor call skips Node startup, grammar loading and, for
+ * unchanged files, analysis. File results are remembered by path, size
+ * and modification time; source results by content hash.
+ */
+export class AnalysisServer {
+  private server: net.Server | null = null;
+  private sockets: Set<net.Socket> = new Set();
+  private analyzers: LruCache<string, FileAnalyzer> = new LruCache(MAX_ANALYZERS);
+  private results: LruCache<string, FileAnalysis>;
+  private startedAt = Date.now();
+  private requests = 0;
+  private filesAnalyzed = 0;
+  private readonly stopped: Promise<void>;
+  private onStopped!: () => void;
+
+  constructor(private readonly options: ServerOptions) {
+    this.results = new LruCache(options.lruSize ?? 5000);
+    this.stopped = new Promise(resolve => {
+      this.onStopped = resolve;
+    });
+  }
+
+  /**
+   * Start listening. A socket left behind by a daemon that is gone is
+   * replaced; a live one is an error. TCP is only served on loopback
+   * addresses, since requests are not authenticated.
+   */
+  async listen(): Promise<void> {
+    const { address } = this.options;
+
+    if ('host' in address && !isLoopbackHost(address.host)) {
+      throw new Error(`Refusing to listen on ${address.host}: the daemon only serves loopback addresses`);
+    }
+
+    if ('path' in address && process.platform !== 'win32' && fs.existsSync(address.path)) {
+      if (await isListening(address.path)) {
+        throw new Error(`A daemon is already listening on ${address.path}`);
+      }
+      fs.unlinkSync(address.path);
+    }
+    if ('path' in address && process.platform !== 'win32') {
+      fs.mkdirSync(path.dirname(address.path), { recursive: true, mode: 0o700 });
+    }
+
+    const server = net.createServer(socket => this.accept(socket));
+    this.server = server;
+
+    await new Promise<void>((resolve, reject) => {
+      server.once('error', reject);
+      const ready = () => {
+        server.off('error', reject);
+        resolve();
+      };
+      if ('path' in address) {
+        server.listen(address.path, ready);
+      } else {
+        server.listen(address.port, address.host, ready);
+      }
+    });
+  }
+
+  /**
+   * Resolves once the daemon is closed, by close() or a `shutdown` request
+   */
+  closed(): Promise<void> {
+    return this.stopped;
+  }
+
+  async close(): Promise<void> {
+    const server = this.server;
+    if (!server) {
+      return;
+    }
+    this.server = null;
+
+    // Ending lets pending responses flush; clients that stay connected are cut off
+    this.sockets.forEach(socket => socket.end());
+    const timer = setTimeout(() => this.sockets.forEach(socket => socket.destroy()), 1000);
+    await new Promise<void>(resolve => server.close(() => resolve()));
+    clearTimeout(timer);
+    this.onStopped();
+  }
+
+  /**
+   * Handle one JSON-RPC message; null for notifications
+   */
+  async handleMessage(message: string): Promise<RpcResponse | null> {
+    let request: RpcRequest;
+    try {
+      request = JSON.parse(message);
+    } catch {
+      return errorResponse(null, { code: RPC_ERRORS.PARSE_ERROR, message: 'Parse error' });
+    }
+
+    if (!request || request.jsonrpc !== '2.0' || typeof request.method !== 'string') {
+      return errorResponse(request?.id ?? null, { code: RPC_ERRORS.INVALID_REQUEST, message: 'Invalid request' });
+    }
+
+    this.requests++;
+    const id = request.id ?? null;
+
+    try {
+      const result = await this.dispatch(request.method, request.params ?? {});
+      return request.id === undefined ? null : { jsonrpc: '2.0', id, result };
+    } catch (error) {
+      if (request.id === undefined) {
+        return null;
+      }
+      if (error instanceof RpcFailure) {
+        return errorResponse(id, { code: error.code, message: error.message, data: error.data });
+      }
+      const message = error instanceof Error ? error.message : String(error);
+      return errorResponse(id, { code: RPC_ERRORS.ANALYSIS_FAILED, message });
+    }
+  }
+
+  getStats(): DaemonStats {
+    return {
+      pid: process.pid,
+      address: formatDaemonAddress(this.options.address),
+      uptimeMs: Date.now() - this.startedAt,
+      requests: this.requests,
+      filesAnalyzed: this.filesAnalyzed,
+      analyzers: this.analyzers.size,
+      results: this.results.getStats(),
+      rssBytes: process.memoryUsage().rss,
+    };
+  }
+
+  private accept(socket: net.Socket): void {
+    this.sockets.add(socket);
+    socket.setEncoding('utf-8');
+    socket.on('close', () => this.sockets.delete(socket));
+    socket.on('error', () => socket.destroy());
+
+    socket.on('data', splitLines(line => {
+      this.handleMessage(line).then(response => {
+        if (response && !socket.destroyed) {
+          socket.write(JSON.stringify(response) + '\n');
+        }
+      });
+    }));
+  }
+
+  private async dispatch(method: string, params: any): Promise<unknown> {
+    switch (method) {
+      case 'analyzeFile':
+        return this.analyzeFile(requireString(params, 'filePath'), this.getAnalyzer(params.config));
+      case 'analyzeSource':
+        return this.analyzeSource(
+          requireString(params, 'code'),
+          requireString(params, 'filePath'),
+          this.getAnalyzer(params.config)
+        );
+      case 'analyzeBatch':
+        return this.analyzeBatch(params, this.getAnalyzer(params.config));
+      case 'stats':
+        return this.getStats();
+      case 'shutdown':
+        // Respond first, then stop
+        setImmediate(() => this.close());
+        return null;
+      default:
+        throw new RpcFailure(RPC_ERRORS.METHOD_NOT_FOUND, `Method not found: ${method}`);
+    }
+  }
+
+  private analyzeFile(filePath: string, analyzer: { key: string; analyzer: FileAnalyzer }): FileAnalysis {
+    const result = this.analyzeFiles([path.resolve(filePath)], analyzer);
+    if (result.failed.length > 0) {
+      const failure = result.failed[0];
+      throw new RpcFailure(RPC_ERRORS.ANALYSIS_FAILED, failure.error, failure);
+    }
+    return result.successful[0];
+  }
+
+  private analyzeSource(
+    code: string,
+    filePath: string,
+    { key, analyzer }: { key: string; analyzer: FileAnalyzer }
+  ): FileAnalysis {
+    const resultKey = `${key}\0${filePath}\0${crypto.createHash('sha1').update(code).digest('hex')}`;
+    const remembered = this.results.get(resultKey);
+    if (remembered) {
+      return remembered;
+    }
+
+    try {
+      const analysis = analyzer.analyzeSource(code, filePath);
+      this.filesAnalyzed++;
+      this.results.set(resultKey, analysis);
+      return analysis;
+    } catch (error) {
+      const failure = toAnalysisError(filePath, error);
+      throw new RpcFailure(RPC_ERRORS.ANALYSIS_FAILED, failure.error, failure);
+    }
+  }
+
+  private async analyzeBatch(
+    params: any,
+    analyzer: { key: string; analyzer: FileAnalyzer }
+  ): Promise<AnalysisResult> {
+    if (!Array.isArray(params.filePaths) || params.filePaths.some((file: unknown) => typeof file !== 'string')) {
+      throw new RpcFailure(RPC_ERRORS.INVALID_PARAMS, 'filePaths must be an array of strings');
+    }
+    const filePaths = (params.filePaths as string[]).map(file => path.resolve(file));
+    const jobs = Math.max(1, Number(params.jobs) || 1);
+
+    return jobs > 1 ? this.analyzeFilesParallel(filePaths, jobs, analyzer) : this.analyzeFiles(filePaths, analyzer);
+  }
+
+  /**
+   * Analyze files on this thread, serving unchanged ones from memory
+   */
+  private analyzeFiles(filePaths: string[], { key, analyzer }: { key: string; analyzer: FileAnalyzer }): AnalysisResult {
+    const result: AnalysisResult = { successful: [], failed: [] };
+
+    for (const filePath of filePaths) {
+      const resultKey = fileResultKey(key, filePath);
+      const remembered = resultKey ? this.results.get(resultKey) : undefined;
+      if (remembered) {
+        result.successful.push(remembered);
+        continue;
+      }
+
+      const fresh = analyzer.analyzeFilesWithErrors([filePath]);
+      this.remember(resultKey, fresh);
+      result.successful.push(...fresh.successful);
+      result.failed.push(...fresh.failed);
+    }
+
+    return result;
+  }
+
+  /**
+   * Analyze the files not remembered on worker threads, keeping input order
+   */
+  private async analyzeFilesParallel(
+    filePaths: string[],
+    jobs: number,
+    { key, analyzer }: { key: string; analyzer: FileAnalyzer }
+  ): Promise<AnalysisResult> {
+    const resultKeys = filePaths.map(filePath => fileResultKey(key, filePath));
+    const remembered = resultKeys.map(resultKey => (resultKey ? this.results.get(resultKey) : undefined));
+    const missing = filePaths.filter((_, i) => !remembered[i]);
+
+    const fresh = await analyzer.analyzeFilesWithErrorsParallel(missing, jobs);
+    const byPath = new Map(fresh.successful.map(analysis => [analysis.filePath, analysis]));
+
+    const successful: FileAnalysis[] = [];
+    filePaths.forEach((filePath, i) => {
+      const analysis = remembered[i] ?? byPath.get(filePath);
+      if (!remembered[i]) {
+        this.remember(resultKeys[i], { successful: analysis ? [analysis] : [], failed: [] });
+      }
+      if (analysis) {
+        successful.push(analysis);
+      }
+    });
+
+    return { successful, failed: fresh.failed };
+  }
+
+  private remember(resultKey: string | null, fresh: AnalysisResult): void {
+    this.filesAnalyzed += fresh.successful.length + fresh.failed.length;
+    if (resultKey && fresh.successful.length > 0) {
+      this.results.set(resultKey, fresh.successful[0]);
+    }
+  }
+
+  /**
+   * The warm analyzer for a config, created on first use
+   */
+  private getAnalyzer(config?: AnalyzerConfig): { key: string; analyzer: FileAnalyzer } {
+    const effective = { ...this.options.config, ...(config ?? {}) };
+    const key = JSON.stringify(effective, Object.keys(effective).sort());
+
+    let analyzer = this.analyzers.get(key);
+    if (!analyzer) {
+      const cache = this.options.cacheDir === null
+        ? undefined
+        : new AnalysisCache(this.options.cacheDir, effective);
+      analyzer = new FileAnalyzer(cache, effective);
+      this.analyzers.set(key, analyzer);
+    }
+
+    return { key, analyzer };
+  }
+}
+
+/**
+ * Memory key of a file's current version; null when it cannot be stat'ed,
+ * so the analyzer reports why
+ */
+function fileResultKey(configKey: string, filePath: string): string | null {
+  try {
+    const stat = fs.statSync(filePath);
+    return `${configKey}\0${filePath}\0${stat.size}\0${stat.mtimeMs}`;
+  } catch {
+    return null;
+  }
+}
+
+function toAnalysisError(filePath: string, error: unknown): AnalysisError {
+  const message = error instanceof Error ? error.message : String(error);
+  let errorType: AnalysisError['errorType'] = 'PARSE_ERROR';
+
+  if (error instanceof AnalysisLimitError) {
+    errorType = error.reason;
+  } else if (message.includes('No parser available')) {
+    errorType = 'UNSUPPORTED_EXTENSION';
+  }
+
+  return { filePath, error: message, errorType };
+}
+
+function requireString(params: any, name: string): string {
+  if (typeof params[name] !== 'string') {
+    throw new RpcFailure(RPC_ERRORS.INVALID_PARAMS, `${name} must be a string`);
+  }
+  return params[name];
+}
+
+function errorResponse(id: RpcResponse['id'], error: RpcError): RpcResponse {
+  return { jsonrpc: '2.0', id, error };
+}
+
+function isListening(socketPath: string): Promise<boolean> {
+  return new Promise(resolve => {
+    const socket = net.connect(socketPath);
+    socket.once('connect', () => {
+      socket.destroy();
+      resolve(true);
+    });
+    socket.once('error', () => resolve(false));
+  });
+}
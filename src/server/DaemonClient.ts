@@ -0,0 +1,162 @@
+import * as fs from 'fs';
+import * as net from 'net';
+import { AnalysisResult, AnalyzerConfig, FileAnalysis } from '../types';
+import { DaemonAddress, DaemonStats, RpcResponse, defaultDaemonAddress, splitLines } from './protocol';
+
+/**
+ * Error returned by the daemon for one request
+ */
+export class DaemonError extends Error {
+  constructor(readonly code: number, message: string, readonly data?: unknown) {
+    super(message);
+    this.name = 'DaemonError';
+  }
+}
+
+/**
+ * Thin client of a `complexity serve` daemon
+ *
+ * Requests are pipelined over one connection and matched to responses by
+ * id. Every analysis request carries the client's config, so results match
+ * what the CLI would compute in-process.
+ */
+export class DaemonClient {
+  private nextId = 1;
+  private pending: Map<number, { resolve: (result: any) => void; reject: (error: Error) => void }> = new Map();
+
+  private constructor(private readonly socket: net.Socket, private readonly config?: AnalyzerConfig) {
+    socket.setEncoding('utf-8');
+    socket.on('data', splitLines(line => this.receive(line)));
+    socket.on('close', () => this.rejectAll(new Error('Connection to the analysis daemon closed')));
+    socket.on('error', error => this.rejectAll(error));
+    socket.on('end', () => socket.destroy());
+  }
+
+  /**
+   * Connect to the daemon at `address`, or resolve null when none is
+   * listening there within `timeoutMs`
+   */
+  static connect(
+    address: DaemonAddress = defaultDaemonAddress(),
+    config?: AnalyzerConfig,
+    timeoutMs = 500
+  ): Promise<DaemonClient | null> {
+    // Skip the connection attempt in the common no-daemon case
+    if ('path' in address && process.platform !== 'win32' && !fs.existsSync(address.path)) {
+      return Promise.resolve(null);
+    }
+
+    return new Promise(resolve => {
+      const socket = 'path' in address ? net.connect(address.path) : net.connect(address.port, address.host);
+      const timer = setTimeout(() => {
+        socket.destroy();
+        resolve(null);
+      }, timeoutMs);
+
+      socket.once('connect', () => {
+        clearTimeout(timer);
+        resolve(new DaemonClient(socket, config));
+      });
+      socket.once('error', () => {
+        clearTimeout(timer);
+        socket.destroy();
+        resolve(null);
+      });
+    });
+  }
+
+  request<T>(method: string, params?: object): Promise<T> {
+    const id = this.nextId++;
+    return new Promise<T>((resolve, reject) => {
+      this.pending.set(id, { resolve, reject });
+      this.socket.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+    });
+  }
+
+  async analyzeFile(filePath: string): Promise<FileAnalysis> {
+    return reviveAnalysis(await this.request<FileAnalysis>('analyzeFile', { filePath, config: this.config }));
+  }
+
+  async analyzeSource(code: string, filePath: string): Promise<FileAnalysis> {
+    return reviveAnalysis(await this.request<FileAnalysis>('analyzeSource', { code, filePath, config: this.config }));
+  }
+
+  async analyzeBatch(filePaths: string[], jobs = 1): Promise<AnalysisResult> {
+    const result = await this.request<AnalysisResult>('analyzeBatch', { filePaths, jobs, config: this.config });
+    return { successful: result.successful.map(reviveAnalysis), failed: result.failed };
+  }
+
+  /**
+   * Same contract as FileAnalyzer.analyzeFilesStream: one analysis or one
+   * failure per result. Files are sent in batches, with the next batch in
+   * flight while the current one is consumed.
+   */
+  async *analyzeFilesStream(filePaths: string[], jobs = 1, batchSize = 64): AsyncGenerator<AnalysisResult> {
+    const batches: string[][] = [];
+    for (let start = 0; start < filePaths.length; start += batchSize) {
+      batches.push(filePaths.slice(start, start + batchSize));
+    }
+
+    let next = batches.length > 0 ? this.analyzeBatch(batches[0], jobs) : null;
+    try {
+      for (let i = 0; next; i++) {
+        const result = await next;
+        next = i + 1 < batches.length ? this.analyzeBatch(batches[i + 1], jobs) : null;
+
+        for (const analysis of result.successful) {
+          yield { successful: [analysis], failed: [] };
+        }
+        for (const failure of result.failed) {
+          yield { successful: [], failed: [failure] };
+        }
+      }
+    } finally {
+      // A consumer that stops early leaves a batch in flight
+      next?.catch(() => undefined);
+    }
+  }
+
+  stats(): Promise<DaemonStats> {
+    return this.request<DaemonStats>('stats');
+  }
+
+  async shutdown(): Promise<void> {
+    await this.request<null>('shutdown');
+  }
+
+  close(): void {
+    this.socket.end();
+  }
+
+  private receive(line: string): void {
+    let response: RpcResponse;
+    try {
+      response = JSON.parse(line);
+    } catch {
+      this.socket.destroy(new Error('Malformed response from the analysis daemon'));
+      return;
+    }
+
+    const pending = typeof response.id === 'number' ? this.pending.get(response.id) : undefined;
+    if (!pending) {
+      return;
+    }
+    this.pending.delete(response.id as number);
+
+    if (response.error) {
+      pending.reject(new DaemonError(response.error.code, response.error.message, response.error.data));
+    } else {
+      pending.resolve(response.result);
+    }
+  }
+
+  private rejectAll(error: Error): void {
+    this.pending.forEach(({ reject }) => reject(error));
+    this.pending.clear();
+  }
+}
+
+// Dates arrive as ISO strings
+function reviveAnalysis(analysis: FileAnalysis): FileAnalysis {
+  return { ...analysis, analysisDate: new Date(analysis.analysisDate) };
+}
@@ -0,0 +1,46 @@
+/**
+ * Map that holds at most `maxEntries` entries, evicting the least recently
+ * used one first. Relies on Map keeping insertion order: a read moves the
+ * entry to the end, so the first key is always the oldest.
+ */
+export class LruCache<K, V> {
+  private entries: Map<K, V> = new Map();
+  private hits = 0;
+  private misses = 0;
+
+  constructor(private readonly maxEntries: number) {}
+
+  get(key: K): V | undefined {
+    const value = this.entries.get(key);
+    if (value === undefined) {
+      this.misses++;
+      return undefined;
+    }
+
+    this.hits++;
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    return value;
+  }
+
+  set(key: K, value: V): void {
+    this.entries.delete(key);
+    this.entries.set(key, value);
+
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as K);
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  getStats(): { hits: number; misses: number; size: number; maxEntries: number } {
+    return { hits: this.hits, misses: this.misses, size: this.entries.size, maxEntries: this.maxEntries };
+  }
+}
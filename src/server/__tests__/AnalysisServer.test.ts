@@ -0,0 +1,96 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { AnalysisServer } from '../AnalysisServer';
+import { DaemonClient, DaemonError } from '../DaemonClient';
+import { RPC_ERRORS, parseDaemonAddress } from '../protocol';
+import { DEFAULT_CONFIG } from '../../types';
+
+describe('AnalysisServer', () => {
+  let dir: string;
+  let server: AnalysisServer;
+
+  const call = async (method: string, params?: object) =>
+    server.handleMessage(JSON.stringify({ jsonrpc: '2.0', id: 1, method, params }));
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'complexity-server-'));
+    fs.writeFileSync(path.join(dir, 'app.js'), 'function add(a, b) {\n  return a + b;\n}\n');
+    server = new AnalysisServer({
+      address: { path: path.join(dir, 'daemon.sock') },
+      config: DEFAULT_CONFIG,
+      cacheDir: null,
+    });
+  });
+
+  afterEach(async () => {
+    await server.close();
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('should analyze a file and serve it from memory until it changes', async () => {
+    const filePath = path.join(dir, 'app.js');
+
+    const first = await call('analyzeFile', { filePath });
+    const second = await call('analyzeFile', { filePath });
+
+    expect((first?.result as any).functions[0].name).toBe('add');
+    expect(second?.result).toBe(first?.result);
+    expect(server.getStats().results.hits).toBe(1);
+    expect(server.getStats().filesAnalyzed).toBe(1);
+  });
+
+  it('should analyze unsaved source', async () => {
+    const response = await call('analyzeSource', { code: 'def f(x):\n    return x\n', filePath: 'buffer.py' });
+
+    expect((response?.result as any).language).toBe('Python');
+  });
+
+  it('should report failures and protocol errors as JSON-RPC errors', async () => {
+    const missing = await call('analyzeFile', { filePath: path.join(dir, 'missing.js') });
+    const invalid = await call('analyzeBatch', { filePaths: 'app.js' });
+    const unknown = await call('format');
+    const malformed = await server.handleMessage('{');
+
+    expect(missing?.error?.code).toBe(RPC_ERRORS.ANALYSIS_FAILED);
+    expect((missing?.error?.data as any).errorType).toBe('FILE_NOT_FOUND');
+    expect(invalid?.error?.code).toBe(RPC_ERRORS.INVALID_PARAMS);
+    expect(unknown?.error?.code).toBe(RPC_ERRORS.METHOD_NOT_FOUND);
+    expect(malformed?.error?.code).toBe(RPC_ERRORS.PARSE_ERROR);
+  });
+
+  it('should not answer notifications', async () => {
+    expect(await server.handleMessage(JSON.stringify({ jsonrpc: '2.0', method: 'stats' }))).toBeNull();
+  });
+
+  it('should serve clients over its socket', async () => {
+    await server.listen();
+    const client = await DaemonClient.connect({ path: path.join(dir, 'daemon.sock') }, DEFAULT_CONFIG);
+
+    try {
+      const result = await client!.analyzeBatch([path.join(dir, 'app.js'), path.join(dir, 'missing.js')]);
+
+      expect(result.successful).toHaveLength(1);
+      expect(result.successful[0].analysisDate).toBeInstanceOf(Date);
+      expect(result.failed[0].errorType).toBe('FILE_NOT_FOUND');
+      await expect(client!.analyzeSource('x', 'notes.txt')).rejects.toBeInstanceOf(DaemonError);
+    } finally {
+      client?.close();
+    }
+  });
+
+  it('should find no daemon where none is listening', async () => {
+    expect(await DaemonClient.connect({ path: path.join(dir, 'none.sock') })).toBeNull();
+  });
+
+  it('should only accept loopback TCP addresses', async () => {
+    expect(parseDaemonAddress('7070')).toEqual({ host: '127.0.0.1', port: 7070 });
+    expect(parseDaemonAddress('localhost:7070')).toEqual({ host: 'localhost', port: 7070 });
+    expect(parseDaemonAddress('[::1]:7070')).toEqual({ host: '::1', port: 7070 });
+    expect(() => parseDaemonAddress('0.0.0.0:7070')).toThrow('loopback');
+    expect(() => parseDaemonAddress('example.com:7070')).toThrow('loopback');
+
+    const exposed = new AnalysisServer({ address: { host: '0.0.0.0', port: 0 }, config: DEFAULT_CONFIG });
+    await expect(exposed.listen()).rejects.toThrow('loopback');
+  });
+});
@@ -0,0 +1,27 @@
+import { LruCache } from '../LruCache';
+
+describe('LruCache', () => {
+  it('should evict the least recently used entry', () => {
+    const cache = new LruCache<string, number>(2);
+
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.get('a');
+    cache.set('c', 3);
+
+    expect(cache.get('a')).toBe(1);
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('c')).toBe(3);
+    expect(cache.size).toBe(2);
+  });
+
+  it('should count hits and misses', () => {
+    const cache = new LruCache<string, number>(10);
+
+    cache.set('a', 1);
+    cache.get('a');
+    cache.get('missing');
+
+    expect(cache.getStats()).toEqual({ hits: 1, misses: 1, size: 1, maxEntries: 10 });
+  });
+});
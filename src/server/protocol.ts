@@ -0,0 +1,166 @@
+import * as crypto from 'crypto';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { AnalyzerConfig } from '../types';
+
+/**
+ * Wire format shared by `complexity serve` and DaemonClient: JSON-RPC 2.0,
+ * one message per line over a Unix domain socket (a named pipe on Windows)
+ * or a localhost TCP port.
+ *
+ * Methods:
+ * - `analyzeFile {filePath, config?}` -> FileAnalysis
+ * - `analyzeSource {code, filePath, config?}` -> FileAnalysis, for unsaved buffers
+ * - `analyzeBatch {filePaths, jobs?, config?}` -> AnalysisResult
+ * - `stats` -> DaemonStats
+ * - `shutdown` -> null, then the daemon exits
+ *
+ * `config` is the caller's effective AnalyzerConfig; the daemon keeps an
+ * analyzer warm for each config it is asked for. Failed analyses are
+ * reported as errors whose `data` is the AnalysisError.
+ */
+export interface RpcRequest {
+  jsonrpc: '2.0';
+  // Absent for notifications, which get no response
+  id?: number | string | null;
+  method: string;
+  params?: any;
+}
+
+export interface RpcError {
+  code: number;
+  message: string;
+  data?: unknown;
+}
+
+export interface RpcResponse {
+  jsonrpc: '2.0';
+  id: number | string | null;
+  result?: unknown;
+  error?: RpcError;
+}
+
+export const RPC_ERRORS = {
+  PARSE_ERROR: -32700,
+  INVALID_REQUEST: -32600,
+  METHOD_NOT_FOUND: -32601,
+  INVALID_PARAMS: -32602,
+  ANALYSIS_FAILED: -32000,
+} as const;
+
+export interface AnalyzeParams {
+  config?: AnalyzerConfig;
+}
+
+export interface DaemonStats {
+  pid: number;
+  address: string;
+  uptimeMs: number;
+  requests: number;
+  filesAnalyzed: number;
+  // Distinct configs with a warm analyzer
+  analyzers: number;
+  results: { hits: number; misses: number; size: number; maxEntries: number };
+  rssBytes: number;
+}
+
+/**
+ * A Unix socket or named pipe path, or a TCP port on `host`
+ */
+export type DaemonAddress = { path: string } | { host: string; port: number };
+
+// Overrides the default address, for both `serve` and the CLI
+export const DAEMON_ENV = 'COMPLEXITY_DAEMON';
+
+/**
+ * `1234` or `host:1234` is a TCP address, anything else a socket path.
+ * The daemon is unauthenticated and reads any path it is asked for, so
+ * TCP hosts must be loopback addresses.
+ */
+export function parseDaemonAddress(value: string): DaemonAddress {
+  const tcp = /^(?:(.+):)?(\d+)$/.exec(value);
+  if (tcp) {
+    const host = tcp[1]?.replace(/^\[(.*)\]$/, '$1') ?? '127.0.0.1';
+    if (!isLoopbackHost(host)) {
+      throw new Error(`Daemon host must be a loopback address, got ${host}`);
+    }
+    return { host, port: parseInt(tcp[2], 10) };
+  }
+  return { path: path.resolve(value) };
+}
+
+/**
+ * Whether a host name or address only reaches this machine
+ */
+export function isLoopbackHost(host: string): boolean {
+  return host === 'localhost' || host === '::1' || /^127(\.\d{1,3}){3}$/.test(host);
+}
+
+export function formatDaemonAddress(address: DaemonAddress): string {
+  return 'path' in address ? address.path : `${address.host}:${address.port}`;
+}
+
+/**
+ * Address of the daemon serving the project that contains `cwd`: the
+ * COMPLEXITY_DAEMON override, or a socket named after the project root in
+ * a directory only the current user can open
+ */
+export function defaultDaemonAddress(cwd: string = process.cwd()): DaemonAddress {
+  const override = process.env[DAEMON_ENV];
+  if (override) {
+    return parseDaemonAddress(override);
+  }
+
+  const hash = crypto.createHash('sha1').update(projectRoot(cwd)).digest('hex').slice(0, 16);
+  if (process.platform === 'win32') {
+    return { path: `\\\\.\\pipe\\complexity-${hash}` };
+  }
+
+  const user = typeof process.getuid === 'function' ? process.getuid() : os.userInfo().username;
+  return { path: path.join(os.tmpdir(), `complexity-${user}`, `${hash}.sock`) };
+}
+
+/**
+ * The enclosing git work tree, or `cwd` itself outside of one, so every
+ * directory of a project reaches the same daemon
+ */
+function projectRoot(cwd: string): string {
+  let dir = path.resolve(cwd);
+  try {
+    dir = fs.realpathSync(dir);
+  } catch {
+    // Keep the resolved path
+  }
+
+  for (let current = dir; ; current = path.dirname(current)) {
+    if (fs.existsSync(path.join(current, '.git'))) {
+      return current;
+    }
+    if (path.dirname(current) === current) {
+      return dir;
+    }
+  }
+}
+
+/**
+ * Split a stream of text chunks into non-empty lines. Only new chunks are
+ * scanned for newlines, so long messages cost linear time.
+ */
+export function splitLines(onLine: (line: string) => void): (chunk: string) => void {
+  let partial = '';
+
+  return chunk => {
+    let start = 0;
+    let newline: number;
+    while ((newline = chunk.indexOf('\n', start)) !== -1) {
+      const line = partial + chunk.slice(start, newline);
+      partial = '';
+      start = newline + 1;
+      if (line.trim() !== '') {
+        onLine(line);
+      }
+    }
+    partial += chunk.slice(start);
+  };
+}
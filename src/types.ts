@@ -12,12 +12,56 @@ export interface ComplexityMetrics {
   parameterCount: number;
 }
 
+/**
+ * Identifies a function of the same file
+ */
+export interface FunctionRef {
+  name: string;
+  startLine: number;
+}
+
+/**
+ * Token-level summary of a function's own body, used to find duplicates.
+ * Identifiers and literals are abstracted before hashing, so renamed
+ * copies fingerprint alike.
+ */
+export interface FunctionFingerprint {
+  // Normalized tokens in the body
+  tokens: number;
+  // MinHash signature of the body's winnowed token shingles
+  minHash: number[];
+}
+
 export interface FunctionInfo {
   name: string;
   startLine: number;
   endLine: number;
+  // Including the functions nested in this one
   metrics: ComplexityMetrics;
+  // This function's own body only; present when it has nested functions
+  exclusiveMetrics?: ComplexityMetrics;
+  // The same function at the --since revision, when asked for
+  previousMetrics?: ComplexityMetrics;
+  // Enclosing function, for nested functions
+  parent?: FunctionRef;
+  // Functions nested directly in this one
+  children?: FunctionRef[];
+  // Issues in this function's own body; nested functions report their own
   issues: CodeIssue[];
+  // Present when duplicate detection is on and the body is large enough
+  fingerprint?: FunctionFingerprint;
+}
+
+/**
+ * A module imported by a file, as written in its source
+ */
+export interface ModuleImport {
+  // A path or package for JavaScript and TypeScript; a dotted module,
+  // possibly relative (`..utils`), for Python
+  source: string;
+  // Names a Python `from` import takes from the module, which may be submodules
+  names?: string[];
+  line: number;
 }
 
 export interface FileAnalysis {
@@ -28,6 +72,20 @@ export interface FileAnalysis {
   classes: ClassInfo[];
   totalIssues: number;
   analysisDate: Date;
+  // Set when only metrics were computed, e.g. for minified or generated files
+  degraded?: AnalysisError;
+  // Present when dependency analysis is on
+  imports?: ModuleImport[];
+}
+
+/**
+ * Read-only sequence of file analyses, as taken by the reporters. Arrays
+ * satisfy it, and so does AnalysisStore, which materializes each analysis
+ * only when it is read.
+ */
+export interface AnalysisList extends Iterable<FileAnalysis> {
+  readonly length: number;
+  slice(start?: number, end?: number): FileAnalysis[];
 }
 
 export interface ClassInfo {
@@ -114,6 +172,8 @@ export enum IssueType {
   TIGHT_COUPLING = 'TIGHT_COUPLING',
   MISSING_ABSTRACTION = 'MISSING_ABSTRACTION',
   INCONSISTENT_NAMING = 'INCONSISTENT_NAMING',
+  CIRCULAR_DEPENDENCY = 'CIRCULAR_DEPENDENCY',
+  HUB_MODULE = 'HUB_MODULE',
 }
 
 export interface AnalyzerConfig {
@@ -123,10 +183,43 @@ export interface AnalyzerConfig {
   maxFunctionLength: number;
   maxParameters: number;
   trackHistory: boolean;
+  // Larger files are skipped without being read
+  maxFileBytes: number;
+  // Files whose walk visits more syntax nodes are skipped
+  maxAstNodes: number;
+  // Wall-clock limit for parsing and analyzing one file
+  fileTimeoutMs: number;
+  // Analyze minified and generated files for metrics only
+  detectGenerated: boolean;
+  // Report functions duplicated across the analyzed files
+  detectDuplicates: boolean;
+  // Smaller functions are never reported as duplicates
+  minDuplicateTokens: number;
+  // Estimated token-set similarity (0-1) at which two functions are duplicates
+  duplicateSimilarity: number;
+  // Resolve imports into a module graph and report cycles and hub modules
+  analyzeDependencies: boolean;
+}
+
+/**
+ * Called for every syntax node walked; throws to abort the file's analysis
+ */
+export interface NodeBudget {
+  visit(): void;
+}
+
+export interface ParseOptions {
+  // Compute metrics without detecting issues
+  metricsOnly?: boolean;
+  budget?: NodeBudget;
+  // Fingerprint functions of at least this many tokens, for duplicate detection
+  minFingerprintTokens?: number;
+  // Record the file's imports, for the module dependency graph
+  collectImports?: boolean;
 }
 
 export interface ParserInterface {
-  parse(code: string, filePath: string): FileAnalysis;
+  parse(code: string, filePath: string, options?: ParseOptions): FileAnalysis;
   getSupportedExtensions(): string[];
   getLanguageName(): string;
 }
@@ -138,20 +231,50 @@ export const DEFAULT_CONFIG: AnalyzerConfig = {
   maxFunctionLength: 50,
   maxParameters: 5,
   trackHistory: false,
+  maxFileBytes: 1024 * 1024,
+  maxAstNodes: 1_000_000,
+  fileTimeoutMs: 10_000,
+  detectGenerated: true,
+  detectDuplicates: false,
+  minDuplicateTokens: 50,
+  duplicateSimilarity: 0.85,
+  analyzeDependencies: false,
 };
 
 export interface CLIOptions {
   language?: string;
-  output?: 'table' | 'json' | 'html';
+  output?: 'table' | 'json' | 'ndjson' | 'csv' | 'html';
   threshold?: string;
   history?: boolean;
   recursive?: boolean;
+  since?: string;
+  previousMetrics?: boolean;
+  gitLsFiles?: boolean;
+  jobs?: string;
+  cache?: boolean;
+  cacheDir?: string;
+  profile?: boolean;
+  traceOut?: string;
+  fixes?: boolean;
+  maxFileBytes?: string;
+  maxAstNodes?: string;
+  fileTimeout?: string;
+  includeGenerated?: boolean;
+  daemon?: boolean;
+  duplicates?: boolean;
+  dependencies?: boolean;
 }
 
+/**
+ * Why a file was skipped (size, nodes, time) or analyzed for metrics only
+ * (minified, generated)
+ */
+export type AnalysisLimitReason = 'FILE_TOO_LARGE' | 'TOO_MANY_NODES' | 'TIMEOUT' | 'MINIFIED' | 'GENERATED';
+
 export interface AnalysisError {
   filePath: string;
   error: string;
-  errorType: 'FILE_NOT_FOUND' | 'UNSUPPORTED_EXTENSION' | 'PARSE_ERROR' | 'READ_ERROR';
+  errorType: 'FILE_NOT_FOUND' | 'UNSUPPORTED_EXTENSION' | 'PARSE_ERROR' | 'READ_ERROR' | AnalysisLimitReason;
 }
 
 export interface AnalysisResult {